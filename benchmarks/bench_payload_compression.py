@@ -0,0 +1,137 @@
+"""Database size before and after compressing event payloads.
+
+Runs compress_payloads - the backfill for history written before payload
+compression - over a copy of a database and reports what it saved: payload
+bytes, and the file size once both versions are VACUUMed. Point --db at a
+real data.db for numbers from actual history (it is copied with the
+WAL-aware backup API and never written); without it, a synthetic history of
+status lines, stack traces, CI logs and plan summaries is generated.
+
+    uv run python benchmarks/bench_payload_compression.py [--db PATH] [--events 20000]
+        [--threshold 1024] [--codec zlib]
+"""
+
+import argparse
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from agent_event_bus.payload_codec import CODECS
+from agent_event_bus.storage import PAYLOAD_COMPRESS_MIN_BYTES, SQLiteStorage
+
+
+def _synthetic_payload(rng: random.Random, i: int) -> str:
+    """One payload, in roughly the mix agents publish: mostly short, some long."""
+    kind = rng.random()
+    if kind < 0.7:
+        return f"Finished step {i}: {rng.choice(['tests pass', 'lint clean', 'pushed'])}"
+    if kind < 0.8:
+        frames = "".join(
+            f'  File "/srv/app/{rng.choice(["api", "db", "jobs"])}/mod{rng.randrange(40)}.py", '
+            f"line {rng.randrange(1, 900)}, in handler_{rng.randrange(200)}\n"
+            f"    result = process(item, retries={rng.randrange(5)})\n"
+            for _ in range(rng.randrange(10, 60))
+        )
+        return f"Traceback (most recent call last):\n{frames}ValueError: bad item {i}"
+    if kind < 0.9:
+        return "".join(
+            f"[{rng.randrange(10**6):06d}] test_case_{rng.randrange(3000)} "
+            f"{rng.choice(['PASSED', 'PASSED', 'PASSED', 'FAILED', 'SKIPPED'])}\n"
+            for _ in range(rng.randrange(40, 300))
+        )
+    return "\n".join(
+        f"{n}. {rng.choice(['Refactor', 'Test', 'Document', 'Migrate'])} the "
+        f"{rng.choice(['storage', 'server', 'webhook', 'retention'])} layer so that "
+        f"request {rng.randrange(10**4)} no longer blocks the publish path"
+        for n in range(1, rng.randrange(5, 40))
+    )
+
+
+def _build(path: Path, count: int) -> None:
+    storage = SQLiteStorage(
+        db_path=str(path), compress_min_bytes=0, recent_events=0, session_cache=False
+    )
+    rng = random.Random(0)
+    with storage.transaction():
+        for i in range(count):
+            storage.add_event(
+                event_type="bench", payload=_synthetic_payload(rng, i), session_id="s"
+            )
+    storage.close()
+
+
+def _copy(source: Path, dest: Path) -> None:
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(dest)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def _vacuumed_size(path: Path) -> int:
+    """File size once free pages are dropped and the WAL is folded back in."""
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    return path.stat().st_size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=Path, help="database to report on (copied, never written)")
+    parser.add_argument("--events", type=int, default=20000, help="synthetic history size")
+    parser.add_argument(
+        "--threshold", type=int, default=PAYLOAD_COMPRESS_MIN_BYTES, help="compress_min_bytes"
+    )
+    parser.add_argument("--codec", choices=sorted(CODECS), default="zlib")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-compress-"))
+    try:
+        db = tmp / "bench.db"
+        if args.db:
+            _copy(args.db, db)
+        else:
+            _build(db, args.events)
+        before = _vacuumed_size(db)
+
+        storage = SQLiteStorage(
+            db_path=str(db),
+            compress_min_bytes=args.threshold,
+            payload_codec=args.codec,
+            recent_events=0,
+            session_cache=False,
+        )
+        start = time.perf_counter()
+        stats = storage.compress_payloads()
+        elapsed = time.perf_counter() - start
+        storage.close()
+        after = _vacuumed_size(db)
+
+        print(f"{args.db or 'synthetic history'}: {args.codec}, threshold {args.threshold} B")
+        print(
+            f"  events     {stats['scanned']:>12,}   compressed {stats['compressed']:,} "
+            f"in {elapsed:.2f}s"
+        )
+        if stats["compressed"]:
+            print(
+                f"  payloads   {stats['bytes_before']:>12,} B -> {stats['bytes_after']:,} B "
+                f"({stats['bytes_after'] / stats['bytes_before']:.0%})"
+            )
+        print(f"  file       {before:>12,} B -> {after:,} B ({after / before:.0%})")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Sustained publish_event throughput under concurrent publishers (the #112 storm).
+
+Drives the publish_event tool the way the server does - concurrent calls on
+one event loop, each body offloaded by _run_sync to the worker pool - against
+a throwaway database, in three configurations: every add_event its own transaction (the
+pre-group-commit behavior), group commit, and group commit with relaxed
+durability. Prints events/second and how many calls failed with
+"database is locked".
+
+    uv run python benchmarks/bench_publish_throughput.py [--publishers 32] [--events 200]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Before importing server: its module-level storage must not open the real bus
+# database, and TESTING keeps it from writing the production log file.
+_tmp = tempfile.mkdtemp(prefix="bench-publish-")
+os.environ["AGENT_EVENT_BUS_DB"] = str(Path(_tmp) / "bench.db")
+os.environ["AGENT_EVENT_BUS_TESTING"] = "1"
+
+from agent_event_bus import server  # noqa: E402
+from agent_event_bus.storage import GROUP_COMMIT_MAX_EVENTS, SQLiteStorage  # noqa: E402
+
+CONFIGS = {
+    "per-event commit": dict(group_commit_max=0),
+    "group commit": dict(group_commit_max=GROUP_COMMIT_MAX_EVENTS),
+    "group + normal": dict(group_commit_max=GROUP_COMMIT_MAX_EVENTS, durability="normal"),
+}
+
+
+async def _publisher(worker_id: int, events: int) -> int:
+    """Publish `events` events; return how many failed with a locked database."""
+    locked = 0
+    for i in range(events):
+        try:
+            await server.publish_event.fn(
+                event_type="ci_status", payload=f"{worker_id}:{i}", channel="repo:bench"
+            )
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            locked += 1
+    return locked
+
+
+async def _run(name: str, options: dict, publishers: int, events: int) -> tuple[float, int]:
+    server.storage = SQLiteStorage(db_path=str(Path(_tmp) / f"{name}.db"), **options)
+    try:
+        start = time.perf_counter()
+        locked = sum(await asyncio.gather(*(_publisher(i, events) for i in range(publishers))))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.storage.close()
+    return publishers * events / elapsed, locked
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--publishers", type=int, default=32, help="concurrent publishers")
+    parser.add_argument("--events", type=int, default=200, help="events per publisher")
+    args = parser.parse_args()
+
+    print(f"{args.publishers} publishers x {args.events} events")
+    try:
+        for name, options in CONFIGS.items():
+            rate, locked = asyncio.run(_run(name, options, args.publishers, args.events))
+            print(f"{name:>18}  {rate:9.0f} events/s   {locked} 'database is locked'")
+    finally:
+        shutil.rmtree(_tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
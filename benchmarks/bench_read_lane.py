@@ -0,0 +1,116 @@
+"""Read latency during a publish storm, with and without the read-only connection lane.
+
+Publisher threads call storage.add_event as fast as they can while reader
+threads run the read path's SQL - list_sessions, list_webhooks, a peek-style
+get_events - and the read latencies are recorded. The session cache and the
+recent-events window are turned off so every read reaches SQLite. Runs once
+with reads on the shared read-write pool (_read swapped for _connect, the
+pre-lane behavior) and once on the read-only lane, and prints read
+percentiles for each, plus the publish rate the storm sustained.
+
+    uv run python benchmarks/bench_read_lane.py [--publishers 4] [--readers 4] [--seconds 5]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+os.environ["AGENT_EVENT_BUS_TESTING"] = "1"
+
+from agent_event_bus.storage import Session, SQLiteStorage  # noqa: E402
+
+_tmp = tempfile.mkdtemp(prefix="bench-read-lane-")
+
+
+def _storage(name: str, shared: bool) -> SQLiteStorage:
+    storage = SQLiteStorage(
+        db_path=str(Path(_tmp) / f"{name}.db"), recent_events=0, session_cache=False
+    )
+    if shared:
+        storage._read = storage._connect
+    now = datetime.now()
+    for i in range(20):
+        storage.add_session(
+            Session(
+                id=f"s{i}",
+                display_id=f"bench-{i}",
+                name=f"bench-{i}",
+                machine="bench",
+                cwd="/bench",
+                repo="bench",
+                registered_at=now,
+                last_heartbeat=now,
+                client_id=f"c{i}",
+            )
+        )
+    storage.add_webhook(url="https://example.test/hook")
+    return storage
+
+
+def _run(storage: SQLiteStorage, publishers: int, readers: int, seconds: float):
+    stop = threading.Event()
+    published = [0] * publishers
+    latencies: list[list[float]] = [[] for _ in range(readers)]
+
+    def publish(n: int) -> None:
+        while not stop.is_set():
+            storage.add_event(event_type="bench", payload="x" * 200, session_id="s0")
+            published[n] += 1
+
+    def read(n: int) -> None:
+        samples = latencies[n]
+        while not stop.is_set():
+            cursor = storage.get_cursor()
+            start = time.perf_counter()
+            storage.list_sessions()
+            storage.list_webhooks()
+            storage.get_events(cursor=str(max(int(cursor or 0) - 50, 0)), order="asc")
+            samples.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=publish, args=(n,)) for n in range(publishers)]
+    threads += [threading.Thread(target=read, args=(n,)) for n in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    storage.close()
+    return [t for samples in latencies for t in samples], sum(published) / seconds
+
+
+def _summary(samples: list[float]) -> str:
+    ms = sorted(t * 1000 for t in samples)
+    p50 = statistics.median(ms)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    p99 = ms[int(len(ms) * 0.99) - 1]
+    return f"p50 {p50:7.3f} ms   p95 {p95:7.3f} ms   p99 {p99:7.3f} ms"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--publishers", type=int, default=4, help="publishing threads")
+    parser.add_argument("--readers", type=int, default=4, help="reading threads")
+    parser.add_argument("--seconds", type=float, default=5.0, help="storm duration per run")
+    args = parser.parse_args()
+
+    print(f"{args.publishers} publishers, {args.readers} readers, {args.seconds:g}s per run")
+    try:
+        for label, shared in (("shared", True), ("read-only", False)):
+            storage = _storage(label, shared)
+            samples, rate = _run(storage, args.publishers, args.readers, args.seconds)
+            print(f"{label:>10}  reads {_summary(samples)}   publishes {rate:8.0f}/s")
+    finally:
+        shutil.rmtree(_tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
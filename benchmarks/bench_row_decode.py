@@ -0,0 +1,122 @@
+"""Rows per second decoded for one get_events page, before and after the tuple decoder.
+
+"before" is the old read path: a PARSE_DECLTYPES converter parsing every
+TIMESTAMP column, sqlite3.Row rows, a decoder that looks each column up by
+name (with keys() membership checks), and isoformat() again for the wire.
+"after" is the current one: plain tuples unpacked in a fixed column order,
+fromisoformat called directly, and the stored text reused as the cached
+wire string. Both read the same page from one throwaway database, straight
+from SQLite (the recent-events window is off).
+
+    uv run python benchmarks/bench_row_decode.py [--page 500] [--rounds 200]
+"""
+
+import argparse
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from agent_event_bus.storage import Event, SQLiteStorage, _build_events_query, _fetch_tuples
+
+
+def _legacy_row_to_event(row: sqlite3.Row) -> Event:
+    """SQLiteStorage._row_to_event as it was before the tuple decoder."""
+    keys = row.keys()
+    meta = None
+    if "payload_meta" in keys and row["payload_meta"]:
+        try:
+            meta = json.loads(row["payload_meta"])
+        except (json.JSONDecodeError, TypeError):
+            meta = None
+    return Event(
+        id=row["id"],
+        event_type=row["event_type"],
+        payload=row["payload"],
+        session_id=row["session_id"],
+        timestamp=row["timestamp"],
+        channel=row["channel"] if "channel" in keys else "all",
+        correlation_id=row["correlation_id"] if "correlation_id" in keys else None,
+        meta=meta,
+    )
+
+
+def _build(tmp: Path, page: int) -> SQLiteStorage:
+    storage = SQLiteStorage(db_path=str(tmp / "bench.db"), recent_events=0)
+    for i in range(page):
+        storage.add_event(
+            event_type="bench",
+            payload=f"payload {i}",
+            session_id="bench",
+            channel="repo:bench",
+            meta={"title": "t", "tags": ["a"]} if i % 2 else None,
+        )
+    return storage
+
+
+def _before(db_path: Path, page: int, rounds: int) -> tuple[float, float]:
+    # The converter storage.py used to register; storage connections no
+    # longer PARSE_DECLTYPES, so registering it here changes no other path.
+    sqlite3.register_converter("TIMESTAMP", lambda data: datetime.fromisoformat(data.decode()))
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.row_factory = sqlite3.Row
+    query = f"SELECT * FROM events ORDER BY id DESC LIMIT {page}"
+    decode = render = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        events = [_legacy_row_to_event(row) for row in conn.execute(query).fetchall()]
+        decode += time.perf_counter() - start
+        start = time.perf_counter()
+        for e in events:
+            e.timestamp.isoformat()
+        render += time.perf_counter() - start
+    conn.close()
+    return decode, render
+
+
+def _after(storage: SQLiteStorage, page: int, rounds: int) -> tuple[float, float]:
+    query, params = _build_events_query(None, page)
+    decode = render = 0.0
+    with storage._connect() as conn:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            events = [storage._row_to_event(row) for row in _fetch_tuples(conn, query, params)]
+            decode += time.perf_counter() - start
+            start = time.perf_counter()
+            for e in events:
+                e.timestamp_iso
+            render += time.perf_counter() - start
+    return decode, render
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", type=int, default=500, help="events per get_events page")
+    parser.add_argument("--rounds", type=int, default=200, help="pages decoded per variant")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-decode-"))
+    try:
+        storage = _build(tmp, args.page)
+        rows = args.page * args.rounds
+        print(f"{args.rounds} pages of {args.page} events")
+        for label, (decode, render) in (
+            ("before", _before(storage.db_path, args.page, args.rounds)),
+            ("after", _after(storage, args.page, args.rounds)),
+        ):
+            print(
+                f"{label:>7}  decode {rows / decode:>12,.0f} rows/s   "
+                f"decode+iso {rows / (decode + render):>12,.0f} rows/s"
+            )
+        storage.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
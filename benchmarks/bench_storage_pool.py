@@ -0,0 +1,92 @@
+"""Per-call latency of publish_event / get_events with and without connection pooling.
+
+Drives the real tool implementations (_publish_event_impl, _get_events_impl)
+from a pool of threads, the way _run_sync does under concurrent agents, against
+a throwaway database. Runs once with pool_size=0 (open a connection per storage
+call, the pre-pool behavior) and once pooled, and prints latency percentiles.
+
+    uv run python benchmarks/bench_storage_pool.py [--threads 8] [--calls 500]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Before importing server: its module-level storage must not open the real bus
+# database, and TESTING keeps it from writing the production log file.
+_tmp = tempfile.mkdtemp(prefix="bench-pool-")
+os.environ["AGENT_EVENT_BUS_DB"] = str(Path(_tmp) / "bench.db")
+os.environ["AGENT_EVENT_BUS_TESTING"] = "1"
+
+from agent_event_bus import server  # noqa: E402
+from agent_event_bus.storage import DEFAULT_POOL_SIZE, SQLiteStorage  # noqa: E402
+
+
+def _worker(worker_id: int, calls: int) -> tuple[list[float], list[float]]:
+    """Alternate publish and consuming resume-poll calls; return both latency lists."""
+    reg = server._register_session_impl(
+        name=f"bench-{worker_id}", machine="bench", cwd="/bench", client_id=f"bench-{worker_id}"
+    )
+    session_id = reg["session_id"]
+    publish, poll = [], []
+    for i in range(calls):
+        start = time.perf_counter()
+        server._publish_event_impl(
+            event_type="bench", payload=str(i), session_id=session_id, channel="repo:bench"
+        )
+        publish.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        server._get_events_impl(session_id=session_id, resume=True, order="asc", limit=50)
+        poll.append(time.perf_counter() - start)
+    return publish, poll
+
+
+def _run(pool_size: int, threads: int, calls: int) -> dict[str, list[float]]:
+    db_path = Path(_tmp) / f"pool-{pool_size}.db"
+    server.storage = SQLiteStorage(db_path=str(db_path), pool_size=pool_size)
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(_worker, range(threads), [calls] * threads))
+    finally:
+        server.storage.close()
+    return {
+        "publish_event": [t for publish, _ in results for t in publish],
+        "get_events": [t for _, poll in results for t in poll],
+    }
+
+
+def _summary(samples: list[float]) -> str:
+    ms = sorted(t * 1000 for t in samples)
+    p50 = statistics.median(ms)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    p99 = ms[int(len(ms) * 0.99) - 1]
+    return f"p50 {p50:7.3f} ms   p95 {p95:7.3f} ms   p99 {p99:7.3f} ms"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8, help="concurrent callers")
+    parser.add_argument("--calls", type=int, default=500, help="publish+poll pairs per caller")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.calls} publish+get_events pairs")
+    try:
+        for label, size in (("unpooled", 0), (f"pooled({args.pool_size})", args.pool_size)):
+            results = _run(size, args.threads, args.calls)
+            for tool, samples in results.items():
+                print(f"{label:>12}  {tool:<14} {_summary(samples)}")
+    finally:
+        shutil.rmtree(_tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
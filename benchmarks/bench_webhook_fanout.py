@@ -0,0 +1,99 @@
+"""Webhook bodies rendered per second at a fan-out of 1, 10 and 100 webhooks.
+
+"before" is the old dispatch path: every delivery builds its event's payload
+dict, json.dumps it and signs the result, so an event matching N webhooks is
+rendered and signed N times. "after" is the current one: a dispatch round's
+_WebhookBodies renders each event once, hands every delivery the same bytes,
+and signs them once per distinct secret. The webhooks share --secrets
+distinct secrets between them (0: none are signed). The encoder line says
+whether orjson is installed; without it "after" uses json, like "before".
+
+    uv run python benchmarks/bench_webhook_fanout.py [--events 100] [--rounds 50]
+        [--secrets 2] [--fanout 1 10 100]
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+from agent_event_bus.server import (
+    _compute_signature,
+    _encode_json,
+    _json_bytes,
+    _webhook_payload,
+    _WebhookBodies,
+)
+from agent_event_bus.storage import Event
+
+
+def _events(count: int) -> list[Event]:
+    return [
+        Event(
+            id=i,
+            event_type="task_completed",
+            payload=f"Finished step {i}: tests pass, lint clean, pushed to review " * 4,
+            session_id="bench-session",
+            timestamp=datetime(2026, 1, 1),
+            channel="repo:bench",
+            meta={"title": f"step {i}", "tags": ["ci", "bench"]} if i % 2 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def _before(events: list[Event], secrets: list[str | None]) -> int:
+    sent = 0
+    for event in events:
+        for secret in secrets:
+            body = json.dumps(_webhook_payload(event)).encode()
+            if secret:
+                _compute_signature(body, secret)
+            sent += len(body)
+    return sent
+
+
+def _after(events: list[Event], secrets: list[str | None]) -> int:
+    bodies = _WebhookBodies()
+    sent = 0
+    for event in events:
+        for secret in secrets:
+            body = bodies.event(event)
+            if secret:
+                bodies.signature(body, secret)
+            sent += len(body)
+    return sent
+
+
+def _rate(render, events: list[Event], secrets: list[str | None], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        render(events, secrets)
+    return len(events) * len(secrets) * rounds / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100, help="events per dispatch round")
+    parser.add_argument("--rounds", type=int, default=50, help="rounds per measurement")
+    parser.add_argument("--secrets", type=int, default=2, help="distinct webhook secrets")
+    parser.add_argument("--fanout", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    events = _events(args.events)
+    encoder = "json" if _encode_json is _json_bytes else "orjson"
+    print(f"{args.rounds} rounds of {args.events} events, {args.secrets} secret(s), {encoder}")
+    for fanout in args.fanout:
+        secrets = [f"secret-{i % args.secrets}" if args.secrets else None for i in range(fanout)]
+        before = _rate(_before, events, secrets, args.rounds)
+        after = _rate(_after, events, secrets, args.rounds)
+        print(
+            f"{fanout:>4} webhooks  before {before:>12,.0f} deliveries/s   "
+            f"after {after:>12,.0f} deliveries/s   {after / before:>6.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
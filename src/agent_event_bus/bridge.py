@@ -1196,13 +1196,29 @@ def create_bridge_app(
         # only the status code.
         except (ValueError, RecursionError):
             return {"error": "invalid JSON"}, 400
+        if isinstance(event, list):
+            # A batch-mode webhook's delivery: an array of the same objects.
+            # Validated whole before anything is handled, so a malformed
+            # batch (the bus never sends one) writes nothing. Each event is
+            # then handled exactly as a lone delivery would be, and the
+            # batch answers 200 with every disposition: an item-level 400
+            # (an unserializable payload) is as deterministic in a batch as
+            # alone, and failing the whole POST would have the bus resend -
+            # and the spool re-append - every item that did land.
+            if not all(isinstance(item, dict) for item in event):
+                return {"error": "expected a JSON array of objects"}, 400
+            results = [handle(item)[0] for item in event]
+            return {"status": "batch", "results": results}, 200
         if not isinstance(event, dict):
-            # Valid JSON that isn't an object (123, [], "x"): a named 400,
+            # Valid JSON that isn't an object (123, "x"): a named 400,
             # not an AttributeError traceback (retried by the bus either
             # way) - this endpoint is network reachable, more so once it
             # binds beyond loopback
             return {"error": "expected a JSON object"}, 400
+        return handle(event)
 
+    def handle(event: dict) -> tuple[dict, int]:
+        """One event's disposition - a lone delivery, or an item of a batch."""
         # The bus always sends the derived signal_level; only actionable
         # events (DMs, help_needed, blockers, CI failures) justify a wake
         level = event.get("signal_level")
@@ -9,10 +9,14 @@ Usage:
     agent-event-bus-cli publish --type TYPE --payload PAYLOAD [--channel CHANNEL] [--session-id ID]
                          [--title TITLE] [--tags T1,T2] [--correlation-id ID]
                          [--signal-level lifecycle|info|actionable]
+    agent-event-bus-cli publish-batch [--channel CHANNEL] [--session-id ID] < events.ndjson
     agent-event-bus-cli events [--cursor CURSOR] [--session-id ID] [--limit N] [--include T1,T2]
                          [--exclude T1,T2] [--timeout MS] [--json] [--order asc|desc]
                          [--channel CHANNEL] [--resume] [--peek] [--correlation-id ID]
-                         [--min-level lifecycle|info|actionable]
+                         [--min-level lifecycle|info|actionable] [--wait SECONDS]
+                         [--tags T1,T2] [--any-tags T1,T2]
+    agent-event-bus-cli search QUERY [--limit N] [--channel CHANNEL] [--include T1,T2]
+                         [--correlation-id ID] [--tags T1,T2] [--any-tags T1,T2] [--json]
     agent-event-bus-cli ack --cursor N [--session-id ID] [--allow-rewind] [--json]
     agent-event-bus-cli notify --title TITLE --message MSG [--sound]
     agent-event-bus-cli panes set [--session-id ID] [--mux tmux|zellij --pane ID
@@ -20,10 +24,13 @@ Usage:
     agent-event-bus-cli panes clear [--session-id ID] [--keep-pane-entries]
     agent-event-bus-cli wake-state busy|idle [--session-id ID] [--wake-dir DIR]
     agent-event-bus-cli webhook register --url URL [--channel CH] [--event-types T1,T2] [--secret S]
+                                         [--batch-size N] [--batch-linger SECONDS]
     agent-event-bus-cli webhook list [--all]
     agent-event-bus-cli webhook disable WEBHOOK_ID
     agent-event-bus-cli webhook enable WEBHOOK_ID
     agent-event-bus-cli webhook unregister WEBHOOK_ID
+    agent-event-bus-cli webhook dead-letters [--webhook-id ID] [--limit N] [--json]
+    agent-event-bus-cli webhook replay [DELIVERY_ID ...] [--webhook-id ID]
 
 Examples:
     # Register a session
@@ -42,6 +49,12 @@ Examples:
     # Publish an event
     agent-event-bus-cli publish --type "task_done" --payload "Finished API" --channel "repo:my-project"
 
+    # Publish several events in one call: one JSON object per line, with
+    # publish_events' fields (event_type, payload, title, tags, ...)
+    printf '%s\n' '{"event_type": "test_failed", "payload": "test_a"}' \
+                   '{"event_type": "test_failed", "payload": "test_b"}' |
+        agent-event-bus-cli publish-batch --channel "repo:my-project"
+
     # Get recent events (newest first by default)
     agent-event-bus-cli events --session-id abc123
 
@@ -64,9 +77,19 @@ Examples:
     agent-event-bus-cli events --include task_completed,ci_completed
     agent-event-bus-cli events --include gotcha_discovered,pattern_found --exclude session_registered
 
+    # Filter by tag server-side: --tags needs every tag, --any-tags any one of them
+    agent-event-bus-cli events --tags ci,flaky
+    agent-event-bus-cli events --any-tags backend,frontend
+
+    # Full-text search over all history, best match first
+    agent-event-bus-cli search "migration failure" --include ci_failed --limit 5
+
     # Drop lifecycle noise server-side (lifecycle < info < actionable)
     agent-event-bus-cli events --min-level info
 
+    # Long-poll: block up to 60s for the next matching event instead of sleeping
+    agent-event-bus-cli events --session-id abc123 --resume --order asc --wait 60
+
     # Thread a request to its responses with a correlation id
     agent-event-bus-cli publish --type task_request --payload "Review PR #42?" --correlation-id review-42
     agent-event-bus-cli events --correlation-id review-42 --order asc
@@ -355,7 +378,11 @@ def cmd_publish(args):
 
     result = call_tool("publish_event", arguments, url=args.url)
     print(json.dumps(result, indent=2))
+    _warn_if_session_deleted(result, session_id)
+
 
+def _warn_if_session_deleted(result: dict, session_id: str | None) -> None:
+    """Tell the operator on stderr that a publish came from a deleted session."""
     if result.get("session_deleted"):
         # Exit status stays 0 and the event id is real: #144 stores the event
         # and flags it. The warning goes to stderr because the callers this
@@ -374,6 +401,42 @@ def cmd_publish(args):
         print(warning, file=sys.stderr)
 
 
+def _read_ndjson(stream) -> list[dict]:
+    """One event per non-blank line of `stream`; exits on a line that is not a JSON object."""
+    events = []
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Error: line {lineno} is not valid JSON: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not isinstance(item, dict):
+            print(f"Error: line {lineno} is not a JSON object", file=sys.stderr)
+            sys.exit(1)
+        events.append(item)
+    return events
+
+
+def cmd_publish_batch(args):
+    """Publish the NDJSON events on stdin in one call."""
+    events = _read_ndjson(sys.stdin)
+    if args.channel:
+        # A default, not an override: a line naming its own channel keeps it
+        events = [{"channel": args.channel, **item} for item in events]
+    arguments = {"events": events}
+    session_id = args.session_id or _session_id_from_env()
+    if session_id:
+        arguments["session_id"] = session_id
+
+    result = call_tool("publish_events", arguments, url=args.url)
+    print(json.dumps(result, indent=2))
+    if "error" in result:
+        sys.exit(1)
+    _warn_if_session_deleted(result, session_id)
+
+
 def cmd_events(args):
     """Get recent events."""
     # Use explicit --session-id, fall back to env var (matches cmd_publish)
@@ -402,10 +465,21 @@ def cmd_events(args):
         arguments["event_types"] = [t.strip() for t in args.include.split(",")]
     if args.correlation_id:
         arguments["correlation_id"] = args.correlation_id
+    if args.tags:
+        arguments["tags"] = [t.strip() for t in args.tags.split(",")]
+    if args.any_tags:
+        arguments["any_tags"] = [t.strip() for t in args.any_tags.split(",")]
     if args.min_level:
         arguments["min_level"] = args.min_level
+    timeout_ms = args.timeout
+    if args.wait:
+        arguments["wait_seconds"] = args.wait
+        # --timeout bounds the request, and a long-poll legitimately spends
+        # up to --wait of it parked on the server; without the extension a
+        # quiet bus would read as a timeout failure.
+        timeout_ms += int(args.wait * 1000)
 
-    result = call_tool("get_events", arguments, url=args.url, timeout_ms=args.timeout)
+    result = call_tool("get_events", arguments, url=args.url, timeout_ms=timeout_ms)
 
     # Check for server-side errors (e.g., session not found or deleted)
     if "error" in result:
@@ -504,6 +578,47 @@ def cmd_ack(args):
         print(f"Cursor acked: {previous} → {result['cursor']}")
 
 
+def cmd_search(args):
+    """Full-text search over event payloads and titles."""
+    arguments = {"query": args.query}
+    if args.limit is not None:
+        arguments["limit"] = args.limit
+    if args.channel:
+        arguments["channel"] = args.channel
+    if args.include:
+        arguments["event_types"] = [t.strip() for t in args.include.split(",")]
+    if args.correlation_id:
+        arguments["correlation_id"] = args.correlation_id
+    if args.tags:
+        arguments["tags"] = [t.strip() for t in args.tags.split(",")]
+    if args.any_tags:
+        arguments["any_tags"] = [t.strip() for t in args.any_tags.split(",")]
+
+    result = call_tool("search_events", arguments, url=args.url)
+
+    if "error" in result:
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f"Error: {result['error']}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result))
+        return
+    results = result.get("results", [])
+    if not results:
+        print("No matches")
+    for e in results:
+        header = f"[{e['id']}] {e['event_type']} ({e['channel']}) score {e['score']}"
+        print(header)
+        if e.get("title"):
+            print(f"    title: {e['title']}")
+        print(f"    {e['snippet']}")
+        print(f"    from: {e['session_id']} at {e['timestamp']}")
+        print()
+
+
 def cmd_notify(args):
     """Send a system notification."""
     arguments = {
@@ -657,6 +772,10 @@ def cmd_webhook_register(args):
         arguments["event_types"] = [t.strip() for t in args.event_types.split(",")]
     if args.secret:
         arguments["secret"] = args.secret
+    if args.batch_size is not None:
+        arguments["batch_size"] = args.batch_size
+    if args.batch_linger is not None:
+        arguments["batch_linger"] = args.batch_linger
 
     result = call_tool("register_webhook", arguments, url=args.url)
     print(json.dumps(result, indent=2))
@@ -683,6 +802,14 @@ def cmd_webhook_list(args):
             print(f"      Channel: {wh['channel']}")
         if wh.get("event_types"):
             print(f"      Events: {', '.join(wh['event_types'])}")
+        if wh.get("batch_size"):
+            print(f"      Batches: up to {wh['batch_size']} events, {wh['batch_linger']:g}s linger")
+        breaker = wh.get("breaker") or {}
+        if breaker.get("state", "closed") != "closed":
+            line = f"      Circuit: {breaker['state']} after {breaker['consecutive_failures']} failures"
+            if breaker.get("retry_at"):
+                line += f", next probe {breaker['retry_at']}"
+            print(line)
         print(f"      Created: {wh['created_at']}")
         print()
 
@@ -714,6 +841,43 @@ def cmd_webhook_unregister(args):
         sys.exit(1)
 
 
+def cmd_webhook_dead_letters(args):
+    """List webhook deliveries that failed every retry."""
+    arguments = {"limit": args.limit}
+    if args.webhook_id is not None:
+        arguments["webhook_id"] = args.webhook_id
+    result = call_tool("list_dead_letters", arguments, url=args.url)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    dead = result.get("dead_letters", [])
+    if not dead:
+        print("No dead letters")
+        return
+
+    print(f"Dead letters ({len(dead)}):\n")
+    for d in dead:
+        print(f"  #{d['delivery_id']}  webhook #{d['webhook_id']}  event {d['event_id']}")
+        print(f"      Attempts: {d['attempts']}")
+        print(f"      Last error: {d['last_error']}")
+        print()
+
+
+def cmd_webhook_replay(args):
+    """Retry dead-lettered webhook deliveries."""
+    arguments = {}
+    if args.delivery_ids:
+        arguments["delivery_ids"] = args.delivery_ids
+    if args.webhook_id is not None:
+        arguments["webhook_id"] = args.webhook_id
+    result = call_tool("replay_dead_letters", arguments, url=args.url)
+    if "error" in result:
+        print(f"Failed: {result['error']}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Requeued {result['replayed']} dead letter(s)")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="CLI wrapper for agent-event-bus",
@@ -777,6 +941,19 @@ def main():
     )
     p_publish.set_defaults(func=cmd_publish)
 
+    # publish-batch
+    p_publish_batch = subparsers.add_parser(
+        "publish-batch", help="Publish NDJSON events from stdin in one transaction"
+    )
+    p_publish_batch.add_argument(
+        "--channel", help="Channel for lines that do not name one (default: all)"
+    )
+    p_publish_batch.add_argument(
+        "--session-id",
+        help="Your session ID (default: $AGENT_EVENT_BUS_SESSION_ID, else $CLAUDE_CODE_SESSION_ID)",
+    )
+    p_publish_batch.set_defaults(func=cmd_publish_batch)
+
     # events
     p_events = subparsers.add_parser("events", help="Get recent events")
     p_events.add_argument("--cursor", help="Cursor from previous call (for pagination)")
@@ -832,11 +1009,27 @@ def main():
         help="Filter to one correlation thread "
         "(non-consuming: does not advance the session cursor)",
     )
+    p_events.add_argument(
+        "--tags",
+        help="Comma-separated tags an event must ALL carry, filtered server-side "
+        "(non-consuming: does not advance the session cursor)",
+    )
+    p_events.add_argument(
+        "--any-tags",
+        help="Comma-separated tags an event must carry at least one of "
+        "(non-consuming: does not advance the session cursor)",
+    )
     p_events.add_argument(
         "--min-level",
         choices=["lifecycle", "info", "actionable"],
         help="Drop events below this signal level (server-side; replaces client denylists)",
     )
+    p_events.add_argument(
+        "--wait",
+        type=float,
+        help="Long-poll: when nothing matches yet, wait up to SECONDS (max 120) for a "
+        "matching event instead of returning empty (added on top of --timeout)",
+    )
     p_events.set_defaults(func=cmd_events)
 
     # ack
@@ -861,6 +1054,22 @@ def main():
     p_ack.add_argument("--json", action="store_true", help="Output the raw JSON result")
     p_ack.set_defaults(func=cmd_ack)
 
+    # search
+    p_search = subparsers.add_parser(
+        "search", help="Full-text search over event payloads and titles"
+    )
+    p_search.add_argument(
+        "query", help='Words to find; FTS5 syntax works too ("phrase", OR, NOT, prefix*)'
+    )
+    p_search.add_argument("--limit", type=int, help="Maximum number of results (default: 20)")
+    p_search.add_argument("--channel", help="Filter to a specific channel")
+    p_search.add_argument("--include", help="Comma-separated event types to search within")
+    p_search.add_argument("--correlation-id", help="Filter to one correlation thread")
+    p_search.add_argument("--tags", help="Comma-separated tags a result must ALL carry")
+    p_search.add_argument("--any-tags", help="Comma-separated tags a result must carry one of")
+    p_search.add_argument("--json", action="store_true", help="Output the raw JSON result")
+    p_search.set_defaults(func=cmd_search)
+
     # notify
     p_notify = subparsers.add_parser("notify", help="Send system notification")
     p_notify.add_argument("--title", required=True, help="Notification title")
@@ -939,6 +1148,12 @@ def main():
     )
     p_wh_register.add_argument("--event-types", help="Comma-separated event types to filter")
     p_wh_register.add_argument("--secret", help="Shared secret for HMAC signing")
+    p_wh_register.add_argument(
+        "--batch-size", type=int, help="POST JSON arrays of up to N events (1-100)"
+    )
+    p_wh_register.add_argument(
+        "--batch-linger", type=float, help="Seconds a batch waits to fill (default: 1)"
+    )
     p_wh_register.set_defaults(func=cmd_webhook_register)
 
     # webhook list
@@ -959,6 +1174,22 @@ def main():
     p_wh_unregister.add_argument("webhook_id", type=int, help="Webhook ID to remove")
     p_wh_unregister.set_defaults(func=cmd_webhook_unregister)
 
+    # webhook dead-letters / replay - deliveries that failed every retry
+    p_wh_dead = webhook_subparsers.add_parser(
+        "dead-letters", help="List deliveries that failed every retry"
+    )
+    p_wh_dead.add_argument("--webhook-id", type=int, help="Only this webhook's")
+    p_wh_dead.add_argument("--limit", type=int, default=100, help="Max to list (default: 100)")
+    p_wh_dead.add_argument("--json", action="store_true", help="Output the raw JSON result")
+    p_wh_dead.set_defaults(func=cmd_webhook_dead_letters)
+
+    p_wh_replay = webhook_subparsers.add_parser("replay", help="Retry dead-lettered deliveries")
+    p_wh_replay.add_argument(
+        "delivery_ids", nargs="*", type=int, help="Dead letters to retry (default: all)"
+    )
+    p_wh_replay.add_argument("--webhook-id", type=int, help="Only this webhook's")
+    p_wh_replay.set_defaults(func=cmd_webhook_replay)
+
     args = parser.parse_args()
 
     if args.command is None:
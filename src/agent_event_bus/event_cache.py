@@ -0,0 +1,245 @@
+"""In-memory window of the most recent events, serving tail reads.
+
+Almost every poll is a resume - "events after my cursor" - and the cursor is
+nearly always within the last few hundred ids. RecentEvents holds those
+events, so SQLiteStorage.get_events can answer such a read without touching
+SQLite at all, and falls back to SQL for anything the window cannot answer
+exactly.
+
+Exactly is the whole contract. A read is served from memory only when the
+window provably holds every committed event the SQL query would return:
+
+- The window is complete above its floor. It is warmed from SQLite with the
+  newest events, and every later event enters it when its transaction
+  commits. Evicting the oldest event raises the floor to that event's id. A
+  cursor below the floor is a miss, unless a newest-first read fills its
+  whole page from the window.
+- Events enter only once committed, and never out of order as far as a
+  reader can tell. An event is registered as in flight the moment its INSERT
+  assigns it an id, which happens while its writer holds the SQLite write
+  lock, so before any higher id can exist. Reads stop below the lowest
+  in-flight id. If two commits race to append, the reader sees the earlier
+  state, never a gap.
+- Deleting an event through storage (retention) removes it from the window
+  too.
+
+This holds because this process is the bus's only writer. A second process
+writing the same database would invalidate it. Nothing does that today. The
+CLI and the bridge go through the server.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from agent_event_bus.storage import Event
+
+# Rough fixed cost of one cached event beyond its strings: the Event object,
+# its dict, list slots and string headers. Only needs to be the right order
+# of magnitude - it keeps max_bytes honest for windows of tiny payloads.
+EVENT_OVERHEAD_BYTES = 400
+
+
+def _event_size(event: Event) -> int:
+    """Approximate bytes an event holds in the window.
+
+    payload_size, not len(payload): a compressed payload is held compressed
+    until first served, and measuring it must not decompress it.
+    """
+    size = EVENT_OVERHEAD_BYTES + event.payload_size + len(event.event_type)
+    size += len(event.session_id) + len(event.channel) + len(event.correlation_id or "")
+    if event.meta:
+        size += len(repr(event.meta))
+    return size
+
+
+class RecentEvents:
+    """The newest committed events, bounded by count and by approximate bytes.
+
+    Thread-safe. Events handed out are the cached objects themselves and
+    must be treated as read-only.
+    """
+
+    def __init__(self, capacity: int, max_bytes: int):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._ids: list[int] = []  # sorted, parallel to _events
+        self._events: list[Event] = []
+        self._bytes = 0
+        # Every committed event with id > floor is in the window. None until
+        # warmed: an unwarmed window serves nothing.
+        self._floor: int | None = None
+        self._in_flight: set[int] = set()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def warm(self, newest: list[Event], complete: bool) -> None:
+        """Load the newest events from storage, oldest first.
+
+        `complete` means `newest` is the entire table (fewer rows than were
+        asked for), so the window reaches back to the beginning.
+        """
+        with self._lock:
+            self._ids = [e.id for e in newest]
+            self._events = list(newest)
+            self._bytes = sum(_event_size(e) for e in newest)
+            if complete or not newest:
+                self._floor = 0
+            else:
+                # The oldest loaded event is included; everything above it is
+                # present, so the floor sits just below it.
+                self._floor = newest[0].id - 1
+            self._evict()
+
+    def begin(self, event_id: int) -> None:
+        """Mark an id as inserted but not yet committed."""
+        with self._lock:
+            self._in_flight.add(event_id)
+
+    def commit(self, events: Iterable[Event]) -> None:
+        """Admit committed events and clear them from in flight."""
+        with self._lock:
+            for event in events:
+                self._in_flight.discard(event.id)
+                if self._floor is None or event.id <= self._floor:
+                    continue
+                index = bisect.bisect_left(self._ids, event.id)
+                if index < len(self._ids) and self._ids[index] == event.id:
+                    continue
+                self._ids.insert(index, event.id)
+                self._events.insert(index, event)
+                self._bytes += _event_size(event)
+            self._evict()
+
+    def abort(self, event_ids: Iterable[int]) -> None:
+        """Forget in-flight ids whose transaction rolled back."""
+        with self._lock:
+            self._in_flight.difference_update(event_ids)
+
+    def discard(self, event_ids: Iterable[int]) -> None:
+        """Drop events deleted from storage."""
+        doomed = set(event_ids)
+        if not doomed:
+            return
+        with self._lock:
+            keep = [i for i, event_id in enumerate(self._ids) if event_id not in doomed]
+            if len(keep) == len(self._ids):
+                return
+            self._bytes -= sum(
+                _event_size(self._events[i])
+                for i in range(len(self._ids))
+                if self._ids[i] in doomed
+            )
+            self._ids = [self._ids[i] for i in keep]
+            self._events = [self._events[i] for i in keep]
+
+    def read(
+        self,
+        since_id: int,
+        limit: int,
+        channels: list[str] | None = None,
+        order: Literal["asc", "desc"] = "desc",
+        event_types: list[str] | None = None,
+        correlation_id: str | None = None,
+        tags: list[str] | None = None,
+        any_tags: list[str] | None = None,
+    ) -> list[Event] | None:
+        """get_events' query answered from memory, or None if it cannot be.
+
+        Same result as the SQL in storage._build_events_query: events with
+        id > since_id matching every filter, the first `limit` for asc, the
+        newest `limit` (newest first) for desc.
+
+        A cursor below the floor can still be answered newest-first: if the
+        window alone yields `limit` matches, older events could only have
+        ranked after them.
+        """
+        with self._lock:
+            if self._floor is None:
+                self._misses += 1
+                return None
+            start = bisect.bisect_right(self._ids, since_id)
+            end = len(self._ids)
+            if self._in_flight:
+                end = bisect.bisect_left(self._ids, min(self._in_flight), start)
+            window = self._events[start:end]
+            complete = since_id >= self._floor
+
+        if not complete and (order == "asc" or limit <= 0):
+            self._count(hit=False)
+            return None
+
+        channel_set = set(channels) if channels else None
+        type_set = set(event_types) if event_types else None
+        all_tags = set(tags) if tags else None
+        any_tag_set = set(any_tags) if any_tags else None
+
+        def matches(event: Event) -> bool:
+            if not (
+                (channel_set is None or event.channel in channel_set)
+                and (type_set is None or event.event_type in type_set)
+                and (not correlation_id or event.correlation_id == correlation_id)
+            ):
+                return False
+            if all_tags is None and any_tag_set is None:
+                return True
+            carried = set(event.tags)
+            return (all_tags is None or all_tags <= carried) and (
+                any_tag_set is None or not any_tag_set.isdisjoint(carried)
+            )
+
+        result = []
+        if limit > 0:
+            for event in window if order == "asc" else reversed(window):
+                if matches(event):
+                    result.append(event)
+                    if len(result) == limit:
+                        break
+        if not complete and len(result) < limit:
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return result
+
+    def stats(self) -> dict:
+        """Size and hit-rate counters, for /health."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._ids),
+                "capacity": self.capacity,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "floor": self._floor,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "evictions": self._evictions,
+            }
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _evict(self) -> None:
+        """Drop the oldest events until both caps hold (lock held)."""
+        over = 0
+        while len(self._ids) - over > self.capacity or (
+            self._bytes > self.max_bytes and over < len(self._ids)
+        ):
+            self._bytes -= _event_size(self._events[over])
+            over += 1
+        if over:
+            self._floor = self._ids[over - 1]
+            del self._ids[:over]
+            del self._events[:over]
+            self._evictions += over
@@ -5,6 +5,8 @@ import os
 import platform
 import shutil
 import subprocess
+import threading
+import time
 
 logger = logging.getLogger("agent-event-bus")
 
@@ -30,6 +32,12 @@ SIGNATURE_HEADER = "X-Event-Bus-Signature"
 # import-cleanliness reason.
 WEBHOOK_CONTENT_TYPE = "application/json"
 
+# How long ClientLiveness trusts one snapshot of the running processes.
+# list_sessions and list_channels are polled every few seconds by
+# dashboards; within this window they share one pass over the process table
+# instead of each signalling every local client's PID.
+LIVENESS_TTL_SECONDS = 2.0
+
 
 def _sanitize_name(name: str) -> str:
     """Sanitize a name by replacing problematic characters."""
@@ -66,17 +74,24 @@ def is_client_alive(client_id: str | None, is_local: bool) -> bool:
     Returns:
         True if client is alive or we can't determine, False if definitely dead.
     """
+    pid = _checkable_pid(client_id, is_local)
+    return pid is None or _pid_exists(pid)
+
+
+def _checkable_pid(client_id: str | None, is_local: bool) -> int | None:
+    """The PID to check for a client, or None if its liveness can't be checked."""
     if client_id is None or not is_local:
-        return True  # Can't check remote or unknown clients, assume alive
+        return None  # Can't check remote or unknown clients, assume alive
 
     # Try to parse as PID for liveness check
     try:
-        pid = int(client_id)
+        return int(client_id)
     except ValueError:
         logger.debug(f"Skipping liveness check for non-numeric client_id: {client_id}")
-        return True  # Non-numeric client_id, can't check, assume alive
+        return None  # Non-numeric client_id, can't check, assume alive
+
 
-    # Check PID liveness
+def _pid_exists(pid: int) -> bool:
     try:
         os.kill(pid, 0)  # Signal 0 = check if process exists
         return True
@@ -86,6 +101,52 @@ def is_client_alive(client_id: str | None, is_local: bool) -> bool:
         return True  # Process exists but we can't signal it
 
 
+def _scan_pids() -> frozenset[int] | None:
+    """Every running PID, from one listing of /proc; None where there is no procfs (macOS)."""
+    try:
+        names = os.listdir("/proc")
+    except OSError:
+        return None
+    return frozenset(int(name) for name in names if name.isdigit()) or None
+
+
+class ClientLiveness:
+    """is_client_alive over a process snapshot shared for `ttl` seconds.
+
+    On Linux one /proc listing per snapshot answers every PID that is still
+    running. A PID missing from it is confirmed with os.kill before it is
+    called dead - the process may have started after the snapshot - and
+    that answer is kept for the rest of the snapshot too. Without /proc
+    every answer comes from os.kill, still at most once per PID per
+    snapshot. Thread-safe; concurrent callers share one refresh.
+    """
+
+    def __init__(self, ttl: float = LIVENESS_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._taken: float | None = None
+        self._pids: frozenset[int] | None = None
+        self._checked: dict[int, bool] = {}
+
+    def is_alive(self, client_id: str | None, is_local: bool) -> bool:
+        """Same answer as is_client_alive, at most `ttl` seconds old."""
+        pid = _checkable_pid(client_id, is_local)
+        if pid is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self._taken is None or now - self._taken >= self.ttl:
+                self._pids = _scan_pids()
+                self._checked = {}
+                self._taken = now
+            if self._pids is not None and pid in self._pids:
+                return True
+            alive = self._checked.get(pid)
+            if alive is None:
+                alive = self._checked[pid] = _pid_exists(pid)
+            return alive
+
+
 def escape_applescript_string(s: str) -> str:
     """Escape a string for safe inclusion in AppleScript double-quoted strings.
 
@@ -0,0 +1,96 @@
+"""Background housekeeping for the event bus server.
+
+Work that has no caller to ride on - pruning old events, reclaiming pages,
+expiring sessions - runs on its own daemon thread, off both the event loop and the worker pool
+that tool calls use. main() starts it after the app is built and stops it
+when uvicorn returns; tests call the underlying functions directly.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+logger = logging.getLogger("agent-event-bus")
+
+
+class PeriodicTask:
+    """Run `func` every `interval` seconds on a daemon thread until stopped.
+
+    A failing run is logged and the schedule carries on: one bad pass (a
+    locked database, a full disk) must not silently end housekeeping for the
+    life of the server. The first run happens one interval after start, not
+    at start, so a restart loop cannot turn into a prune loop.
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], object]):
+        self.name = name
+        self.interval = interval
+        self._func = func
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the thread. A second call while running is a no-op."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Ask the thread to finish and wait up to `timeout` for a run in progress."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> None:
+        """One pass of `func`, logging rather than raising on failure."""
+        try:
+            self._func()
+        except Exception:
+            logger.exception(f"{self.name}: run failed")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+class DeadlineTask(PeriodicTask):
+    """Run `func` each time the moment `next_due` names arrives.
+
+    For work that is due at a known time rather than on a schedule - a
+    session timing out. `next_due` returns a time.time() timestamp, or None
+    when nothing is pending; it is asked again after every run and at least
+    every `max_wait` seconds, so a deadline that moves earlier is met at
+    most that late. Runs are at least `min_wait` apart, so a run that keeps
+    failing (and so keeps its deadline in the past) cannot spin.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_wait: float,
+        func: Callable[[], object],
+        next_due: Callable[[], float | None],
+        min_wait: float = 1.0,
+    ):
+        super().__init__(name, max_wait, func)
+        self.min_wait = min_wait
+        self._next_due = next_due
+
+    def _run(self) -> None:
+        while True:
+            try:
+                due = self._next_due()
+            except Exception:
+                logger.exception(f"{self.name}: next_due failed")
+                due = None
+            wait = self.interval if due is None else due - time.time()
+            if self._stop.wait(min(max(wait, self.min_wait), self.interval)):
+                return
+            if due is not None and time.time() >= due:
+                self.run_once()
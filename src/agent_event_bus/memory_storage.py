@@ -0,0 +1,759 @@
+"""In-memory storage backend: the Storage interface with no database behind it.
+
+For ephemeral buses (CI, a throwaway demo) that should leave nothing on disk,
+and for benchmarking the server layer with storage cost removed. Everything
+is lost when the process exits.
+
+Same semantics as SQLiteStorage, on plain Python structures:
+
+- events in a dict by id, with a sorted id list for cursor seeks and a
+  sorted id list per channel, event type, correlation id and tag. A filtered
+  read walks the shortest list that applies and checks the other filters on
+  each event it finds, the way SQLite drives a query from one index.
+- sessions in a SessionCache (session_cache.py), which already is a
+  complete in-memory sessions table, and webhooks in a dict matched through
+  a WebhookIndex (webhook_registry.py), with their outbox in a dict by id.
+- one re-entrant lock held for the length of a transaction() - the
+  equivalent of BEGIN IMMEDIATE, one writer at a time - and an undo log,
+  replayed newest first if the block raises, so a unit still commits or
+  rolls back as a whole.
+
+Nothing is buffered, so heartbeats and cursors are written through and the
+flush methods have nothing to do. search_events has no FTS5 to lean on;
+see its docstring for the subset of the query syntax it understands.
+"""
+
+from __future__ import annotations
+
+import bisect
+import dataclasses
+import re
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Literal
+
+from agent_event_bus.session_cache import SessionCache
+from agent_event_bus.storage import (
+    _FTS_OPERATORS,
+    SEARCH_TITLE_WEIGHT,
+    SESSION_TIMEOUT,
+    Event,
+    SearchHit,
+    Session,
+    Webhook,
+    WebhookDelivery,
+    _cursor_to_id,
+    _meta_title,
+    _snippet,
+)
+from agent_event_bus.webhook_registry import WebhookIndex
+
+
+def _remove_sorted(ids: list[int], event_id: int) -> None:
+    """Remove `event_id` from a sorted id list, if present."""
+    index = bisect.bisect_left(ids, event_id)
+    if index < len(ids) and ids[index] == event_id:
+        del ids[index]
+
+
+def _merge_sorted(lists: list[list[int]]) -> list[int]:
+    """The union of several sorted id lists, sorted."""
+    if len(lists) == 1:
+        return lists[0]
+    return sorted({event_id for ids in lists for event_id in ids})
+
+
+class MemoryStorage:
+    """Sessions, events and webhooks held in process memory."""
+
+    # Nothing is write-behind here: see the module docstring.
+    buffers_heartbeats = False
+    buffers_cursors = False
+    heartbeat_flush_seconds = 0.0
+    cursor_flush_seconds = 0.0
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # The open transaction() on each thread, if any: its undo log and
+        # the callbacks waiting for it to commit.
+        self._local = threading.local()
+
+        self._events: dict[int, Event] = {}
+        self._ids: list[int] = []  # every event id, sorted
+        self._by_channel: dict[str, list[int]] = {}
+        self._by_type: dict[str, list[int]] = {}
+        self._by_correlation: dict[str, list[int]] = {}
+        self._by_tag: dict[str, list[int]] = {}
+        self._last_event_id = 0
+
+        self._sessions = SessionCache()
+
+        self._webhooks: dict[int, Webhook] = {}
+        self._last_webhook_id = 0
+        self._webhook_index: WebhookIndex | None = None
+        # The webhook outbox (see SQLiteStorage.claim_webhook_deliveries)
+        self._deliveries: dict[int, WebhookDelivery] = {}
+        self._last_delivery_id = 0
+
+    # Transactions
+
+    @contextmanager
+    def transaction(self, lazy: bool = False) -> Iterator[None]:
+        """Run every storage call in the block as one unit (SQLiteStorage.transaction).
+
+        Holds the storage lock for the whole block, so no other thread's
+        write lands between the block's reads and its writes. lazy changes
+        nothing: there is no lock worth deferring. Nested blocks join the
+        outer one.
+        """
+        if self._in_transaction():
+            yield
+            return
+        with self._lock:
+            self._local.undo = []
+            self._local.on_commit = []
+            try:
+                yield
+            except BaseException:
+                for undo in reversed(self._local.undo):
+                    undo()
+                raise
+            finally:
+                callbacks = self._local.on_commit
+                self._local.undo = None
+                self._local.on_commit = None
+        for callback in callbacks:
+            callback()
+
+    def _in_transaction(self) -> bool:
+        return getattr(self._local, "undo", None) is not None
+
+    def _on_rollback(self, undo: Callable[[], None]) -> None:
+        """Record how to reverse a write just made, if a transaction could roll it back."""
+        if self._in_transaction():
+            self._local.undo.append(undo)
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run `callback` once the current transaction commits - or now, outside one."""
+        if self._in_transaction():
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    def close(self) -> None:
+        """Nothing to release. The data stays readable until the object is dropped."""
+
+    # Sessions
+
+    def _put_session(self, session: Session) -> None:
+        """Insert or replace a session row, undoably."""
+        previous = self._sessions.get(session.id, include_deleted=True)
+        self._sessions.put(session)
+        if previous is None:
+            self._on_rollback(lambda: self._sessions.remove(session.id))
+        else:
+            self._on_rollback(lambda: self._sessions.put(previous))
+
+    def _update_active_session(self, session_id: str, **fields) -> bool:
+        """SET `fields` on an active session. Returns True if one was updated."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            self._put_session(dataclasses.replace(session, **fields))
+            return True
+
+    def invalidate_sessions(self, session_id: str | None = None) -> None:
+        """A no-op: there is no table behind the sessions to reload from."""
+
+    def add_session(self, session: Session) -> None:
+        """Add or update a session."""
+        with self._lock:
+            self._put_session(session)
+
+    def find_session_by_client(
+        self, machine: str, client_id: str, include_deleted: bool = False
+    ) -> Session | None:
+        """Find an existing session by machine+client_id key."""
+        return self._sessions.find_by_client(machine, client_id, include_deleted)
+
+    def get_session(self, session_id: str, include_deleted: bool = False) -> Session | None:
+        """Get a session by ID."""
+        return self._sessions.get(session_id, include_deleted)
+
+    def delete_session(self, session_id: str) -> bool:
+        """Soft-delete a session by ID. Returns True if the session was deleted."""
+        return self._update_active_session(session_id, deleted_at=datetime.now())
+
+    def delete_sessions(self, session_ids: list[str]) -> int:
+        """Soft-delete several sessions. Returns how many were active."""
+        now = datetime.now()
+        with self._lock:
+            return sum(self._update_active_session(sid, deleted_at=now) for sid in session_ids)
+
+    def update_heartbeat(self, session_id: str, timestamp: datetime) -> bool:
+        """Update session heartbeat. Returns True if active session exists."""
+        return self._update_active_session(session_id, last_heartbeat=timestamp)
+
+    def flush_heartbeats(self) -> int:
+        """Nothing is buffered. Always 0."""
+        return 0
+
+    def update_session_cursor(self, session_id: str, cursor: str) -> bool:
+        """Set session's last seen cursor, in either direction. True if active session exists."""
+        return self._update_active_session(session_id, last_cursor=cursor)
+
+    def advance_session_cursor(self, session_id: str, cursor: str) -> bool:
+        """Move a session's cursor forward to `cursor`; never back. True if active session exists."""
+        target = int(cursor)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            if target > _cursor_to_id(session.last_cursor):
+                self._put_session(dataclasses.replace(session, last_cursor=str(target)))
+            return True
+
+    def flush_cursors(self) -> int:
+        """Nothing is buffered. Always 0."""
+        return 0
+
+    def list_sessions(self) -> list[Session]:
+        """List all active sessions, ordered by most recently active first."""
+        return self._sessions.active()
+
+    def cleanup_stale_sessions(self, timeout_seconds: int = SESSION_TIMEOUT) -> int:
+        """Soft-delete sessions that haven't sent a heartbeat recently. Returns how many."""
+        return len(self.expire_sessions(timeout_seconds))
+
+    def expire_sessions(self, timeout_seconds: int = SESSION_TIMEOUT) -> list[Session]:
+        """Soft-delete sessions that haven't sent a heartbeat recently, and return them."""
+        now = datetime.now()
+        with self._lock:
+            expired = []
+            for session in self._sessions.stale(now - timedelta(seconds=timeout_seconds)):
+                self._put_session(session := dataclasses.replace(session, deleted_at=now))
+                expired.append(session)
+            return expired
+
+    def next_session_expiry(self, timeout_seconds: int = SESSION_TIMEOUT) -> datetime | None:
+        """When the next session can time out, at the earliest; None if none can."""
+        oldest = self._sessions.oldest_heartbeat()
+        return None if oldest is None else oldest + timedelta(seconds=timeout_seconds)
+
+    def session_count(self) -> int:
+        """Get count of active (non-deleted) sessions."""
+        return self._sessions.active_count()
+
+    def min_active_cursor(self) -> int | None:
+        """The lowest saved cursor among active sessions, or None if none has one."""
+        cursors = []
+        for session in self._sessions.active():
+            try:
+                cursors.append(int(session.last_cursor))
+            except (TypeError, ValueError):
+                continue  # no cursor, or an unparseable one - never pins history
+        return min(cursors) if cursors else None
+
+    # Events
+
+    def _index_keys(self, event: Event) -> Iterator[tuple[dict[str, list[int]], str]]:
+        """(index, key) for each per-filter id list `event` belongs in."""
+        yield self._by_channel, event.channel
+        yield self._by_type, event.event_type
+        if event.correlation_id:
+            yield self._by_correlation, event.correlation_id
+        for tag in dict.fromkeys(event.tags):  # a tag listed twice is indexed once
+            yield self._by_tag, tag
+
+    def add_event(
+        self,
+        event_type: str,
+        payload: str,
+        session_id: str,
+        channel: str = "all",
+        correlation_id: str | None = None,
+        meta: dict | None = None,
+    ) -> Event:
+        """Add a new event and return it with assigned ID."""
+        with self._lock:
+            self._last_event_id += 1
+            event = Event(
+                id=self._last_event_id,
+                event_type=event_type,
+                payload=payload,
+                session_id=session_id,
+                timestamp=datetime.now(),
+                channel=channel,
+                correlation_id=correlation_id,
+                meta=meta or None,  # Normalize empty dict to None
+            )
+            # Ids only grow, so appending keeps every list sorted.
+            self._events[event.id] = event
+            self._ids.append(event.id)
+            for index, key in self._index_keys(event):
+                index.setdefault(key, []).append(event.id)
+            self._on_rollback(lambda: self._remove_events([event.id]))
+            now = datetime.now()
+            for webhook in self.get_matching_webhooks(event):
+                self._last_delivery_id += 1
+                self._put_delivery(
+                    WebhookDelivery(
+                        id=self._last_delivery_id,
+                        webhook_id=webhook.id,
+                        event_id=event.id,
+                        status="pending",
+                        attempts=0,
+                        next_attempt_at=now,
+                        created_at=now,
+                    )
+                )
+        return event
+
+    def add_events(self, events: list[dict]) -> list[Event]:
+        """Add several events in one transaction and return them, in order."""
+        with self.transaction():
+            return [self.add_event(**fields) for fields in events]
+
+    def _remove_events(self, event_ids: list[int]) -> list[Event]:
+        """Drop events and their index entries (lock held). Returns the ones that existed."""
+        removed = []
+        for event_id in event_ids:
+            event = self._events.pop(event_id, None)
+            if event is None:
+                continue
+            removed.append(event)
+            _remove_sorted(self._ids, event_id)
+            for index, key in self._index_keys(event):
+                _remove_sorted(ids := index[key], event_id)
+                if not ids:
+                    del index[key]
+        return removed
+
+    def _restore_events(self, events: list[Event]) -> None:
+        """Put deleted events back (lock held), for a rolled-back delete."""
+        for event in events:
+            self._events[event.id] = event
+            bisect.insort(self._ids, event.id)
+            for index, key in self._index_keys(event):
+                bisect.insort(index.setdefault(key, []), event.id)
+
+    def _candidate_ids(
+        self,
+        channels: list[str] | None,
+        event_types: list[str] | None,
+        correlation_id: str | None,
+        tags: list[str] | None,
+        any_tags: list[str] | None,
+    ) -> list[int]:
+        """The shortest sorted id list that holds every event the filters can match."""
+        options = []
+        if channels:
+            options.append([self._by_channel.get(c, []) for c in dict.fromkeys(channels)])
+        if event_types:
+            options.append([self._by_type.get(t, []) for t in dict.fromkeys(event_types)])
+        if correlation_id:
+            options.append([self._by_correlation.get(correlation_id, [])])
+        for tag in tags or ():
+            options.append([self._by_tag.get(tag, [])])
+        if any_tags:
+            options.append([self._by_tag.get(t, []) for t in dict.fromkeys(any_tags)])
+        if not options:
+            return self._ids
+        return _merge_sorted(min(options, key=lambda lists: sum(map(len, lists))))
+
+    @staticmethod
+    def _matcher(
+        channels: list[str] | None,
+        event_types: list[str] | None,
+        correlation_id: str | None,
+        tags: list[str] | None,
+        any_tags: list[str] | None,
+    ) -> Callable[[Event], bool]:
+        """A predicate for get_events' filters (the SQL in storage._event_filters)."""
+        channel_set = set(channels) if channels else None
+        type_set = set(event_types) if event_types else None
+        all_tags = set(tags) if tags else None
+        any_tag_set = set(any_tags) if any_tags else None
+
+        def matches(event: Event) -> bool:
+            if not (
+                (channel_set is None or event.channel in channel_set)
+                and (type_set is None or event.event_type in type_set)
+                and (not correlation_id or event.correlation_id == correlation_id)
+            ):
+                return False
+            if all_tags is None and any_tag_set is None:
+                return True
+            carried = set(event.tags)
+            return (all_tags is None or all_tags <= carried) and (
+                any_tag_set is None or not any_tag_set.isdisjoint(carried)
+            )
+
+        return matches
+
+    def get_events(
+        self,
+        cursor: str | None = None,
+        limit: int = 50,
+        channels: list[str] | None = None,
+        order: Literal["asc", "desc"] = "desc",
+        event_types: list[str] | None = None,
+        correlation_id: str | None = None,
+        tags: list[str] | None = None,
+        any_tags: list[str] | None = None,
+    ) -> tuple[list[Event], str | None, bool]:
+        """Get events with cursor-based pagination (see SQLiteStorage.get_events)."""
+        filters = (channels, event_types, correlation_id, tags, any_tags)
+        matches = self._matcher(*filters)
+        events: list[Event] = []
+        with self._lock:
+            ids = self._candidate_ids(*filters)
+            start = bisect.bisect_right(ids, _cursor_to_id(cursor))
+            walk = range(start, len(ids)) if order == "asc" else range(len(ids) - 1, start - 1, -1)
+            if limit > 0:
+                for index in walk:
+                    event = self._events[ids[index]]
+                    if matches(event):
+                        events.append(event)
+                        if len(events) == limit:
+                            break
+        next_cursor = str(max(e.id for e in events)) if events else cursor
+        return events, next_cursor, limit > 0 and len(events) == limit
+
+    def recent_events_stats(self) -> dict | None:
+        """None: there is no recent-events window, every read is from memory."""
+        return None
+
+    def scan_events(self, after_id: int, limit: int) -> list[Event]:
+        """Up to `limit` events with id > after_id, oldest first."""
+        with self._lock:
+            start = bisect.bisect_right(self._ids, after_id)
+            return [self._events[event_id] for event_id in self._ids[start : start + limit]]
+
+    def search_events(
+        self,
+        query: str,
+        limit: int = 20,
+        channels: list[str] | None = None,
+        event_types: list[str] | None = None,
+        correlation_id: str | None = None,
+        tags: list[str] | None = None,
+        any_tags: list[str] | None = None,
+    ) -> list[SearchHit]:
+        """Events matching a word query over payloads and titles, best first.
+
+        A linear scan standing in for SQLiteStorage's FTS5 index, with the
+        core of its syntax: words must all appear (AND), OR separates
+        alternatives, NOT excludes the word after it. A word matches any
+        word that starts with its stem-ish head, as snippets do, which
+        covers most of what the porter stemmer would match; quotes are
+        ignored, so a phrase is searched as its words. Scored by matching
+        words, a title counting SEARCH_TITLE_WEIGHT times a payload word.
+        """
+        clauses = self._parse_query(query)
+        if not clauses:
+            return []
+        filters = (channels, event_types, correlation_id, tags, any_tags)
+        matches = self._matcher(*filters)
+        scored = []
+        with self._lock:
+            candidates = [self._events[event_id] for event_id in self._candidate_ids(*filters)]
+        for event in candidates:
+            if not matches(event):
+                continue
+            body = re.findall(r"\w+", event.payload.lower())
+            title = re.findall(r"\w+", (_meta_title(event.meta) or "").lower())
+            score = max(self._score(clause, body, title) for clause in clauses)
+            if score > 0:
+                scored.append((score, event))
+        scored.sort(key=lambda item: (-item[0], -item[1].id))
+        return [
+            SearchHit(event, float(score), _snippet(event.payload, query))
+            for score, event in scored[:limit]
+        ]
+
+    @staticmethod
+    def _parse_query(query: str) -> list[tuple[list[str], list[str]]]:
+        """`query` as OR-ed clauses of (required heads, excluded heads)."""
+        clauses = []
+        required: list[str] = []
+        excluded: list[str] = []
+        negate = False
+        for word in re.findall(r"\w+", query):
+            if word in _FTS_OPERATORS:
+                if word == "OR" and required:
+                    clauses.append((required, excluded))
+                    required, excluded = [], []
+                negate = word == "NOT"
+                continue
+            head = word[: max(len(word) - 3, 3)].lower()
+            (excluded if negate else required).append(head)
+            negate = False
+        if required:
+            clauses.append((required, excluded))
+        return clauses
+
+    @staticmethod
+    def _score(clause: tuple[list[str], list[str]], body: list[str], title: list[str]) -> float:
+        """How well one clause matches an event's words; 0 if it does not."""
+        required, excluded = clause
+        words = body + title
+        if any(w.startswith(head) for head in excluded for w in words):
+            return 0
+        score = 0.0
+        for head in required:
+            hits = sum(w.startswith(head) for w in body)
+            hits += SEARCH_TITLE_WEIGHT * sum(w.startswith(head) for w in title)
+            if not hits:
+                return 0
+            score += hits
+        return score
+
+    def get_cursor(self) -> str | None:
+        """Get a cursor pointing to the most recent event, or None if no events exist."""
+        with self._lock:
+            return str(self._ids[-1]) if self._ids else None
+
+    # Retention (see retention.py for the policy that drives these)
+
+    def event_count(self) -> int:
+        """Total number of stored events."""
+        return len(self._ids)
+
+    def delete_events(self, event_ids: list[int]) -> int:
+        """Delete the given events. Returns how many existed."""
+        with self._lock:
+            removed = self._remove_events(event_ids)
+            self._on_rollback(lambda: self._restore_events(removed))
+            gone = {event.id for event in removed}
+            self._drop_deliveries(lambda d: d.event_id in gone)
+            return len(removed)
+
+    def delete_oldest_events(self, count: int, max_id: int) -> int:
+        """Delete up to `count` of the oldest events with id <= max_id."""
+        if count <= 0:
+            return 0
+        with self._lock:
+            end = bisect.bisect_right(self._ids, max_id, hi=min(count, len(self._ids)))
+            return self.delete_events(self._ids[:end])
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """Nothing to return to the filesystem. Always 0."""
+        return 0
+
+    # Webhook operations
+
+    def _set_webhooks(self, webhooks: dict[int, Webhook]) -> None:
+        """Replace the webhook table (lock held), undoably, and drop the match index."""
+        previous = self._webhooks
+        self._webhooks = webhooks
+        self._webhook_index = None
+
+        def undo():
+            self._webhooks = previous
+            self._webhook_index = None
+
+        self._on_rollback(undo)
+
+    def add_webhook(
+        self,
+        url: str,
+        channel_filter: str | None = None,
+        event_types: list[str] | None = None,
+        secret: str | None = None,
+        batch_size: int | None = None,
+        batch_linger: float | None = None,
+    ) -> Webhook:
+        """Register a new webhook. Returns the created webhook."""
+        with self._lock:
+            self._last_webhook_id += 1
+            webhook = Webhook(
+                id=self._last_webhook_id,
+                url=url,
+                channel_filter=channel_filter,
+                # Normalize empty list to None (matches all event types)
+                event_types=list(event_types) if event_types else None,
+                created_at=datetime.now(),
+                active=True,
+                secret=secret,
+                batch_size=batch_size,
+                batch_linger=batch_linger,
+            )
+            self._set_webhooks({**self._webhooks, webhook.id: webhook})
+            return dataclasses.replace(webhook)
+
+    def list_webhooks(self, active_only: bool = True) -> list[Webhook]:
+        """List webhooks, newest first, active ones only unless active_only=False."""
+        with self._lock:
+            webhooks = [w for w in self._webhooks.values() if w.active or not active_only]
+        webhooks.sort(key=lambda w: (w.created_at, w.id), reverse=True)
+        return [dataclasses.replace(w) for w in webhooks]
+
+    def get_webhook(self, webhook_id: int) -> Webhook | None:
+        """Get a webhook by ID."""
+        with self._lock:
+            webhook = self._webhooks.get(webhook_id)
+            return dataclasses.replace(webhook) if webhook else None
+
+    def delete_webhook(self, webhook_id: int) -> bool:
+        """Delete a webhook. Returns True if deleted, False if not found."""
+        with self._lock:
+            if webhook_id not in self._webhooks:
+                return False
+            self._set_webhooks({k: w for k, w in self._webhooks.items() if k != webhook_id})
+            self._drop_deliveries(lambda d: d.webhook_id == webhook_id)
+            return True
+
+    def set_webhook_active(self, webhook_id: int, active: bool) -> bool:
+        """Enable or disable a webhook. Returns True if updated."""
+        with self._lock:
+            webhook = self._webhooks.get(webhook_id)
+            if webhook is None:
+                return False
+            updated = dataclasses.replace(webhook, active=active)
+            self._set_webhooks({**self._webhooks, webhook_id: updated})
+            return True
+
+    def get_matching_webhooks(self, event: Event) -> list[Webhook]:
+        """Get all active webhooks that match the given event (see SQLiteStorage)."""
+        with self._lock:
+            if self._webhook_index is None:
+                self._webhook_index = WebhookIndex(self.list_webhooks(active_only=True))
+            index = self._webhook_index
+        return index.match(event)
+
+    # Webhook outbox (see SQLiteStorage)
+
+    def _put_delivery(self, delivery: WebhookDelivery) -> None:
+        """Insert or replace an outbox row (lock held), undoably."""
+        previous = self._deliveries.get(delivery.id)
+        self._deliveries[delivery.id] = delivery
+
+        def undo():
+            if previous is None:
+                self._deliveries.pop(delivery.id, None)
+            else:
+                self._deliveries[delivery.id] = previous
+
+        self._on_rollback(undo)
+
+    def _drop_deliveries(self, doomed: Callable[[WebhookDelivery], bool]) -> int:
+        """Delete the outbox rows `doomed` selects (lock held), undoably. Returns how many."""
+        dropped = [d for d in self._deliveries.values() if doomed(d)]
+        for delivery in dropped:
+            del self._deliveries[delivery.id]
+        self._on_rollback(lambda: self._deliveries.update({d.id: d for d in dropped}))
+        return len(dropped)
+
+    def _is_due(self, delivery: WebhookDelivery, now: datetime) -> bool:
+        webhook = self._webhooks.get(delivery.webhook_id)
+        return (
+            delivery.status == "pending"
+            and delivery.next_attempt_at <= now
+            and webhook is not None
+            and webhook.active
+        )
+
+    def claim_webhook_deliveries(self, limit: int, lease_seconds: float) -> list[WebhookDelivery]:
+        """Take up to `limit` due deliveries to active webhooks, oldest due first."""
+        now = datetime.now()
+        with self._lock:
+            due = [d for d in self._deliveries.values() if self._is_due(d, now)]
+            due.sort(key=lambda d: (d.next_attempt_at, d.id))
+            claimed = []
+            for delivery in due[:limit]:
+                leased = dataclasses.replace(
+                    delivery, next_attempt_at=now + timedelta(seconds=lease_seconds)
+                )
+                self._put_delivery(leased)
+                claimed.append(
+                    dataclasses.replace(
+                        leased,
+                        webhook=dataclasses.replace(self._webhooks[leased.webhook_id]),
+                        event=self._events[leased.event_id],
+                    )
+                )
+        claimed.sort(key=lambda d: d.id)
+        return claimed
+
+    def complete_webhook_delivery(self, delivery_id: int) -> bool:
+        """Drop a delivered row from the outbox. Returns True if it was there."""
+        with self._lock:
+            return self._drop_deliveries(lambda d: d.id == delivery_id) > 0
+
+    def fail_webhook_delivery(
+        self, delivery_id: int, error: str, retry_at: datetime | None
+    ) -> bool:
+        """Record a failed attempt: retry at `retry_at`, or, if None, park it as dead."""
+        with self._lock:
+            delivery = self._deliveries.get(delivery_id)
+            if delivery is None:
+                return False
+            if retry_at is None:
+                changes = {"status": "dead"}
+            else:
+                changes = {"next_attempt_at": retry_at}
+            self._put_delivery(
+                dataclasses.replace(
+                    delivery, attempts=delivery.attempts + 1, last_error=error, **changes
+                )
+            )
+            return True
+
+    def defer_webhook_delivery(self, delivery_id: int, until: datetime) -> bool:
+        """Push a claimed delivery back to `until` without counting an attempt."""
+        with self._lock:
+            delivery = self._deliveries.get(delivery_id)
+            if delivery is None:
+                return False
+            self._put_delivery(dataclasses.replace(delivery, next_attempt_at=until))
+            return True
+
+    def list_webhook_deliveries(
+        self, status: str | None = None, webhook_id: int | None = None, limit: int = 100
+    ) -> list[WebhookDelivery]:
+        """Outbox rows, oldest first, optionally only one status or webhook's."""
+        with self._lock:
+            rows = [
+                dataclasses.replace(d)
+                for d in self._deliveries.values()
+                if (status is None or d.status == status)
+                and (webhook_id is None or d.webhook_id == webhook_id)
+            ]
+        rows.sort(key=lambda d: d.id)
+        return rows[:limit]
+
+    def replay_webhook_deliveries(
+        self, delivery_ids: list[int] | None = None, webhook_id: int | None = None
+    ) -> int:
+        """Put dead deliveries back in the queue, due now, with a fresh attempt count."""
+        wanted = set(delivery_ids) if delivery_ids is not None else None
+        now = datetime.now()
+        with self._lock:
+            dead = [
+                d
+                for d in self._deliveries.values()
+                if d.status == "dead"
+                and (wanted is None or d.id in wanted)
+                and (webhook_id is None or d.webhook_id == webhook_id)
+            ]
+            for delivery in dead:
+                self._put_delivery(
+                    dataclasses.replace(delivery, status="pending", attempts=0, next_attempt_at=now)
+                )
+            return len(dead)
+
+    def next_webhook_delivery(self) -> datetime | None:
+        """When the earliest pending delivery to an active webhook is due; None if none is."""
+        with self._lock:
+            return min(
+                (
+                    d.next_attempt_at
+                    for d in self._deliveries.values()
+                    if self._is_due(d, datetime.max)
+                ),
+                default=None,
+            )
@@ -10,16 +10,16 @@ from typing import TYPE_CHECKING
 import anyio.to_thread
 
 if TYPE_CHECKING:
-    from agent_event_bus.storage import SQLiteStorage
+    from agent_event_bus.storage_backend import Storage
 
 logger = logging.getLogger("agent-event-bus")
 
 
-def _get_storage() -> SQLiteStorage:
+def _get_storage() -> Storage:
     """Get the shared storage instance from server.
 
     Uses late import to avoid circular dependency (server imports middleware).
-    Returns the same SQLiteStorage instance used by the MCP tools.
+    Returns the same storage instance used by the MCP tools.
     """
     from agent_event_bus.server import storage
 
@@ -76,12 +76,14 @@ _RESET = "\033[0m"
 _TOOL_COLORS = {
     # Actions with side effects (yellow)
     "publish_event": _YELLOW,
+    "publish_events": _YELLOW,
     "notify": _YELLOW,
     # A write, not a read: it moves the position a later poll starts from, so
     # it belongs with publish_event rather than in the leftover bucket.
     "ack_events": _YELLOW,
     # Read operations (blue)
     "get_events": _BLUE,
+    "search_events": _BLUE,
     # Default (green) for everything else
 }
 
@@ -0,0 +1,101 @@
+"""In-process wake-ups for readers waiting on new events.
+
+A long-polling get_events parks on the server's event loop until something it
+would return is published. Publishes happen in worker threads (every tool body
+runs under _run_sync, #112), so the hand-off has to cross from a thread to the
+loop: EventNotifier.publish is thread-safe and only ever schedules a flag-set
+on the waiter's loop. A waiting reader therefore holds a coroutine, never a
+worker thread - the pool stays free for the calls that actually have work.
+
+Wake-ups are level-triggered hints, not deliveries. A woken reader re-queries
+storage from its cursor rather than trusting the event it was woken by, so a
+publish that lands between a reader's query and its subscribe cannot be lost:
+the subscription is opened BEFORE the first query, and a flag set early is
+still set when the reader gets round to waiting.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from agent_event_bus.storage import Event
+
+logger = logging.getLogger("agent-event-bus")
+
+EventPredicate = Callable[["Event"], bool]
+
+
+class Waiter:
+    """One parked reader: a predicate and a flag set on its own loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, predicate: EventPredicate):
+        self._loop = loop
+        self._predicate = predicate
+        self._ready = asyncio.Event()
+
+    def offer(self, event: Event) -> None:
+        """Wake this reader if `event` is one it would return (any thread)."""
+        try:
+            matched = self._predicate(event)
+        except Exception as e:
+            # A broken predicate wakes rather than strands: the reader re-runs
+            # its real query either way, so a spurious wake costs one read.
+            logger.debug(f"Waiter predicate failed for event {event.id}: {e}")
+            matched = True
+        if not matched:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # The reader's loop has shut down; nobody is left to wake
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for a wake. True if woken, False on timeout.
+
+        The flag is cleared on the way out, so each True corresponds to at
+        least one matching publish since the previous wait returned.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._ready.clear()
+        return True
+
+
+class EventNotifier:
+    """Fan-out of "an event was published" to every parked reader."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: set[Waiter] = set()
+
+    @contextmanager
+    def subscribe(self, predicate: EventPredicate) -> Iterator[Waiter]:
+        """Register a waiter on the running loop for the duration of the block."""
+        waiter = Waiter(asyncio.get_running_loop(), predicate)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            yield waiter
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def publish(self, event: Event) -> None:
+        """Offer a freshly stored event to every waiter. Safe from any thread."""
+        with self._lock:
+            waiters = list(self._waiters)
+        for waiter in waiters:
+            waiter.offer(event)
+
+    def waiter_count(self) -> int:
+        """Number of readers currently parked."""
+        with self._lock:
+            return len(self._waiters)
@@ -0,0 +1,74 @@
+"""Codecs for event payloads stored compressed (see SQLiteStorage.add_event).
+
+A compressed payload is stored as a BLOB in events.payload, with the name of
+its codec in events.payload_codec; NULL there means the payload is plain
+text. zlib is always available. zstd compresses text logs a little better
+and much faster, but needs Python 3.14's compression.zstd or the zstandard
+package - and a database written with it can only be read where one of them
+is installed, which is why it is opt-in rather than the default.
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+
+DEFAULT_CODEC = "zlib"
+
+# zlib's default level: within a few percent of level 9 on log-like text at
+# a fraction of the cost, and compression runs on every large publish.
+ZLIB_LEVEL = 6
+
+
+def _load_zstd() -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]] | None:
+    """(compress, decompress) from whichever zstd binding is installed, if any."""
+    try:
+        from compression import zstd  # Python 3.14+
+    except ImportError:
+        pass
+    else:
+        return zstd.compress, zstd.decompress
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    # The module-level functions, not a shared ZstdCompressor: those are not
+    # safe to use from several threads at once, and publishers are threads.
+    return zstandard.compress, zstandard.decompress
+
+
+# codec name -> (compress, decompress), for the codecs this install can use
+CODECS: dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, ZLIB_LEVEL), zlib.decompress),
+}
+if (_zstd := _load_zstd()) is not None:
+    CODECS["zstd"] = _zstd
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    """`data` compressed with `codec` (which must be in CODECS)."""
+    return CODECS[codec][0](data)
+
+
+def decompress(codec: str, data: bytes) -> str:
+    """A payload stored with `codec`, back as text."""
+    try:
+        _, decode = CODECS[codec]
+    except KeyError:
+        raise ValueError(
+            f"Event payload stored with codec {codec!r}, which this install cannot "
+            f"decode (available: {', '.join(CODECS)})"
+        ) from None
+    return decode(data).decode()
+
+
+@dataclass(frozen=True, slots=True)
+class CompressedPayload:
+    """A payload as stored: compressed bytes not yet decoded to text."""
+
+    codec: str
+    data: bytes
+
+    def decode(self) -> str:
+        return decompress(self.codec, self.data)
@@ -0,0 +1,253 @@
+"""Event retention: which events are old enough to prune, and the pruner.
+
+Nothing else ever deletes an event, so without this the events table - and
+every scan, MAX(id) and backup over it - grows for the life of the bus.
+Retention is opt-in (an unset policy prunes nothing) and configured from the
+environment:
+
+    AGENT_EVENT_BUS_RETENTION_MAX_AGE     default age limit, e.g. "30d", "12h"
+    AGENT_EVENT_BUS_RETENTION_MAX_EVENTS  cap on total rows, oldest go first
+    AGENT_EVENT_BUS_RETENTION_RULES       per-event overrides of the age limit,
+                                          e.g. "level:lifecycle=2d,channel:session:*=90d"
+    AGENT_EVENT_BUS_RETENTION_FORCE       "1" to prune past unread events (below)
+    AGENT_EVENT_BUS_RETENTION_INTERVAL    seconds between runs (default 600)
+
+A rule is `<selector>=<duration>`, where the selector is `level:<signal level>`,
+`channel:<glob>` or `type:<event_type glob>`. The first matching rule sets an
+event's age limit - longer or shorter than the default - and events no rule
+matches get the default. A bare number is days.
+
+Two guarantees hold regardless of policy:
+
+- Unread events survive. Nothing above the lowest active session's
+  last_cursor is deleted, so a session that falls behind loses nothing it has
+  not been served - unless FORCE is set, for when a stuck session would
+  otherwise pin the whole table.
+- The newest event survives, so the tip (get_cursor) never moves backwards and
+  cursors already handed out stay valid. Reads use `id > cursor`, so a cursor
+  below the oldest retained event simply resumes from the oldest one left.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import os
+import re
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from agent_event_bus.storage import Event
+    from agent_event_bus.storage_backend import Storage
+
+logger = logging.getLogger("agent-event-bus")
+
+# Rows deleted per transaction. Small enough that a prune never holds the
+# write lock long enough for a publisher to notice.
+DEFAULT_BATCH_SIZE = 500
+
+# Free pages returned to the filesystem per incremental_vacuum call, repeated
+# until the free list is empty. Each call is its own short write transaction.
+VACUUM_CHUNK_PAGES = 256
+
+DEFAULT_INTERVAL_SECONDS = 600.0
+
+_DURATION_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+_DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd]?)$")
+
+RuleKind = Literal["channel", "level", "type"]
+_RULE_KINDS: tuple[RuleKind, ...] = ("channel", "level", "type")
+
+
+def parse_duration(text: str) -> timedelta:
+    """Parse "90d", "12h", "30m", "45s" or a bare number of days."""
+    match = _DURATION_RE.match(text.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid duration {text!r}: expected e.g. 30d, 12h, 30m or 45s")
+    value, unit = match.groups()
+    return timedelta(**{_DURATION_UNITS[unit or "d"]: float(value)})
+
+
+@dataclass(frozen=True)
+class RetentionRule:
+    """An age limit for the events one selector matches."""
+
+    kind: RuleKind
+    pattern: str
+    max_age: timedelta
+
+    def matches(self, event: Event, level: str) -> bool:
+        if self.kind == "level":
+            return level == self.pattern
+        value = event.channel if self.kind == "channel" else event.event_type
+        return fnmatch.fnmatchcase(value, self.pattern)
+
+
+def parse_rules(text: str) -> tuple[RetentionRule, ...]:
+    """Parse the comma-separated RULES syntax (see the module docstring)."""
+    rules = []
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        selector, sep, duration = item.rpartition("=")
+        kind, colon, pattern = selector.partition(":")
+        if not sep or not colon or not pattern or kind not in _RULE_KINDS:
+            raise ValueError(
+                f"Invalid retention rule {item!r}: expected <kind>:<pattern>=<duration> "
+                f"with kind one of {', '.join(_RULE_KINDS)}"
+            )
+        rules.append(RetentionRule(kind=kind, pattern=pattern, max_age=parse_duration(duration)))
+    return tuple(rules)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """What to keep. The default instance keeps everything."""
+
+    max_age: timedelta | None = None
+    max_events: int | None = None
+    rules: tuple[RetentionRule, ...] = ()
+    force: bool = False
+    batch_size: int = DEFAULT_BATCH_SIZE
+    interval: float = DEFAULT_INTERVAL_SECONDS
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_age is not None or self.max_events is not None or bool(self.rules)
+
+    def max_age_for(self, event: Event, level: str) -> timedelta | None:
+        """The age limit for `event`: its first matching rule's, else the default."""
+        for rule in self.rules:
+            if rule.matches(event, level):
+                return rule.max_age
+        return self.max_age
+
+    def shortest_age(self) -> timedelta | None:
+        """The smallest age limit any event can have - nothing younger can expire."""
+        ages = [rule.max_age for rule in self.rules]
+        if self.max_age is not None:
+            ages.append(self.max_age)
+        return min(ages) if ages else None
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> RetentionPolicy:
+        """Build the policy from AGENT_EVENT_BUS_RETENTION_* variables.
+
+        Raises ValueError on a malformed value: a retention typo should stop
+        the server at startup, not silently keep (or prune) the wrong events.
+        """
+        max_age = environ.get("AGENT_EVENT_BUS_RETENTION_MAX_AGE")
+        max_events = environ.get("AGENT_EVENT_BUS_RETENTION_MAX_EVENTS")
+        interval = environ.get("AGENT_EVENT_BUS_RETENTION_INTERVAL")
+        return cls(
+            max_age=parse_duration(max_age) if max_age else None,
+            max_events=int(max_events) if max_events else None,
+            rules=parse_rules(environ.get("AGENT_EVENT_BUS_RETENTION_RULES", "")),
+            force=environ.get("AGENT_EVENT_BUS_RETENTION_FORCE", "").lower() in ("1", "true"),
+            interval=float(interval) if interval else DEFAULT_INTERVAL_SECONDS,
+        )
+
+
+@dataclass
+class PruneResult:
+    """What one prune_events pass removed."""
+
+    by_count: int = 0
+    by_age: int = 0
+    pages_freed: int = 0
+    ceiling: int | None = None  # Highest id the pass was allowed to delete
+
+    @property
+    def deleted(self) -> int:
+        return self.by_count + self.by_age
+
+
+def prune_events(
+    storage: Storage,
+    policy: RetentionPolicy,
+    level_of: Callable[[Event], str],
+    now: datetime | None = None,
+) -> PruneResult:
+    """Delete what `policy` no longer keeps, in small batches, then reclaim pages.
+
+    `level_of` is the server's effective signal level (level rules match on
+    it, and it is derived rather than stored). Every delete is its own short
+    transaction, so publishers and pollers interleave with a long prune
+    instead of queueing behind it.
+    """
+    result = PruneResult()
+    if not policy.enabled:
+        return result
+    tip = storage.get_cursor()
+    if tip is None:
+        return result
+
+    # Never the newest event (the tip must not regress), and - unless forced -
+    # nothing an active session has not been served yet.
+    ceiling = int(tip) - 1
+    if not policy.force:
+        floor = storage.min_active_cursor()
+        if floor is not None:
+            ceiling = min(ceiling, floor)
+    result.ceiling = ceiling
+    if ceiling <= 0:
+        return result
+
+    if policy.max_events is not None:
+        excess = storage.event_count() - policy.max_events
+        while excess > 0:
+            deleted = storage.delete_oldest_events(min(excess, policy.batch_size), ceiling)
+            if not deleted:
+                break  # the rest is above the ceiling
+            excess -= deleted
+            result.by_count += deleted
+
+    shortest = policy.shortest_age()
+    if shortest is not None:
+        now = now or datetime.now()
+        result.by_age = _prune_by_age(storage, policy, level_of, now, now - shortest, ceiling)
+
+    if result.deleted:
+        while freed := storage.incremental_vacuum(VACUUM_CHUNK_PAGES):
+            result.pages_freed += freed
+        logger.info(
+            f"retention: pruned {result.deleted} events "
+            f"({result.by_count} over the row cap, {result.by_age} past their age limit), "
+            f"freed {result.pages_freed} pages"
+        )
+    return result
+
+
+def _prune_by_age(
+    storage: Storage,
+    policy: RetentionPolicy,
+    level_of: Callable[[Event], str],
+    now: datetime,
+    horizon: datetime,
+    ceiling: int,
+) -> int:
+    """Walk events oldest-first, deleting expired ones a batch at a time.
+
+    Stops at the ceiling or at the first event younger than `horizon` (the
+    shortest age limit in the policy) - ids and timestamps rise together, so
+    nothing past that point can have expired yet.
+    """
+    deleted = 0
+    after_id = 0
+    while True:
+        events = storage.scan_events(after_id, policy.batch_size)
+        expired = []
+        reached_end = len(events) < policy.batch_size
+        if events:
+            after_id = events[-1].id
+        for event in events:
+            if event.id > ceiling or event.timestamp > horizon:
+                reached_end = True
+                break
+            max_age = policy.max_age_for(event, level_of(event))
+            if max_age is not None and now - event.timestamp > max_age:
+                expired.append(event.id)
+        deleted += storage.delete_events(expired)
+        if reached_end:
+            return deleted
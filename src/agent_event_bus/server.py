@@ -5,6 +5,7 @@ Provides tools for cross-session Claude Code communication:
 - list_sessions: See active sessions
 - list_channels: See channels with subscriber counts
 - publish_event: Broadcast events (auto-refreshes heartbeat)
+- publish_events: Publish a batch of events in one transaction
 - get_events: Poll for new events (auto-refreshes heartbeat)
 - ack_events: Advance a session's cursor to an id it already holds
 - unregister_session: Clean up on exit
@@ -13,6 +14,11 @@ Provides tools for cross-session Claude Code communication:
 - list_webhooks: List registered webhooks
 - set_webhook_active: Pause/resume a webhook without unregistering it
 - unregister_webhook: Remove a webhook
+- list_dead_letters: List webhook deliveries that failed every retry
+- replay_dead_letters: Retry dead-lettered webhook deliveries
+
+HTTP routes outside MCP: GET /health (liveness) and GET /events/stream
+(Server-Sent Events feed of new events).
 """
 
 import asyncio
@@ -22,10 +28,13 @@ import hmac
 import json
 import logging
 import os
+import random
 import socket
 import threading
 import uuid
-from datetime import datetime
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Literal
 
@@ -33,7 +42,7 @@ import anyio.to_thread
 import httpx
 from fastmcp import FastMCP
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 # SIGNATURE_HEADER: one name, three readers (this module's _dispatch_webhook
 # sets it, the bridge's hook endpoint reads it, the bridge tests build theirs
@@ -47,14 +56,19 @@ from agent_event_bus.helpers import (
 )
 from agent_event_bus.helpers import (
     WEBHOOK_CONTENT_TYPE,
+    ClientLiveness,
     _dev_notify,
     extract_repo_from_cwd,
-    is_client_alive,
     send_notification,
 )
+from agent_event_bus.maintenance import DeadlineTask, PeriodicTask
 from agent_event_bus.middleware import RequestLoggingMiddleware, TailscaleAuthMiddleware
+from agent_event_bus.notifier import EventNotifier
+from agent_event_bus.retention import RetentionPolicy, prune_events
 from agent_event_bus.session_ids import generate_session_id
-from agent_event_bus.storage import Event, Session, SQLiteStorage, Webhook
+from agent_event_bus.storage import Event, Session, Webhook, WebhookDelivery
+from agent_event_bus.storage_backend import create_storage
+from agent_event_bus.webhook_breaker import WebhookBreakers
 
 # Configure logging
 # Default log path: ~/.claude/contrib/agent-event-bus/agent-event-bus.log
@@ -91,7 +105,52 @@ if (
 # Constants
 MAX_PAYLOAD_PREVIEW = 50  # Max chars to show in notification previews
 WEBHOOK_TIMEOUT = 5.0  # Seconds to wait for webhook response
-WEBHOOK_MAX_RETRIES = 2  # Number of retries for failed webhooks
+# Webhook outbox (see storage.migrate_v10). A failed delivery is retried
+# after 1s, 2s, 4s, ... (jittered, capped at 15 minutes) until its 15th
+# attempt fails - about an hour and a half of endpoint downtime - and is
+# then a dead letter, kept until replayed or its event is pruned.
+WEBHOOK_MAX_ATTEMPTS = 15
+WEBHOOK_RETRY_BASE_SECONDS = 1.0
+WEBHOOK_RETRY_MAX_SECONDS = 900.0
+# How long a dispatch pass holds the deliveries it claimed. Longer than the
+# slowest round takes - a full WEBHOOK_DISPATCH_BATCH for one webhook,
+# queued behind its WEBHOOK_MAX_CONCURRENCY slots at WEBHOOK_TIMEOUT each,
+# is 125s - so it only ever runs out when the pass died with them (a crash,
+# a restart), and then they are simply retried.
+WEBHOOK_DELIVERY_LEASE_SECONDS = 180.0
+# Deliveries per dispatch round - the most POSTs one round has in flight.
+WEBHOOK_DISPATCH_BATCH = 100
+# Batched webhooks (register_webhook batch_size) get up to batch_size
+# events per POST, as a JSON array - at most a round's worth. A batch waits
+# for more events this long by default, and never longer than a minute.
+WEBHOOK_BATCH_LINGER_SECONDS = 1.0
+WEBHOOK_MAX_BATCH_LINGER_SECONDS = 60.0
+# Most requests in flight to any one webhook, across every concurrent pass:
+# a burst to a slow endpoint queues here instead of in the HTTP client.
+WEBHOOK_MAX_CONCURRENCY = 4
+# The shared client's connection pool, across all webhooks.
+WEBHOOK_MAX_CONNECTIONS = 100
+WEBHOOK_MAX_KEEPALIVE_CONNECTIONS = 20
+# Per-webhook circuit breaker (see webhook_breaker.py): opens after this
+# many failures in a row, probes after 30s, and doubles the wait after each
+# failed probe up to 10 minutes.
+WEBHOOK_BREAKER_THRESHOLD = 5
+WEBHOOK_BREAKER_COOLDOWN_SECONDS = 30.0
+WEBHOOK_BREAKER_MAX_COOLDOWN_SECONDS = 600.0
+# The retry task sleeps until the next retry is due, but asks again at least
+# this often: how it notices a delivery that a pass never picked up.
+WEBHOOK_RETRY_MAX_WAIT = 60.0
+# Upper bound on a get_events long-poll. Long enough to replace a poll loop,
+# short enough that a client whose connection silently died stops pinning a
+# waiter within a couple of minutes.
+MAX_WAIT_SECONDS = 120.0
+# The session-expiry task sleeps until the oldest heartbeat times out, but
+# asks again at least this often: how it notices the first session after
+# there were none, and how often it sweeps without the session cache.
+SESSION_EXPIRY_MAX_WAIT = 60.0
+# Most events one publish_events call may carry. The batch is one
+# transaction, so this also bounds how long it holds the write lock.
+MAX_PUBLISH_BATCH = 500
 
 # Known signal levels (RFC #121 / #129). Validation is soft: unknown values
 # are stored as-is with a warning, never rejected.
@@ -140,8 +199,25 @@ def _get_signal_level(event: Event) -> str:
 # Initialize MCP server
 mcp = FastMCP("agent-event-bus")
 
-# SQLite-backed storage (persists across restarts)
-storage = SQLiteStorage()
+# SQLite-backed storage (persists across restarts) unless
+# AGENT_EVENT_BUS_STORAGE selects another backend (see storage_backend.py)
+storage = create_storage()
+
+# Wakes long-polling readers when an event they would return is stored.
+# Every storage.add_event in this module is followed by _announce_event.
+notifier = EventNotifier()
+
+# One snapshot of which local clients are still running, shared by
+# list_sessions and list_channels (see helpers.LIVENESS_TTL_SECONDS).
+client_liveness = ClientLiveness()
+
+# One circuit breaker per webhook, consulted before every delivery.
+webhook_breakers = WebhookBreakers(
+    threshold=WEBHOOK_BREAKER_THRESHOLD,
+    cooldown=WEBHOOK_BREAKER_COOLDOWN_SECONDS,
+    max_cooldown=WEBHOOK_BREAKER_MAX_COOLDOWN_SECONDS,
+    probe_wait=WEBHOOK_TIMEOUT,
+)
 
 # The server's event loop, captured on the first tool call. Lets code running
 # in worker threads (webhook dispatch) schedule coroutines on the real loop.
@@ -171,6 +247,39 @@ def usage_guide() -> str:
         return "# Event Bus Usage Guide\n\nGuide file not found. See CLAUDE.md for usage."
 
 
+def _announce_event(event: Event) -> None:
+    """Wake any long-polling reader this event would satisfy.
+
+    Only once the event is committed: a woken reader re-queries storage, and
+    waking it before the row is visible would park it again with the event it
+    was woken for already behind it. Inside a unit of work that means when
+    the transaction commits, not when add_event returns.
+    """
+    storage.after_commit(functools.partial(notifier.publish, event))
+
+
+def _unit_of_work(func=None, *, lazy: bool = False):
+    """Run a sync tool body as one storage transaction (Storage.transaction).
+
+    One connection, one write lock and one commit for every storage call the
+    body makes, instead of one each - and no other writer between the body's
+    reads and the writes they decide. Resolves `storage` per call, so a
+    swapped-in instance (tests) is the one used.
+
+    lazy=True takes the write lock only when the body first reaches SQLite,
+    for bodies that are usually served from storage's in-memory caches.
+    """
+    if func is None:
+        return functools.partial(_unit_of_work, lazy=lazy)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with storage.transaction(lazy=lazy):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
 def _auto_heartbeat(session_id: str | None) -> None:
     """Refresh heartbeat for a session if it exists."""
     if session_id and session_id != "anonymous":
@@ -195,21 +304,27 @@ def _get_live_sessions() -> list[Session]:
 
     For local sessions, checks if the client process is still alive.
     Remote sessions and sessions without client_id are assumed alive.
+    (Heartbeat timeouts are not checked here: the session-expiry task
+    deletes those as they fall due.)
+
+    Liveness comes from the shared client_liveness snapshot, and every dead
+    session found is deleted in one write.
 
     Returns:
         List of sessions that are still alive
     """
-    storage.cleanup_stale_sessions()
     local_hostname = socket.gethostname()
     live = []
+    dead = []
 
     for s in storage.list_sessions():
         is_local = s.machine == local_hostname
-        if not is_client_alive(s.client_id, is_local):
-            storage.delete_session(s.id)
-            continue
-        live.append(s)
+        if client_liveness.is_alive(s.client_id, is_local):
+            live.append(s)
+        else:
+            dead.append(s.id)
 
+    storage.delete_sessions(dead)
     return live
 
 
@@ -261,6 +376,7 @@ def _notify_dm_recipient(
         logger.warning(f"Failed to notify session {target_id} of DM: {e}")
 
 
+@_unit_of_work
 def _register_session_impl(
     name: str,
     machine: str | None = None,
@@ -268,8 +384,6 @@ def _register_session_impl(
     client_id: str | None = None,
 ) -> dict:
     """Sync implementation of register_session (runs in a worker thread)."""
-    storage.cleanup_stale_sessions()
-
     now = datetime.now()
     machine = machine or socket.gethostname()
     cwd = cwd or os.environ.get("PWD", os.getcwd())
@@ -333,6 +447,8 @@ def _register_session_impl(
         payload=f"{name} started on {machine} in {cwd}",
         session_id=session_id,
     )
+    _announce_event(registration_event)
+    storage.after_commit(functools.partial(_schedule_webhook_dispatch, registration_event))
 
     result = {
         "session_id": session_id,
@@ -424,20 +540,8 @@ async def list_channels() -> list[dict]:
     return await _run_sync(_list_channels_impl)
 
 
-def _publish_event_impl(
-    event_type: str,
-    payload: str,
-    session_id: str | None = None,
-    channel: str = "all",
-    title: str | None = None,
-    tags: list[str] | None = None,
-    correlation_id: str | None = None,
-    signal_level: str | None = None,
-) -> dict:
-    """Sync implementation of publish_event (runs in a worker thread)."""
-    # Auto-refresh heartbeat when session publishes
-    _auto_heartbeat(session_id)
-
+def _warn_on_publish_fields(channel: str, signal_level: str | None) -> None:
+    """Log the soft-validation warnings for a publish; nothing is rejected."""
     # Validate channel format for known channel types
     if channel not in ["all"] and ":" in channel:
         channel_type, _, channel_value = channel.partition(":")
@@ -455,22 +559,48 @@ def _publish_event_impl(
             f"{', '.join(VALID_SIGNAL_LEVELS)}). Storing as-is."
         )
 
-    # Auto-notify on direct messages (DMs)
-    _notify_dm_recipient(channel, payload, session_id)
 
+def _publish_meta(
+    title: str | None, tags: list[str] | None, signal_level: str | None
+) -> dict | None:
+    """The event meta for a publish's optional fields, or None if none was given."""
     meta = {
         k: v
         for k, v in {"title": title, "tags": tags, "signal_level": signal_level}.items()
         if v is not None
     }
+    return meta or None
+
+
+def _publish_event_impl(
+    event_type: str,
+    payload: str,
+    session_id: str | None = None,
+    channel: str = "all",
+    title: str | None = None,
+    tags: list[str] | None = None,
+    correlation_id: str | None = None,
+    signal_level: str | None = None,
+) -> dict:
+    """Sync implementation of publish_event (runs in a worker thread)."""
+    # Auto-refresh heartbeat when session publishes
+    _auto_heartbeat(session_id)
+
+    _warn_on_publish_fields(channel, signal_level)
+
+    # Auto-notify on direct messages (DMs)
+    _notify_dm_recipient(channel, payload, session_id)
+
+    meta = _publish_meta(title, tags, signal_level)
     event = storage.add_event(
         event_type=event_type,
         payload=payload,
         session_id=session_id or "anonymous",
         channel=channel,
         correlation_id=correlation_id,
-        meta=meta or None,
+        meta=meta,
     )
+    _announce_event(event)
 
     # Dispatch to matching webhooks (async, non-blocking)
     _schedule_webhook_dispatch(event)
@@ -551,6 +681,110 @@ async def publish_event(
     )
 
 
+# The fields a publish_events item may carry: publish_event's, less session_id
+# (one publisher per batch).
+_PUBLISH_FIELDS = {
+    "event_type",
+    "payload",
+    "channel",
+    "title",
+    "tags",
+    "correlation_id",
+    "signal_level",
+}
+
+
+def _publish_batch_error(events: list) -> str | None:
+    """Why a publish_events batch is malformed, or None if it is well-formed.
+
+    Checked for the whole batch before anything is written, so a bad item
+    rejects the batch rather than leaving it half-published.
+    """
+    if len(events) > MAX_PUBLISH_BATCH:
+        return f"Too many events: {len(events)} (max {MAX_PUBLISH_BATCH} per call)"
+    for i, item in enumerate(events):
+        if not isinstance(item, dict):
+            return f"Event {i}: expected an object"
+        unknown = set(item) - _PUBLISH_FIELDS
+        if unknown:
+            return f"Event {i}: unknown field(s) {', '.join(sorted(unknown))}"
+        for field in ("event_type", "payload"):
+            if not isinstance(item.get(field), str):
+                return f"Event {i}: {field} must be a string"
+        # No tool-schema validation reaches inside the items, so every other
+        # field is checked here: a non-string channel breaks the publish
+        # mid-batch, and a non-string signal_level is stored and then breaks
+        # every read that returns the event
+        # (an unknown signal_level string is fine: it is warned about and
+        # stored as-is, exactly as for publish_event)
+        for field in ("channel", "title", "correlation_id", "signal_level"):
+            if not isinstance(item.get(field), (str, type(None))):
+                return f"Event {i}: {field} must be a string"
+        tags = item.get("tags")
+        if tags is not None and not (
+            isinstance(tags, list) and all(isinstance(tag, str) for tag in tags)
+        ):
+            return f"Event {i}: tags must be a list of strings"
+    return None
+
+
+def _publish_events_impl(events: list[dict], session_id: str | None = None) -> dict:
+    """Sync implementation of publish_events (runs in a worker thread)."""
+    error = _publish_batch_error(events)
+    if error:
+        return {"error": error}
+
+    _auto_heartbeat(session_id)
+
+    rows = []
+    for item in events:
+        channel = item.get("channel") or "all"
+        signal_level = item.get("signal_level")
+        _warn_on_publish_fields(channel, signal_level)
+        _notify_dm_recipient(channel, item["payload"], session_id)
+        rows.append(
+            {
+                "event_type": item["event_type"],
+                "payload": item["payload"],
+                "session_id": session_id or "anonymous",
+                "channel": channel,
+                "correlation_id": item.get("correlation_id"),
+                "meta": _publish_meta(item.get("title"), item.get("tags"), signal_level),
+            }
+        )
+    published = storage.add_events(rows)
+    for event in published:
+        _announce_event(event)
+
+    # One dispatch pass for the whole batch, not one scheduled task per event
+    _schedule_webhook_dispatch(*published)
+
+    _dev_notify("publish_events", f"{len(published)} events")
+
+    result = {"event_ids": [event.id for event in published], "count": len(published)}
+    # Flagged, not rejected, exactly as for publish_event
+    deleted = _deleted_session_flag(_load_polling_session(session_id))
+    if deleted:
+        result.update(deleted)
+    return result
+
+
+@mcp.tool()
+async def publish_events(events: list[dict], session_id: str | None = None) -> dict:
+    """Publish several events at once, in one transaction. Returns event_ids in order.
+
+    All or nothing: a malformed item rejects the whole batch. Prefer this
+    over repeated publish_event calls when emitting more than one event.
+
+    Args:
+        events: Up to 500 objects, each with event_type and payload, and
+            optionally channel, title, tags, correlation_id, signal_level
+            (as for publish_event)
+        session_id: Your session ID, the publisher of every event
+    """
+    return await _run_sync(_publish_events_impl, events=events, session_id=session_id)
+
+
 def _event_wire_dict(event: Event, *, id_key: str) -> dict:
     """The one wire shape for an event, keyed by `id_key` for the event id.
 
@@ -570,7 +804,7 @@ def _event_wire_dict(event: Event, *, id_key: str) -> dict:
         "event_type": event.event_type,
         "payload": event.payload,
         "session_id": event.session_id,
-        "timestamp": event.timestamp.isoformat(),
+        "timestamp": event.timestamp_iso,
         "channel": event.channel,
         "correlation_id": event.correlation_id,
         "signal_level": _get_signal_level(event),
@@ -755,6 +989,42 @@ def _event_to_dict(e: Event) -> dict:
     return _event_wire_dict(e, id_key="id")
 
 
+def _event_matches(
+    event: Event,
+    channel: str | None = None,
+    event_types: list[str] | None = None,
+    correlation_id: str | None = None,
+    min_level: Literal["lifecycle", "info", "actionable"] | None = None,
+    tags: list[str] | None = None,
+    any_tags: list[str] | None = None,
+) -> bool:
+    """Whether a get_events call with these filters would return `event`.
+
+    The in-memory twin of the SQL WHERE clause plus the min_level pass, used
+    to decide which long-pollers a publish wakes. It only has to be no
+    stricter than the real query: a false positive costs one re-read, a false
+    negative parks a reader past an event it should have returned.
+    """
+    if channel and event.channel != channel:
+        return False
+    if event_types and event.event_type not in event_types:
+        return False
+    if correlation_id and event.correlation_id != correlation_id:
+        return False
+    if tags and not set(tags) <= set(event.tags):
+        return False
+    if any_tags and set(any_tags).isdisjoint(event.tags):
+        return False
+    if min_level:
+        return SIGNAL_LEVEL_ORDER[_get_signal_level(event)] >= SIGNAL_LEVEL_ORDER[min_level]
+    return True
+
+
+# Lazy: a poll resuming near the tip is answered from the session cache and
+# the recent-events window, with its heartbeat and cursor advance buffered -
+# nothing to lock. Nothing it writes is decided by a read that could go
+# stale without the lock either: the cursor only ever moves forward.
+@_unit_of_work(lazy=True)
 def _get_events_impl(
     cursor: str | None = None,
     limit: int = 50,
@@ -766,6 +1036,8 @@ def _get_events_impl(
     peek: bool = False,
     correlation_id: str | None = None,
     min_level: Literal["lifecycle", "info", "actionable"] | None = None,
+    tags: list[str] | None = None,
+    any_tags: list[str] | None = None,
 ) -> dict:
     """Sync implementation of get_events (runs in a worker thread)."""
     # Fail loudly for soft-deleted sessions (#140) - checked on every read
@@ -783,10 +1055,11 @@ def _get_events_impl(
     # above - active by this point, and _auto_heartbeat only touches
     # last_heartbeat, so its last_cursor is still current.
     # Only applies when: resume=True, session_id provided, cursor not provided
+    narrowed = bool(channel or event_types or correlation_id or tags or any_tags)
     if resume and session_id and cursor is None:
         if session and session.last_cursor:
             cursor = session.last_cursor
-        elif session and (peek or channel or event_types or correlation_id):
+        elif session and (peek or narrowed):
             # Non-consuming reads (peek or narrowed) on a cursor-less session:
             # read from the tip without persisting it. Persisting here would
             # let a narrowed resume mark the entire backlog as seen.
@@ -812,8 +1085,6 @@ def _get_events_impl(
             _dev_notify("get_events", f"resume failed: session not found {session_id[:8]}...")
             return {"error": "Session not found", "session_id": session_id}
 
-    storage.cleanup_stale_sessions()
-
     # Broadcast model: with no explicit channel filter, every session sees
     # every event. Channel is metadata on the event, not a subscription, so
     # there is nothing implicit to derive from session_id.
@@ -826,9 +1097,11 @@ def _get_events_impl(
         order=order,
         event_types=event_types,
         correlation_id=correlation_id,
+        tags=tags,
+        any_tags=any_tags,
     )
 
-    # Persist high-water mark for session-based tracking (enables seamless resume)
+    # Advance the high-water mark for session-based tracking (enables seamless resume)
     # We save the MAX event ID seen, not the pagination cursor. This ensures that
     # resume=True always starts from after the newest event seen, regardless of
     # what order was used for polling.
@@ -839,15 +1112,18 @@ def _get_events_impl(
     # consuming poll (e.g. the UserPromptSubmit hook) still returns them. This
     # lets a Stop-hook drain inspect pending events and decide whether to act
     # without stealing them from the normal pull path.
-    # Narrowing filters (channel, event_types, correlation_id) make the read
+    # Narrowing filters (channel, event_types, correlation_id, tags) make the read
     # non-consuming: the max id below is taken over the SQL-filtered batch,
     # so advancing the cursor would mark every non-matching lower-id event
     # as seen and silently drop it from a later resume. min_level filters
     # after this bookkeeping, so level-filtered noise still counts as seen.
-    narrowed = bool(channel or event_types or correlation_id)
+    # Forward-only and buffered (storage.advance_session_cursor): an explicit
+    # cursor behind the saved one re-reads without rewinding the session -
+    # that is ack_events(allow_rewind=True) - and the write reaches SQLite
+    # with the next cursor flush, or the session's next ack.
     if session_id and raw_events and not peek and not narrowed:
         high_water_mark = str(max(e.id for e in raw_events))
-        storage.update_session_cursor(session_id, high_water_mark)
+        storage.advance_session_cursor(session_id, high_water_mark)
 
     # Level filtering happens after cursor bookkeeping: filtered-out events
     # still count as "seen" (they are noise by definition, not missed signal).
@@ -870,6 +1146,57 @@ def _get_events_impl(
     }
 
 
+async def _wait_for_events(wait_seconds: float, **kwargs) -> dict:
+    """get_events that parks on the loop until it has something to return.
+
+    Each pass is an ordinary _get_events_impl call in a worker thread; only
+    the wait between passes is spent on the loop, as a coroutine, so a parked
+    reader costs no worker thread. The subscription opens before the first
+    pass, so a publish racing that pass still leaves the flag set and the
+    next wait returns at once.
+
+    Returns the first pass that yields events or an error, or the last empty
+    pass once `wait_seconds` runs out.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_seconds
+    predicate = functools.partial(
+        _event_matches,
+        channel=kwargs.get("channel"),
+        event_types=kwargs.get("event_types"),
+        correlation_id=kwargs.get("correlation_id"),
+        min_level=kwargs.get("min_level"),
+        tags=kwargs.get("tags"),
+        any_tags=kwargs.get("any_tags"),
+    )
+    # Only a consuming resume moves the session's saved cursor (the same
+    # rule as _get_events_impl: peek and narrowing filters don't)
+    rereads_saved_cursor = kwargs.get("resume") and not (
+        kwargs.get("peek")
+        or kwargs.get("channel")
+        or kwargs.get("event_types")
+        or kwargs.get("correlation_id")
+        or kwargs.get("tags")
+        or kwargs.get("any_tags")
+    )
+    with notifier.subscribe(predicate) as waiter:
+        while True:
+            result = await _run_sync(_get_events_impl, **kwargs)
+            if result.get("events") or "error" in result:
+                return result
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await waiter.wait(remaining):
+                return result
+            # Re-read from where the empty pass left off. A consuming resume
+            # re-reads from the session's saved cursor instead, which that
+            # pass has already moved. A non-consuming one (peek, or narrowed)
+            # never moves it, and on a session without one each pass would
+            # start from the then-current tip - past the event that woke it -
+            # so it is pinned to where the empty pass left off like any read.
+            if not rereads_saved_cursor and result.get("next_cursor") is not None:
+                kwargs["cursor"] = result["next_cursor"]
+
+
 @mcp.tool()
 async def get_events(
     cursor: str | None = None,
@@ -882,10 +1209,13 @@ async def get_events(
     peek: bool = False,
     correlation_id: str | None = None,
     min_level: Literal["lifecycle", "info", "actionable"] | None = None,
+    wait_seconds: float = 0,
+    tags: list[str] | None = None,
+    any_tags: list[str] | None = None,
 ) -> dict:
     """Get events. Auto-refreshes heartbeat. Returns events list and next_cursor for pagination.
 
-    Narrowed reads (channel/event_types/correlation_id) never advance the
+    Narrowed reads (channel/event_types/correlation_id/tags) never advance the
     session cursor; min_level does. A deleted session_id returns
     {"error": ..., "session_deleted": true} instead of an empty batch -
     re-register or stop polling.
@@ -901,9 +1231,12 @@ async def get_events(
         peek: Read without advancing the session cursor (non-consuming)
         correlation_id: Filter to one correlation thread
         min_level: Drop events below this signal level (lifecycle < info < actionable)
+        wait_seconds: Long-poll - if nothing matches yet, block up to this long (max 120)
+            for a matching event instead of returning an empty batch
+        tags: Only events carrying ALL of these tags
+        any_tags: Only events carrying at least one of these tags
     """
-    return await _run_sync(
-        _get_events_impl,
+    kwargs = dict(
         cursor=cursor,
         limit=limit,
         session_id=session_id,
@@ -914,9 +1247,83 @@ async def get_events(
         peek=peek,
         correlation_id=correlation_id,
         min_level=min_level,
+        tags=tags,
+        any_tags=any_tags,
+    )
+    if wait_seconds and wait_seconds > 0:
+        return await _wait_for_events(min(wait_seconds, MAX_WAIT_SECONDS), **kwargs)
+    return await _run_sync(_get_events_impl, **kwargs)
+
+
+def _search_events_impl(
+    query: str,
+    limit: int = 20,
+    channel: str | None = None,
+    event_types: list[str] | None = None,
+    correlation_id: str | None = None,
+    tags: list[str] | None = None,
+    any_tags: list[str] | None = None,
+) -> dict:
+    """Sync implementation of search_events (runs in a worker thread)."""
+    if not query or not query.split():
+        return {"error": "Empty search query"}
+    hits = storage.search_events(
+        query,
+        limit=limit,
+        channels=[channel] if channel else None,
+        event_types=event_types,
+        correlation_id=correlation_id,
+        tags=tags,
+        any_tags=any_tags,
+    )
+    _dev_notify("search_events", f"{len(hits)} hits for {_preview(query)}")
+    return {
+        "results": [
+            {**_event_to_dict(hit.event), "score": round(hit.score, 4), "snippet": hit.snippet}
+            for hit in hits
+        ],
+    }
+
+
+@mcp.tool()
+async def search_events(
+    query: str,
+    limit: int = 20,
+    channel: str | None = None,
+    event_types: list[str] | None = None,
+    correlation_id: str | None = None,
+    tags: list[str] | None = None,
+    any_tags: list[str] | None = None,
+) -> dict:
+    """Full-text search over event payloads and titles, best match first.
+
+    Searches the whole history, not just unread events, and never moves a
+    session cursor. Each result is a get_events event plus `score` (higher
+    is better) and `snippet` (the payload around the match, matches in
+    **bold**).
+
+    Args:
+        query: Words to find; FTS5 syntax works too ("exact phrase", OR, NOT, prefix*)
+        limit: Max results (default: 20)
+        channel: Filter to specific channel
+        event_types: Filter by types, e.g., ["ci_failed"]
+        correlation_id: Filter to one correlation thread
+        tags: Only events carrying ALL of these tags
+        any_tags: Only events carrying at least one of these tags
+    """
+    return await _run_sync(
+        _search_events_impl,
+        query=query,
+        limit=limit,
+        channel=channel,
+        event_types=event_types,
+        correlation_id=correlation_id,
+        tags=tags,
+        any_tags=any_tags,
     )
 
 
+@_unit_of_work
 def _ack_events_impl(session_id: str, cursor: str, allow_rewind: bool = False) -> dict:
     """Sync implementation of ack_events (runs in a worker thread)."""
     session = _load_polling_session(session_id)
@@ -1002,16 +1409,13 @@ def _ack_events_impl(session_id: str, cursor: str, allow_rewind: bool = False) -
     # above it. That is a replay, the safe direction; the guard exists to stop
     # loss, not to stop repetition (which allow_rewind exists to ask for).
     #
-    # Advisory under concurrency, deliberately: `previous` is read outside the
-    # UPDATE, so two overlapping acks can both clear this on the same stale
-    # read and the lower one can land last. Left as is because the outcome is
-    # a re-serve rather than a drop - the ceiling above, which is the guard
-    # that prevents loss, cannot go the other way, since a concurrent publish
-    # only RAISES the tip and a stale tip read is therefore stricter, never
-    # looser. Making this atomic means folding it into update_session_cursor's
-    # WHERE, which would collapse "refused a rewind" and "lost the deletion
-    # race" into one False; worth doing only if a consumer ever acks the same
-    # session from two places at once.
+    # Atomic: the whole ack is one unit of work holding the write lock from
+    # the load above, so no overlapping ack can land between this read of
+    # `previous` and the UPDATE below. (It used to be advisory - two acks
+    # could both clear the guard on the same stale read and the lower one
+    # land last.) Kept out of update_session_cursor's WHERE on purpose: that
+    # would collapse "refused a rewind" and "lost the deletion race" into one
+    # False.
     if previous is not None and not allow_rewind:
         try:
             moving_backwards = target < int(previous)
@@ -1033,8 +1437,10 @@ def _ack_events_impl(session_id: str, cursor: str, allow_rewind: bool = False) -
     # canonical form so those never read back as the caller's typing.
     canonical = str(target)
     if not storage.update_session_cursor(session_id, canonical):
-        # Lost a race with deletion between the load above and this write
-        # (the UPDATE is guarded by deleted_at IS NULL). Re-read so the caller
+        # Deleted between the load above and this write (the UPDATE is guarded
+        # by deleted_at IS NULL). The unit of work rules out a concurrent
+        # deletion; this stays for the storage call failing on its own terms,
+        # and so the function is correct outside a transaction. Re-read so the caller
         # gets the same shape a rejected poll gets, rather than a success the
         # bus did not actually perform - cmd_ack exits non-zero on error
         # precisely so a drain hook cannot mistake one for the other.
@@ -1071,6 +1477,7 @@ async def ack_events(session_id: str, cursor: str, allow_rewind: bool = False) -
     )
 
 
+@_unit_of_work
 def _unregister_session_impl(session_id: str | None = None, client_id: str | None = None) -> dict:
     """Sync implementation of unregister_session (runs in a worker thread)."""
     # Look up session by client_id if provided
@@ -1103,26 +1510,25 @@ def _unregister_session_impl(session_id: str | None = None, client_id: str | Non
         return {"error": "Session not found", "session_id": session_id}
 
     if not storage.delete_session(session_id):
-        # Lost a race: a concurrent unregister (or the 24h sweep) deleted the
-        # row between the load above and this write, which is guarded by
-        # `deleted_at IS NULL`. Same shape ack_events uses for its analogous
-        # race - reporting success here would be this PR's own bug arriving
-        # through the TOCTOU door, and it would publish a SECOND
-        # session_unregistered event for one session ending.
-        # Announced like every other exit from this function. _deleted_session_gone
-        # cannot cover for it: its _dev_notify sits inside the warn block, which
-        # already_gone deliberately skips - so without this line the one outcome
-        # an operator most wants surfaced is the only silent one.
+        # delete_session only touches a row with deleted_at IS NULL. The unit
+        # of work holds the write lock from the load above, so no concurrent
+        # unregister or session expiry can land in between; this fires only if
+        # the write disagrees with that read (the session cache out of step
+        # with the table). Refused like ack_events' analogous branch: success
+        # would publish a second session_unregistered. Notified here because
+        # _deleted_session_gone stays quiet for an already-gone session.
         _dev_notify("unregister_session", f"{session.display_id} deleted concurrently")
         raced = _deleted_session_gone(_load_polling_session(session_id))
         return raced or {"error": "Session not found", "session_id": session_id}
 
     # Publish unregister event
-    storage.add_event(
+    unregistered = storage.add_event(
         event_type="session_unregistered",
         payload=f"{session.name} ended on {session.machine}",
         session_id=session_id,
     )
+    _announce_event(unregistered)
+    storage.after_commit(functools.partial(_schedule_webhook_dispatch, unregistered))
 
     _dev_notify("unregister_session", f"{session.name} ({session.display_id})")
     return {
@@ -1173,6 +1579,10 @@ async def notify(title: str, message: str, sound: bool = False) -> dict:
 # Module-level HTTP client for webhook dispatch (connection pooling)
 _webhook_client: httpx.AsyncClient | None = None
 _webhook_client_loop: asyncio.AbstractEventLoop | None = None
+# webhook id -> the semaphore capping its in-flight deliveries. Bound to a
+# loop like the client, and replaced along with it.
+_webhook_slots: dict[int, asyncio.Semaphore] = {}
+_webhook_slots_loop: asyncio.AbstractEventLoop | None = None
 
 
 def _get_webhook_client() -> httpx.AsyncClient:
@@ -1189,16 +1599,65 @@ def _get_webhook_client() -> httpx.AsyncClient:
     global _webhook_client, _webhook_client_loop
     loop = asyncio.get_running_loop()
     if _webhook_client is None or _webhook_client.is_closed or _webhook_client_loop is not loop:
-        _webhook_client = httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT)
+        _webhook_client = httpx.AsyncClient(
+            timeout=WEBHOOK_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=WEBHOOK_MAX_CONNECTIONS,
+                max_keepalive_connections=WEBHOOK_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
         _webhook_client_loop = loop
     return _webhook_client
 
 
+def _webhook_slot(webhook_id: int) -> asyncio.Semaphore:
+    """The semaphore holding one webhook to WEBHOOK_MAX_CONCURRENCY in-flight deliveries."""
+    global _webhook_slots, _webhook_slots_loop
+    loop = asyncio.get_running_loop()
+    if _webhook_slots_loop is not loop:
+        _webhook_slots = {}
+        _webhook_slots_loop = loop
+    slot = _webhook_slots.get(webhook_id)
+    if slot is None:
+        slot = _webhook_slots[webhook_id] = asyncio.Semaphore(WEBHOOK_MAX_CONCURRENCY)
+    return slot
+
+
 def _compute_signature(payload: bytes, secret: str) -> str:
     """Compute HMAC-SHA256 signature for webhook payload."""
     return hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
 
 
+def _json_bytes(obj: object) -> bytes:
+    return json.dumps(obj).encode()
+
+
+def _load_json_encoder() -> Callable[[object], bytes]:
+    """JSON-to-bytes for webhook bodies: orjson if it is installed, else json.
+
+    orjson renders a payload several times faster, and only webhook fan-out
+    renders enough for that to matter, so it is optional. Its output is
+    compact where json.dumps puts a space after separators; receivers verify
+    the signature over the raw bytes and then parse them, so neither shows.
+    A value orjson refuses (an integer past 64 bits in meta) goes to json.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return _json_bytes
+
+    def encode(obj: object) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:  # orjson.JSONEncodeError is one
+            return _json_bytes(obj)
+
+    return encode
+
+
+_encode_json = _load_json_encoder()
+
+
 def _webhook_payload(event: Event) -> dict:
     """The JSON body every webhook receives (event id under "event_id").
 
@@ -1208,101 +1667,334 @@ def _webhook_payload(event: Event) -> dict:
     return _event_wire_dict(event, id_key="event_id")
 
 
-async def _dispatch_webhook(webhook: Webhook, event: Event) -> bool:
-    """Send event to a single webhook. Returns True on success."""
-    payload_bytes = json.dumps(_webhook_payload(event)).encode()
+class _WebhookBodies:
+    """The wire bytes of one dispatch round: each event rendered once, each
+    body signed once per distinct secret.
 
+    An event matching N webhooks used to be turned into a dict, dumped and
+    signed N times over - at high fan-out, most of a round's CPU. Bodies are
+    immutable bytes, so every delivery of an event is handed the same object,
+    and a batch is spliced from its events' bytes rather than re-rendered.
+    """
+
+    def __init__(self) -> None:
+        self._events: dict[int, bytes] = {}  # event id -> its body
+        self._signatures: dict[tuple[bytes, str], str] = {}  # (body, secret) -> signature
+
+    def event(self, event: Event) -> bytes:
+        body = self._events.get(event.id)
+        if body is None:
+            body = self._events[event.id] = _encode_json(_webhook_payload(event))
+        return body
+
+    def batch(self, events: list[Event]) -> bytes:
+        return b"[" + b", ".join(self.event(event) for event in events) + b"]"
+
+    def signature(self, body: bytes, secret: str) -> str:
+        # bytes cache their hash, so a shared body is only hashed once too
+        key = (body, secret)
+        signature = self._signatures.get(key)
+        if signature is None:
+            signature = self._signatures[key] = _compute_signature(body, secret)
+        return signature
+
+
+async def _deliver_webhook(
+    webhook: Webhook, event: Event, bodies: _WebhookBodies | None = None
+) -> str | None:
+    """POST one event to one webhook, once. Returns None on success, else why it failed.
+
+    No retries here: a failed delivery stays in the outbox and the next pass
+    due for it tries again (see _record_deliveries). `bodies` is the dispatch
+    round's render cache; without one the event is rendered just for this.
+    """
+    bodies = bodies or _WebhookBodies()
+    return await _post_webhook(webhook, bodies.event(event), bodies, f"event {event.id}")
+
+
+async def _deliver_webhook_batch(
+    webhook: Webhook, events: list[Event], bodies: _WebhookBodies | None = None
+) -> str | None:
+    """POST several events to a batched webhook as one JSON array, once.
+
+    The array is signed as a whole, with the same header a single event
+    gets. Returns None on success, else why it failed - for every event in it.
+    """
+    bodies = bodies or _WebhookBodies()
+    ids = ", ".join(str(event.id) for event in events)
+    return await _post_webhook(webhook, bodies.batch(events), bodies, f"events {ids}")
+
+
+async def _post_webhook(
+    webhook: Webhook, payload_bytes: bytes, bodies: _WebhookBodies, what: str
+) -> str | None:
+    """POST a rendered body to a webhook, signed if it has a secret. None on success."""
     # Single-sourced with the bridge's hook-endpoint requirement (its
     # anti-browser guard 415s any other media type) - see helpers.py
     headers = {"Content-Type": WEBHOOK_CONTENT_TYPE}
     if webhook.secret:
-        signature = _compute_signature(payload_bytes, webhook.secret)
-        headers[SIGNATURE_HEADER] = f"sha256={signature}"
+        headers[SIGNATURE_HEADER] = f"sha256={bodies.signature(payload_bytes, webhook.secret)}"
 
     client = _get_webhook_client()
-    for attempt in range(WEBHOOK_MAX_RETRIES + 1):
-        try:
-            response = await client.post(
-                webhook.url,
-                content=payload_bytes,
-                headers=headers,
-            )
-            if response.status_code < 400:
-                logger.debug(
-                    f"Webhook {webhook.id} ({webhook.url}) delivered: {response.status_code}"
-                )
-                return True
-            logger.warning(
-                f"Webhook {webhook.id} ({webhook.url}) returned {response.status_code}, "
-                f"attempt {attempt + 1}/{WEBHOOK_MAX_RETRIES + 1}"
-            )
-        except httpx.TimeoutException as e:
-            logger.warning(
-                f"Webhook {webhook.id} ({webhook.url}) timed out: {e}, "
-                f"attempt {attempt + 1}/{WEBHOOK_MAX_RETRIES + 1}"
-            )
-        except httpx.RequestError as e:
-            logger.warning(
-                f"Webhook {webhook.id} ({webhook.url}) request failed: {e}, "
-                f"attempt {attempt + 1}/{WEBHOOK_MAX_RETRIES + 1}"
-            )
-        if attempt < WEBHOOK_MAX_RETRIES:
-            await asyncio.sleep(0.5 * (attempt + 1))  # Backoff
+    try:
+        response = await client.post(
+            webhook.url,
+            content=payload_bytes,
+            headers=headers,
+        )
+    except httpx.TimeoutException as e:
+        error = f"timed out: {e}"
+    except httpx.RequestError as e:
+        error = f"request failed: {e}"
+    else:
+        if response.status_code < 400:
+            logger.debug(f"Webhook {webhook.id} ({webhook.url}) delivered: {response.status_code}")
+            return None
+        error = f"returned {response.status_code}"
+    logger.warning(f"Webhook {webhook.id} ({webhook.url}) {error} ({what})")
+    return error
 
-    return False
 
+async def _dispatch_webhook(webhook: Webhook, event: Event) -> bool:
+    """Send event to a single webhook, once. Returns True on success."""
+    return await _deliver_webhook(webhook, event) is None
 
-async def _dispatch_webhooks(event: Event) -> None:
-    """Dispatch event to all matching webhooks (async, fire-and-forget)."""
-    # This coroutine runs on the server loop; the webhook lookup hits SQLite,
-    # so it must go to a worker thread like every other blocking call (#112)
-    webhooks = await anyio.to_thread.run_sync(storage.get_matching_webhooks, event)
-    if not webhooks:
-        return
 
-    logger.info(f"Dispatching event {event.id} to {len(webhooks)} webhook(s)")
+def _webhook_retry_delay(attempts: int) -> float:
+    """Seconds to wait before retrying a delivery that has failed `attempts` times.
 
-    # Fire all webhooks concurrently
-    results = await asyncio.gather(
-        *[_dispatch_webhook(wh, event) for wh in webhooks],
-        return_exceptions=True,
-    )
+    Doubles per failure up to WEBHOOK_RETRY_MAX_SECONDS, with "equal jitter":
+    somewhere between half and all of that, so the deliveries a downed
+    endpoint piled up don't all come due - and hit it - in the same instant
+    when it returns.
+    """
+    delay = min(WEBHOOK_RETRY_MAX_SECONDS, WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+@dataclass
+class _FillingBatch:
+    """A batched webhook's batch that is still filling (see _plan_deliveries)."""
+
+    deadline: datetime  # when it goes out, full or not
+    # Its deliveries deferred to the deadline so far, waiting in the outbox
+    held: list[WebhookDelivery]
+
+
+# webhook id -> the batch filling up for it
+_filling_batches: dict[int, _FillingBatch] = {}
+
+
+def _chunks(deliveries: list[WebhookDelivery], size: int) -> list[list[WebhookDelivery]]:
+    return [deliveries[i : i + size] for i in range(0, len(deliveries), size)]
+
+
+def _plan_deliveries(
+    claimed: list[WebhookDelivery],
+) -> tuple[list[list[WebhookDelivery]], list[tuple[WebhookDelivery, datetime]]]:
+    """Split a round's claimed deliveries into POSTs to send now and ones to hold.
+
+    Returns (units, waiting). Each unit is one POST: a single delivery, or
+    up to batch_size of them for a batched webhook. Waiting are deliveries
+    to defer, each with the time to defer it to: a batched webhook's fresh
+    deliveries whose batch is still filling, until its deadline - or, for a
+    batch that just filled up, its held deliveries and the ones completing
+    it, until now, so the next round claims them together.
 
-    # Log results with exception details
-    success_count = 0
-    for wh, result in zip(webhooks, results):
-        if result is True:
-            success_count += 1
-        elif isinstance(result, Exception):
+    A batch goes out once it is full or when its linger, counted from its
+    oldest event, has run out. The batch is remembered per webhook, so
+    events arriving while it fills join it instead of each starting their
+    own, and count towards filling it whichever round claims them. It lives
+    in memory only, but the deferred rows carry its deadline in the outbox,
+    so a restart costs at most one batch going out late or small. Retries
+    skip the wait: their batch already waited once.
+    """
+    now = datetime.now()
+    units: list[list[WebhookDelivery]] = []
+    waiting: list[tuple[WebhookDelivery, datetime]] = []
+    batched: dict[int, list[WebhookDelivery]] = {}
+    for delivery in claimed:
+        if delivery.webhook.batch_size is None:
+            units.append([delivery])
+        else:
+            batched.setdefault(delivery.webhook_id, []).append(delivery)
+
+    for webhook_id, deliveries in batched.items():
+        webhook = deliveries[0].webhook
+        size = webhook.batch_size
+        units.extend(_chunks([d for d in deliveries if d.attempts], size))
+        fresh = [d for d in deliveries if not d.attempts]
+        if not fresh:
+            continue
+        oldest = min(d.created_at or now for d in fresh)
+        batch = _filling_batches.get(webhook_id)
+        if batch is None or batch.deadline < oldest:  # none filling, or a stale one
+            linger = timedelta(seconds=webhook.batch_linger or 0)
+            batch = _filling_batches[webhook_id] = _FillingBatch(oldest + linger, [])
+
+        if now >= batch.deadline:
+            # Time is up: everything goes. The held rows are due by now too,
+            # so they are in this claim or the next.
+            units.extend(_chunks(fresh, size))
+            del _filling_batches[webhook_id]
+        elif batch.held and len(batch.held) + len(fresh) >= size:
+            # Full, but partly deferred in the outbox: make it all due now,
+            # for the next round to claim and send together
+            waiting.extend((d, now) for d in batch.held + fresh)
+            del _filling_batches[webhook_id]
+        else:
+            ready = len(fresh) // size * size  # full batches go now
+            units.extend(_chunks(fresh[:ready], size))
+            waiting.extend((d, batch.deadline) for d in fresh[ready:])
+            batch.held.extend(fresh[ready:])
+            if not batch.held:
+                del _filling_batches[webhook_id]
+    return units, waiting
+
+
+async def _attempt_delivery(
+    deliveries: list[WebhookDelivery], bodies: _WebhookBodies | None = None
+) -> str | None | datetime:
+    """Try one POST's worth of claimed deliveries, within the webhook's cap and breaker.
+
+    `deliveries` all go to one webhook: a single delivery, or a batch for a
+    batched webhook, which always gets a JSON array. None if delivered, the
+    error if it failed, or - when the webhook's circuit breaker held it
+    back - the time to defer it to; a batch shares one outcome. `bodies` is
+    the round's render cache, shared by every delivery in it.
+    """
+    first = deliveries[0]
+    webhook = first.webhook
+    async with _webhook_slot(webhook.id):
+        # Asked only once a slot is free: a breaker that opened while this
+        # delivery queued behind the failures that opened it holds it back
+        held_until = webhook_breakers.admit(webhook.id)
+        if held_until is not None:
+            return datetime.fromtimestamp(held_until)
+        error = "cancelled"
+        try:
+            if webhook.batch_size is None:
+                error = await _deliver_webhook(webhook, first.event, bodies)
+            else:
+                events = [d.event for d in deliveries]
+                error = await _deliver_webhook_batch(webhook, events, bodies)
+        except Exception as e:
+            ids = ", ".join(str(d.event_id) for d in deliveries)
             logger.error(
-                f"Webhook {wh.id} ({wh.url}) raised exception for event {event.id}: {result}"
+                f"Webhook {webhook.id} ({webhook.url}) raised exception for event {ids}: {e}"
             )
-        else:
-            # result is False - dispatch failed after retries (already logged)
-            pass
+            error = f"raised {type(e).__name__}: {e}"
+        finally:
+            webhook_breakers.record(webhook.id, error is None)
+        return error
 
-    if success_count < len(webhooks):
-        logger.warning(
-            f"Webhook dispatch: {success_count}/{len(webhooks)} succeeded for event {event.id}"
+
+@_unit_of_work
+def _record_deliveries(outcomes: list[tuple[WebhookDelivery, str | None | datetime]]) -> None:
+    """Write back one dispatch pass's outcomes (runs in a worker thread).
+
+    A success leaves the outbox; a failure is rescheduled with backoff, or,
+    on its WEBHOOK_MAX_ATTEMPTS-th try, parked as a dead letter for
+    replay_dead_letters; a delivery the breaker held back, or whose batch
+    is still filling, is deferred, attempts untouched. One transaction for
+    the whole pass.
+    """
+    now = datetime.now()
+    # A failed batch is retried as one: its deliveries share the jittered delay
+    batch_delays: dict[tuple[int, int], float] = {}
+    for delivery, error in outcomes:
+        if isinstance(error, datetime):  # held back: not an error, a time
+            storage.defer_webhook_delivery(delivery.id, error)
+            continue
+        if error is None:
+            storage.complete_webhook_delivery(delivery.id)
+            continue
+        attempts = delivery.attempts + 1
+        if attempts >= WEBHOOK_MAX_ATTEMPTS:
+            logger.error(
+                f"Webhook {delivery.webhook_id}: giving up on event {delivery.event_id} "
+                f"after {attempts} attempts (dead letter {delivery.id}): {error}"
+            )
+            retry_at = None
+        else:
+            if delivery.webhook is not None and delivery.webhook.batch_size is not None:
+                key = (delivery.webhook_id, attempts)
+                if key not in batch_delays:
+                    batch_delays[key] = _webhook_retry_delay(attempts)
+                delay = batch_delays[key]
+            else:
+                delay = _webhook_retry_delay(attempts)
+            retry_at = now + timedelta(seconds=delay)
+        storage.fail_webhook_delivery(delivery.id, error, retry_at)
+
+
+async def _dispatch_webhooks() -> None:
+    """Deliver everything due in the webhook outbox (async, fire-and-forget).
+
+    Each round leases up to WEBHOOK_DISPATCH_BATCH due deliveries, POSTs
+    them concurrently - at most WEBHOOK_MAX_CONCURRENCY at a time to any one
+    webhook, and none past an open circuit breaker - and records the outcomes; a full round means
+    there may be more, so it goes again. The lease is what makes concurrent
+    passes (a publish's and the retry task's) safe: a claimed delivery is
+    invisible to every other pass until it is recorded - or, if this
+    process died first, until the lease runs out and the next pass retries
+    it. At-least-once, never lost. Batched webhooks get their deliveries
+    grouped into arrays, or held until their batch fills (_plan_deliveries).
+    """
+    while True:
+        # This coroutine runs on the server loop; the outbox lives in SQLite,
+        # so every storage call goes to a worker thread (#112)
+        claimed = await anyio.to_thread.run_sync(
+            storage.claim_webhook_deliveries,
+            WEBHOOK_DISPATCH_BATCH,
+            WEBHOOK_DELIVERY_LEASE_SECONDS,
         )
+        if not claimed:
+            return
+        units, waiting = _plan_deliveries(claimed)
+        sent = sum(len(unit) for unit in units)
+        lingering = len(claimed) - sent
+        logger.info(
+            f"Dispatching {sent} webhook deliveries in {len(units)} requests"
+            + (f", {lingering} waiting for their batch to fill" if lingering else "")
+        )
+
+        # Fire all webhooks concurrently, each within its own cap - and each
+        # event rendered and signed once, however many webhooks it goes to
+        bodies = _WebhookBodies()
+        results = await asyncio.gather(*[_attempt_delivery(unit, bodies) for unit in units])
+        outcomes = [(delivery, result) for unit, result in zip(units, results) for delivery in unit]
+        await anyio.to_thread.run_sync(_record_deliveries, outcomes + waiting)
+
+        failed = sum(1 for _, result in outcomes if isinstance(result, str))
+        held = sum(1 for _, result in outcomes if isinstance(result, datetime))
+        if failed or held:
+            logger.warning(
+                f"Webhook dispatch: {sent - failed - held}/{sent} succeeded"
+                + (f", {held} held back by open circuit breakers" if held else "")
+            )
+        # A batch that filled up was made due again: go round to send it
+        refilled = any(until <= datetime.now() for _, until in waiting)
+        if len(claimed) < WEBHOOK_DISPATCH_BATCH and not refilled:
+            return
 
 
-def _handle_dispatch_task_exception(task: asyncio.Task, event_id: int) -> None:
+def _handle_dispatch_task_exception(task: asyncio.Task) -> None:
     """Log exceptions from background webhook dispatch tasks."""
     if task.cancelled():
         return
     exc = task.exception()
     if exc:
-        logger.error(f"Webhook dispatch task failed for event {event_id}: {exc}")
+        logger.error(f"Webhook dispatch task failed: {exc}")
 
 
-def _run_dispatch_in_thread(event: Event) -> None:
-    """Run webhook dispatch in a new thread with its own event loop."""
+def _run_dispatch_in_thread() -> None:
+    """Run a webhook dispatch pass in a new thread with its own event loop."""
 
     async def dispatch_and_close() -> None:
         global _webhook_client
         try:
-            await _dispatch_webhooks(event)
+            await _dispatch_webhooks()
         finally:
             # This throwaway loop is about to die; close the client it
             # created so pooled sockets don't linger until GC. Only touch
@@ -1319,18 +2011,23 @@ def _run_dispatch_in_thread(event: Event) -> None:
     try:
         asyncio.run(dispatch_and_close())
     except Exception as e:
-        logger.error(f"Webhook dispatch failed for event {event.id}: {e}")
+        logger.error(f"Webhook dispatch failed: {e}")
 
 
-def _schedule_webhook_dispatch(event: Event) -> None:
-    """Schedule webhook dispatch in background (non-blocking).
+def _schedule_webhook_dispatch(*events: Event) -> None:
+    """Start a webhook dispatch pass in background (non-blocking).
+
+    Given the events just published, only when one of them has a webhook to
+    go to; their deliveries are already in the outbox (storage enqueues them
+    with the event), so the pass only makes them prompt - were it never to
+    run, the retry task would deliver them anyway. Given nothing, always.
 
     Tool implementations run in worker threads (no running loop), so the
     normal path hands the coroutine to the server loop captured by _run_sync.
     The thread fallback only remains for direct sync calls (e.g. tests).
     """
-    # Capture event.id in closure to avoid issues if event object changes
-    event_id = event.id
+    if events and not any(storage.get_matching_webhooks(event) for event in events):
+        return
 
     try:
         loop = asyncio.get_running_loop()
@@ -1338,34 +2035,75 @@ def _schedule_webhook_dispatch(event: Event) -> None:
         loop = None
 
     if loop is not None:
-        task = loop.create_task(_dispatch_webhooks(event))
-        task.add_done_callback(lambda t: _handle_dispatch_task_exception(t, event_id))
+        task = loop.create_task(_dispatch_webhooks())
+        task.add_done_callback(_handle_dispatch_task_exception)
         return
 
     server_loop = _server_loop
     if server_loop is not None and server_loop.is_running():
-        future = asyncio.run_coroutine_threadsafe(_dispatch_webhooks(event), server_loop)
+        future = asyncio.run_coroutine_threadsafe(_dispatch_webhooks(), server_loop)
         # concurrent.futures.Future has the same cancelled()/exception() API
-        future.add_done_callback(lambda f: _handle_dispatch_task_exception(f, event_id))
+        future.add_done_callback(_handle_dispatch_task_exception)
         return
 
     # No event loop anywhere (direct sync context) - run in background thread
-    thread = threading.Thread(target=_run_dispatch_in_thread, args=(event,), daemon=True)
+    thread = threading.Thread(target=_run_dispatch_in_thread, daemon=True)
     thread.start()
 
 
+def _retry_webhook_deliveries() -> None:
+    """One dispatch pass for the retries now due (runs on the maintenance thread).
+
+    On the server loop when there is one, so retries share its HTTP client
+    and deliver like any other pass; waited for, so passes don't stack up
+    behind an endpoint that is timing out.
+    """
+    server_loop = _server_loop
+    if server_loop is not None and server_loop.is_running():
+        future = asyncio.run_coroutine_threadsafe(_dispatch_webhooks(), server_loop)
+        future.result(timeout=WEBHOOK_DELIVERY_LEASE_SECONDS)
+    else:
+        _run_dispatch_in_thread()
+
+
+def _next_webhook_delivery() -> float | None:
+    """When _retry_webhook_deliveries next has work, as a time.time() timestamp."""
+    due = storage.next_webhook_delivery()
+    return due.timestamp() if due is not None else None
+
+
 def _register_webhook_impl(
     url: str,
     channel: str | None = None,
     event_types: list[str] | None = None,
     secret: str | None = None,
+    batch_size: int | None = None,
+    batch_linger: float | None = None,
 ) -> dict:
     """Sync implementation of register_webhook (runs in a worker thread)."""
+    if batch_size is None:
+        if batch_linger is not None:
+            return {"error": "batch_linger needs batch_size"}
+    else:
+        if not 1 <= batch_size <= WEBHOOK_DISPATCH_BATCH:
+            return {
+                "error": f"Invalid batch_size {batch_size}: expected 1 to {WEBHOOK_DISPATCH_BATCH}"
+            }
+        if batch_linger is None:
+            batch_linger = WEBHOOK_BATCH_LINGER_SECONDS
+        if not 0 <= batch_linger <= WEBHOOK_MAX_BATCH_LINGER_SECONDS:
+            return {
+                "error": f"Invalid batch_linger {batch_linger}: expected 0 to "
+                f"{WEBHOOK_MAX_BATCH_LINGER_SECONDS:g} seconds"
+            }
+
     webhook = storage.add_webhook(
         url=url,
         channel_filter=channel,
         event_types=event_types,
         secret=secret,
+        batch_size=batch_size,
+        batch_linger=batch_linger,
     )
 
     _dev_notify("register_webhook", f"#{webhook.id} → {url}")
@@ -1375,6 +2113,8 @@ def _register_webhook_impl(
         "url": url,
         "channel": channel,
         "event_types": event_types,
+        "batch_size": batch_size,
+        "batch_linger": batch_linger,
         "created_at": webhook.created_at.isoformat(),
     }
 
@@ -1385,6 +2125,8 @@ async def register_webhook(
     channel: str | None = None,
     event_types: list[str] | None = None,
     secret: str | None = None,
+    batch_size: int | None = None,
+    batch_linger: float | None = None,
 ) -> dict:
     """Register a webhook to receive event notifications via HTTP POST.
 
@@ -1393,9 +2135,19 @@ async def register_webhook(
         channel: Filter to specific channel (None = all). Supports prefix matching.
         event_types: Filter to specific event types (None = all)
         secret: Shared secret for HMAC signing (optional)
+        batch_size: Batch mode: POST JSON arrays of up to this many events
+            (1-100) instead of one event per request (None = off)
+        batch_linger: Batch mode: seconds a batch waits to fill before it is
+            sent anyway (default: 1, max: 60)
     """
     return await _run_sync(
-        _register_webhook_impl, url=url, channel=channel, event_types=event_types, secret=secret
+        _register_webhook_impl,
+        url=url,
+        channel=channel,
+        event_types=event_types,
+        secret=secret,
+        batch_size=batch_size,
+        batch_linger=batch_linger,
     )
 
 
@@ -1412,6 +2164,9 @@ def _list_webhooks_impl(active_only: bool = True) -> list[dict]:
             "active": wh.active,
             "created_at": wh.created_at.isoformat(),
             "has_secret": wh.secret is not None,
+            "batch_size": wh.batch_size,
+            "batch_linger": wh.batch_linger,
+            "breaker": webhook_breakers.snapshot(wh.id),
         }
         for wh in webhooks
     ]
@@ -1455,6 +2210,7 @@ def _unregister_webhook_impl(webhook_id: int) -> dict:
     deleted = storage.delete_webhook(webhook_id)
 
     if deleted:
+        webhook_breakers.forget(webhook_id)
         _dev_notify("unregister_webhook", f"#{webhook_id} removed")
         return {"success": True, "webhook_id": webhook_id}
     else:
@@ -1471,15 +2227,191 @@ async def unregister_webhook(webhook_id: int) -> dict:
     return await _run_sync(_unregister_webhook_impl, webhook_id=webhook_id)
 
 
+def _delivery_to_dict(delivery: WebhookDelivery) -> dict:
+    """A webhook_deliveries row as list_dead_letters reports it."""
+    return {
+        "delivery_id": delivery.id,
+        "webhook_id": delivery.webhook_id,
+        "event_id": delivery.event_id,
+        "status": delivery.status,
+        "attempts": delivery.attempts,
+        "last_error": delivery.last_error,
+        "next_attempt_at": delivery.next_attempt_at.isoformat(),
+        "created_at": delivery.created_at.isoformat() if delivery.created_at else None,
+    }
+
+
+def _list_dead_letters_impl(webhook_id: int | None = None, limit: int = 100) -> dict:
+    """Sync implementation of list_dead_letters (runs in a worker thread)."""
+    dead = storage.list_webhook_deliveries(status="dead", webhook_id=webhook_id, limit=limit)
+    _dev_notify("list_dead_letters", f"{len(dead)} dead letter(s)")
+    return {"dead_letters": [_delivery_to_dict(d) for d in dead], "count": len(dead)}
+
+
+@mcp.tool()
+async def list_dead_letters(webhook_id: int | None = None, limit: int = 100) -> dict:
+    """List webhook deliveries that failed every retry (dead letters), oldest first.
+
+    Args:
+        webhook_id: Only this webhook's (None = every webhook's)
+        limit: Maximum number to return (default: 100)
+    """
+    return await _run_sync(_list_dead_letters_impl, webhook_id=webhook_id, limit=limit)
+
+
+def _replay_dead_letters_impl(
+    delivery_ids: list[int] | None = None, webhook_id: int | None = None
+) -> dict:
+    """Sync implementation of replay_dead_letters (runs in a worker thread)."""
+    replayed = storage.replay_webhook_deliveries(delivery_ids=delivery_ids, webhook_id=webhook_id)
+    if replayed:
+        _schedule_webhook_dispatch()
+    _dev_notify("replay_dead_letters", f"{replayed} dead letter(s) requeued")
+    return {"replayed": replayed}
+
+
+@mcp.tool()
+async def replay_dead_letters(
+    delivery_ids: list[int] | None = None, webhook_id: int | None = None
+) -> dict:
+    """Retry dead-lettered webhook deliveries now, with a fresh set of attempts.
+
+    Args:
+        delivery_ids: Which dead letters (None = all of them)
+        webhook_id: Only this webhook's (None = every webhook's)
+    """
+    return await _run_sync(
+        _replay_dead_letters_impl, delivery_ids=delivery_ids, webhook_id=webhook_id
+    )
+
+
 @mcp.custom_route("/health", methods=["GET"])
 async def health_check(request: Request) -> JSONResponse:
     """Liveness probe that bypasses the MCP handler (issue #112).
 
-    Runs entirely on the event loop with no storage access, so it answers
+    Runs entirely on the event loop with no database access, so it answers
     even when worker threads are saturated - a hung /health means the loop
-    itself is blocked.
+    itself is blocked. The recent-events counters it reports are in memory.
+    """
+    return JSONResponse(
+        {
+            "status": "ok",
+            "service": "agent-event-bus",
+            "recent_events": storage.recent_events_stats(),
+        }
+    )
+
+
+# Events per storage read while a stream replays its backlog. A full page
+# means "read again immediately"; a short one means caught up, so wait.
+STREAM_PAGE_SIZE = 200
+# Seconds of silence before a stream sends an SSE comment. Keeps idle
+# connections from being reaped by proxies (tailscale serve included) and
+# surfaces a dead client as a failed write within one interval.
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+
+def _stream_start_cursor(session_id: str | None, cursor: str | None) -> dict:
+    """Where a new stream starts reading, or the error that refuses it.
+
+    An explicit cursor (or Last-Event-ID) wins; otherwise a session picks up
+    from its saved cursor, exactly as resume=True would. Anything else starts
+    at the tip - a stream is a live feed, and replaying the whole history to a
+    caller that named no position is never what it asked for.
+    """
+    session = _load_polling_session(session_id)
+    deleted = _deleted_session_error(session, tool="events_stream")
+    if deleted:
+        return deleted
+    if cursor is None:
+        cursor = session.last_cursor if session and session.last_cursor else storage.get_cursor()
+    return {"cursor": cursor}
+
+
+def _sse_frame(event: dict) -> str:
+    """One event as an SSE frame; `id:` is what a reconnect sends back."""
+    return f"id: {event['id']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _event_stream(
+    cursor: str | None,
+    session_id: str | None = None,
+    channel: str | None = None,
+    min_level: Literal["lifecycle", "info", "actionable"] | None = None,
+    keepalive: float = STREAM_KEEPALIVE_SECONDS,
+):
+    """Replay from `cursor`, then follow the bus - as SSE frames.
+
+    Every read is an ordinary consuming get_events pass (order="asc"), so the
+    stream inherits its whole contract rather than re-deriving it: heartbeat
+    refresh, the deleted-session refusal, high-water-mark persistence for an
+    unfiltered session stream, and `channel` as a non-consuming narrowing
+    filter. Between passes it parks on the notifier like a long-poll, holding
+    no worker thread.
+    """
+    predicate = functools.partial(_event_matches, channel=channel, min_level=min_level)
+    with notifier.subscribe(predicate) as waiter:
+        while True:
+            result = await _run_sync(
+                _get_events_impl,
+                cursor=cursor,
+                limit=STREAM_PAGE_SIZE,
+                session_id=session_id,
+                order="asc",
+                channel=channel,
+                min_level=min_level,
+            )
+            if "error" in result:
+                # Deleted mid-stream: say so in-band, then end the stream -
+                # the same refusal a poll would get, not a silent hang-up.
+                yield f"event: error\ndata: {json.dumps(result)}\n\n"
+                return
+            for event in result["events"]:
+                yield _sse_frame(event)
+            cursor = result["next_cursor"]
+            if result["has_more"]:
+                continue
+            if not await waiter.wait(keepalive):
+                yield ": keepalive\n\n"
+
+
+@mcp.custom_route("/events/stream", methods=["GET"])
+async def events_stream(request: Request) -> Response:
+    """Server-Sent Events feed: replay from a cursor, then push new events live.
+
+    Query parameters: session_id, cursor, channel, min_level - the get_events
+    meanings. A reconnecting EventSource sends Last-Event-ID, which takes
+    precedence over `cursor` so a dropped stream resumes without a gap.
+    Frames carry the get_events wire shape (`_event_to_dict`).
+
+    Sits behind the same middleware as every route: TailscaleAuthMiddleware
+    gates it, and RequestLoggingMiddleware passes it through untouched (it
+    only logs /mcp POSTs).
     """
-    return JSONResponse({"status": "ok", "service": "agent-event-bus"})
+    params = request.query_params
+    session_id = params.get("session_id") or None
+    channel = params.get("channel") or None
+    min_level = params.get("min_level") or None
+    cursor = request.headers.get("last-event-id") or params.get("cursor") or None
+
+    if min_level is not None and min_level not in SIGNAL_LEVEL_ORDER:
+        return JSONResponse(
+            {"error": f"Invalid min_level {min_level!r}: expected one of {VALID_SIGNAL_LEVELS}"},
+            status_code=400,
+        )
+
+    start = await _run_sync(_stream_start_cursor, session_id=session_id, cursor=cursor)
+    if "error" in start:
+        # 410 Gone: the id existed and the bus deleted it - retrying the same
+        # request will never succeed, which is what a reconnecting client
+        # needs to be told to stop.
+        return JSONResponse(start, status_code=410)
+
+    return StreamingResponse(
+        _event_stream(start["cursor"], session_id=session_id, channel=channel, min_level=min_level),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 def create_app():
@@ -1511,6 +2443,69 @@ def create_app():
     return app
 
 
+def _load_retention_policy() -> RetentionPolicy:
+    """The retention policy from the environment, with level rules checked.
+
+    Level names are validated here rather than in retention.py because the
+    level vocabulary is the server's (VALID_SIGNAL_LEVELS); a misspelled level
+    would otherwise match nothing and silently keep those events forever.
+    """
+    policy = RetentionPolicy.from_env()
+    for rule in policy.rules:
+        if rule.kind == "level" and rule.pattern not in SIGNAL_LEVEL_ORDER:
+            raise ValueError(
+                f"Invalid retention rule level {rule.pattern!r}: "
+                f"expected one of {', '.join(VALID_SIGNAL_LEVELS)}"
+            )
+    return policy
+
+
+def _prune_events(policy: RetentionPolicy) -> None:
+    """One retention pass over the live storage (runs on the maintenance thread)."""
+    prune_events(storage, policy, _get_signal_level)
+
+
+def _flush_heartbeats() -> None:
+    """Write buffered heartbeats to the live storage (runs on the maintenance thread)."""
+    storage.flush_heartbeats()
+
+
+@_unit_of_work
+def _expire_sessions() -> int:
+    """Soft-delete timed-out sessions and announce each one (runs on the maintenance thread).
+
+    Announced as session_unregistered, like a session that exited cleanly,
+    so watchers see a session end the same way however it ended. Returns
+    how many expired.
+    """
+    expired = storage.expire_sessions()
+    announced = []
+    for session in expired:
+        event = storage.add_event(
+            event_type="session_unregistered",
+            payload=f"{session.name} expired on {session.machine} (no heartbeat)",
+            session_id=session.id,
+        )
+        _announce_event(event)
+        announced.append(event)
+    if announced:
+        storage.after_commit(functools.partial(_schedule_webhook_dispatch, *announced))
+    if expired:
+        logger.info(f"session-expiry: {len(expired)} session(s) timed out")
+    return len(expired)
+
+
+def _next_session_expiry() -> float | None:
+    """When _expire_sessions next has work, as a time.time() timestamp."""
+    due = storage.next_session_expiry()
+    return due.timestamp() if due is not None else None
+
+
+def _flush_cursors() -> None:
+    """Write buffered cursor advances to the live storage (runs on the maintenance thread)."""
+    storage.flush_cursors()
+
+
 def main():
     """Run the MCP server."""
     import uvicorn
@@ -1524,9 +2519,44 @@ def main():
         f"Add to Claude Code: claude mcp add --transport http --scope user agent-event-bus http://{host}:{port}/mcp"
     )
 
-    # Disable uvicorn's access log - we have our own middleware logging
-    # This keeps ~/.claude/contrib/agent-event-bus/agent-event-bus.log clean with just our pretty-printed tool calls
-    uvicorn.run(create_app(), host=host, port=port, access_log=False)
+    # Before the app starts: a bad retention setting fails the launch, not
+    # the first prune ten minutes later.
+    retention = _load_retention_policy()
+    retention_task = PeriodicTask(
+        "event-retention", retention.interval, functools.partial(_prune_events, retention)
+    )
+    if retention.enabled:
+        retention_task.start()
+    heartbeat_task = PeriodicTask(
+        "heartbeat-flush", storage.heartbeat_flush_seconds, _flush_heartbeats
+    )
+    if storage.buffers_heartbeats:
+        heartbeat_task.start()
+    cursor_task = PeriodicTask("cursor-flush", storage.cursor_flush_seconds, _flush_cursors)
+    if storage.buffers_cursors:
+        cursor_task.start()
+    expiry_task = DeadlineTask(
+        "session-expiry", SESSION_EXPIRY_MAX_WAIT, _expire_sessions, _next_session_expiry
+    )
+    expiry_task.start()
+    # Also the restart story: deliveries left in the outbox by the last run
+    # are due (or their leases run out), and this delivers them.
+    webhook_task = DeadlineTask(
+        "webhook-retry", WEBHOOK_RETRY_MAX_WAIT, _retry_webhook_deliveries, _next_webhook_delivery
+    )
+    webhook_task.start()
+
+    try:
+        # Disable uvicorn's access log - we have our own middleware logging
+        # This keeps ~/.claude/contrib/agent-event-bus/agent-event-bus.log clean with just our pretty-printed tool calls
+        uvicorn.run(create_app(), host=host, port=port, access_log=False)
+    finally:
+        retention_task.stop()
+        heartbeat_task.stop()
+        cursor_task.stop()
+        expiry_task.stop()
+        webhook_task.stop()
+        storage.close()  # flushes whatever heartbeats and cursors are still buffered
 
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+"""In-memory copy of the sessions table, kept coherent by write-through.
+
+One tool call used to read the same session row several times - loading the
+polling session, checking the DM target and sender, the log middleware
+resolving display ids, list_sessions for liveness - each its own SELECT.
+SessionCache holds every row (active and soft-deleted; the table is small),
+so SQLiteStorage answers all of those from memory.
+
+It is complete rather than populated on demand, which makes it easy to keep
+exact: nothing is ever filled from a read that could race a write. It is
+loaded once at startup, and every later change is applied by the storage
+method that made it, after that change commits and in commit order (see
+SQLiteStorage._write_sessions). A miss is therefore a real "no such
+session", with no negative entries to manage.
+
+It also keeps the sessions in a min-heap by heartbeat, which is what the
+expiry timer runs on: the oldest heartbeat says when the next session can
+time out, and stale() finds the ones that have without scanning them all.
+The heap is lazy - a heartbeat only ever moves a session's deadline later,
+so refreshing one pushes nothing; the old entry is re-armed with the
+current heartbeat when it reaches the top.
+
+Like the recent-events window (event_cache.py), this assumes the server is
+the only process writing the database. SQLiteStorage.invalidate_sessions
+reloads rows from SQLite for anything that breaks that, and
+AGENT_EVENT_BUS_SESSION_CACHE=0 turns the cache off.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import heapq
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from agent_event_bus.storage import Session
+
+
+class SessionCache:
+    """Every session row by id, with a (machine, client_id) index.
+
+    Thread-safe. Sessions go in and come out as copies: callers mutate the
+    Session objects they get back (registration resumes one in place) and
+    must not be editing the cache as they do.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id: dict[str, Session] = {}
+        self._by_client: dict[tuple[str, str | None], set[str]] = {}
+        # (last_heartbeat, id) for active sessions; _scheduled is the
+        # heartbeat of each id's live entry, so superseded ones are skipped.
+        self._heap: list[tuple[datetime, str]] = []
+        self._scheduled: dict[str, datetime] = {}
+
+    def load(self, sessions: list[Session]) -> None:
+        """Replace the whole cache with `sessions`."""
+        with self._lock:
+            self._by_id = {}
+            self._by_client = {}
+            self._heap = []
+            self._scheduled = {}
+            for session in sessions:
+                self._put(session)
+
+    def put(self, session: Session) -> None:
+        """Insert or replace a session (INSERT OR REPLACE)."""
+        with self._lock:
+            self._put(session)
+
+    def remove(self, session_id: str) -> None:
+        """Forget a row that no longer exists in SQLite."""
+        with self._lock:
+            self._remove(session_id)
+
+    def update(self, session_id: str, **fields) -> None:
+        """Set `fields` on a cached session, if it is cached."""
+        with self._lock:
+            session = self._by_id.get(session_id)
+            if session is not None:
+                self._put(dataclasses.replace(session, **fields))
+
+    def get(self, session_id: str, include_deleted: bool = False) -> Session | None:
+        with self._lock:
+            session = self._by_id.get(session_id)
+            if session is None or (session.deleted_at is not None and not include_deleted):
+                return None
+            return dataclasses.replace(session)
+
+    def find_by_client(
+        self, machine: str, client_id: str, include_deleted: bool = False
+    ) -> Session | None:
+        """Same pick as the SQL in SQLiteStorage.find_session_by_client."""
+        with self._lock:
+            candidates = [self._by_id[sid] for sid in self._by_client.get((machine, client_id), ())]
+        if not include_deleted:
+            candidates = [s for s in candidates if s.deleted_at is None]
+        if not candidates:
+            return None
+        # Active first, then the most recent heartbeat
+        best = max(candidates, key=lambda s: (s.deleted_at is None, s.last_heartbeat))
+        return dataclasses.replace(best)
+
+    def active(self) -> list[Session]:
+        """Active sessions, most recently active first (list_sessions' order)."""
+        with self._lock:
+            sessions = [s for s in self._by_id.values() if s.deleted_at is None]
+        sessions.sort(key=lambda s: s.last_heartbeat, reverse=True)
+        return [dataclasses.replace(s) for s in sessions]
+
+    def active_count(self) -> int:
+        with self._lock:
+            return sum(1 for s in self._by_id.values() if s.deleted_at is None)
+
+    def oldest_heartbeat(self) -> datetime | None:
+        """A lower bound on the oldest active heartbeat; None with no active sessions.
+
+        Exact unless that session has since heartbeated or ended, in which
+        case the next stale() call re-arms or drops it.
+        """
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def stale(self, cutoff: datetime) -> list[Session]:
+        """Active sessions whose heartbeat is older than `cutoff`, oldest first."""
+        found = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < cutoff:
+                heartbeat, session_id = heapq.heappop(self._heap)
+                if self._scheduled.get(session_id) != heartbeat:
+                    continue  # superseded by an earlier entry
+                del self._scheduled[session_id]
+                session = self._by_id.get(session_id)
+                if session is None or session.deleted_at is not None:
+                    continue
+                if session.last_heartbeat >= cutoff:
+                    self._schedule(session)  # heartbeated since: re-arm
+                    continue
+                found.append(session)
+            # Stale until something deletes them - keep them scheduled
+            for session in found:
+                self._schedule(session)
+        return [dataclasses.replace(s) for s in found]
+
+    def _put(self, session: Session) -> None:
+        self._remove(session.id)
+        self._by_id[session.id] = dataclasses.replace(session)
+        self._by_client.setdefault((session.machine, session.client_id), set()).add(session.id)
+        if session.deleted_at is None:
+            self._schedule(session)
+
+    def _schedule(self, session: Session) -> None:
+        scheduled = self._scheduled.get(session.id)
+        if scheduled is None or session.last_heartbeat < scheduled:
+            heapq.heappush(self._heap, (session.last_heartbeat, session.id))
+            self._scheduled[session.id] = session.last_heartbeat
+
+    def _remove(self, session_id: str) -> None:
+        old = self._by_id.pop(session_id, None)
+        if old is None:
+            return
+        key = (old.machine, old.client_id)
+        ids = self._by_client.get(key)
+        if ids is not None:
+            ids.discard(session_id)
+            if not ids:
+                del self._by_client[key]
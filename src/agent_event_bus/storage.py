@@ -1,21 +1,32 @@
 """SQLite storage backend for event bus persistence."""
 
+import dataclasses
+import functools
 import json
 import logging
 import os
+import queue
+import re
 import sqlite3
+import threading
+import time
 from collections.abc import Callable
 from contextlib import contextmanager
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Literal
 
+from agent_event_bus.event_cache import RecentEvents
+from agent_event_bus.payload_codec import CODECS, DEFAULT_CODEC, CompressedPayload, compress
+from agent_event_bus.session_cache import SessionCache
+from agent_event_bus.webhook_registry import WebhookIndex
+
 logger = logging.getLogger("agent-event-bus")
 
 # Schema version for migrations
 # Increment this when adding new migrations
-SCHEMA_VERSION = 5
+SCHEMA_VERSION = 11
 
 # Migration function type: takes a connection, returns nothing
 MigrationFunc = Callable[[sqlite3.Connection], None]
@@ -163,8 +174,299 @@ def migrate_v5(conn: sqlite3.Connection) -> None:
         conn.execute("ALTER TABLE events ADD COLUMN channel TEXT NOT NULL DEFAULT 'all'")
 
 
-# Register datetime adapters/converters (required for Python 3.12+)
+# Composite indexes matched to get_events' filter shapes (see
+# _build_events_query). Every filtered poll is "<filter> AND id > cursor
+# ORDER BY id", so each index leads with the filter column and ends with id:
+# the cursor becomes part of the seek instead of a walk over every matching
+# row ever written. idx_events_id goes - an index on the INTEGER PRIMARY KEY
+# duplicates the table's own b-tree and only costs writes.
+# (correlation_id keeps its v4 index: every SQLite index already ends in the
+# rowid, so it seeks on correlation_id = ? AND id > ? as it is.)
+@migration(6, "composite_event_indexes")
+def migrate_v6(conn: sqlite3.Connection) -> None:
+    """Add (channel, id) and (event_type, id) indexes; drop idx_events_id."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_channel_id ON events(channel, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_type_id ON events(event_type, id)")
+    conn.execute("DROP INDEX IF EXISTS idx_events_id")
+
+
+# Large payloads are stored compressed (see PAYLOAD_COMPRESS_MIN_BYTES): a
+# BLOB in the existing payload column - TEXT affinity leaves BLOBs alone -
+# with the codec named here. NULL means plain text, which is every row
+# written before this migration, so nothing needs rewriting to upgrade.
+@migration(7, "payload_codec")
+def migrate_v7(conn: sqlite3.Connection) -> None:
+    """Add events.payload_codec."""
+    event_columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+    if "payload_codec" not in event_columns:
+        conn.execute("ALTER TABLE events ADD COLUMN payload_codec TEXT")
+
+
+# Tags normalized out of payload_meta, so get_events can filter on them in
+# SQL. Keyed (event_id, tag) for the delete trigger and the write path;
+# idx_event_tags_tag leads with the tag, so a tag filter seeks exactly the
+# events carrying it, above the cursor (see _build_events_query). The
+# trigger keeps the table in step with every delete, retention included.
+# Existing events are backfilled from their payload_meta.
+@migration(8, "event_tags")
+def migrate_v8(conn: sqlite3.Connection) -> None:
+    """Create event_tags, its index and delete trigger, and backfill it."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS event_tags (
+            event_id INTEGER NOT NULL,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (event_id, tag)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_event_tags_tag ON event_tags(tag, event_id)")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_delete_tags AFTER DELETE ON events
+        BEGIN
+            DELETE FROM event_tags WHERE event_id = old.id;
+        END
+    """)
+    rows = conn.execute(
+        "SELECT id, payload_meta FROM events WHERE payload_meta LIKE '%\"tags\"%'"
+    ).fetchall()
+    tagged = []
+    for event_id, meta in rows:
+        try:
+            meta = json.loads(meta)
+        except (json.JSONDecodeError, TypeError):
+            continue  # Corrupt meta carries no tags, as _row_to_event reads it
+        tagged.extend((event_id, tag) for tag in _meta_tags(meta))
+    conn.executemany(_INSERT_TAG_SQL, tagged)
+
+
+# Full-text index over payloads and titles, for search_events. Contentless
+# (content=''): it holds only the index, not a second, uncompressed copy of
+# every payload - which would undo payload compression - so snippets are cut
+# from the decoded payloads of the page returned (see _snippet). The cost is
+# that a row can only be removed from the index by restating the text it was
+# indexed with, which only Python can decode, so every delete goes through
+# SQLiteStorage._unindex_events rather than a trigger. Porter stemming, so
+# "migration" finds "migrations".
+@migration(9, "events_fts")
+def migrate_v9(conn: sqlite3.Connection) -> None:
+    """Create events_fts and index every existing event."""
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+        "body, title, content='', tokenize='porter unicode61')"
+    )
+    rows = conn.execute("SELECT id, payload, payload_codec, payload_meta FROM events")
+    conn.executemany(_INSERT_FTS_SQL, (_fts_row(*row) for row in rows))
+
+
+# The webhook outbox: one row per (webhook, event) still owed a delivery,
+# written in the transaction that writes the event, so a delivery is never
+# lost to a crash between the two. The dispatcher claims due rows, POSTs
+# them, and deletes each one delivered; a failure is rescheduled with
+# backoff, and one that keeps failing stays behind as status 'dead' until
+# replayed. idx_webhook_deliveries_due serves the claim's "pending, oldest
+# due first". A delivery dies with its event (retention, via the trigger)
+# or its webhook (delete_webhook): there is nothing left to deliver, or
+# nobody to deliver it to.
+@migration(10, "webhook_deliveries")
+def migrate_v10(conn: sqlite3.Connection) -> None:
+    """Create the webhook_deliveries outbox, its index and cleanup trigger."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS webhook_deliveries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            webhook_id INTEGER NOT NULL,
+            event_id INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP NOT NULL,
+            last_error TEXT,
+            created_at TIMESTAMP NOT NULL
+        )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_webhook_deliveries_due "
+        "ON webhook_deliveries(status, next_attempt_at)"
+    )
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_delete_deliveries AFTER DELETE ON events
+        BEGIN
+            DELETE FROM webhook_deliveries WHERE event_id = old.id;
+        END
+    """)
+
+
+# Batch-mode webhooks (opt-in at registration): deliveries are held up to
+# batch_linger seconds and POSTed as JSON arrays of at most batch_size
+# events. NULL batch_size is the one-event-per-POST default, so every
+# existing webhook keeps its wire shape.
+@migration(11, "webhook_batching")
+def migrate_v11(conn: sqlite3.Connection) -> None:
+    """Add webhooks.batch_size and webhooks.batch_linger."""
+    webhook_columns = {row[1] for row in conn.execute("PRAGMA table_info(webhooks)")}
+    if "batch_size" not in webhook_columns:
+        conn.execute("ALTER TABLE webhooks ADD COLUMN batch_size INTEGER")
+    if "batch_linger" not in webhook_columns:
+        conn.execute("ALTER TABLE webhooks ADD COLUMN batch_linger REAL")
+
+
+_INSERT_TAG_SQL = "INSERT OR IGNORE INTO event_tags (event_id, tag) VALUES (?, ?)"
+_INSERT_FTS_SQL = "INSERT INTO events_fts (rowid, body, title) VALUES (?, ?, ?)"
+_DELETE_FTS_SQL = (
+    "INSERT INTO events_fts (events_fts, rowid, body, title) VALUES ('delete', ?, ?, ?)"
+)
+
+
+def _meta_title(meta: dict | None) -> str | None:
+    """The title an event's meta carries, as events_fts indexes it."""
+    title = meta.get("title") if isinstance(meta, dict) else None
+    return title if isinstance(title, str) else None
+
+
+def _fts_row(event_id: int, payload, codec: str | None, meta_text: str | None) -> tuple:
+    """(rowid, body, title) for a stored event row, exactly as it is indexed.
+
+    Both indexing and unindexing derive the text here: a contentless FTS5
+    delete must restate the indexed values exactly.
+    """
+    if codec is not None:
+        payload = CompressedPayload(codec, payload).decode()
+    try:
+        meta = json.loads(meta_text) if meta_text else None
+    except (json.JSONDecodeError, TypeError):
+        meta = None
+    return event_id, payload, _meta_title(meta)
+
+
+def _meta_tags(meta: dict | None) -> list[str]:
+    """The tags an event's meta carries, as event_tags indexes them: strings only."""
+    tags = meta.get("tags") if isinstance(meta, dict) else None
+    if not isinstance(tags, list):
+        return []
+    return [tag for tag in tags if isinstance(tag, str)]
+
+
+def _cursor_to_id(cursor: str | None) -> int:
+    """Decode a cursor (an opaque string encoding an event ID).
+
+    Malformed cursors are handled gracefully by resetting to the start (0).
+    """
+    if cursor:
+        try:
+            return int(cursor)
+        except ValueError:
+            pass
+    return 0
+
+
+def _event_filters(
+    since_id: int,
+    channels: list[str] | None = None,
+    event_types: list[str] | None = None,
+    correlation_id: str | None = None,
+    tags: list[str] | None = None,
+    any_tags: list[str] | None = None,
+) -> tuple[list[str], list]:
+    """WHERE conditions over events for get_events' filters, and their parameters."""
+    # Build the WHERE clause from whichever filters are present.
+    # Every condition is parameterized; the only interpolated text is
+    # the placeholder run for the IN clauses, whose length comes from
+    # the caller's list, never its contents.
+    conditions: list[str] = []
+    params_base: list = []
+
+    if since_id:
+        conditions.append("id > ?")
+        params_base.append(since_id)
+    if channels:
+        conditions.append(f"channel IN ({','.join('?' * len(channels))})")
+        params_base.extend(channels)
+    if event_types:
+        conditions.append(f"event_type IN ({','.join('?' * len(event_types))})")
+        params_base.extend(event_types)
+    if correlation_id:
+        conditions.append("correlation_id = ?")
+        params_base.append(correlation_id)
+    # Tag filters are id lists drawn from idx_event_tags_tag: one per tag for
+    # `tags` (every one must match), one for all of `any_tags`. The cursor
+    # goes into each, so the seek covers only tagged events above it.
+    tag_lists = [[tag] for tag in dict.fromkeys(tags or ())]
+    if any_tags:
+        tag_lists.append(list(dict.fromkeys(any_tags)))
+    for tag_list in tag_lists:
+        conditions.append(
+            f"id IN (SELECT event_id FROM event_tags WHERE tag IN "
+            f"({','.join('?' * len(tag_list))}) AND event_id > ?)"
+        )
+        params_base.extend((*tag_list, since_id))
+    return conditions, params_base
+
+
+def _build_events_query(
+    cursor: str | None,
+    limit: int,
+    channels: list[str] | None = None,
+    order: Literal["asc", "desc"] = "desc",
+    event_types: list[str] | None = None,
+    correlation_id: str | None = None,
+    tags: list[str] | None = None,
+    any_tags: list[str] | None = None,
+) -> tuple[str, tuple]:
+    """The SELECT behind SQLiteStorage.get_events, and its parameters.
+
+    Separate so the query-plan test can run EXPLAIN QUERY PLAN over exactly
+    the SQL get_events executes, for every filter combination it can build.
+    """
+    effective_order = "DESC" if order == "desc" else "ASC"
+    conditions, params_base = _event_filters(
+        _cursor_to_id(cursor), channels, event_types, correlation_id, tags, any_tags
+    )
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT {_EVENT_COLUMNS} FROM events
+        {where_clause}
+        ORDER BY id {effective_order}
+        LIMIT ?
+    """
+    return query, (*params_base, limit)
+
+
+# Relative weight of a title match over a payload match in search ranking:
+# a title is a headline its publisher chose, so a hit there says more.
+SEARCH_TITLE_WEIGHT = 3.0
+
+
+def _build_search_query(
+    match: str,
+    limit: int,
+    channels: list[str] | None = None,
+    event_types: list[str] | None = None,
+    correlation_id: str | None = None,
+    tags: list[str] | None = None,
+    any_tags: list[str] | None = None,
+) -> tuple[str, tuple]:
+    """The SELECT behind SQLiteStorage.search_events, and its parameters.
+
+    Best match first, by bm25 (lower is better). The alias is not "rank":
+    that is a hidden column of every FTS5 table.
+    """
+    conditions, params = _event_filters(0, channels, event_types, correlation_id, tags, any_tags)
+    where = " AND ".join(["events_fts MATCH ?", *conditions])
+    query = f"""
+        SELECT {_EVENT_COLUMNS}, bm25(events_fts, 1.0, {SEARCH_TITLE_WEIGHT}) AS relevance
+        FROM events_fts JOIN events ON events.id = events_fts.rowid
+        WHERE {where}
+        ORDER BY relevance
+        LIMIT ?
+    """
+    return query, (match, *params, limit)
+
+
+# Register the datetime adapter (required for Python 3.12+)
 # See: https://docs.python.org/3/library/sqlite3.html#default-adapters-and-converters-deprecated
+#
+# Timestamps are stored as ISO-8601 TEXT. There is deliberately no matching
+# converter: connections no longer PARSE_DECLTYPES, and the row decoders call
+# datetime.fromisoformat themselves. A converter cost a Python call and a
+# bytes decode per timestamp column per row - and would throw away the text,
+# which is already the wire form (see _row_to_event).
 
 
 def _adapt_datetime(dt: datetime) -> str:
@@ -172,13 +474,37 @@ def _adapt_datetime(dt: datetime) -> str:
     return dt.isoformat()
 
 
-def _convert_datetime(data: bytes) -> datetime:
-    """Convert ISO format string from SQLite to datetime."""
-    return datetime.fromisoformat(data.decode())
+sqlite3.register_adapter(datetime, _adapt_datetime)
 
 
-sqlite3.register_adapter(datetime, _adapt_datetime)
-sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+def _parse_timestamp(text: str | None) -> datetime | None:
+    """A stored timestamp (or NULL) back as a datetime."""
+    return None if text is None else datetime.fromisoformat(text)
+
+
+# Fixed column orders for the row decoders below, which unpack rows by
+# position instead of looking each column up by name.
+_SESSION_COLUMNS = (
+    "id, display_id, name, machine, cwd, repo, registered_at, last_heartbeat, "
+    "client_id, last_cursor, deleted_at"
+)
+_EVENT_COLUMNS = (
+    "id, event_type, payload, session_id, timestamp, channel, correlation_id, payload_meta, "
+    "payload_codec"
+)
+_WEBHOOK_COLUMNS = (
+    "id, url, channel_filter, event_types, created_at, active, secret, batch_size, batch_linger"
+)
+_DELIVERY_COLUMNS = (
+    "id, webhook_id, event_id, status, attempts, next_attempt_at, last_error, created_at"
+)
+
+
+def _fetch_tuples(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> list[tuple]:
+    """fetchall() as plain tuples, for the bulk reads feeding the row decoders."""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor.execute(sql, params).fetchall()
 
 
 @dataclass
@@ -218,19 +544,107 @@ class Session:
         return "unknown"
 
 
+class _LazyPayload:
+    """Event.payload: always text to readers, decompressed on first read.
+
+    An event read back from a compressed row holds the CompressedPayload
+    until something - almost always serialization for the wire - asks for
+    the text, so a retention scan or an unserved page never decompresses.
+    The text then replaces it, so it is decoded once per event.
+    """
+
+    def __get__(self, event, owner=None):
+        if event is None:
+            # No class-level value: keeps payload a required dataclass field.
+            raise AttributeError("payload")
+        payload = event.__dict__["_payload"]
+        if isinstance(payload, CompressedPayload):
+            payload = event.__dict__["_payload"] = payload.decode()
+        return payload
+
+    def __set__(self, event, value) -> None:
+        event.__dict__["_payload"] = value
+
+
 @dataclass
 class Event:
     """An event broadcast to all sessions."""
 
     id: int
     event_type: str
-    payload: str
+    payload: str = _LazyPayload()  # str | CompressedPayload when constructed
     session_id: str
     timestamp: datetime
     channel: str = "all"  # Target channel for the event
     correlation_id: str | None = None  # Threads a request to its response
     meta: dict | None = None  # Optional structured fields: title, tags, signal_level
 
+    @functools.cached_property
+    def timestamp_iso(self) -> str:
+        """timestamp.isoformat(), rendered once per event.
+
+        The same Event is serialized by every poll the recent-events window
+        serves it to, and by every webhook delivery.
+        """
+        return self.timestamp.isoformat()
+
+    @property
+    def tags(self) -> list[str]:
+        """The event's tags, as the event_tags table holds them."""
+        return _meta_tags(self.meta)
+
+    @property
+    def payload_size(self) -> int:
+        """Length of the payload as held: its compressed bytes until first read."""
+        payload = self.__dict__["_payload"]
+        return len(payload.data if isinstance(payload, CompressedPayload) else payload)
+
+
+@dataclass
+class SearchHit:
+    """One search_events result."""
+
+    event: Event
+    score: float  # bm25 relevance: higher is a better match
+    snippet: str  # payload excerpt around the first match, matches in **bold**
+
+
+# Characters of context a search snippet keeps on each side of its first match.
+SNIPPET_CONTEXT_CHARS = 80
+
+# FTS5 operators, which are not search terms to highlight.
+_FTS_OPERATORS = {"AND", "OR", "NOT", "NEAR"}
+
+
+def _quote_words(query: str) -> str:
+    """`query` as FTS5 phrases, one per word: matches the words, whatever they contain."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def _snippet(text: str, query: str) -> str:
+    """An excerpt of `text` around the first term of `query` it contains.
+
+    events_fts is contentless, so FTS5's own snippet() has nothing to cut
+    from; this does the same job on the decoded payload. Terms match by
+    prefix, and long ones by their stem-ish head, so the words the porter
+    tokenizer matched ("migrations" for "migration") are found here too.
+    Falls back to the start of `text` when no term is found verbatim.
+    """
+    terms = [t for t in re.findall(r"\w+", query) if t not in _FTS_OPERATORS]
+    heads = sorted({t[: max(len(t) - 3, 3)].lower() for t in terms}, key=len, reverse=True)
+    pattern = (
+        re.compile(r"\b(?:" + "|".join(map(re.escape, heads)) + r")\w*", re.IGNORECASE)
+        if heads
+        else None
+    )
+    first = pattern.search(text) if pattern else None
+    start = max(0, first.start() - SNIPPET_CONTEXT_CHARS) if first else 0
+    end = min(len(text), (first.end() if first else 0) + SNIPPET_CONTEXT_CHARS)
+    excerpt = " ".join(text[start:end].split())
+    if pattern:
+        excerpt = pattern.sub(lambda m: f"**{m.group(0)}**", excerpt)
+    return ("…" if start > 0 else "") + excerpt + ("…" if end < len(text) else "")
+
 
 @dataclass
 class Webhook:
@@ -243,6 +657,25 @@ class Webhook:
     created_at: datetime
     active: bool = True
     secret: str | None = None  # Optional shared secret for HMAC signing
+    batch_size: int | None = None  # None = one event per POST, else arrays of at most this many
+    batch_linger: float | None = None  # Seconds a batch waits to fill (batch mode only)
+
+
+@dataclass
+class WebhookDelivery:
+    """One event owed to one webhook: a row of the webhook_deliveries outbox."""
+
+    id: int
+    webhook_id: int
+    event_id: int
+    status: str  # "pending", or "dead" once retries are exhausted
+    attempts: int  # failed attempts so far
+    next_attempt_at: datetime
+    last_error: str | None = None
+    created_at: datetime | None = None
+    # What to deliver, and where: filled in by claim_webhook_deliveries only
+    webhook: Webhook | None = None
+    event: Event | None = None
 
 
 # Database paths
@@ -263,20 +696,218 @@ SESSION_TIMEOUT = 86400  # 24 hours
 # "database is locked" instead of queueing briefly.
 BUSY_TIMEOUT_MS = 5000
 
+# Idle connections each storage keeps open for reuse. A single get_events
+# touches storage 4-6 times, and opening a connection (plus its PRAGMAs) cost
+# more than most of the queries it ran. Sized for the worker pool _run_sync
+# draws from: busier moments than this open extra connections rather than
+# block, and those are closed on release instead of kept. 0 disables pooling
+# - every call opens and closes its own connection, as it used to.
+DEFAULT_POOL_SIZE = 16
+
+# Group commit for add_event (the publish path). Concurrent publishers queue
+# their rows; whichever holds the writer mutex commits everything queued so
+# far - up to this many rows - in one transaction, and everyone else finds
+# their id already assigned when they get the mutex. Under a CI storm that
+# turns N fsyncs and N trips through the WAL lock into one. 0 disables it:
+# every add_event is its own transaction, as it used to be.
+GROUP_COMMIT_MAX_EVENTS = 256
+
+# How long a commit leader waits for more rows before committing. 0 (the
+# default) relies on natural batching - rows that arrive while a commit is in
+# flight go out together in the next one - so a lone publish is never delayed.
+# A few ms trades that latency for bigger batches under sustained load.
+GROUP_COMMIT_LINGER_MS = 0.0
+
+# Heartbeats are write-behind: update_heartbeat records the time in the
+# session cache and a flush writes everything recorded since the last one in
+# a single UPDATE batch, this many seconds apart (plus once on close). A
+# heartbeat only has to be accurate against SESSION_TIMEOUT (24h), and
+# writing one per tool call made every poll a write transaction competing
+# with publishers for the WAL lock. A crash loses at most this much
+# heartbeat freshness. 0 writes each heartbeat through, as it used to; so
+# does running without the session cache, which is what reads the buffered
+# values back. Selected with AGENT_EVENT_BUS_HEARTBEAT_FLUSH_SECONDS.
+HEARTBEAT_FLUSH_SECONDS = 5.0
+
+# Session cursors are write-behind the same way. Every consuming poll moves
+# its session's saved cursor to the newest event it returned; that advance is
+# recorded in the session cache and written, batched, this many seconds
+# apart, by ack_events (which persists its own cursor at once), and on close.
+# Only ever forwards, so what a crash loses is the last few advances - the
+# session is served those events again on its next resume, never skips
+# past any. Retention reads the table, so it sees a cursor that lags, which
+# only keeps more history. 0 writes each advance through; so does running
+# without the session cache. Selected with AGENT_EVENT_BUS_CURSOR_FLUSH_SECONDS.
+CURSOR_FLUSH_SECONDS = 2.0
+
+# Move a saved cursor forward, never back, and never on a deleted session.
+# Cursors are stored as TEXT, so they are compared as integers.
+_ADVANCE_CURSOR_SQL = (
+    "UPDATE sessions SET last_cursor = ? WHERE id = ? AND deleted_at IS NULL "
+    "AND (last_cursor IS NULL OR CAST(last_cursor AS INTEGER) < ?)"
+)
+
+# PRAGMA synchronous per durability mode. "full" fsyncs the WAL on every
+# commit: nothing committed is lost even on power failure. "normal" syncs only
+# at checkpoints - still crash-safe for the process (the database cannot
+# corrupt), but an OS crash or power cut can roll back the last few commits.
+# Selected with AGENT_EVENT_BUS_DURABILITY.
+DURABILITY_MODES = {"full": "FULL", "normal": "NORMAL"}
+DEFAULT_DURABILITY = "full"
+
+# The newest events kept in memory to answer tail reads - "events after my
+# cursor", nearly every poll - without SQLite (see event_cache.py). Covers
+# any cursor within this many events of the tip. 0 disables the window.
+# Selected with AGENT_EVENT_BUS_RECENT_EVENTS.
+DEFAULT_RECENT_EVENTS = 1000
+# Approximate memory cap for that window. Large payloads shrink it below
+# DEFAULT_RECENT_EVENTS events rather than growing it past this.
+RECENT_EVENTS_MAX_BYTES = 8 * 1024 * 1024
+
+# Payloads of at least this many bytes (UTF-8) are stored compressed - stack
+# traces, CI logs and plan summaries, which otherwise dominate the table, the
+# WAL, backups and the page cache every scan goes through. Below it the
+# saving is too small to pay for the compress on publish. A payload that
+# does not shrink is stored as text anyway. 0 disables compression; rows
+# already compressed stay readable. Selected with
+# AGENT_EVENT_BUS_COMPRESS_MIN_BYTES, the codec with
+# AGENT_EVENT_BUS_PAYLOAD_CODEC (see payload_codec.py).
+PAYLOAD_COMPRESS_MIN_BYTES = 1024
+
+
+@dataclass
+class _PendingEvent:
+    """One add_event waiting for a group commit."""
+
+    row: tuple
+    meta: dict | None = None
+    payload: str = ""  # as published, for the search index (row holds it as stored)
+    event: Event | None = None
+    error: BaseException | None = None
+    woken: threading.Event = field(default_factory=threading.Event)
+
 
 class SQLiteStorage:
     """SQLite-backed storage for sessions and events."""
 
-    def __init__(self, db_path: str | None = None):
-        """Initialize storage with optional custom DB path."""
+    def __init__(
+        self,
+        db_path: str | None = None,
+        pool_size: int | None = None,
+        durability: str | None = None,
+        group_commit_max: int = GROUP_COMMIT_MAX_EVENTS,
+        group_commit_linger_ms: float = GROUP_COMMIT_LINGER_MS,
+        recent_events: int | None = None,
+        recent_events_max_bytes: int = RECENT_EVENTS_MAX_BYTES,
+        session_cache: bool | None = None,
+        heartbeat_flush_seconds: float | None = None,
+        cursor_flush_seconds: float | None = None,
+        compress_min_bytes: int | None = None,
+        payload_codec: str | None = None,
+    ):
+        """Initialize storage with optional custom DB path and tuning.
+
+        pool_size defaults to AGENT_EVENT_BUS_POOL_SIZE, else DEFAULT_POOL_SIZE;
+        durability to AGENT_EVENT_BUS_DURABILITY, else DEFAULT_DURABILITY;
+        recent_events to AGENT_EVENT_BUS_RECENT_EVENTS, else DEFAULT_RECENT_EVENTS;
+        session_cache to AGENT_EVENT_BUS_SESSION_CACHE ("0" disables), else on;
+        heartbeat_flush_seconds to AGENT_EVENT_BUS_HEARTBEAT_FLUSH_SECONDS, else
+        HEARTBEAT_FLUSH_SECONDS; cursor_flush_seconds to
+        AGENT_EVENT_BUS_CURSOR_FLUSH_SECONDS, else CURSOR_FLUSH_SECONDS;
+        compress_min_bytes to AGENT_EVENT_BUS_COMPRESS_MIN_BYTES, else
+        PAYLOAD_COMPRESS_MIN_BYTES; payload_codec to
+        AGENT_EVENT_BUS_PAYLOAD_CODEC, else DEFAULT_CODEC.
+        """
         if db_path is None:
             db_path = os.environ.get("AGENT_EVENT_BUS_DB", str(DEFAULT_DB_PATH))
+        if pool_size is None:
+            pool_size = int(os.environ.get("AGENT_EVENT_BUS_POOL_SIZE", DEFAULT_POOL_SIZE))
+        if durability is None:
+            durability = os.environ.get("AGENT_EVENT_BUS_DURABILITY", DEFAULT_DURABILITY)
+        if durability not in DURABILITY_MODES:
+            raise ValueError(
+                f"Unknown durability {durability!r}: expected one of {', '.join(DURABILITY_MODES)}"
+            )
+        if recent_events is None:
+            recent_events = int(
+                os.environ.get("AGENT_EVENT_BUS_RECENT_EVENTS", DEFAULT_RECENT_EVENTS)
+            )
+        if session_cache is None:
+            session_cache = os.environ.get("AGENT_EVENT_BUS_SESSION_CACHE", "1") != "0"
+        if heartbeat_flush_seconds is None:
+            heartbeat_flush_seconds = float(
+                os.environ.get("AGENT_EVENT_BUS_HEARTBEAT_FLUSH_SECONDS", HEARTBEAT_FLUSH_SECONDS)
+            )
+        if cursor_flush_seconds is None:
+            cursor_flush_seconds = float(
+                os.environ.get("AGENT_EVENT_BUS_CURSOR_FLUSH_SECONDS", CURSOR_FLUSH_SECONDS)
+            )
+        if compress_min_bytes is None:
+            compress_min_bytes = int(
+                os.environ.get("AGENT_EVENT_BUS_COMPRESS_MIN_BYTES", PAYLOAD_COMPRESS_MIN_BYTES)
+            )
+        if payload_codec is None:
+            payload_codec = os.environ.get("AGENT_EVENT_BUS_PAYLOAD_CODEC", DEFAULT_CODEC)
+        if payload_codec not in CODECS:
+            raise ValueError(
+                f"Unknown or unavailable payload codec {payload_codec!r}: expected one of "
+                f"{', '.join(CODECS)}"
+            )
 
         self.db_path = Path(db_path)
+        self.pool_size = pool_size
+        self.durability = durability
+        self.group_commit_max = group_commit_max
+        self.group_commit_linger_ms = group_commit_linger_ms
+        # Group commit state: rows waiting to be written, and whether some
+        # caller is currently leading (writing) a batch. Rows queued while a
+        # commit is in flight are exactly the ones the next batch collects.
+        self._pending: list[_PendingEvent] = []
+        self._pending_lock = threading.Lock()
+        self._leader_active = False
+        # LIFO so the most recently used connection - warm page cache, warm
+        # statement cache - is the one handed out next.
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=pool_size)
+        # Read-only connections for queries that only read (see _read), pooled
+        # apart from the read-write ones and to the same size.
+        self._read_pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=pool_size)
+        self._closed = False
+        # The open transaction() on each thread, if any: its connection and
+        # the callbacks waiting for it to commit (or roll back).
+        self._local = threading.local()
+        self._recent = (
+            RecentEvents(recent_events, recent_events_max_bytes) if recent_events > 0 else None
+        )
+        self._sessions = SessionCache() if session_cache else None
+        # Held across "commit a sessions write, then apply it to the cache",
+        # so the cache sees changes in the order SQLite committed them.
+        self._sessions_lock = threading.Lock()
+        # Heartbeats recorded but not yet written, newest per session
+        # (guarded by _sessions_lock). See HEARTBEAT_FLUSH_SECONDS.
+        self.heartbeat_flush_seconds = heartbeat_flush_seconds
+        self.buffers_heartbeats = heartbeat_flush_seconds > 0 and self._sessions is not None
+        self._heartbeats: dict[str, datetime] = {}
+        # Cursor advances likewise, as integers. See CURSOR_FLUSH_SECONDS.
+        self.cursor_flush_seconds = cursor_flush_seconds
+        self.buffers_cursors = cursor_flush_seconds > 0 and self._sessions is not None
+        self._cursors: dict[str, int] = {}
+        # See PAYLOAD_COMPRESS_MIN_BYTES.
+        self.compress_min_bytes = compress_min_bytes
+        self.payload_codec = payload_codec
+        # Active webhooks, indexed for get_matching_webhooks. Built on first
+        # use and dropped by every webhook write; the generation stops a
+        # build that read the table before a write from installing its
+        # outdated result after it.
+        self._webhook_index: WebhookIndex | None = None
+        self._webhook_generation = 0
+        self._webhook_lock = threading.Lock()
 
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        self._prepare_new_file()
         self._init_db()
+        self._warm_recent_events()
+        self.invalidate_sessions()
 
         # Report a pre-rename database if one is lying around (only for the
         # default path, not custom/test paths). After _init_db, so the
@@ -284,9 +915,29 @@ class SQLiteStorage:
         if self.db_path == DEFAULT_DB_PATH:
             self._warn_about_legacy_db_location()
 
+    def _prepare_new_file(self) -> None:
+        """Give a brand-new database file incremental auto-vacuum.
+
+        Lets the retention pruner hand freed pages back to the filesystem a
+        few at a time (incremental_vacuum). SQLite only honors the setting
+        before the file's header is first written - and switching to WAL,
+        which every connection does on open, writes it - so it has to happen
+        here, on a connection of its own, before anything else touches the
+        file. An existing database keeps its mode (only a full VACUUM could
+        change it); pruning there reuses freed pages in place instead.
+        """
+        if self.db_path.exists() and self.db_path.stat().st_size > 0:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
     def _is_empty(self) -> bool:
         """True when this database holds no sessions and no events."""
-        with self._connect() as conn:
+        with self._read() as conn:
             sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
             if sessions:
                 return False
@@ -328,30 +979,262 @@ class SQLiteStorage:
             f"(sqlite3 .backup, not cp: it is WAL-aware.)"
         )
 
-    @contextmanager
-    def _connect(self):
-        """Context manager for database connections."""
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a connection and apply the per-connection PRAGMAs, once."""
         conn = sqlite3.connect(
             self.db_path,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            # Pooled connections move between worker threads. Never shared:
+            # a connection belongs to exactly one _connect block at a time.
+            check_same_thread=False,
         )
         conn.row_factory = sqlite3.Row
         try:
             # WAL lets concurrent readers proceed while a writer holds the
             # lock, which is the norm when several agents poll and publish at
-            # once (issue #112). journal_mode is persistent per-database but
-            # cheap to re-assert; busy_timeout is per-connection and must be
-            # set each time - and set FIRST, so the one-time WAL conversion
-            # of a legacy DB queues briefly under contention instead of
-            # failing fast with SQLITE_BUSY. Inside the try so a PRAGMA
-            # failure (e.g. WAL on a network filesystem) still closes the
-            # connection.
+            # once (issue #112). journal_mode is persistent per-database;
+            # busy_timeout is per-connection, so a pooled connection needs it
+            # once - and FIRST, so the one-time WAL conversion of a legacy DB
+            # queues briefly under contention instead of failing fast with
+            # SQLITE_BUSY. Inside the try so a PRAGMA failure (e.g. WAL on a
+            # network filesystem) still closes the connection.
             conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
             conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={DURABILITY_MODES[self.durability]}")
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Open a read-only connection: mode=ro, and query_only on top.
+
+        No journal_mode or synchronous: both concern writing, and asserting
+        WAL is itself a write to a database not yet converted. _init_db has
+        converted this one long before any reader opens. mode=ro makes
+        SQLite refuse writes at the file level; query_only makes any
+        statement that would write fail even before that.
+        """
+        conn = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,  # pooled, as in _open_connection
+        )
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA query_only=ON")
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _acquire(self, readonly: bool = False) -> sqlite3.Connection:
+        """An idle pooled connection, or a new one if none is idle."""
+        pool = self._read_pool if readonly else self._pool
+        try:
+            return pool.get_nowait()
+        except queue.Empty:
+            return self._open_reader() if readonly else self._open_connection()
+
+    def _release(self, conn: sqlite3.Connection, readonly: bool = False) -> None:
+        """Return a clean connection to the pool, or close it if there is no room."""
+        # maxsize=0 would make the queue unbounded, not empty - check first.
+        if self._closed or self.pool_size <= 0:
+            conn.close()
+            return
+        try:
+            (self._read_pool if readonly else self._pool).put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def _connect(self):
+        """Context manager for database connections.
+
+        Commits on a clean exit and hands the connection back to the pool. On
+        an exception it rolls back and closes the connection instead: one
+        that failed mid-statement is not worth the risk of reusing, and
+        callers see exactly the old open-per-call semantics either way.
+
+        Inside transaction() on this thread, it yields the transaction's
+        connection and does neither: the transaction commits or rolls back
+        the whole unit when it ends.
+        """
+        joined = self._transaction_conn()
+        if joined is not None:
+            yield joined
+            return
+        conn = self._acquire()
+        try:
             yield conn
             conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            finally:
+                conn.close()
+            raise
+        self._release(conn)
+
+    @contextmanager
+    def _read(self):
+        """Context manager for a connection that only reads.
+
+        The read path's lane: a pooled read-only connection (_open_reader)
+        that never commits, never asserts a PRAGMA that writes, and so never
+        contends with the writer for anything but a checkpoint. A WAL reader
+        sees everything committed before its statement began, exactly as a
+        read on a read-write connection would.
+
+        Inside transaction() on this thread, it yields the transaction's
+        connection instead, like _connect: the unit must see its own
+        uncommitted writes, and its reads are what the write lock covers.
+        """
+        joined = self._transaction_conn()
+        if joined is not None:
+            yield joined
+            return
+        conn = self._acquire(readonly=True)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        self._release(conn, readonly=True)
+
+    @contextmanager
+    def transaction(self, lazy: bool = False):
+        """Run every storage call in the block as one transaction on one connection.
+
+        A tool call chains several storage methods - get_events alone loads the
+        session, refreshes its heartbeat, sweeps stale sessions, reads, and
+        persists a cursor - and each used to take its own connection, its own
+        write lock, and its own commit. Inside this block they share one
+        connection and one BEGIN IMMEDIATE: the write lock is taken once, up
+        front, so every read in the block sees the state its writes apply to
+        (no other writer can slip in between a check and the write it guards),
+        and the whole unit commits - or rolls back - together.
+
+        IMMEDIATE rather than deferred because almost every unit writes, and a
+        deferred transaction that reads first and writes second can fail to
+        upgrade its lock with SQLITE_BUSY, which busy_timeout does not retry.
+        WAL readers outside any transaction are never blocked by it.
+
+        lazy=True defers the BEGIN IMMEDIATE to the block's first statement,
+        for units that usually never reach SQLite at all - a poll answered
+        from the session cache and the recent-events window, with its
+        heartbeat and cursor buffered, would otherwise take the write lock
+        only to commit nothing. The price is that reads served from memory
+        before that first statement are not covered by the lock; use it only
+        where no write is decided by such a read.
+
+        Nested blocks join the outer one. Scoped to the calling thread: the
+        worker thread running a tool body is the only user of the connection.
+        """
+        if self._in_transaction():
+            yield
+            return
+        self._local.active = True
+        self._local.conn = None
+        self._local.on_commit = []
+        self._local.on_rollback = []
+        self._local.session_changes = []
+        self._local.events_deleted = False
+        try:
+            if not lazy:
+                self._begin()
+            yield
+            conn = self._local.conn
+            if conn is None:
+                pass  # lazy, and nothing in the block touched SQLite
+            elif self._local.session_changes:
+                with self._sessions_lock:
+                    conn.commit()
+                    for apply in self._local.session_changes:
+                        apply()
+            else:
+                conn.commit()
+        except BaseException:
+            conn = self._local.conn
+            try:
+                if conn is not None:
+                    try:
+                        conn.rollback()
+                    finally:
+                        conn.close()
+            finally:
+                for undo in self._local.on_rollback:
+                    undo()
+            raise
         finally:
+            callbacks = self._local.on_commit
+            self._local.active = False
+            self._local.conn = None
+            self._local.on_commit = []
+            self._local.on_rollback = []
+            self._local.session_changes = []
+            self._local.events_deleted = False
+        if conn is not None:
+            self._release(conn)
+        for callback in callbacks:
+            callback()
+
+    def _in_transaction(self) -> bool:
+        """True inside transaction() on this thread, begun or not."""
+        return getattr(self._local, "active", False)
+
+    def _transaction_conn(self) -> sqlite3.Connection | None:
+        """This thread's transaction connection, beginning a lazy one now; None outside one."""
+        if not self._in_transaction():
+            return None
+        return self._local.conn or self._begin()
+
+    def _begin(self) -> sqlite3.Connection:
+        """BEGIN IMMEDIATE on a pooled connection for this thread's transaction()."""
+        conn = self._acquire()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
             conn.close()
+            raise
+        # A sessions write that committed just before our BEGIN applies
+        # itself to the session cache straight after, still holding
+        # _sessions_lock (_write_sessions). Passing through the lock once
+        # waits that out, so the cache this unit reads is never behind the
+        # table its write lock now holds still.
+        with self._sessions_lock:
+            pass
+        self._local.conn = conn
+        return conn
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run `callback` once the current transaction commits - or now, outside one.
+
+        For side effects that must not be seen before the data they describe
+        (waking a reader for an event still uncommitted would have it re-query
+        and miss the row). Dropped if the transaction rolls back.
+        """
+        if self._in_transaction():
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    def close(self) -> None:
+        """Close every pooled connection, both lanes. Later calls still work, unpooled.
+
+        Called on server shutdown so the WAL is checkpointed by a clean last
+        close rather than left for the next start to recover. Buffered
+        heartbeats and cursors are written first.
+        """
+        self.flush_cursors()
+        self.flush_heartbeats()
+        self._closed = True
+        for pool in (self._pool, self._read_pool):
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
 
     def _reject_prehistoric_schema(self, conn: sqlite3.Connection) -> None:
         """Refuse to open a pre-RFC-#29 (pid-based) sessions table.
@@ -368,7 +1251,7 @@ class SQLiteStorage:
         Runs before _init_db creates anything, so the refusal adds no tables
         of its own - it only reads PRAGMA table_info. One caveat, since the
         promise above should be exact: merely opening the file asserts
-        journal_mode=WAL (in _connect, before any statement here), which
+        journal_mode=WAL (in _open_connection, before any statement here), which
         rewrites the journal format. That is format, not content; no row is
         read, written, or dropped.
         """
@@ -449,14 +1332,12 @@ class SQLiteStorage:
                     timestamp TIMESTAMP NOT NULL,
                     channel TEXT NOT NULL DEFAULT 'all',
                     correlation_id TEXT,
-                    payload_meta TEXT
+                    payload_meta TEXT,
+                    payload_codec TEXT
                 )
             """)
-            # Index for efficient event polling
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_events_id ON events(id)
-            """)
-            # idx_events_correlation comes from migration v4
+            # Event indexes come from migrations: idx_events_correlation from
+            # v4, the (channel, id) and (event_type, id) composites from v6
             # Index for efficient session ordering by activity
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_sessions_heartbeat ON sessions(last_heartbeat)
@@ -476,9 +1357,79 @@ class SQLiteStorage:
 
     # Session operations
 
+    def _write_sessions(self, statement: Callable[[sqlite3.Connection], tuple]):
+        """Run a write to the sessions table and mirror it in the session cache.
+
+        `statement` executes the write and returns (result, apply), where
+        `apply` brings the cache in line with what it changed - or is None if
+        it changed nothing. `apply` runs only once the write has committed,
+        and with the commit under _sessions_lock, so concurrent writers update
+        the cache in the order SQLite applied their writes (applying in any
+        other order could leave an older heartbeat or cursor in the cache than
+        in the table). Inside transaction() the apply waits for the whole
+        unit's commit, and is dropped if it rolls back. Returns `result`.
+        """
+        joined = self._transaction_conn()
+        if joined is not None:
+            result, apply = statement(joined)
+            if apply is not None and self._sessions is not None:
+                self._local.session_changes.append(apply)
+            return result
+        conn = self._acquire()
+        try:
+            result, apply = statement(conn)
+            with self._sessions_lock:
+                conn.commit()
+                if apply is not None and self._sessions is not None:
+                    apply()
+        except BaseException:
+            try:
+                conn.rollback()
+            finally:
+                conn.close()
+            raise
+        self._release(conn)
+        return result
+
+    def _cached_sessions(self) -> SessionCache | None:
+        """The session cache, if reads on this thread may use it.
+
+        Not inside a transaction that has written sessions itself: the cache
+        shows only committed rows, and the unit must read its own writes.
+        """
+        if self._sessions is None or getattr(self._local, "session_changes", None):
+            return None
+        return self._sessions
+
+    def invalidate_sessions(self, session_id: str | None = None) -> None:
+        """Reload the session cache from SQLite - one row, or all of them.
+
+        The hook for anything that writes sessions behind this storage's back
+        (another process, a manual fix-up in sqlite3). Also how the cache is
+        filled at startup. A no-op when the cache is disabled.
+        """
+        if self._sessions is None:
+            return
+        with self._sessions_lock, self._read() as conn:
+            if session_id is None:
+                rows = _fetch_tuples(conn, f"SELECT {_SESSION_COLUMNS} FROM sessions")
+                self._sessions.load([self._row_to_session(row) for row in rows])
+                return
+            row = conn.execute(
+                f"SELECT {_SESSION_COLUMNS} FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                self._sessions.remove(session_id)
+            else:
+                self._sessions.put(self._row_to_session(row))
+
     def add_session(self, session: Session) -> None:
         """Add or update a session."""
-        with self._connect() as conn:
+        # Snapshot for the cache: the caller may keep editing `session`
+        # before the write commits.
+        saved = dataclasses.replace(session)
+
+        def statement(conn):
             conn.execute(
                 """
                 INSERT OR REPLACE INTO sessions
@@ -500,6 +1451,9 @@ class SQLiteStorage:
                     session.deleted_at,
                 ),
             )
+            return None, lambda: self._sessions.put(saved)
+
+        self._write_sessions(statement)
 
     def find_session_by_client(
         self, machine: str, client_id: str, include_deleted: bool = False
@@ -512,37 +1466,54 @@ class SQLiteStorage:
         Args:
             include_deleted: If True, also match soft-deleted sessions (for codename recovery).
         """
-        with self._connect() as conn:
+        if cache := self._cached_sessions():
+            return cache.find_by_client(machine, client_id, include_deleted)
+        with self._read() as conn:
             if include_deleted:
                 # ORDER BY: deleted_at IS NOT NULL evaluates to 0 (active) or 1 (deleted)
                 # in SQLite, so active sessions sort first; ties broken by most recent heartbeat
                 row = conn.execute(
-                    "SELECT * FROM sessions WHERE machine = ? AND client_id = ? ORDER BY deleted_at IS NOT NULL, last_heartbeat DESC LIMIT 1",
+                    f"SELECT {_SESSION_COLUMNS} FROM sessions WHERE machine = ? AND client_id = ? "
+                    "ORDER BY deleted_at IS NOT NULL, last_heartbeat DESC LIMIT 1",
                     (machine, client_id),
                 ).fetchone()
             else:
                 row = conn.execute(
-                    "SELECT * FROM sessions WHERE machine = ? AND client_id = ? AND deleted_at IS NULL",
+                    f"SELECT {_SESSION_COLUMNS} FROM sessions "
+                    "WHERE machine = ? AND client_id = ? AND deleted_at IS NULL",
                     (machine, client_id),
                 ).fetchone()
             if row:
                 return self._row_to_session(row)
             return None
 
-    def _row_to_session(self, row: sqlite3.Row) -> Session:
-        """Convert a database row to a Session object."""
+    def _row_to_session(self, row: tuple) -> Session:
+        """Convert a row selected as _SESSION_COLUMNS to a Session object."""
+        (
+            session_id,
+            display_id,
+            name,
+            machine,
+            cwd,
+            repo,
+            registered_at,
+            last_heartbeat,
+            client_id,
+            last_cursor,
+            deleted_at,
+        ) = row
         return Session(
-            id=row["id"],
-            display_id=row["display_id"] if "display_id" in row.keys() else row["id"],
-            name=row["name"],
-            machine=row["machine"],
-            cwd=row["cwd"],
-            repo=row["repo"],
-            registered_at=row["registered_at"],
-            last_heartbeat=row["last_heartbeat"],
-            client_id=row["client_id"],
-            last_cursor=row["last_cursor"] if "last_cursor" in row.keys() else None,
-            deleted_at=row["deleted_at"] if "deleted_at" in row.keys() else None,
+            id=session_id,
+            display_id=display_id,
+            name=name,
+            machine=machine,
+            cwd=cwd,
+            repo=repo,
+            registered_at=datetime.fromisoformat(registered_at),
+            last_heartbeat=datetime.fromisoformat(last_heartbeat),
+            client_id=client_id,
+            last_cursor=last_cursor,
+            deleted_at=_parse_timestamp(deleted_at),
         )
 
     def get_session(self, session_id: str, include_deleted: bool = False) -> Session | None:
@@ -554,10 +1525,12 @@ class SQLiteStorage:
                 distinguish "never registered" from "registered then deleted"
                 need this - the default hides both behind None (#140).
         """
-        query = "SELECT * FROM sessions WHERE id = ?"
+        if cache := self._cached_sessions():
+            return cache.get(session_id, include_deleted)
+        query = f"SELECT {_SESSION_COLUMNS} FROM sessions WHERE id = ?"
         if not include_deleted:
             query += " AND deleted_at IS NULL"
-        with self._connect() as conn:
+        with self._read() as conn:
             row = conn.execute(query, (session_id,)).fetchone()
             if row:
                 return self._row_to_session(row)
@@ -569,40 +1542,191 @@ class SQLiteStorage:
         Sets deleted_at timestamp instead of removing the row.
         Returns True if the session was deleted, False if not found.
         """
-        with self._connect() as conn:
-            cursor = conn.execute(
-                "UPDATE sessions SET deleted_at = ? WHERE id = ? AND deleted_at IS NULL",
-                (datetime.now(), session_id),
-            )
-            return cursor.rowcount > 0
+        return self._update_active_session(session_id, deleted_at=datetime.now())
+
+    def delete_sessions(self, session_ids: list[str]) -> int:
+        """Soft-delete several sessions in one write. Returns how many were active."""
+        if not session_ids:
+            return 0
+        now = datetime.now()
+        placeholders = ", ".join("?" for _ in session_ids)
+
+        def statement(conn):
+            rows = conn.execute(
+                f"UPDATE sessions SET deleted_at = ? "
+                f"WHERE id IN ({placeholders}) AND deleted_at IS NULL RETURNING id",
+                (now, *session_ids),
+            ).fetchall()
+            if not rows:
+                return 0, None
+
+            def apply():
+                for row in rows:
+                    self._sessions.update(row[0], deleted_at=now)
+
+            return len(rows), apply
+
+        return self._write_sessions(statement)
 
     def update_heartbeat(self, session_id: str, timestamp: datetime) -> bool:
-        """Update session heartbeat. Returns True if active session exists."""
-        with self._connect() as conn:
-            cursor = conn.execute(
-                "UPDATE sessions SET last_heartbeat = ? WHERE id = ? AND deleted_at IS NULL",
-                (timestamp, session_id),
-            )
-            return cursor.rowcount > 0
+        """Update session heartbeat. Returns True if active session exists.
+
+        Buffered (see HEARTBEAT_FLUSH_SECONDS): the session cache - which every
+        session read goes through - has the new time at once, the table gets
+        it at the next flush_heartbeats().
+        """
+        if not self.buffers_heartbeats:
+            return self._update_active_session(session_id, last_heartbeat=timestamp)
+        with self._sessions_lock:
+            if self._sessions.get(session_id) is None:
+                return False
+            self._sessions.update(session_id, last_heartbeat=timestamp)
+            previous = self._heartbeats.get(session_id)
+            if previous is None or timestamp > previous:
+                self._heartbeats[session_id] = timestamp
+        return True
+
+    def flush_heartbeats(self) -> int:
+        """Write buffered heartbeats in one batch. Returns how many were pending.
+
+        Never moves a heartbeat backwards or touches a deleted session: a
+        session re-registered or deleted since its heartbeat was buffered
+        keeps what that write set. If the batch fails (or the transaction it
+        joined rolls back), the heartbeats go back in the buffer for the next
+        flush.
+        """
+        with self._sessions_lock:
+            pending, self._heartbeats = self._heartbeats, {}
+        if not pending:
+            return 0
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "UPDATE sessions SET last_heartbeat = ? "
+                    "WHERE id = ? AND deleted_at IS NULL AND last_heartbeat < ?",
+                    [(ts, session_id, ts) for session_id, ts in pending.items()],
+                )
+        except BaseException:
+            self._requeue_heartbeats(pending)
+            raise
+        if self._in_transaction():
+            self._local.on_rollback.append(functools.partial(self._requeue_heartbeats, pending))
+        return len(pending)
+
+    def _requeue_heartbeats(self, pending: dict[str, datetime]) -> None:
+        with self._sessions_lock:
+            for session_id, ts in pending.items():
+                current = self._heartbeats.get(session_id)
+                if current is None or ts > current:
+                    self._heartbeats[session_id] = ts
 
     def update_session_cursor(self, session_id: str, cursor: str) -> bool:
-        """Update session's last seen cursor. Returns True if active session exists."""
-        with self._connect() as conn:
-            result = conn.execute(
-                "UPDATE sessions SET last_cursor = ? WHERE id = ? AND deleted_at IS NULL",
-                (cursor, session_id),
+        """Update session's last seen cursor. Returns True if active session exists.
+
+        Written through, in either direction, replacing any advance still
+        buffered for the session - the persist-now path for acks and rewinds.
+        Polls use advance_session_cursor.
+        """
+        return self._update_active_session(session_id, last_cursor=cursor)
+
+    def advance_session_cursor(self, session_id: str, cursor: str) -> bool:
+        """Move a session's cursor forward to `cursor`; never back. True if active session exists.
+
+        Buffered (see CURSOR_FLUSH_SECONDS): the session cache has the new
+        cursor at once, the table gets it at the next flush_cursors(). A
+        cursor at or behind the current one is left alone.
+        """
+        target = int(cursor)
+        sessions = self._cached_sessions() if self.buffers_cursors else None
+        if sessions is None:
+            return self._advance_cursor_now(session_id, target)
+        with self._sessions_lock:
+            session = sessions.get(session_id)
+            if session is None:
+                return False
+            if target > _cursor_to_id(session.last_cursor):
+                sessions.update(session_id, last_cursor=str(target))
+                self._cursors[session_id] = target
+        return True
+
+    def _advance_cursor_now(self, session_id: str, target: int) -> bool:
+        def statement(conn):
+            if conn.execute(_ADVANCE_CURSOR_SQL, (str(target), session_id, target)).rowcount:
+                return True, lambda: self._sessions.update(session_id, last_cursor=str(target))
+            return False, None
+
+        # No row updated is either "already at or past it" or "no such
+        # active session"; only the second is a False.
+        return self._write_sessions(statement) or self.get_session(session_id) is not None
+
+    def flush_cursors(self) -> int:
+        """Write buffered cursor advances in one batch. Returns how many were pending.
+
+        Forward-only, like the advances themselves, and never onto a deleted
+        session. Takes the write lock before emptying the buffer: an
+        update_session_cursor that commits first has already dropped the
+        advance it supersedes, and one that commits later overwrites this
+        batch - so an ack's rewind is never undone by an older advance. If
+        the batch fails (or the transaction it joined rolls back), the
+        advances go back in the buffer for the next flush.
+        """
+        with self.transaction():
+            conn = self._transaction_conn()
+            with self._sessions_lock:
+                pending, self._cursors = self._cursors, {}
+            if not pending:
+                return 0
+            self._local.on_rollback.append(functools.partial(self._requeue_cursors, pending))
+            conn.executemany(
+                _ADVANCE_CURSOR_SQL,
+                [(str(target), session_id, target) for session_id, target in pending.items()],
             )
-            return result.rowcount > 0
+        return len(pending)
+
+    def _requeue_cursors(self, pending: dict[str, int]) -> None:
+        with self._sessions_lock:
+            for session_id, target in pending.items():
+                if target > self._cursors.get(session_id, -1):
+                    self._cursors[session_id] = target
+
+    def _update_active_session(self, session_id: str, **fields) -> bool:
+        """SET `fields` on an active session. Returns True if one was updated.
+
+        Column names come from the fixed keyword names of the three callers
+        above, never from input.
+        """
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+
+        def statement(conn):
+            cursor = conn.execute(
+                f"UPDATE sessions SET {assignments} WHERE id = ? AND deleted_at IS NULL",
+                (*fields.values(), session_id),
+            )
+            if not cursor.rowcount:
+                return False, None
+
+            def apply():
+                self._sessions.update(session_id, **fields)
+                if "last_cursor" in fields:
+                    self._cursors.pop(session_id, None)  # superseded
+
+            return True, apply
+
+        return self._write_sessions(statement)
 
     def list_sessions(self) -> list[Session]:
         """List all active sessions, ordered by most recently active first.
 
         Only returns active (non-deleted) sessions.
         """
-        with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT * FROM sessions WHERE deleted_at IS NULL ORDER BY last_heartbeat DESC"
-            ).fetchall()
+        if cache := self._cached_sessions():
+            return cache.active()
+        with self._read() as conn:
+            rows = _fetch_tuples(
+                conn,
+                f"SELECT {_SESSION_COLUMNS} FROM sessions "
+                "WHERE deleted_at IS NULL ORDER BY last_heartbeat DESC",
+            )
             return [self._row_to_session(row) for row in rows]
 
     def cleanup_stale_sessions(self, timeout_seconds: int = SESSION_TIMEOUT) -> int:
@@ -610,20 +1734,60 @@ class SQLiteStorage:
 
         Returns the number of sessions marked as deleted.
         """
-        cutoff = datetime.now().timestamp() - timeout_seconds
-        cutoff_dt = datetime.fromtimestamp(cutoff)
+        return len(self.expire_sessions(timeout_seconds))
+
+    def expire_sessions(self, timeout_seconds: int = SESSION_TIMEOUT) -> list[Session]:
+        """Soft-delete sessions that haven't sent a heartbeat recently, and return them.
+
+        The sessions come back deleted, for the caller to announce. With the
+        session cache this finds nothing without a write, in O(1) when nothing
+        is due (see next_session_expiry).
+        """
         now = datetime.now()
+        cutoff = now - timedelta(seconds=timeout_seconds)
 
-        with self._connect() as conn:
-            cursor = conn.execute(
-                "UPDATE sessions SET deleted_at = ? WHERE last_heartbeat < ? AND deleted_at IS NULL",
-                (now, cutoff_dt),
-            )
-            return cursor.rowcount
+        if (cache := self._cached_sessions()) and not cache.stale(cutoff):
+            return []
+        # The UPDATE below judges staleness by the table, so it must not miss
+        # a heartbeat still waiting in the buffer.
+        self.flush_heartbeats()
+
+        def statement(conn):
+            rows = conn.execute(
+                "UPDATE sessions SET deleted_at = ? "
+                f"WHERE last_heartbeat < ? AND deleted_at IS NULL RETURNING {_SESSION_COLUMNS}",
+                (now, cutoff),
+            ).fetchall()
+            expired = [self._row_to_session(row) for row in rows]
+            if not expired:
+                return expired, None
+
+            def apply():
+                for session in expired:
+                    self._sessions.update(session.id, deleted_at=now)
+
+            return expired, apply
+
+        return self._write_sessions(statement)
+
+    def next_session_expiry(self, timeout_seconds: int = SESSION_TIMEOUT) -> datetime | None:
+        """When the next session can time out, at the earliest; None if none can.
+
+        Taken from the session cache's heartbeat heap. Without the cache
+        nothing is known, so the answer is "now" whenever any session exists.
+        """
+        if self._sessions is None:
+            return datetime.now() if self.session_count() else None
+        oldest = self._sessions.oldest_heartbeat()
+        if oldest is None:
+            return None
+        return oldest + timedelta(seconds=timeout_seconds)
 
     def session_count(self) -> int:
         """Get count of active (non-deleted) sessions."""
-        with self._connect() as conn:
+        if cache := self._cached_sessions():
+            return cache.active_count()
+        with self._read() as conn:
             row = conn.execute(
                 "SELECT COUNT(*) as count FROM sessions WHERE deleted_at IS NULL"
             ).fetchone()
@@ -640,58 +1804,257 @@ class SQLiteStorage:
         correlation_id: str | None = None,
         meta: dict | None = None,
     ) -> Event:
-        """Add a new event and return it with assigned ID."""
-        now = datetime.now()
+        """Add a new event and return it with assigned ID.
+
+        Outside a transaction the row goes through group commit (see
+        GROUP_COMMIT_MAX_EVENTS): it may share its commit with concurrent
+        publishers, but still returns only once it is committed. Inside one,
+        it is written inline and commits with the rest of the unit.
+        """
+        pending = self._pending_event(
+            event_type, payload, session_id, channel, correlation_id, meta
+        )
+        if self._in_transaction():
+            conn = self._transaction_conn()
+            row, meta = pending.row, pending.meta
+            event = self._new_event(self._insert_event(conn, row), row, meta)
+            self._index_event(conn, event.id, payload, meta)
+            self._enqueue_deliveries(conn, event)
+            if self._recent is not None:
+                self.after_commit(functools.partial(self._recent.commit, [event]))
+                self._local.on_rollback.append(functools.partial(self._recent.abort, [event.id]))
+            return event
+        if self.group_commit_max <= 0:
+            self._commit_batch([pending])
+        else:
+            self._group_commit(pending)
+        if pending.error is not None:
+            raise pending.error
+        return pending.event
+
+    def add_events(self, events: list[dict]) -> list[Event]:
+        """Add several events in one transaction and return them, in order.
+
+        Each item holds add_event's keyword arguments. All or nothing: if
+        any row fails, none is written. Outside a transaction the rows skip
+        the group-commit queue - they already are a batch - and are written
+        straight through _commit_batch, one fsync for the lot; inside one,
+        they join it like any other add_event.
+        """
+        if self._in_transaction():
+            return [self.add_event(**fields) for fields in events]
+        batch = [self._pending_event(**fields) for fields in events]
+        if not batch:
+            return []
+        self._commit_batch(batch)
+        if batch[0].error is not None:
+            raise batch[0].error
+        return [p.event for p in batch]
+
+    def _pending_event(
+        self,
+        event_type: str,
+        payload: str,
+        session_id: str,
+        channel: str = "all",
+        correlation_id: str | None = None,
+        meta: dict | None = None,
+    ) -> _PendingEvent:
+        """The row add_event would write for these arguments, not yet written."""
         meta = meta or None  # Normalize empty dict to None
-        with self._connect() as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO events
-                (event_type, payload, session_id, timestamp, channel, correlation_id, payload_meta)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    event_type,
-                    payload,
-                    session_id,
-                    now,
-                    channel,
-                    correlation_id,
-                    json.dumps(meta) if meta else None,
-                ),
-            )
-            event_id = cursor.lastrowid
-
-            return Event(
-                id=event_id,
-                event_type=event_type,
-                payload=payload,
-                session_id=session_id,
-                timestamp=now,
-                channel=channel,
-                correlation_id=correlation_id,
-                meta=meta,
+        # Encoded here, in the caller's thread, so a payload that cannot be
+        # serialized fails its own call rather than the batch it would join -
+        # and so compression never runs while the write lock is held.
+        stored, codec = self._encode_payload(payload)
+        row = (
+            event_type,
+            stored,
+            session_id,
+            datetime.now(),
+            channel,
+            correlation_id,
+            json.dumps(meta) if meta else None,
+            codec,
+        )
+        return _PendingEvent(row, meta, payload)
+
+    _INSERT_EVENT_SQL = """
+        INSERT INTO events
+        (event_type, payload, session_id, timestamp, channel, correlation_id, payload_meta,
+         payload_codec)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    @staticmethod
+    def _index_event(
+        conn: sqlite3.Connection, event_id: int, payload: str, meta: dict | None
+    ) -> None:
+        """Index a just-inserted event in event_tags and events_fts."""
+        tags = _meta_tags(meta)
+        if tags:
+            conn.executemany(_INSERT_TAG_SQL, [(event_id, tag) for tag in tags])
+        conn.execute(_INSERT_FTS_SQL, (event_id, payload, _meta_title(meta)))
+
+    def _enqueue_deliveries(self, conn: sqlite3.Connection, event: Event) -> None:
+        """Queue a just-inserted event for each webhook it matches, in the same transaction."""
+        webhooks = self.get_matching_webhooks(event)
+        if webhooks:
+            now = datetime.now()
+            conn.executemany(
+                "INSERT INTO webhook_deliveries "
+                "(webhook_id, event_id, status, attempts, next_attempt_at, created_at) "
+                "VALUES (?, ?, 'pending', 0, ?, ?)",
+                [(webhook.id, event.id, now, now) for webhook in webhooks],
             )
 
-    def _row_to_event(self, row: sqlite3.Row) -> Event:
-        """Convert a database row to an Event object."""
-        keys = row.keys()
-        meta = None
-        if "payload_meta" in keys and row["payload_meta"]:
+    def _encode_payload(self, payload: str) -> tuple[str | bytes, str | None]:
+        """(value, codec) to store for `payload`: compressed if large enough to be worth it."""
+        if self.compress_min_bytes <= 0 or len(payload) * 4 < self.compress_min_bytes:
+            return payload, None  # too short to reach the threshold even as UTF-8
+        data = payload.encode()
+        if len(data) < self.compress_min_bytes:
+            return payload, None
+        compressed = compress(self.payload_codec, data)
+        if len(compressed) >= len(data):
+            return payload, None
+        return compressed, self.payload_codec
+
+    def _insert_event(self, conn: sqlite3.Connection, row: tuple) -> int:
+        """INSERT one add_event row on `conn` and return its id.
+
+        The id is marked in flight in the recent-events window right away,
+        while this transaction still holds the write lock - before any later
+        event can be assigned a higher one - so no tail read is answered from
+        memory past it until it commits or rolls back.
+        """
+        event_id = conn.execute(self._INSERT_EVENT_SQL, row).lastrowid
+        if self._recent is not None:
+            self._recent.begin(event_id)
+        return event_id
+
+    @staticmethod
+    def _new_event(event_id: int, row: tuple, meta: dict | None) -> Event:
+        """The Event an add_event row became once inserted as `event_id`."""
+        event_type, payload, session_id, timestamp, channel, correlation_id, _, codec = row
+        if codec is not None:
+            payload = CompressedPayload(codec, payload)
+        return Event(
+            id=event_id,
+            event_type=event_type,
+            payload=payload,
+            session_id=session_id,
+            timestamp=timestamp,
+            channel=channel,
+            correlation_id=correlation_id,
+            meta=meta,
+        )
+
+    def _group_commit(self, pending: _PendingEvent) -> None:
+        """Queue `pending` and return once a group commit has written it (or failed).
+
+        Leader/follower without a dedicated thread. The caller that finds no
+        commit in flight becomes the leader: it writes every queued row (up to
+        group_commit_max) in one transaction, wakes each of their callers, and
+        hands leadership to the oldest row still queued - or stands down if
+        none is. Everyone else just waits to be woken, usually with their id
+        already assigned, and returns without touching the database. Exactly
+        one thread writes through this path at a time, so the in-process
+        publishers of the #112 storm never contend on the SQLite write lock
+        with each other.
+        """
+        with self._pending_lock:
+            self._pending.append(pending)
+            leading = not self._leader_active
+            self._leader_active = True
+        if not leading:
+            pending.woken.wait()
+            # Woken either with a result, or promoted to lead the next batch
+            # (which then starts with this row - it is the oldest queued).
+        if pending.event is None and pending.error is None:
+            if self.group_commit_linger_ms > 0:
+                time.sleep(self.group_commit_linger_ms / 1000)
+            with self._pending_lock:
+                batch = self._pending[: self.group_commit_max]
+                del self._pending[: self.group_commit_max]
             try:
-                meta = json.loads(row["payload_meta"])
+                self._commit_batch(batch)
+            finally:
+                with self._pending_lock:
+                    if self._pending:
+                        self._pending[0].woken.set()
+                    else:
+                        self._leader_active = False
+                for p in batch:
+                    p.woken.set()
+
+    def _commit_batch(self, batch: list[_PendingEvent]) -> None:
+        """Write `batch` in one transaction; every row shares its outcome."""
+        ids: list[int] = []
+        events: list[Event] = []
+        try:
+            with self._connect() as conn:
+                for p in batch:
+                    ids.append(event_id := self._insert_event(conn, p.row))
+                    self._index_event(conn, event_id, p.payload, p.meta)
+                    events.append(event := self._new_event(event_id, p.row, p.meta))
+                    self._enqueue_deliveries(conn, event)
+        except BaseException as e:
+            if self._recent is not None:
+                self._recent.abort(ids)
+            # The transaction rolled back, so no row in it was written: each
+            # caller gets the error, exactly as if its own commit had failed.
+            # Set even for KeyboardInterrupt and friends (then re-raised in the
+            # leader), so no woken follower mistakes a missing id for promotion.
+            for p in batch:
+                p.error = e
+            if not isinstance(e, Exception):
+                raise
+            return
+        for p, event in zip(batch, events, strict=True):
+            p.event = event
+        if self._recent is not None:
+            self._recent.commit(p.event for p in batch)
+
+    def _row_to_event(self, row: tuple) -> Event:
+        """Convert a row selected as _EVENT_COLUMNS to an Event object."""
+        (
+            event_id,
+            event_type,
+            payload,
+            session_id,
+            timestamp,
+            channel,
+            correlation_id,
+            meta,
+            codec,
+        ) = row
+        if codec is not None:
+            payload = CompressedPayload(codec, payload)
+        if meta:
+            try:
+                meta = json.loads(meta)
             except (json.JSONDecodeError, TypeError):
                 meta = None  # Corrupt meta is dropped, never fatal
-        return Event(
-            id=row["id"],
-            event_type=row["event_type"],
-            payload=row["payload"],
-            session_id=row["session_id"],
-            timestamp=row["timestamp"],
-            channel=row["channel"] if "channel" in keys else "all",
-            correlation_id=row["correlation_id"] if "correlation_id" in keys else None,
-            meta=meta,
+        else:
+            meta = None
+        # Positional: keyword construction costs twice as much, once per row.
+        event = Event(
+            event_id,
+            event_type,
+            payload,
+            session_id,
+            datetime.fromisoformat(timestamp),
+            channel,
+            correlation_id,
+            meta,
         )
+        # The stored text IS timestamp.isoformat() - _adapt_datetime wrote it -
+        # so it seeds the cached wire form instead of being rendered again.
+        # Only in the two shapes isoformat() produces for a naive datetime,
+        # so a row written some other way still renders exactly as before.
+        if len(timestamp) in (19, 26) and timestamp[10] == "T":
+            event.__dict__["timestamp_iso"] = timestamp
+        return event
 
     def get_events(
         self,
@@ -701,6 +2064,8 @@ class SQLiteStorage:
         order: Literal["asc", "desc"] = "desc",
         event_types: list[str] | None = None,
         correlation_id: str | None = None,
+        tags: list[str] | None = None,
+        any_tags: list[str] | None = None,
     ) -> tuple[list[Event], str | None, bool]:
         """Get events with cursor-based pagination.
 
@@ -711,6 +2076,8 @@ class SQLiteStorage:
             order: "desc" (newest first, default) or "asc" (oldest first).
             event_types: Optional list of event types to filter by (None = all types).
             correlation_id: Optional correlation thread to filter by (None = all).
+            tags: Optional tags an event must ALL carry (None = no tag filter).
+            any_tags: Optional tags an event must carry at least one of.
 
         Returns:
             Tuple of (events, next_cursor, has_more). next_cursor is the batch
@@ -721,68 +2088,119 @@ class SQLiteStorage:
             events are NOT reachable via next_cursor - drain with "asc" if you
             must not miss events.
         """
-        with self._connect() as conn:
-            effective_order = "DESC" if order == "desc" else "ASC"
+        # Tail reads come from the recent-events window when it can answer
+        # them exactly (see event_cache.py). Not inside a transaction that has
+        # inserted or deleted events itself: SQL would see those changes, the
+        # window not until the commit.
+        events = None
+        if (
+            self._recent is not None
+            and not getattr(self._local, "on_rollback", None)
+            and not getattr(self._local, "events_deleted", False)
+        ):
+            events = self._recent.read(
+                _cursor_to_id(cursor),
+                limit,
+                channels,
+                order,
+                event_types,
+                correlation_id,
+                tags,
+                any_tags,
+            )
+        if events is None:
+            query, params = _build_events_query(
+                cursor, limit, channels, order, event_types, correlation_id, tags, any_tags
+            )
+            with self._read() as conn:
+                rows = _fetch_tuples(conn, query, params)
+            events = [self._row_to_event(row) for row in rows]
 
-            # Decode cursor to event ID (cursor is opaque string encoding an ID)
-            # Handle malformed cursors gracefully by resetting to start
-            since_id = 0
-            if cursor:
-                try:
-                    since_id = int(cursor)
-                except ValueError:
-                    since_id = 0  # Malformed cursor, reset to start
-
-            # Build the WHERE clause from whichever filters are present.
-            # Every condition is parameterized; the only interpolated text is
-            # the placeholder run for the IN clauses, whose length comes from
-            # the caller's list, never its contents.
-            conditions: list[str] = []
-            params_base: list = []
-
-            if since_id:
-                conditions.append("id > ?")
-                params_base.append(since_id)
-            if channels:
-                conditions.append(f"channel IN ({','.join('?' * len(channels))})")
-                params_base.extend(channels)
-            if event_types:
-                conditions.append(f"event_type IN ({','.join('?' * len(event_types))})")
-                params_base.extend(event_types)
-            if correlation_id:
-                conditions.append("correlation_id = ?")
-                params_base.append(correlation_id)
-
-            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-            params = (*params_base, limit)
-
-            query = f"""
-                SELECT * FROM events
-                {where_clause}
-                ORDER BY id {effective_order}
-                LIMIT ?
-            """
-            rows = conn.execute(query, params).fetchall()
+        # next_cursor is the high-water mark (MAX id) regardless of order.
+        # The query filters `id > cursor`, so feeding next_cursor back
+        # only ever returns events newer than this batch. (Returning MIN
+        # for desc - the old behavior - re-served the same newest events
+        # on every subsequent call.)
+        if events:
+            next_cursor = str(max(e.id for e in events))
+        else:
+            next_cursor = cursor  # No new events, keep same cursor
 
-            events = [self._row_to_event(row) for row in rows]
+        # A full page means the window may hold more than `limit` events
+        # (exactly-limit gives a false positive; one extra empty poll).
+        # limit=0 must not report more: its empty page never advances the
+        # cursor, so a keep-polling-while-has_more loop would spin forever.
+        has_more = limit > 0 and len(events) == limit
 
-            # next_cursor is the high-water mark (MAX id) regardless of order.
-            # The query filters `id > cursor`, so feeding next_cursor back
-            # only ever returns events newer than this batch. (Returning MIN
-            # for desc - the old behavior - re-served the same newest events
-            # on every subsequent call.)
-            if events:
-                next_cursor = str(max(e.id for e in events))
-            else:
-                next_cursor = cursor  # No new events, keep same cursor
+        return events, next_cursor, has_more
+
+    def _warm_recent_events(self) -> None:
+        """Load the newest events into the recent-events window."""
+        if self._recent is None:
+            return
+        with self._read() as conn:
+            rows = _fetch_tuples(
+                conn,
+                f"SELECT {_EVENT_COLUMNS} FROM events ORDER BY id DESC LIMIT ?",
+                (self._recent.capacity,),
+            )
+        newest = [self._row_to_event(row) for row in reversed(rows)]
+        self._recent.warm(newest, complete=len(rows) < self._recent.capacity)
+
+    def recent_events_stats(self) -> dict | None:
+        """Size and hit rate of the recent-events window, or None if disabled."""
+        return self._recent.stats() if self._recent is not None else None
 
-            # A full page means the window may hold more than `limit` events
-            # (exactly-limit gives a false positive; one extra empty poll).
-            # limit=0 must not report more: its empty page never advances the
-            # cursor, so a keep-polling-while-has_more loop would spin forever.
-            has_more = limit > 0 and len(events) == limit
+    def scan_events(self, after_id: int, limit: int) -> list[Event]:
+        """Up to `limit` events with id > after_id, oldest first, read from SQLite.
+
+        For maintenance walks over the whole table (retention). Never served
+        from the recent-events window: a full scan is all misses anyway, and
+        would drown the hit rate that tracks what pollers actually get.
+        """
+        with self._read() as conn:
+            rows = _fetch_tuples(
+                conn,
+                f"SELECT {_EVENT_COLUMNS} FROM events WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit),
+            )
+        return [self._row_to_event(row) for row in rows]
 
-            return events, next_cursor, has_more
+    def search_events(
+        self,
+        query: str,
+        limit: int = 20,
+        channels: list[str] | None = None,
+        event_types: list[str] | None = None,
+        correlation_id: str | None = None,
+        tags: list[str] | None = None,
+        any_tags: list[str] | None = None,
+    ) -> list[SearchHit]:
+        """Events matching a full-text query over payloads and titles, best first.
+
+        `query` is FTS5 syntax - words, "quoted phrases", OR, NOT, prefix* -
+        and text that does not parse as such ("ci-failure", a stray quote)
+        is searched as the plain words it contains instead. The filters are
+        get_events' own. Always read from SQLite: the recent-events window
+        has no index to search.
+        """
+        if not query.split():
+            return []
+        filters = (channels, event_types, correlation_id, tags, any_tags)
+        try:
+            rows = self._search(query, limit, *filters)
+        except sqlite3.OperationalError:
+            rows = self._search(_quote_words(query), limit, *filters)
+        hits = []
+        for row in rows:
+            event = self._row_to_event(row[:-1])
+            hits.append(SearchHit(event, -row[-1], _snippet(event.payload, query)))
+        return hits
+
+    def _search(self, match: str, limit: int, *filters) -> list[tuple]:
+        query, params = _build_search_query(match, limit, *filters)
+        with self._read() as conn:
+            return _fetch_tuples(conn, query, params)
 
     def get_cursor(self) -> str | None:
         """Get a cursor pointing to the most recent event.
@@ -790,11 +2208,130 @@ class SQLiteStorage:
         Returns:
             Cursor string for the latest event, or None if no events exist.
         """
-        with self._connect() as conn:
+        with self._read() as conn:
             row = conn.execute("SELECT MAX(id) as max_id FROM events").fetchone()
             max_id = row["max_id"]
             return str(max_id) if max_id else None
 
+    # Retention (see retention.py for the policy that drives these)
+
+    def event_count(self) -> int:
+        """Total number of stored events."""
+        with self._read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def min_active_cursor(self) -> int | None:
+        """The lowest saved cursor among active sessions, or None if none has one.
+
+        Everything above it is unseen by at least one live session - the
+        pruner's floor. Compared as integers (cursors are stored as TEXT);
+        an unparseable cursor is skipped rather than allowed to pin history.
+        """
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT last_cursor FROM sessions "
+                "WHERE deleted_at IS NULL AND last_cursor IS NOT NULL"
+            ).fetchall()
+        cursors = []
+        for row in rows:
+            try:
+                cursors.append(int(row[0]))
+            except ValueError:
+                continue
+        return min(cursors) if cursors else None
+
+    def delete_events(self, event_ids: list[int]) -> int:
+        """Delete the given events in one short transaction. Returns rows deleted."""
+        if not event_ids:
+            return 0
+        return self._delete_events_where(
+            f"id IN ({','.join('?' * len(event_ids))})", tuple(event_ids)
+        )
+
+    def delete_oldest_events(self, count: int, max_id: int) -> int:
+        """Delete up to `count` of the oldest events with id <= max_id."""
+        if count <= 0:
+            return 0
+        return self._delete_events_where(
+            "id IN (SELECT id FROM events WHERE id <= ? ORDER BY id LIMIT ?)", (max_id, count)
+        )
+
+    def _delete_events_where(self, where: str, params: tuple) -> int:
+        """Delete the events matching `where`, and their search index entries.
+
+        events_fts is contentless, so each row is unindexed by restating the
+        text it was indexed with (see migrate_v9) - read, and decompressed,
+        here. An immediate transaction, so the rows read are exactly the rows
+        deleted: unindexing a row twice would corrupt the index.
+        """
+        with self.transaction(), self._connect() as conn:
+            rows = _fetch_tuples(
+                conn,
+                f"SELECT id, payload, payload_codec, payload_meta FROM events WHERE {where}",
+                params,
+            )
+            ids = [row[0] for row in rows]
+            conn.executemany(_DELETE_FTS_SQL, [_fts_row(*row) for row in rows])
+            conn.execute(f"DELETE FROM events WHERE id IN ({','.join('?' * len(ids))})", ids)
+            if self._recent is not None:
+                self.after_commit(functools.partial(self._recent.discard, ids))
+                self._local.events_deleted = True
+        return len(ids)
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """Return up to `pages` free pages to the filesystem. Returns pages freed.
+
+        A no-op on databases created before incremental auto-vacuum (see
+        _init_db): they report no free-list shrinkage and keep their size.
+        """
+        with self._connect() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # INCREMENTAL
+                return 0
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+            return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def compress_payloads(self, batch_size: int = 500) -> dict:
+        """Compress stored text payloads that add_event would compress today.
+
+        For history written before compression existed, or under a higher
+        threshold. Walks the table in id order, one short transaction per
+        `batch_size` rows, so publishers are never held off for long; the
+        events themselves are unchanged, so neither cache needs touching.
+        Freed space is reused in place - a VACUUM (or retention's incremental
+        vacuum, on databases that support it) returns it to the filesystem.
+
+        Returns {"scanned", "compressed", "bytes_before", "bytes_after"},
+        the byte counts covering only the rows it compressed.
+        """
+        stats = {"scanned": 0, "compressed": 0, "bytes_before": 0, "bytes_after": 0}
+        last_id = 0
+        while True:
+            with self._connect() as conn:
+                rows = _fetch_tuples(
+                    conn,
+                    "SELECT id, payload FROM events "
+                    "WHERE id > ? AND payload_codec IS NULL ORDER BY id LIMIT ?",
+                    (last_id, batch_size),
+                )
+                updates = []
+                for event_id, payload in rows:
+                    stored, codec = self._encode_payload(payload)
+                    if codec is not None:
+                        updates.append((stored, codec, event_id))
+                        stats["bytes_before"] += len(payload.encode())
+                        stats["bytes_after"] += len(stored)
+                conn.executemany(
+                    "UPDATE events SET payload = ?, payload_codec = ? "
+                    "WHERE id = ? AND payload_codec IS NULL",
+                    updates,
+                )
+            stats["scanned"] += len(rows)
+            stats["compressed"] += len(updates)
+            if len(rows) < batch_size:
+                return stats
+            last_id = rows[-1][0]
+
     # Webhook operations
 
     def add_webhook(
@@ -803,6 +2340,8 @@ class SQLiteStorage:
         channel_filter: str | None = None,
         event_types: list[str] | None = None,
         secret: str | None = None,
+        batch_size: int | None = None,
+        batch_linger: float | None = None,
     ) -> Webhook:
         """Register a new webhook. Returns the created webhook."""
         now = datetime.now()
@@ -813,36 +2352,55 @@ class SQLiteStorage:
         with self._connect() as conn:
             cursor = conn.execute(
                 """
-                INSERT INTO webhooks (url, channel_filter, event_types, created_at, active, secret)
-                VALUES (?, ?, ?, ?, 1, ?)
+                INSERT INTO webhooks (url, channel_filter, event_types, created_at, active, secret,
+                                      batch_size, batch_linger)
+                VALUES (?, ?, ?, ?, 1, ?, ?, ?)
                 """,
-                (url, channel_filter, event_types_str, now, secret),
+                (url, channel_filter, event_types_str, now, secret, batch_size, batch_linger),
             )
             webhook_id = cursor.lastrowid
+        # After the block, once the INSERT has committed: invalidated any
+        # earlier, a concurrent rebuild could still read the table without
+        # the new row and keep that index until the next webhook write
+        self.after_commit(self._invalidate_webhooks)
 
-            return Webhook(
-                id=webhook_id,
-                url=url,
-                channel_filter=channel_filter,
-                event_types=event_types,
-                created_at=now,
-                active=True,
-                secret=secret,
-            )
+        return Webhook(
+            id=webhook_id,
+            url=url,
+            channel_filter=channel_filter,
+            event_types=event_types,
+            created_at=now,
+            active=True,
+            secret=secret,
+            batch_size=batch_size,
+            batch_linger=batch_linger,
+        )
 
-    def _row_to_webhook(self, row: sqlite3.Row) -> Webhook:
-        """Convert a database row to a Webhook object."""
-        event_types_str = row["event_types"]
+    def _row_to_webhook(self, row: tuple) -> Webhook:
+        """Convert a row selected as _WEBHOOK_COLUMNS to a Webhook object."""
+        (
+            webhook_id,
+            url,
+            channel_filter,
+            event_types_str,
+            created_at,
+            active,
+            secret,
+            batch_size,
+            batch_linger,
+        ) = row
         event_types = event_types_str.split(",") if event_types_str else None
 
         return Webhook(
-            id=row["id"],
-            url=row["url"],
-            channel_filter=row["channel_filter"],
+            id=webhook_id,
+            url=url,
+            channel_filter=channel_filter,
             event_types=event_types,
-            created_at=row["created_at"],
-            active=bool(row["active"]),
-            secret=row["secret"],
+            created_at=datetime.fromisoformat(created_at),
+            active=bool(active),
+            secret=secret,
+            batch_size=batch_size,
+            batch_linger=batch_linger,
         )
 
     def list_webhooks(self, active_only: bool = True) -> list[Webhook]:
@@ -853,19 +2411,24 @@ class SQLiteStorage:
         deciding whom to deliver to would otherwise wake every webhook its
         owner had deliberately paused.
         """
-        with self._connect() as conn:
+        with self._read() as conn:
             if active_only:
                 rows = conn.execute(
-                    "SELECT * FROM webhooks WHERE active = 1 ORDER BY created_at DESC"
+                    f"SELECT {_WEBHOOK_COLUMNS} FROM webhooks "
+                    "WHERE active = 1 ORDER BY created_at DESC"
                 ).fetchall()
             else:
-                rows = conn.execute("SELECT * FROM webhooks ORDER BY created_at DESC").fetchall()
+                rows = conn.execute(
+                    f"SELECT {_WEBHOOK_COLUMNS} FROM webhooks ORDER BY created_at DESC"
+                ).fetchall()
             return [self._row_to_webhook(row) for row in rows]
 
     def get_webhook(self, webhook_id: int) -> Webhook | None:
         """Get a webhook by ID."""
-        with self._connect() as conn:
-            row = conn.execute("SELECT * FROM webhooks WHERE id = ?", (webhook_id,)).fetchone()
+        with self._read() as conn:
+            row = conn.execute(
+                f"SELECT {_WEBHOOK_COLUMNS} FROM webhooks WHERE id = ?", (webhook_id,)
+            ).fetchone()
             if row:
                 return self._row_to_webhook(row)
             return None
@@ -874,7 +2437,9 @@ class SQLiteStorage:
         """Delete a webhook. Returns True if deleted, False if not found."""
         with self._connect() as conn:
             cursor = conn.execute("DELETE FROM webhooks WHERE id = ?", (webhook_id,))
-            return cursor.rowcount > 0
+            conn.execute("DELETE FROM webhook_deliveries WHERE webhook_id = ?", (webhook_id,))
+        self.after_commit(self._invalidate_webhooks)
+        return cursor.rowcount > 0
 
     def set_webhook_active(self, webhook_id: int, active: bool) -> bool:
         """Enable or disable a webhook. Returns True if updated."""
@@ -883,7 +2448,14 @@ class SQLiteStorage:
                 "UPDATE webhooks SET active = ? WHERE id = ?",
                 (1 if active else 0, webhook_id),
             )
-            return cursor.rowcount > 0
+        self.after_commit(self._invalidate_webhooks)
+        return cursor.rowcount > 0
+
+    def _invalidate_webhooks(self) -> None:
+        """Drop the webhook index; the next match rebuilds it from the table."""
+        with self._webhook_lock:
+            self._webhook_generation += 1
+            self._webhook_index = None
 
     def get_matching_webhooks(self, event: Event) -> list[Webhook]:
         """Get all active webhooks that match the given event.
@@ -891,25 +2463,192 @@ class SQLiteStorage:
         Matching rules:
         - channel_filter: None matches all, or exact match, or prefix match (e.g., "repo:" matches "repo:foo")
         - event_types: None matches all, or event_type must be in the list
+
+        Answered from an in-memory index (webhook_registry.py), loaded from
+        the table on first use after any webhook write. The returned Webhook
+        objects are shared with the index - read, don't modify.
+        """
+        with self._webhook_lock:
+            index = self._webhook_index
+            generation = self._webhook_generation
+        if index is None:
+            index = WebhookIndex(self.list_webhooks(active_only=True))
+            with self._webhook_lock:
+                if generation == self._webhook_generation:
+                    self._webhook_index = index
+        return index.match(event)
+
+    # Webhook outbox (see migrate_v10)
+
+    def _row_to_delivery(self, row: tuple) -> WebhookDelivery:
+        """Convert a row selected as _DELIVERY_COLUMNS to a WebhookDelivery."""
+        (
+            delivery_id,
+            webhook_id,
+            event_id,
+            status,
+            attempts,
+            next_attempt_at,
+            last_error,
+            created_at,
+        ) = row
+        return WebhookDelivery(
+            id=delivery_id,
+            webhook_id=webhook_id,
+            event_id=event_id,
+            status=status,
+            attempts=attempts,
+            next_attempt_at=datetime.fromisoformat(next_attempt_at),
+            last_error=last_error,
+            created_at=datetime.fromisoformat(created_at),
+        )
+
+    def claim_webhook_deliveries(self, limit: int, lease_seconds: float) -> list[WebhookDelivery]:
+        """Take up to `limit` due deliveries to active webhooks, oldest due first.
+
+        Claiming leases each row: its next_attempt_at moves `lease_seconds`
+        ahead, so a concurrent pass does not take it too, and a dispatcher
+        that dies mid-delivery leaves it to be claimed again once the lease
+        runs out - at-least-once, across restarts. The caller settles every
+        claimed row with complete_webhook_delivery or fail_webhook_delivery.
+        Each comes with its webhook and event filled in.
+        """
+        now = datetime.now()
+        with self.transaction():
+            conn = self._transaction_conn()
+            rows = _fetch_tuples(
+                conn,
+                "UPDATE webhook_deliveries SET next_attempt_at = ? WHERE id IN ("
+                "SELECT d.id FROM webhook_deliveries d JOIN webhooks w ON w.id = d.webhook_id "
+                "WHERE d.status = 'pending' AND d.next_attempt_at <= ? AND w.active = 1 "
+                f"ORDER BY d.next_attempt_at, d.id LIMIT ?) RETURNING {_DELIVERY_COLUMNS}",
+                (now + timedelta(seconds=lease_seconds), now, limit),
+            )
+            if not rows:
+                return []
+            deliveries = sorted(map(self._row_to_delivery, rows), key=lambda d: d.id)
+            event_ids = sorted({d.event_id for d in deliveries})
+            webhook_ids = sorted({d.webhook_id for d in deliveries})
+            events = {
+                event.id: event
+                for event in map(
+                    self._row_to_event,
+                    _fetch_tuples(
+                        conn,
+                        f"SELECT {_EVENT_COLUMNS} FROM events "
+                        f"WHERE id IN ({','.join('?' * len(event_ids))})",
+                        tuple(event_ids),
+                    ),
+                )
+            }
+            webhooks = {
+                webhook.id: webhook
+                for webhook in map(
+                    self._row_to_webhook,
+                    conn.execute(
+                        f"SELECT {_WEBHOOK_COLUMNS} FROM webhooks "
+                        f"WHERE id IN ({','.join('?' * len(webhook_ids))})",
+                        webhook_ids,
+                    ).fetchall(),
+                )
+            }
+        for delivery in deliveries:
+            delivery.event = events[delivery.event_id]
+            delivery.webhook = webhooks[delivery.webhook_id]
+        return deliveries
+
+    def complete_webhook_delivery(self, delivery_id: int) -> bool:
+        """Drop a delivered row from the outbox. Returns True if it was there."""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM webhook_deliveries WHERE id = ?", (delivery_id,))
+        return cursor.rowcount > 0
+
+    def fail_webhook_delivery(
+        self, delivery_id: int, error: str, retry_at: datetime | None
+    ) -> bool:
+        """Record a failed attempt: retry at `retry_at`, or, if None, park it as dead.
+
+        Returns True if the row was there.
         """
-        webhooks = self.list_webhooks(active_only=True)
-        matching = []
+        with self._connect() as conn:
+            if retry_at is None:
+                cursor = conn.execute(
+                    "UPDATE webhook_deliveries SET status = 'dead', attempts = attempts + 1, "
+                    "last_error = ? WHERE id = ?",
+                    (error, delivery_id),
+                )
+            else:
+                cursor = conn.execute(
+                    "UPDATE webhook_deliveries SET attempts = attempts + 1, last_error = ?, "
+                    "next_attempt_at = ? WHERE id = ?",
+                    (error, retry_at, delivery_id),
+                )
+        return cursor.rowcount > 0
 
-        for wh in webhooks:
-            # Check channel filter
-            if wh.channel_filter is not None:
-                # Exact match or prefix match (e.g., "session:" matches "session:abc")
-                if not (
-                    event.channel == wh.channel_filter
-                    or event.channel.startswith(wh.channel_filter)
-                ):
-                    continue
+    def defer_webhook_delivery(self, delivery_id: int, until: datetime) -> bool:
+        """Push a claimed delivery back to `until` without counting an attempt.
+
+        For deliveries held back rather than tried (an open circuit breaker,
+        or a batch still filling). Returns True if the row was there.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE webhook_deliveries SET next_attempt_at = ? WHERE id = ?",
+                (until, delivery_id),
+            )
+        return cursor.rowcount > 0
+
+    def list_webhook_deliveries(
+        self, status: str | None = None, webhook_id: int | None = None, limit: int = 100
+    ) -> list[WebhookDelivery]:
+        """Outbox rows, oldest first, optionally only one status or webhook's."""
+        conditions, params = [], []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if webhook_id is not None:
+            conditions.append("webhook_id = ?")
+            params.append(webhook_id)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        with self._read() as conn:
+            rows = _fetch_tuples(
+                conn,
+                f"SELECT {_DELIVERY_COLUMNS} FROM webhook_deliveries {where}ORDER BY id LIMIT ?",
+                (*params, limit),
+            )
+        return [self._row_to_delivery(row) for row in rows]
 
-            # Check event type filter
-            if wh.event_types is not None:
-                if event.event_type not in wh.event_types:
-                    continue
+    def replay_webhook_deliveries(
+        self, delivery_ids: list[int] | None = None, webhook_id: int | None = None
+    ) -> int:
+        """Put dead deliveries back in the queue, due now, with a fresh attempt count.
 
-            matching.append(wh)
+        All of them, or only those listed, or only one webhook's. last_error
+        is kept until the next attempt replaces it. Returns how many.
+        """
+        if delivery_ids is not None and not delivery_ids:
+            return 0
+        conditions, params = ["status = 'dead'"], [datetime.now()]
+        if delivery_ids is not None:
+            conditions.append(f"id IN ({','.join('?' * len(delivery_ids))})")
+            params.extend(delivery_ids)
+        if webhook_id is not None:
+            conditions.append("webhook_id = ?")
+            params.append(webhook_id)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE webhook_deliveries SET status = 'pending', attempts = 0, "
+                f"next_attempt_at = ? WHERE {' AND '.join(conditions)}",
+                params,
+            )
+        return cursor.rowcount
 
-        return matching
+    def next_webhook_delivery(self) -> datetime | None:
+        """When the earliest pending delivery to an active webhook is due; None if none is."""
+        with self._read() as conn:
+            row = conn.execute(
+                "SELECT MIN(d.next_attempt_at) FROM webhook_deliveries d "
+                "JOIN webhooks w ON w.id = d.webhook_id "
+                "WHERE d.status = 'pending' AND w.active = 1"
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row[0] else None
@@ -0,0 +1,220 @@
+"""The storage interface the server is written against, and the backend selector.
+
+server.py, middleware.py and retention.py only ever call the methods listed
+in Storage, so any object providing them can stand in for SQLiteStorage.
+Two do:
+
+- "sqlite" (SQLiteStorage, the default): the durable bus in data.db.
+- "memory" (MemoryStorage): everything in process memory, gone on exit. For
+  ephemeral or CI buses, and for measuring the server layer with the cost
+  of storage taken out of the picture.
+
+Selected with AGENT_EVENT_BUS_STORAGE. The maintenance-only extras each
+backend has of its own (SQLiteStorage.compress_payloads, invalidate_sessions'
+reload from disk) are deliberately not part of the interface.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Literal, Protocol, runtime_checkable
+
+from agent_event_bus.memory_storage import MemoryStorage
+from agent_event_bus.storage import (
+    SESSION_TIMEOUT,
+    Event,
+    SearchHit,
+    Session,
+    SQLiteStorage,
+    Webhook,
+    WebhookDelivery,
+)
+
+DEFAULT_BACKEND = "sqlite"
+
+
+@runtime_checkable
+class Storage(Protocol):
+    """Sessions, events, cursors and webhooks, as the server uses them.
+
+    Semantics are SQLiteStorage's; see its methods for the details. In
+    brief: transaction() makes the storage calls in its block one atomic
+    unit (nested blocks join the outer one), after_commit() defers a side
+    effect until that unit commits, sessions are soft-deleted, cursors are
+    event ids as strings, and get_events pages by id in either order.
+    """
+
+    # Write-behind buffering: whether the server should run the periodic
+    # flush_heartbeats / flush_cursors tasks, and how often.
+    buffers_heartbeats: bool
+    buffers_cursors: bool
+    heartbeat_flush_seconds: float
+    cursor_flush_seconds: float
+
+    def transaction(self, lazy: bool = False) -> AbstractContextManager[None]: ...
+
+    def after_commit(self, callback: Callable[[], None]) -> None: ...
+
+    def close(self) -> None: ...
+
+    # Sessions
+
+    def add_session(self, session: Session) -> None: ...
+
+    def find_session_by_client(
+        self, machine: str, client_id: str, include_deleted: bool = False
+    ) -> Session | None: ...
+
+    def get_session(self, session_id: str, include_deleted: bool = False) -> Session | None: ...
+
+    def delete_session(self, session_id: str) -> bool: ...
+
+    def delete_sessions(self, session_ids: list[str]) -> int: ...
+
+    def update_heartbeat(self, session_id: str, timestamp: datetime) -> bool: ...
+
+    def flush_heartbeats(self) -> int: ...
+
+    def list_sessions(self) -> list[Session]: ...
+
+    def session_count(self) -> int: ...
+
+    def expire_sessions(self, timeout_seconds: int = SESSION_TIMEOUT) -> list[Session]: ...
+
+    def next_session_expiry(self, timeout_seconds: int = SESSION_TIMEOUT) -> datetime | None: ...
+
+    # Cursors
+
+    def update_session_cursor(self, session_id: str, cursor: str) -> bool: ...
+
+    def advance_session_cursor(self, session_id: str, cursor: str) -> bool: ...
+
+    def flush_cursors(self) -> int: ...
+
+    def get_cursor(self) -> str | None: ...
+
+    def min_active_cursor(self) -> int | None: ...
+
+    # Events
+
+    def add_event(
+        self,
+        event_type: str,
+        payload: str,
+        session_id: str,
+        channel: str = "all",
+        correlation_id: str | None = None,
+        meta: dict | None = None,
+    ) -> Event: ...
+
+    def add_events(self, events: list[dict]) -> list[Event]: ...
+
+    def get_events(
+        self,
+        cursor: str | None = None,
+        limit: int = 50,
+        channels: list[str] | None = None,
+        order: Literal["asc", "desc"] = "desc",
+        event_types: list[str] | None = None,
+        correlation_id: str | None = None,
+        tags: list[str] | None = None,
+        any_tags: list[str] | None = None,
+    ) -> tuple[list[Event], str | None, bool]: ...
+
+    def search_events(
+        self,
+        query: str,
+        limit: int = 20,
+        channels: list[str] | None = None,
+        event_types: list[str] | None = None,
+        correlation_id: str | None = None,
+        tags: list[str] | None = None,
+        any_tags: list[str] | None = None,
+    ) -> list[SearchHit]: ...
+
+    def recent_events_stats(self) -> dict | None: ...
+
+    # Retention (retention.py)
+
+    def scan_events(self, after_id: int, limit: int) -> list[Event]: ...
+
+    def event_count(self) -> int: ...
+
+    def delete_events(self, event_ids: list[int]) -> int: ...
+
+    def delete_oldest_events(self, count: int, max_id: int) -> int: ...
+
+    def incremental_vacuum(self, pages: int) -> int: ...
+
+    # Webhooks
+
+    def add_webhook(
+        self,
+        url: str,
+        channel_filter: str | None = None,
+        event_types: list[str] | None = None,
+        secret: str | None = None,
+        batch_size: int | None = None,
+        batch_linger: float | None = None,
+    ) -> Webhook: ...
+
+    def list_webhooks(self, active_only: bool = True) -> list[Webhook]: ...
+
+    def get_webhook(self, webhook_id: int) -> Webhook | None: ...
+
+    def delete_webhook(self, webhook_id: int) -> bool: ...
+
+    def set_webhook_active(self, webhook_id: int, active: bool) -> bool: ...
+
+    def get_matching_webhooks(self, event: Event) -> list[Webhook]: ...
+
+    # Webhook outbox
+
+    def claim_webhook_deliveries(
+        self, limit: int, lease_seconds: float
+    ) -> list[WebhookDelivery]: ...
+
+    def complete_webhook_delivery(self, delivery_id: int) -> bool: ...
+
+    def fail_webhook_delivery(
+        self, delivery_id: int, error: str, retry_at: datetime | None
+    ) -> bool: ...
+
+    def defer_webhook_delivery(self, delivery_id: int, until: datetime) -> bool: ...
+
+    def list_webhook_deliveries(
+        self, status: str | None = None, webhook_id: int | None = None, limit: int = 100
+    ) -> list[WebhookDelivery]: ...
+
+    def replay_webhook_deliveries(
+        self, delivery_ids: list[int] | None = None, webhook_id: int | None = None
+    ) -> int: ...
+
+    def next_webhook_delivery(self) -> datetime | None: ...
+
+
+# backend name -> storage class, each constructible with no arguments
+STORAGE_BACKENDS: dict[str, Callable[[], Storage]] = {
+    "sqlite": SQLiteStorage,
+    "memory": MemoryStorage,
+}
+
+
+def create_storage(backend: str | None = None) -> Storage:
+    """A new storage of the named backend, else AGENT_EVENT_BUS_STORAGE's, else sqlite.
+
+    Each backend configures itself from its own environment variables
+    (AGENT_EVENT_BUS_DB and friends for sqlite).
+    """
+    if backend is None:
+        backend = os.environ.get("AGENT_EVENT_BUS_STORAGE", DEFAULT_BACKEND)
+    try:
+        factory = STORAGE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage backend {backend!r}: expected one of {', '.join(STORAGE_BACKENDS)}"
+        ) from None
+    return factory()
@@ -0,0 +1,127 @@
+"""Per-webhook circuit breakers: stop hammering an endpoint that keeps failing.
+
+Without one, every dispatch pass sends each due delivery to a dead or hung
+endpoint and waits out the full timeout on each - and a burst of events to
+it is a burst of doomed requests. A breaker tracks one webhook's
+consecutive failures:
+
+- closed: deliveries go out. THRESHOLD failures in a row open it.
+- open: nothing goes out until the cooldown has passed. Deliveries that
+  come due meanwhile are deferred to that moment, not failed - they stay in
+  the outbox and don't spend their retry attempts on a known-down endpoint.
+- half-open: the cooldown has passed and exactly one delivery is let
+  through as a probe. Success closes the breaker; failure opens it again
+  with the cooldown doubled (up to a cap), so a long outage is probed
+  ever more rarely.
+
+A success reported while open closes the breaker too: a delivery that was
+already in flight when it opened has just shown the endpoint is back.
+
+State is in memory, per process: a restarted bus starts every breaker
+closed and relearns within THRESHOLD failures.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass
+class _Breaker:
+    state: str = "closed"  # "closed", "open" or "half_open"
+    failures: int = 0  # consecutive
+    cooldown: float = 0.0  # of the current open spell
+    retry_at: float = 0.0  # time.time() an open breaker next probes
+
+
+class WebhookBreakers:
+    """One breaker per webhook id, created closed on first use. Thread-safe.
+
+    `probe_wait` is how long a probe can take (the delivery timeout): what
+    the deliveries held back behind one are deferred by. `clock` returns
+    time.time()-style timestamps; tests substitute their own.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        cooldown: float,
+        max_cooldown: float,
+        probe_wait: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_wait = probe_wait
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: dict[int, _Breaker] = {}
+
+    def admit(self, webhook_id: int) -> float | None:
+        """May a delivery to this webhook go out now? None if so, else when to try again.
+
+        Admitting the first delivery after an open breaker's cooldown makes
+        it the half-open probe; the others wait for its outcome.
+        """
+        with self._lock:
+            breaker = self._breakers.get(webhook_id)
+            if breaker is None or breaker.state == "closed":
+                return None
+            now = self._clock()
+            if breaker.state == "half_open":
+                return now + self.probe_wait  # the probe's outcome is known by then
+            if now >= breaker.retry_at:
+                breaker.state = "half_open"
+                return None
+            return breaker.retry_at
+
+    def record(self, webhook_id: int, ok: bool) -> None:
+        """Report how an admitted delivery to this webhook went."""
+        with self._lock:
+            breaker = self._breakers.setdefault(webhook_id, _Breaker())
+            if ok:
+                self._breakers[webhook_id] = _Breaker()
+                return
+            if breaker.state == "half_open":
+                breaker.failures += 1
+                self._open(breaker, min(breaker.cooldown * 2, self.max_cooldown))
+            elif breaker.state == "closed":
+                breaker.failures += 1
+                if breaker.failures >= self.threshold:
+                    self._open(breaker, self.base_cooldown)
+            # Failures landing while open were sent before it opened - no news
+
+    def _open(self, breaker: _Breaker, cooldown: float) -> None:
+        breaker.state = "open"
+        breaker.cooldown = cooldown
+        breaker.retry_at = self._clock() + cooldown
+
+    def forget(self, webhook_id: int) -> None:
+        """Drop a webhook's breaker (it was unregistered)."""
+        with self._lock:
+            self._breakers.pop(webhook_id, None)
+
+    def clear(self) -> None:
+        """Drop every breaker (the webhooks table they described was replaced)."""
+        with self._lock:
+            self._breakers.clear()
+
+    def snapshot(self, webhook_id: int) -> dict:
+        """A webhook's breaker as list_webhooks reports it."""
+        with self._lock:
+            breaker = self._breakers.get(webhook_id) or _Breaker()
+            return {
+                "state": breaker.state,
+                "consecutive_failures": breaker.failures,
+                # When an open breaker next lets a probe through
+                "retry_at": (
+                    datetime.fromtimestamp(breaker.retry_at).isoformat()
+                    if breaker.state == "open"
+                    else None
+                ),
+            }
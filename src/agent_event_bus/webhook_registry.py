@@ -0,0 +1,80 @@
+"""Indexed lookup of the webhooks an event should be delivered to.
+
+Every published event asks storage which webhooks match it. That used to
+reload every active row, split each one's event_types string and test each
+channel_filter in turn - per event, for every registered webhook, however
+few of them matched. WebhookIndex is built once from the active webhooks
+and answers the same question with:
+
+- a character trie over channel_filter. Walking the event's channel down it
+  visits exactly the filters that are prefixes of the channel (exact matches
+  included, since a string is a prefix of itself). Webhooks with no filter
+  sit in a bucket of their own.
+- a frozenset of event types per webhook, for an O(1) type check on each
+  channel candidate.
+
+Cost is the channel's length plus the number of webhooks whose channel
+filter matches, independent of how many are registered. SQLiteStorage
+rebuilds the index lazily after add_webhook, delete_webhook or
+set_webhook_active changes the table.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from agent_event_bus.storage import Event, Webhook
+
+
+class _TrieNode:
+    __slots__ = ("children", "webhooks")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        # (rank, webhook, event types or None for all) ending at this prefix
+        self.webhooks: list[tuple[int, Webhook, frozenset[str] | None]] = []
+
+
+class WebhookIndex:
+    """Immutable match index over a list of active webhooks.
+
+    `webhooks` is in list_webhooks order, and matches come back in that
+    order too.
+    """
+
+    def __init__(self, webhooks: list[Webhook]):
+        self.size = len(webhooks)
+        self._unfiltered: list[tuple[int, Webhook, frozenset[str] | None]] = []
+        self._root = _TrieNode()
+        for rank, webhook in enumerate(webhooks):
+            entry = (
+                rank,
+                webhook,
+                frozenset(webhook.event_types) if webhook.event_types is not None else None,
+            )
+            if webhook.channel_filter is None:
+                self._unfiltered.append(entry)
+                continue
+            node = self._root
+            for char in webhook.channel_filter:
+                node = node.children.setdefault(char, _TrieNode())
+            node.webhooks.append(entry)
+
+    def match(self, event: Event) -> list[Webhook]:
+        """Webhooks whose channel filter and event types both admit `event`."""
+        candidates = list(self._unfiltered)
+        node = self._root
+        candidates.extend(node.webhooks)  # "" is a prefix of every channel
+        for char in event.channel:
+            node = node.children.get(char)
+            if node is None:
+                break
+            candidates.extend(node.webhooks)
+        matched = [
+            (rank, webhook)
+            for rank, webhook, types in candidates
+            if types is None or event.event_type in types
+        ]
+        matched.sort(key=lambda item: item[0])
+        return [webhook for _, webhook in matched]
@@ -39,16 +39,48 @@ def temp_db():
     Path(db_path).unlink(missing_ok=True)
 
 
+# Every test that exercises storage runs once per backend (storage_backend.py),
+# so the memory backend is held to exactly the behavior the suite pins down
+# for SQLite. That is any test using the `storage` fixture, plus the modules
+# driving the server's tools, which opt in with
+# `pytestmark = pytest.mark.usefixtures("storage_backend")`. Everything else
+# (CLI parsing, helpers, the bridge) runs once against the default backend.
+# Tests of SQLiteStorage's own machinery - SQL, migrations, the file, its
+# caches and buffers - are marked sqlite_only and run once.
+STORAGE_BACKENDS = ("sqlite", "memory")
+DEFAULT_BACKEND = "sqlite"
+
+
+def pytest_generate_tests(metafunc):
+    if "storage_backend" in metafunc.fixturenames:
+        sqlite_only = metafunc.definition.get_closest_marker("sqlite_only")
+        backends = ("sqlite",) if sqlite_only else STORAGE_BACKENDS
+        metafunc.parametrize("storage_backend", backends, indirect=True)
+
+
+@pytest.fixture
+def storage_backend(request):
+    """The storage backend this run of the test uses."""
+    return request.param
+
+
+def _new_storage(backend: str, db_path: str):
+    from agent_event_bus.storage import SQLiteStorage
+    from agent_event_bus.storage_backend import create_storage
+
+    if backend == "sqlite":
+        return SQLiteStorage(db_path=db_path)
+    return create_storage(backend)
+
+
 @pytest.fixture
-def storage(temp_db):
-    """Create a storage instance with a temporary database.
+def storage(storage_backend, temp_db):
+    """Create a storage instance of the backend under test, on a temporary database.
 
     Note: Import is inside fixture to avoid triggering module-level storage
     initialization before AGENT_EVENT_BUS_DB is set by pytest_configure.
     """
-    from agent_event_bus.storage import SQLiteStorage
-
-    return SQLiteStorage(db_path=temp_db)
+    return _new_storage(storage_backend, temp_db)
 
 
 # Both names the CLI consults when --session-id is omitted (#137).
@@ -70,14 +102,15 @@ def clean_session_id_env(monkeypatch):
 
 
 @pytest.fixture(autouse=True)
-def clean_storage():
-    """Clean the storage before each test.
+def clean_storage(request):
+    """Clean the storage before each test, and install the backend under test.
+
+    Tests that don't run per backend get a fresh default-backend storage.
 
     Note: Imports are inside fixture to avoid triggering module-level storage
     initialization in server.py before AGENT_EVENT_BUS_DB is set by pytest_configure.
     """
     from agent_event_bus import server
-    from agent_event_bus.storage import SQLiteStorage
 
     # Clear all sessions and events
     for session in server.storage.list_sessions():
@@ -85,8 +118,16 @@ def clean_storage():
     # Clear all webhooks
     for webhook in server.storage.list_webhooks(active_only=False):
         server.storage.delete_webhook(webhook.id)
-    # Clear events by recreating storage
-    server.storage = SQLiteStorage(db_path=os.environ["AGENT_EVENT_BUS_DB"])
+    # Clear events by recreating storage (closing the old one's pooled connections)
+    server.storage.close()
+    if "storage_backend" in request.fixturenames:
+        backend = request.getfixturevalue("storage_backend")
+    else:
+        backend = DEFAULT_BACKEND
+    server.storage = _new_storage(backend, os.environ["AGENT_EVENT_BUS_DB"])
+    # Webhook ids restart with the new storage; state keyed on them must too
+    server.webhook_breakers.clear()
+    server._filling_batches.clear()
     yield
 
 
@@ -140,6 +181,9 @@ def make_events_args(**overrides):
         peek=False,
         correlation_id=None,
         min_level=None,
+        wait=None,
+        tags=None,
+        any_tags=None,
     )
     defaults.update(overrides)
     return Namespace(**defaults)
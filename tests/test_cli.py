@@ -554,6 +554,26 @@ class TestCmdEvents:
         call_kwargs = mock_call.call_args
         assert call_kwargs[1]["timeout_ms"] == 200
 
+    @patch("agent_event_bus.cli.call_tool")
+    def test_events_wait_is_sent_and_extends_the_timeout(self, mock_call):
+        """A long-poll spends up to --wait parked on the server, so the HTTP
+        timeout has to cover it on top of --timeout."""
+        mock_call.return_value = {"events": [], "next_cursor": None}
+
+        cli.cmd_events(make_events_args(wait=30.0, timeout=10000))
+
+        assert mock_call.call_args[0][1]["wait_seconds"] == 30.0
+        assert mock_call.call_args[1]["timeout_ms"] == 40000
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_events_without_wait_does_not_send_it(self, mock_call):
+        mock_call.return_value = {"events": [], "next_cursor": None}
+
+        cli.cmd_events(make_events_args())
+
+        assert "wait_seconds" not in mock_call.call_args[0][1]
+        assert mock_call.call_args[1]["timeout_ms"] == 10000
+
     def test_events_resume_requires_session_id(self, capsys):
         """Test that --resume flag requires --session-id."""
         args = make_events_args(resume=True, session_id=None)
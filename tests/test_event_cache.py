@@ -0,0 +1,236 @@
+"""Tests for the recent-events window (event_cache.py) behind get_events."""
+
+import itertools
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from agent_event_bus.event_cache import RecentEvents
+from agent_event_bus.storage import Event, SQLiteStorage, _PendingEvent
+
+
+def _event(event_id: int, channel: str = "all", event_type: str = "note", **kwargs) -> Event:
+    return Event(
+        id=event_id,
+        event_type=event_type,
+        payload=kwargs.pop("payload", "p"),
+        session_id="s",
+        timestamp=datetime.now(),
+        channel=channel,
+        **kwargs,
+    )
+
+
+def _window(ids, capacity=100, max_bytes=10**9, complete=True) -> RecentEvents:
+    recent = RecentEvents(capacity, max_bytes)
+    recent.warm([_event(i) for i in ids], complete=complete)
+    return recent
+
+
+def _ids(events) -> list[int] | None:
+    return None if events is None else [e.id for e in events]
+
+
+class TestRecentEvents:
+    def test_tail_read_both_orders(self):
+        recent = _window(range(1, 11))
+        assert _ids(recent.read(7, 10, order="asc")) == [8, 9, 10]
+        assert _ids(recent.read(2, 3, order="asc")) == [3, 4, 5]
+        assert _ids(recent.read(2, 3, order="desc")) == [10, 9, 8]
+
+    def test_filters_applied_in_memory(self):
+        recent = RecentEvents(100, 10**9)
+        recent.warm(
+            [
+                _event(1, channel="repo:a", event_type="ci"),
+                _event(2, channel="repo:b", event_type="ci"),
+                _event(3, channel="repo:a", event_type="note", correlation_id="t"),
+            ],
+            complete=True,
+        )
+        assert _ids(recent.read(0, 10, channels=["repo:a"], order="asc")) == [1, 3]
+        assert _ids(recent.read(0, 10, event_types=["ci"], order="asc")) == [1, 2]
+        assert _ids(recent.read(0, 10, correlation_id="t")) == [3]
+
+    def test_unwarmed_window_serves_nothing(self):
+        assert RecentEvents(100, 10**9).read(0, 10) is None
+
+    def test_cursor_below_floor_misses_oldest_first(self):
+        recent = _window(range(50, 60), complete=False)
+        assert recent.read(48, 5, order="asc") is None
+        assert _ids(recent.read(49, 5, order="asc")) == [50, 51, 52, 53, 54]
+
+    def test_cursor_below_floor_served_newest_first_when_page_fills(self):
+        recent = _window(range(50, 60), complete=False)
+        assert _ids(recent.read(0, 3, order="desc")) == [59, 58, 57]
+        assert recent.read(0, 20, order="desc") is None
+
+    def test_reads_stop_below_in_flight_ids(self):
+        recent = _window(range(1, 4))
+        recent.begin(4)
+        recent.begin(5)
+        recent.commit([_event(5)])  # committed first, but 4 is still open
+        assert _ids(recent.read(0, 10, order="asc")) == [1, 2, 3]
+        recent.commit([_event(4)])
+        assert _ids(recent.read(0, 10, order="asc")) == [1, 2, 3, 4, 5]
+
+    def test_aborted_ids_release_the_bound(self):
+        recent = _window(range(1, 4))
+        recent.begin(4)
+        recent.abort([4])
+        recent.commit([_event(5)])
+        assert _ids(recent.read(3, 10, order="asc")) == [5]
+
+    def test_capacity_evicts_oldest_and_raises_floor(self):
+        recent = _window(range(1, 6), capacity=5)
+        recent.commit([_event(6), _event(7)])
+        assert recent.stats()["floor"] == 2
+        assert recent.read(1, 10, order="asc") is None
+        assert _ids(recent.read(2, 10, order="asc")) == [3, 4, 5, 6, 7]
+
+    def test_byte_cap_bounds_the_window(self):
+        recent = RecentEvents(1000, 5000)
+        recent.warm([], complete=True)
+        recent.commit(_event(i, payload="x" * 1000) for i in range(1, 21))
+        stats = recent.stats()
+        assert stats["bytes"] <= 5000
+        assert 0 < stats["size"] < 20
+        assert stats["evictions"] == 20 - stats["size"]
+
+    def test_discard_removes_deleted_events(self):
+        recent = _window(range(1, 6))
+        recent.discard([2, 4])
+        assert _ids(recent.read(0, 10, order="asc")) == [1, 3, 5]
+
+    def test_hit_rate(self):
+        recent = _window(range(10, 20), complete=False)
+        recent.read(15, 5)
+        recent.read(0, 5, order="asc")
+        stats = recent.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+@pytest.fixture
+def cached(temp_db):
+    return SQLiteStorage(db_path=temp_db, recent_events=20)
+
+
+def _seed(storage, count: int = 30) -> list[int]:
+    channels = itertools.cycle(["all", "repo:a", "session:x"])
+    types = itertools.cycle(["ci", "note"])
+    return [
+        storage.add_event(
+            event_type=next(types),
+            payload="p",
+            session_id="s",
+            channel=next(channels),
+            correlation_id="t" if i % 4 == 0 else None,
+        ).id
+        for i in range(count)
+    ]
+
+
+class TestStorageIntegration:
+    def test_results_match_sql_for_every_query_shape(self, cached, temp_db):
+        ids = _seed(cached)
+        uncached = SQLiteStorage(db_path=temp_db, recent_events=0)
+        cursors = [None, "garbage", "0", str(ids[5]), str(ids[-15]), str(ids[-3]), str(ids[-1])]
+        for cursor, limit, order, channels, types, corr in itertools.product(
+            cursors,
+            [0, 1, 5, 50],
+            ["asc", "desc"],
+            [None, ["repo:a"], ["all", "session:x"]],
+            [None, ["ci"]],
+            [None, "t"],
+        ):
+            args = dict(
+                cursor=cursor,
+                limit=limit,
+                order=order,
+                channels=channels,
+                event_types=types,
+                correlation_id=corr,
+            )
+            got = cached.get_events(**args)
+            want = uncached.get_events(**args)
+            assert (_ids(got[0]), got[1], got[2]) == (_ids(want[0]), want[1], want[2]), args
+        stats = cached.recent_events_stats()
+        assert stats["hits"] > 0 and stats["misses"] > 0
+
+    def test_tail_read_skips_sqlite(self, cached):
+        ids = _seed(cached, 5)
+        with patch.object(cached, "_connect", side_effect=AssertionError("hit SQLite")):
+            events, _, _ = cached.get_events(cursor=str(ids[1]), order="asc")
+        assert _ids(events) == ids[2:]
+
+    def test_warmed_from_disk_on_startup(self, cached, temp_db):
+        ids = _seed(cached, 25)
+        reopened = SQLiteStorage(db_path=temp_db, recent_events=20)
+        assert reopened.recent_events_stats()["size"] == 20
+        with patch.object(reopened, "_connect", side_effect=AssertionError("hit SQLite")):
+            events, _, _ = reopened.get_events(cursor=str(ids[-6]), order="asc")
+        assert _ids(events) == ids[-5:]
+
+    def test_rolled_back_event_never_served(self, cached):
+        before = _seed(cached, 2)
+        with pytest.raises(RuntimeError):
+            with cached.transaction():
+                cached.add_event(event_type="doomed", payload="p", session_id="s")
+                raise RuntimeError("boom")
+        after = cached.add_event(event_type="kept", payload="p", session_id="s")
+        events, _, _ = cached.get_events(cursor=str(before[-1]), order="asc")
+        assert [e.event_type for e in events] == ["kept"]
+        assert events[0].id == after.id
+
+    def test_event_in_open_transaction_visible_once_committed(self, cached):
+        tip = _seed(cached, 2)[-1]
+        with cached.transaction():
+            event = cached.add_event(event_type="unit", payload="p", session_id="s")
+            assert cached._recent.read(tip, 10, order="asc") == []
+        assert _ids(cached.get_events(cursor=str(tip), order="asc")[0]) == [event.id]
+
+    def test_failed_batch_releases_in_flight(self, cached):
+        tip = _seed(cached, 2)[-1]
+        good = _PendingEvent(("x", "p", "s", datetime.now(), "all", None, None, None))
+        bad = _PendingEvent(("x", object(), "s", datetime.now(), "all", None, None, None))
+        cached._commit_batch([good, bad])  # the second row cannot bind
+        assert good.error is not None and bad.error is not None
+        assert not cached._recent._in_flight
+        after = cached.add_event(event_type="next", payload="p", session_id="s")
+        assert _ids(cached.get_events(cursor=str(tip), order="asc")[0]) == [after.id]
+
+    def test_retention_deletes_evict(self, cached):
+        ids = _seed(cached, 10)
+        cached.delete_events(ids[:2])
+        cached.delete_oldest_events(3, ids[-1])
+        events, _, _ = cached.get_events(order="asc", limit=50)
+        assert _ids(events) == ids[5:]
+
+    def test_rolled_back_delete_keeps_events_in_window(self, cached):
+        ids = _seed(cached, 5)
+        with pytest.raises(RuntimeError):
+            with cached.transaction():
+                cached.delete_events(ids[:2])
+                raise RuntimeError("boom")
+        with patch.object(cached, "_connect", side_effect=AssertionError("hit SQLite")):
+            events, _, _ = cached.get_events(order="asc", limit=50)
+        assert _ids(events) == ids
+
+    def test_delete_in_open_transaction_not_served_from_window(self, cached):
+        ids = _seed(cached, 5)
+        with cached.transaction():
+            cached.delete_events(ids[:2])
+            assert _ids(cached.get_events(order="asc", limit=50)[0]) == ids[2:]
+            assert cached._recent.stats()["size"] == 5  # evicted at commit
+        assert cached._recent.stats()["size"] == 3
+
+    def test_disabled_window(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db, recent_events=0)
+        ids = _seed(storage, 3)
+        assert _ids(storage.get_events(order="asc")[0]) == ids
+        assert storage.recent_events_stats() is None
+
+    def test_size_from_env(self, temp_db, monkeypatch):
+        monkeypatch.setenv("AGENT_EVENT_BUS_RECENT_EVENTS", "7")
+        assert SQLiteStorage(db_path=temp_db).recent_events_stats()["capacity"] == 7
@@ -0,0 +1,191 @@
+"""Tests for the /events/stream Server-Sent Events route."""
+
+import asyncio
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from agent_event_bus import server
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
+
+def _register(client_id: str) -> str:
+    reg = server._register_session_impl(
+        name="streamer", machine="test-machine", cwd="/test/repo", client_id=client_id
+    )
+    return reg["session_id"]
+
+
+def _parse(frame: str) -> dict:
+    """The data of one `id:`/`data:` frame, checking the id line agrees."""
+    lines = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    data = json.loads(lines["data"])
+    assert lines["id"] == str(data["id"])
+    return data
+
+
+async def _take(stream, n: int, timeout: float = 5) -> list[str]:
+    frames = []
+
+    async def pull():
+        async for frame in stream:
+            frames.append(frame)
+            if len(frames) == n:
+                return
+
+    await asyncio.wait_for(pull(), timeout)
+    return frames
+
+
+class TestEventStream:
+    def test_replays_backlog_from_cursor_in_order(self):
+        first = server._publish_event_impl(event_type="a", payload="1")["event_id"]
+        second = server._publish_event_impl(event_type="b", payload="2")["event_id"]
+
+        async def main():
+            stream = server._event_stream(str(first - 1))
+            try:
+                return await _take(stream, 2)
+            finally:
+                await stream.aclose()
+
+        frames = asyncio.run(main())
+        assert [_parse(f)["id"] for f in frames] == [first, second]
+        assert _parse(frames[0])["event_type"] == "a"
+
+    def test_pushes_events_published_after_connect(self):
+        tip = server._publish_event_impl(event_type="before", payload="x")["event_id"]
+
+        async def main():
+            stream = server._event_stream(str(tip))
+            try:
+                pending = asyncio.create_task(_take(stream, 1))
+                await asyncio.sleep(0.1)
+                published = await asyncio.to_thread(
+                    server._publish_event_impl, event_type="live", payload="y"
+                )
+                return await pending, published
+            finally:
+                await stream.aclose()
+
+        frames, published = asyncio.run(main())
+        assert _parse(frames[0])["id"] == published["event_id"]
+
+    def test_channel_and_min_level_filter_the_stream(self):
+        tip = server._publish_event_impl(event_type="before", payload="x")["event_id"]
+        server._publish_event_impl(event_type="help_needed", payload="n", channel="repo:other")
+        server._publish_event_impl(event_type="task_started", payload="n", channel="repo:mine")
+        wanted = server._publish_event_impl(
+            event_type="help_needed", payload="s", channel="repo:mine"
+        )
+
+        async def main():
+            stream = server._event_stream(str(tip), channel="repo:mine", min_level="actionable")
+            try:
+                return await _take(stream, 1)
+            finally:
+                await stream.aclose()
+
+        frames = asyncio.run(main())
+        assert _parse(frames[0])["id"] == wanted["event_id"]
+
+    def test_keepalive_when_idle(self):
+        tip = server._publish_event_impl(event_type="before", payload="x")["event_id"]
+
+        async def main():
+            stream = server._event_stream(str(tip), keepalive=0.05)
+            try:
+                return await _take(stream, 1)
+            finally:
+                await stream.aclose()
+
+        assert asyncio.run(main()) == [": keepalive\n\n"]
+
+    def test_session_stream_persists_high_water_mark(self):
+        sid = _register("stream-hwm")
+        tip = server.storage.get_cursor()
+        published = server._publish_event_impl(event_type="for_you", payload="z")
+
+        async def main():
+            stream = server._event_stream(tip, session_id=sid)
+            try:
+                return await _take(stream, 1)
+            finally:
+                await stream.aclose()
+
+        asyncio.run(main())
+        assert server.storage.get_session(sid).last_cursor == str(published["event_id"])
+
+    def test_channel_stream_does_not_consume_session_cursor(self):
+        sid = _register("stream-narrow")
+        server._get_events_impl(session_id=sid, resume=True)  # initialize cursor
+        saved = server.storage.get_session(sid).last_cursor
+        server._publish_event_impl(event_type="x", payload="p", channel="repo:mine")
+
+        async def main():
+            stream = server._event_stream(saved, session_id=sid, channel="repo:mine")
+            try:
+                return await _take(stream, 1)
+            finally:
+                await stream.aclose()
+
+        asyncio.run(main())
+        assert server.storage.get_session(sid).last_cursor == saved
+
+    def test_session_deleted_mid_stream_ends_with_error_frame(self):
+        sid = _register("stream-deleted")
+        tip = server.storage.get_cursor()
+
+        async def main():
+            stream = server._event_stream(tip, session_id=sid, keepalive=0.05)
+            try:
+                await _take(stream, 1)  # keepalive: connected and idle
+                server.storage.delete_session(sid)
+                return [frame async for frame in stream]
+            finally:
+                await stream.aclose()
+
+        frames = asyncio.run(main())
+        assert len(frames) == 1
+        assert frames[0].startswith("event: error\n")
+        data = json.loads(frames[0].split("data: ", 1)[1])
+        assert data["session_deleted"] is True
+
+
+class TestStreamStartCursor:
+    def test_explicit_cursor_wins(self):
+        sid = _register("start-explicit")
+        assert server._stream_start_cursor(sid, "7") == {"cursor": "7"}
+
+    def test_session_resumes_from_saved_cursor(self):
+        sid = _register("start-saved")
+        server.storage.update_session_cursor(sid, "3")
+        assert server._stream_start_cursor(sid, None) == {"cursor": "3"}
+
+    def test_no_position_starts_at_tip(self):
+        tip = server._publish_event_impl(event_type="x", payload="p")["event_id"]
+        assert server._stream_start_cursor(None, None) == {"cursor": str(tip)}
+
+
+class TestEventStreamRoute:
+    def test_invalid_min_level_is_400(self):
+        client = TestClient(server.create_app())
+        response = client.get("/events/stream", params={"min_level": "loud"})
+        assert response.status_code == 400
+        assert "min_level" in response.json()["error"]
+
+    def test_deleted_session_is_410(self):
+        sid = _register("route-deleted")
+        server.storage.delete_session(sid)
+        client = TestClient(server.create_app())
+        response = client.get("/events/stream", params={"session_id": sid})
+        assert response.status_code == 410
+        assert response.json()["session_deleted"] is True
+
+    def test_requires_tailscale_auth_when_enabled(self, monkeypatch):
+        monkeypatch.delenv("AGENT_EVENT_BUS_AUTH_DISABLED", raising=False)
+        # TestClient's IP is "testclient", not a trusted localhost address
+        client = TestClient(server.create_app())
+        assert client.get("/events/stream").status_code == 401
@@ -1,17 +1,23 @@
 """Tests for the issue #112 hardening: event-loop offloading, bounded
-notification subprocesses, SQLite concurrency pragmas, loop-safe webhook
-dispatch, and the /health liveness route."""
+notification subprocesses, SQLite concurrency pragmas, connection pooling and
+the read-only lane,
+loop-safe webhook dispatch, and the /health liveness route."""
 
 import asyncio
 import inspect
+import sqlite3
 import subprocess
 import threading
 from datetime import datetime
 
+import pytest
+
 from agent_event_bus import helpers, server
-from agent_event_bus.storage import BUSY_TIMEOUT_MS, Event
+from agent_event_bus.storage import BUSY_TIMEOUT_MS, Event, SQLiteStorage
 from conftest import registered_tools
 
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
 
 class TestAsyncToolWrappers:
     """Tool functions must not block the server's event loop."""
@@ -31,7 +37,9 @@ class TestAsyncToolWrappers:
             "list_sessions",
             "list_channels",
             "publish_event",
+            "publish_events",
             "get_events",
+            "search_events",
             "ack_events",
             "unregister_session",
             "notify",
@@ -39,6 +47,8 @@ class TestAsyncToolWrappers:
             "list_webhooks",
             "set_webhook_active",
             "unregister_webhook",
+            "list_dead_letters",
+            "replay_dead_letters",
         }, f"tool roster changed: {sorted(found)} - update this list and guide.md together"
 
     def test_wrappers_pass_through_end_to_end(self):
@@ -113,6 +123,7 @@ class TestNotificationTimeout:
         assert all(t == helpers.NOTIFY_TIMEOUT for t in seen_timeouts)
 
 
+@pytest.mark.sqlite_only
 class TestSQLiteConcurrencyPragmas:
     def test_wal_and_busy_timeout_set(self, storage):
         with storage._connect() as conn:
@@ -122,6 +133,118 @@ class TestSQLiteConcurrencyPragmas:
             assert timeout == BUSY_TIMEOUT_MS
 
 
+@pytest.mark.sqlite_only
+class TestConnectionPool:
+    def test_connection_is_reused_across_calls(self, storage):
+        with storage._connect() as first:
+            pass
+        with storage._connect() as second:
+            assert second is first
+            # PRAGMAs were applied when it was opened, and still hold
+            assert second.execute("PRAGMA busy_timeout").fetchone()[0] == BUSY_TIMEOUT_MS
+
+    def test_concurrent_blocks_get_distinct_connections(self, storage):
+        with storage._connect() as a, storage._connect() as b:
+            assert a is not b
+
+    def test_idle_connections_capped_at_pool_size(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db, pool_size=2)
+        with storage._connect(), storage._connect(), storage._connect():
+            pass
+        assert storage._pool.qsize() == 2
+        storage.close()
+
+    def test_pool_size_zero_disables_pooling(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db, pool_size=0)
+        with storage._connect() as first:
+            pass
+        with storage._connect() as second:
+            assert second is not first
+        assert storage._pool.qsize() == 0
+
+    def test_failure_rolls_back_and_discards_connection(self, storage):
+        with pytest.raises(RuntimeError):
+            with storage._connect() as conn:
+                conn.execute(
+                    "INSERT INTO events (event_type, payload, session_id, timestamp) "
+                    "VALUES ('t', 'p', 's', '2026-01-01T00:00:00')"
+                )
+                raise RuntimeError("boom")
+        with storage._connect() as fresh:
+            assert fresh is not conn
+            assert fresh.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 0
+
+    def test_connection_usable_from_another_thread(self, storage):
+        with storage._connect():
+            pass  # pooled on this thread
+        errors = []
+
+        def worker():
+            try:
+                storage.get_cursor()
+            except Exception as e:
+                errors.append(e)
+
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+        assert errors == []
+
+    def test_close_empties_pool_and_storage_keeps_working(self, storage):
+        storage.add_event("t", "p", "s")
+        assert storage._pool.qsize() > 0
+        storage.close()
+        assert storage._pool.qsize() == 0
+        assert storage.get_cursor() is not None
+        assert storage._pool.qsize() == 0  # no longer pooling after close
+
+
+@pytest.mark.sqlite_only
+class TestReadOnlyLane:
+    def test_reader_cannot_write(self, storage):
+        with storage._read() as conn:
+            assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM events")
+
+    def test_reads_use_their_own_pool(self, storage):
+        storage.add_event("t", "p", "s")
+        writers = storage._pool.qsize()
+        assert storage.get_cursor() is not None
+        storage.list_webhooks()
+        assert storage._read_pool.qsize() == 1  # one reader, reused
+        assert storage._read_pool.queue[0] not in storage._pool.queue
+        assert storage._pool.qsize() == writers
+
+    def test_pooled_reader_sees_later_commits(self, storage):
+        assert storage.get_cursor() is None  # pools a reader
+        event = storage.add_event("t", "p", "s")
+        assert storage.get_cursor() == str(event.id)
+
+    def test_reads_inside_a_transaction_see_its_writes(self, storage):
+        readers = storage._read_pool.qsize()
+        with storage.transaction():
+            event = storage.add_event("t", "p", "s")
+            assert storage.get_cursor() == str(event.id)
+            assert storage.event_count() == 1
+        assert storage._read_pool.qsize() == readers  # the transaction's own connection
+
+    def test_reader_is_not_blocked_by_an_open_write(self, storage):
+        storage.add_event("t", "committed", "s")
+        with storage.transaction():  # holds the write lock
+            storage.add_event("t", "uncommitted", "s")
+            seen = []
+            reader = threading.Thread(target=lambda: seen.append(storage.event_count()))
+            reader.start()
+            reader.join(2)
+            assert seen == [1]
+
+    def test_close_empties_both_pools(self, storage):
+        storage.get_cursor()
+        storage.close()
+        assert storage._read_pool.qsize() == 0
+
+
 class TestLoopSafeWebhookDispatch:
     def test_webhook_client_recreated_on_new_loop(self):
         """Reusing an AsyncClient across event loops hangs; each loop must get
@@ -147,11 +270,12 @@ class TestLoopSafeWebhookDispatch:
         ran: dict = {}
         done = threading.Event()
 
-        async def fake_dispatch(event):
+        async def fake_dispatch():
             ran["loop"] = asyncio.get_running_loop()
             done.set()
 
         monkeypatch.setattr(server, "_dispatch_webhooks", fake_dispatch)
+        server.storage.add_webhook(url="https://example.test/hook")
         event = Event(id=1, event_type="t", payload="p", session_id="s", timestamp=datetime.now())
 
         async def main():
@@ -181,21 +305,31 @@ class TestHealthEndpoint:
             assert body["status"] == "ok"
             assert body["service"] == "agent-event-bus"
 
+    @pytest.mark.sqlite_only
+    def test_health_reports_recent_events_hit_rate(self):
+        from starlette.testclient import TestClient
+
+        server._publish_event_impl(event_type="note", payload="x")
+        server._get_events_impl(cursor=server.storage.get_cursor())
+        with TestClient(server.create_app()) as client:
+            stats = client.get("/health").json()["recent_events"]
+        assert stats["hits"] >= 1
+        assert "hit_rate" in stats
+
 
 class TestDispatchStorageOffLoop:
     def test_webhook_lookup_runs_off_the_loop_thread(self, monkeypatch):
-        """_dispatch_webhooks runs on the server loop; its SQLite lookup must
-        be offloaded to a worker thread per the #112 invariant."""
+        """_dispatch_webhooks runs on the server loop; its SQLite outbox claim
+        must be offloaded to a worker thread per the #112 invariant."""
         seen = {}
 
-        def fake_matching(event):
+        def fake_claim(limit, lease_seconds):
             seen["thread"] = threading.current_thread()
             return []
 
-        monkeypatch.setattr(server.storage, "get_matching_webhooks", fake_matching)
-        event = Event(id=1, event_type="t", payload="p", session_id="s", timestamp=datetime.now())
+        monkeypatch.setattr(server.storage, "claim_webhook_deliveries", fake_claim)
 
-        asyncio.run(server._dispatch_webhooks(event))
+        asyncio.run(server._dispatch_webhooks())
 
         # asyncio.run drove the loop on this thread; the lookup must not have
         # run there
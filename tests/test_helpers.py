@@ -5,6 +5,7 @@ from datetime import datetime
 from unittest.mock import patch
 
 from agent_event_bus.helpers import (
+    ClientLiveness,
     _dev_notify,
     escape_applescript_string,
     extract_repo_from_cwd,
@@ -233,6 +234,57 @@ class TestIsClientAlive:
         assert is_client_alive("12345", is_local=True) is True
 
 
+class TestClientLiveness:
+    """Tests for the shared ClientLiveness snapshot."""
+
+    def test_same_answers_as_is_client_alive(self):
+        liveness = ClientLiveness()
+        for client_id, is_local in [
+            (str(os.getpid()), True),
+            ("999999999", True),
+            ("999999999", False),
+            (None, True),
+            ("abc-session-id", True),
+        ]:
+            assert liveness.is_alive(client_id, is_local) == is_client_alive(client_id, is_local)
+
+    def test_one_scan_per_snapshot(self):
+        liveness = ClientLiveness(ttl=60)
+        with (
+            patch("agent_event_bus.helpers._scan_pids", return_value=frozenset({1, 2})) as scan,
+            patch("os.kill") as kill,
+        ):
+            for _ in range(3):
+                assert liveness.is_alive("1", is_local=True)
+                assert liveness.is_alive("2", is_local=True)
+        assert scan.call_count == 1
+        kill.assert_not_called()
+
+    def test_pid_missing_from_snapshot_is_confirmed(self):
+        """A process started after the snapshot is not called dead."""
+        liveness = ClientLiveness(ttl=60)
+        with patch("agent_event_bus.helpers._scan_pids", return_value=frozenset({1})):
+            assert liveness.is_alive(str(os.getpid()), is_local=True)
+            assert not liveness.is_alive("999999999", is_local=True)
+
+    def test_without_proc_kill_is_cached(self):
+        liveness = ClientLiveness(ttl=60)
+        with (
+            patch("agent_event_bus.helpers._scan_pids", return_value=None),
+            patch("os.kill") as kill,
+        ):
+            for _ in range(3):
+                assert liveness.is_alive("12345", is_local=True)
+        assert kill.call_count == 1
+
+    def test_refreshes_after_ttl(self):
+        liveness = ClientLiveness(ttl=0)
+        with patch("agent_event_bus.helpers._scan_pids", return_value=frozenset({1})) as scan:
+            liveness.is_alive("1", is_local=True)
+            liveness.is_alive("1", is_local=True)
+        assert scan.call_count == 2
+
+
 class TestDevNotify:
     """Tests for _dev_notify helper."""
 
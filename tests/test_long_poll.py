@@ -0,0 +1,283 @@
+"""Tests for get_events long-polling (wait_seconds) and the in-process notifier."""
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from agent_event_bus import server
+from agent_event_bus.notifier import EventNotifier
+from agent_event_bus.storage import Event
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
+
+def _event(**overrides) -> Event:
+    fields = dict(
+        id=1, event_type="t", payload="p", session_id="s", timestamp=datetime.now(), channel="all"
+    )
+    fields.update(overrides)
+    return Event(**fields)
+
+
+async def _publish_later(delay: float, **kwargs) -> dict:
+    """Publish from a worker thread after `delay`, like a real concurrent caller."""
+    await asyncio.sleep(delay)
+    return await asyncio.to_thread(server._publish_event_impl, **kwargs)
+
+
+class TestEventNotifier:
+    def test_publish_from_another_thread_wakes_a_matching_waiter(self):
+        notifier = EventNotifier()
+
+        async def main():
+            with notifier.subscribe(lambda e: True) as waiter:
+                threading.Timer(0.05, notifier.publish, args=(_event(),)).start()
+                return await waiter.wait(5)
+
+        assert asyncio.run(main()) is True
+
+    def test_non_matching_event_does_not_wake(self):
+        notifier = EventNotifier()
+
+        async def main():
+            with notifier.subscribe(lambda e: e.channel == "repo:mine") as waiter:
+                notifier.publish(_event(channel="repo:other"))
+                return await waiter.wait(0.1)
+
+        assert asyncio.run(main()) is False
+
+    def test_publish_before_wait_is_not_lost(self):
+        """The race the subscribe-first ordering exists for: an event landing
+        between the reader's query and its wait must still wake it."""
+        notifier = EventNotifier()
+
+        async def main():
+            with notifier.subscribe(lambda e: True) as waiter:
+                notifier.publish(_event())
+                await asyncio.sleep(0)  # let the thread-safe callback run
+                return await waiter.wait(0.1)
+
+        assert asyncio.run(main()) is True
+
+    def test_waiter_is_removed_on_exit(self):
+        notifier = EventNotifier()
+
+        async def main():
+            with notifier.subscribe(lambda e: True):
+                assert notifier.waiter_count() == 1
+            return notifier.waiter_count()
+
+        assert asyncio.run(main()) == 0
+
+    def test_raising_predicate_wakes_rather_than_strands(self):
+        notifier = EventNotifier()
+
+        def broken(event):
+            raise KeyError("boom")
+
+        async def main():
+            with notifier.subscribe(broken) as waiter:
+                notifier.publish(_event())
+                return await waiter.wait(1)
+
+        assert asyncio.run(main()) is True
+
+
+class TestEventMatches:
+    def test_filters_mirror_get_events(self):
+        e = _event(channel="repo:x", event_type="ci_failed", correlation_id="c1")
+        assert server._event_matches(e)
+        assert server._event_matches(e, channel="repo:x")
+        assert not server._event_matches(e, channel="repo:y")
+        assert server._event_matches(e, event_types=["ci_failed", "other"])
+        assert not server._event_matches(e, event_types=["other"])
+        assert server._event_matches(e, correlation_id="c1")
+        assert not server._event_matches(e, correlation_id="c2")
+
+    def test_min_level_uses_the_effective_signal_level(self):
+        lifecycle = _event(event_type="session_registered")
+        assert not server._event_matches(lifecycle, min_level="info")
+        dm = _event(channel="session:abc", event_type="session_registered")
+        assert server._event_matches(dm, min_level="actionable")
+
+
+class TestGetEventsLongPoll:
+    def test_returns_immediately_when_events_are_pending(self):
+        first = server._publish_event_impl(event_type="ready", payload="x")
+
+        async def main():
+            start = time.monotonic()
+            result = await server.get_events.fn(
+                cursor=str(first["event_id"] - 1), order="asc", wait_seconds=5
+            )
+            return result, time.monotonic() - start
+
+        result, elapsed = asyncio.run(main())
+        assert [e["id"] for e in result["events"]] == [first["event_id"]]
+        assert elapsed < 2
+
+    def test_wakes_on_a_publish_during_the_wait(self):
+        tip = server._publish_event_impl(event_type="before", payload="x")["event_id"]
+
+        async def main():
+            poll = asyncio.create_task(
+                server.get_events.fn(cursor=str(tip), order="asc", wait_seconds=10)
+            )
+            published = await _publish_later(0.1, event_type="after", payload="y")
+            result = await asyncio.wait_for(poll, 5)
+            return result, published
+
+        result, published = asyncio.run(main())
+        assert [e["id"] for e in result["events"]] == [published["event_id"]]
+
+    def test_times_out_with_an_empty_batch(self):
+        tip = server._publish_event_impl(event_type="before", payload="x")["event_id"]
+
+        async def main():
+            start = time.monotonic()
+            result = await server.get_events.fn(cursor=str(tip), wait_seconds=0.2)
+            return result, time.monotonic() - start
+
+        result, elapsed = asyncio.run(main())
+        assert result["events"] == []
+        assert result["next_cursor"] == str(tip)
+        assert 0.2 <= elapsed < 2
+
+    def test_events_outside_the_filter_do_not_end_the_wait(self):
+        tip = server._publish_event_impl(event_type="before", payload="x")["event_id"]
+
+        async def main():
+            poll = asyncio.create_task(
+                server.get_events.fn(
+                    cursor=str(tip), order="asc", channel="repo:mine", wait_seconds=10
+                )
+            )
+            await _publish_later(0.05, event_type="noise", payload="n", channel="repo:other")
+            await asyncio.sleep(0.1)
+            assert not poll.done()
+            wanted = await _publish_later(0, event_type="signal", payload="s", channel="repo:mine")
+            return await asyncio.wait_for(poll, 5), wanted
+
+        result, wanted = asyncio.run(main())
+        assert [e["id"] for e in result["events"]] == [wanted["event_id"]]
+
+    def test_min_level_filtered_noise_does_not_end_the_wait(self):
+        tip = server._publish_event_impl(event_type="before", payload="x")["event_id"]
+
+        async def main():
+            poll = asyncio.create_task(
+                server.get_events.fn(
+                    cursor=str(tip), order="asc", min_level="actionable", wait_seconds=10
+                )
+            )
+            await _publish_later(0.05, event_type="task_started", payload="lifecycle")
+            await asyncio.sleep(0.1)
+            assert not poll.done()
+            wanted = await _publish_later(0, event_type="help_needed", payload="help")
+            return await asyncio.wait_for(poll, 5), wanted
+
+        result, wanted = asyncio.run(main())
+        assert [e["id"] for e in result["events"]] == [wanted["event_id"]]
+
+    def test_resume_long_poll_consumes_like_a_normal_poll(self):
+        reg = server._register_session_impl(
+            name="waiter", machine="test-machine", cwd="/test/repo", client_id="lp-client"
+        )
+        sid = reg["session_id"]
+        server._get_events_impl(session_id=sid, resume=True, order="asc")  # drain
+
+        async def main():
+            poll = asyncio.create_task(
+                server.get_events.fn(session_id=sid, resume=True, order="asc", wait_seconds=10)
+            )
+            published = await _publish_later(0.1, event_type="for_you", payload="z")
+            return await asyncio.wait_for(poll, 5), published
+
+        result, published = asyncio.run(main())
+        assert [e["id"] for e in result["events"]] == [published["event_id"]]
+        assert server.storage.get_session(sid).last_cursor == str(published["event_id"])
+
+    def _cursorless_session(self) -> str:
+        sid = server._register_session_impl(
+            name="waiter", machine="test-machine", cwd="/test/repo", client_id="lp-peek"
+        )["session_id"]
+        assert server.storage.get_session(sid).last_cursor is None
+        return sid
+
+    def _non_consuming_resume_wakes(self, **filters):
+        sid = self._cursorless_session()
+
+        async def main():
+            poll = asyncio.create_task(
+                server.get_events.fn(session_id=sid, resume=True, wait_seconds=10, **filters)
+            )
+            published = await _publish_later(0.1, event_type="for_you", payload="z")
+            return await asyncio.wait_for(poll, 5), published
+
+        result, published = asyncio.run(main())
+        assert [e["id"] for e in result["events"]] == [published["event_id"]]
+        # Still non-consuming: the session has no saved cursor afterwards either
+        assert server.storage.get_session(sid).last_cursor is None
+
+    def test_peek_resume_without_a_saved_cursor_returns_the_waking_event(self):
+        self._non_consuming_resume_wakes(peek=True)
+
+    def test_narrowed_resume_without_a_saved_cursor_returns_the_waking_event(self):
+        self._non_consuming_resume_wakes(channel="all")
+
+    def test_tag_narrowed_resume_without_a_saved_cursor_returns_the_waking_event(self):
+        sid = self._cursorless_session()
+
+        async def main():
+            poll = asyncio.create_task(
+                server.get_events.fn(session_id=sid, resume=True, tags=["ci"], wait_seconds=10)
+            )
+            published = await _publish_later(0.1, event_type="for_you", payload="z", tags=["ci"])
+            return await asyncio.wait_for(poll, 5), published
+
+        result, published = asyncio.run(main())
+        assert [e["id"] for e in result["events"]] == [published["event_id"]]
+
+    def test_deleted_session_error_returns_without_waiting(self):
+        reg = server._register_session_impl(
+            name="gone", machine="test-machine", cwd="/test/repo", client_id="lp-gone"
+        )
+        server.storage.delete_session(reg["session_id"])
+
+        async def main():
+            start = time.monotonic()
+            result = await server.get_events.fn(
+                session_id=reg["session_id"], resume=True, wait_seconds=10
+            )
+            return result, time.monotonic() - start
+
+        result, elapsed = asyncio.run(main())
+        assert result["session_deleted"] is True
+        assert elapsed < 2
+
+    def test_waiting_holds_no_worker_thread(self):
+        """The point of the notifier: a parked reader is a coroutine, so the
+        waiter count rises while the worker pool is untouched."""
+        tip = server._publish_event_impl(event_type="before", payload="x")["event_id"]
+
+        async def main():
+            polls = [
+                asyncio.create_task(server.get_events.fn(cursor=str(tip), wait_seconds=10))
+                for _ in range(50)
+            ]
+            for _ in range(200):
+                if server.notifier.waiter_count() >= 50:
+                    break
+                await asyncio.sleep(0.01)
+            parked = server.notifier.waiter_count()
+            threads_while_parked = threading.active_count()
+            await _publish_later(0, event_type="wake", payload="all")
+            await asyncio.wait_for(asyncio.gather(*polls), 5)
+            return parked, threads_while_parked
+
+        parked, threads = asyncio.run(main())
+        assert parked == 50
+        assert threads < 50
@@ -0,0 +1,254 @@
+"""Tests for bulk publish: add_events, the publish_events tool, and the CLI."""
+
+import asyncio
+import io
+import sys
+from argparse import Namespace
+from unittest.mock import patch
+
+import pytest
+
+from agent_event_bus import cli, server
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
+
+class TestStorageAddEvents:
+    def test_returns_events_in_order_with_increasing_ids(self, storage):
+        events = storage.add_events(
+            [
+                {"event_type": "a", "payload": "1", "session_id": "s"},
+                {
+                    "event_type": "b",
+                    "payload": "2",
+                    "session_id": "s",
+                    "channel": "repo:x",
+                    "correlation_id": "t-1",
+                    "meta": {"tags": ["ci"]},
+                },
+            ]
+        )
+        assert [e.event_type for e in events] == ["a", "b"]
+        assert events[0].id < events[1].id
+        stored, _, _ = storage.get_events(order="asc")
+        assert [e.id for e in stored] == [e.id for e in events]
+        assert [e.id for e in storage.get_events(tags=["ci"])[0]] == [events[1].id]
+        assert storage.get_events(correlation_id="t-1")[0][0].channel == "repo:x"
+
+    def test_empty_batch(self, storage):
+        assert storage.add_events([]) == []
+        assert storage.event_count() == 0
+
+    def test_large_payloads_round_trip(self, storage):
+        large = "line\n" * 1000
+        (event,) = storage.add_events([{"event_type": "log", "payload": large, "session_id": "s"}])
+        assert storage.get_events()[0][0].payload == large
+        assert event.payload == large
+
+    def test_joins_an_open_transaction(self, storage):
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.add_events([{"event_type": "a", "payload": "1", "session_id": "s"}])
+                raise RuntimeError("abort")
+        assert storage.event_count() == 0
+
+    def test_bad_item_writes_nothing(self, storage):
+        with pytest.raises(TypeError):
+            storage.add_events(
+                [
+                    {"event_type": "a", "payload": "1", "session_id": "s"},
+                    {"event_type": "b", "payload": "2", "session_id": "s", "bogus": 1},
+                ]
+            )
+        assert storage.event_count() == 0
+
+
+class TestPublishEventsImpl:
+    def test_publishes_every_event(self):
+        result = server._publish_events_impl(
+            events=[
+                {"event_type": "test_failed", "payload": "test_a", "tags": ["ci"]},
+                {
+                    "event_type": "note",
+                    "payload": "b",
+                    "channel": "repo:x",
+                    "title": "B",
+                    "signal_level": "actionable",
+                },
+            ],
+            session_id="publisher",
+        )
+        assert result["count"] == 2
+        first, second = result["event_ids"]
+        events = server._get_events_impl(cursor=str(first - 1), order="asc")["events"]
+        assert [e["id"] for e in events] == [first, second]
+        assert events[0]["tags"] == ["ci"]
+        assert events[0]["session_id"] == "publisher"
+        assert events[1]["channel"] == "repo:x"
+        assert events[1]["title"] == "B"
+        assert events[1]["signal_level"] == "actionable"
+
+    @pytest.mark.parametrize(
+        "events, error",
+        [
+            (["not an object"], "Event 0: expected an object"),
+            ([{"payload": "p"}], "Event 0: event_type must be a string"),
+            ([{"event_type": "t", "payload": 3}], "Event 0: payload must be a string"),
+            ([{"event_type": "t", "payload": "p", "session_id": "x"}], "unknown field"),
+            ([{"event_type": "t", "payload": "p", "channel": 1}], "channel must be a string"),
+            ([{"event_type": "t", "payload": "p", "title": ["a"]}], "title must be a string"),
+            (
+                [{"event_type": "t", "payload": "p", "correlation_id": 7}],
+                "correlation_id must be a string",
+            ),
+            (
+                [{"event_type": "t", "payload": "p", "signal_level": ["a"]}],
+                "signal_level must be a string",
+            ),
+            ([{"event_type": "t", "payload": "p", "tags": "ci"}], "tags must be a list"),
+            ([{"event_type": "t", "payload": "p", "tags": ["ci", 1]}], "tags must be a list"),
+        ],
+    )
+    def test_malformed_batch_is_rejected_whole(self, events, error):
+        before = server.storage.event_count()
+        batch = [{"event_type": "ok", "payload": "fine"}, *events]
+        result = server._publish_events_impl(events=batch)
+        assert error.replace("Event 0", "Event 1") in result["error"]
+        assert server.storage.event_count() == before
+
+    def test_unknown_signal_level_is_stored_with_a_warning(self, caplog):
+        """Soft validation (RFC #121), as for publish_event: warned, never rejected."""
+        result = server._publish_events_impl(
+            events=[{"event_type": "t", "payload": "p", "signal_level": "urgent"}],
+        )
+        (event_id,) = result["event_ids"]
+        assert "Unknown signal_level 'urgent'" in caplog.text
+        (event,) = server._get_events_impl(cursor=str(event_id - 1), order="asc")["events"]
+        assert event["id"] == event_id
+
+    def test_batch_size_is_capped(self, monkeypatch):
+        monkeypatch.setattr(server, "MAX_PUBLISH_BATCH", 2)
+        result = server._publish_events_impl(
+            events=[{"event_type": "t", "payload": "p"}] * 3,
+        )
+        assert result == {"error": "Too many events: 3 (max 2 per call)"}
+
+    def test_webhook_dispatch_is_one_pass(self):
+        with patch("agent_event_bus.server._schedule_webhook_dispatch") as mock_dispatch:
+            result = server._publish_events_impl(
+                events=[{"event_type": "t", "payload": str(i)} for i in range(3)]
+            )
+        mock_dispatch.assert_called_once()
+        assert [e.id for e in mock_dispatch.call_args[0]] == result["event_ids"]
+
+    def test_deleted_session_is_flagged(self):
+        reg = server._register_session_impl(name="batch-orphan", client_id="batch-orphan-client")
+        server.storage.delete_session(reg["session_id"])
+        result = server._publish_events_impl(
+            events=[{"event_type": "note", "payload": "p"}], session_id=reg["session_id"]
+        )
+        assert result["count"] == 1
+        assert result["session_deleted"] is True
+        assert "error" not in result
+
+
+class TestBatchDispatch:
+    def test_delivers_every_match_in_one_claim(self, monkeypatch):
+        """One worker-thread hop to claim the batch's deliveries, every
+        delivery gathered together, and one hop to record the outcomes."""
+        every = server.storage.add_webhook(url="https://every.test")
+        only_b = server.storage.add_webhook(url="https://only-b.test", event_types=["b"])
+        server.storage.add_events(
+            [
+                {"event_type": "a", "payload": "1", "session_id": "s"},
+                {"event_type": "b", "payload": "2", "session_id": "s"},
+            ]
+        )
+        hops = []
+        real_run_sync = server.anyio.to_thread.run_sync
+
+        async def counting_run_sync(func, *args):
+            hops.append(func)
+            return await real_run_sync(func, *args)
+
+        monkeypatch.setattr(server.anyio.to_thread, "run_sync", counting_run_sync)
+        delivered = []
+
+        async def fake_deliver(webhook, event, bodies=None):
+            delivered.append((webhook.id, event.event_type))
+            return None
+
+        monkeypatch.setattr(server, "_deliver_webhook", fake_deliver)
+
+        asyncio.run(server._dispatch_webhooks())
+
+        assert len(hops) == 2
+        assert sorted(delivered) == [(every.id, "a"), (every.id, "b"), (only_b.id, "b")]
+        assert server.storage.list_webhook_deliveries() == []
+
+
+def _batch_args(**overrides) -> Namespace:
+    defaults = dict(channel=None, session_id=None, url=None)
+    defaults.update(overrides)
+    return Namespace(**defaults)
+
+
+class TestCmdPublishBatch:
+    @patch("agent_event_bus.cli.call_tool")
+    def test_reads_ndjson_from_stdin(self, mock_call, monkeypatch):
+        monkeypatch.delenv("AGENT_EVENT_BUS_SESSION_ID", raising=False)
+        monkeypatch.delenv("CLAUDE_CODE_SESSION_ID", raising=False)
+        mock_call.return_value = {"event_ids": [1, 2], "count": 2}
+        stdin = '{"event_type": "a", "payload": "1"}\n\n{"event_type": "b", "payload": "2"}\n'
+        monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+        cli.cmd_publish_batch(_batch_args(session_id="me"))
+        mock_call.assert_called_once_with(
+            "publish_events",
+            {
+                "events": [
+                    {"event_type": "a", "payload": "1"},
+                    {"event_type": "b", "payload": "2"},
+                ],
+                "session_id": "me",
+            },
+            url=None,
+        )
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_channel_is_a_default(self, mock_call, monkeypatch):
+        mock_call.return_value = {"event_ids": [1, 2], "count": 2}
+        stdin = (
+            '{"event_type": "a", "payload": "1"}\n'
+            '{"event_type": "b", "payload": "2", "channel": "repo:own"}\n'
+        )
+        monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+        cli.cmd_publish_batch(_batch_args(channel="repo:x"))
+        events = mock_call.call_args[0][1]["events"]
+        assert [e["channel"] for e in events] == ["repo:x", "repo:own"]
+
+    @pytest.mark.parametrize("line", ["{not json", "[1, 2]"])
+    @patch("agent_event_bus.cli.call_tool")
+    def test_bad_line_exits_before_publishing(self, mock_call, monkeypatch, capsys, line):
+        monkeypatch.setattr(
+            sys, "stdin", io.StringIO('{"event_type": "a", "payload": "1"}\n' + line)
+        )
+        with pytest.raises(SystemExit):
+            cli.cmd_publish_batch(_batch_args())
+        assert "line 2" in capsys.readouterr().err
+        mock_call.assert_not_called()
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_error_exits_nonzero(self, mock_call, monkeypatch):
+        mock_call.return_value = {"error": "Too many events: 501 (max 500 per call)"}
+        monkeypatch.setattr(sys, "stdin", io.StringIO(""))
+        with pytest.raises(SystemExit):
+            cli.cmd_publish_batch(_batch_args())
+
+    def test_flags_parse(self):
+        argv = ["cli", "publish-batch", "--channel", "repo:x", "--session-id", "me"]
+        with patch.object(sys, "argv", argv):
+            with patch("agent_event_bus.cli.cmd_publish_batch") as mock_cmd:
+                cli.main()
+        args = mock_cmd.call_args[0][0]
+        assert args.channel == "repo:x"
+        assert args.session_id == "me"
@@ -0,0 +1,285 @@
+"""Tests for event retention (retention.py) and the maintenance thread."""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from agent_event_bus import server
+from agent_event_bus.maintenance import DeadlineTask, PeriodicTask
+from agent_event_bus.retention import (
+    RetentionPolicy,
+    RetentionRule,
+    parse_duration,
+    parse_rules,
+    prune_events,
+)
+from agent_event_bus.storage import Session, SQLiteStorage
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
+
+def _add(storage, age_days: float = 0, **kwargs) -> int:
+    """Add an event and backdate it by `age_days`."""
+    fields = dict(event_type="note", payload="p", session_id="s")
+    fields.update(kwargs)
+    event = storage.add_event(**fields)
+    if age_days:
+        when = datetime.now() - timedelta(days=age_days)
+        if isinstance(storage, SQLiteStorage):
+            with storage._connect() as conn:
+                conn.execute("UPDATE events SET timestamp = ? WHERE id = ?", (when, event.id))
+        else:
+            event.timestamp = when  # the memory backend hands out the Event it stores
+    return event.id
+
+
+def _ids(storage) -> list[int]:
+    events, _, _ = storage.get_events(limit=1000, order="asc")
+    return [e.id for e in events]
+
+
+def _session(storage, session_id: str, cursor: int) -> None:
+    now = datetime.now()
+    storage.add_session(
+        Session(
+            id=session_id,
+            display_id=session_id,
+            name=session_id,
+            machine="m",
+            cwd="/c",
+            repo="r",
+            registered_at=now,
+            last_heartbeat=now,
+            last_cursor=str(cursor),
+        )
+    )
+
+
+def _prune(storage, policy, now=None):
+    return prune_events(storage, policy, server._get_signal_level, now=now)
+
+
+class TestParsing:
+    def test_durations(self):
+        assert parse_duration("90d") == timedelta(days=90)
+        assert parse_duration("12h") == timedelta(hours=12)
+        assert parse_duration("30m") == timedelta(minutes=30)
+        assert parse_duration("45s") == timedelta(seconds=45)
+        assert parse_duration("2") == timedelta(days=2)
+        with pytest.raises(ValueError, match="duration"):
+            parse_duration("two weeks")
+
+    def test_rules(self):
+        rules = parse_rules("level:lifecycle=2d, channel:session:*=90d,type:ci_*=7d")
+        assert rules == (
+            RetentionRule("level", "lifecycle", timedelta(days=2)),
+            RetentionRule("channel", "session:*", timedelta(days=90)),
+            RetentionRule("type", "ci_*", timedelta(days=7)),
+        )
+        assert parse_rules("") == ()
+
+    @pytest.mark.parametrize("bad", ["lifecycle=2d", "size:big=1d", "level:=1d", "level:info"])
+    def test_malformed_rule_rejected(self, bad):
+        with pytest.raises(ValueError, match="retention rule"):
+            parse_rules(bad)
+
+    def test_policy_from_env(self):
+        policy = RetentionPolicy.from_env(
+            {
+                "AGENT_EVENT_BUS_RETENTION_MAX_AGE": "30d",
+                "AGENT_EVENT_BUS_RETENTION_MAX_EVENTS": "1000",
+                "AGENT_EVENT_BUS_RETENTION_RULES": "level:lifecycle=2d",
+                "AGENT_EVENT_BUS_RETENTION_FORCE": "1",
+                "AGENT_EVENT_BUS_RETENTION_INTERVAL": "60",
+            }
+        )
+        assert policy.max_age == timedelta(days=30)
+        assert policy.max_events == 1000
+        assert len(policy.rules) == 1
+        assert policy.force is True
+        assert policy.interval == 60
+
+    def test_empty_env_keeps_everything(self):
+        assert not RetentionPolicy.from_env({}).enabled
+
+    def test_server_rejects_unknown_level(self, monkeypatch):
+        monkeypatch.setenv("AGENT_EVENT_BUS_RETENTION_RULES", "level:urgent=1d")
+        with pytest.raises(ValueError, match="urgent"):
+            server._load_retention_policy()
+
+
+class TestPruneByAge:
+    def test_expired_events_deleted(self, storage):
+        old = _add(storage, age_days=40)
+        recent = _add(storage, age_days=1)
+        newest = _add(storage)
+
+        result = _prune(storage, RetentionPolicy(max_age=timedelta(days=30)))
+
+        assert result.by_age == 1
+        assert _ids(storage) == [recent, newest]
+        assert old not in _ids(storage)
+
+    def test_rules_override_default_both_ways(self, storage):
+        lifecycle = _add(storage, age_days=3, event_type="session_registered")
+        dm = _add(storage, age_days=60, channel="session:abc")
+        note = _add(storage, age_days=60)
+        tip = _add(storage)
+
+        policy = RetentionPolicy(
+            max_age=timedelta(days=30),
+            rules=parse_rules("level:lifecycle=2d,channel:session:*=90d"),
+        )
+        _prune(storage, policy)
+
+        remaining = _ids(storage)
+        assert lifecycle not in remaining  # 3d old, lifecycle keeps 2d
+        assert dm in remaining  # 60d old, DMs keep 90d
+        assert note not in remaining  # 60d old, default 30d
+        assert tip in remaining
+
+    def test_small_batches(self, storage):
+        for _ in range(12):
+            _add(storage, age_days=10)
+        tip = _add(storage)
+
+        policy = RetentionPolicy(max_age=timedelta(days=1), batch_size=5)
+        assert _prune(storage, policy).by_age == 12
+        assert _ids(storage) == [tip]
+
+
+class TestPruneByCount:
+    def test_oldest_go_first(self, storage):
+        ids = [_add(storage) for _ in range(10)]
+
+        result = _prune(storage, RetentionPolicy(max_events=4, batch_size=3))
+
+        assert result.by_count == 6
+        assert _ids(storage) == ids[-4:]
+
+
+class TestPruneSafety:
+    def test_newest_event_always_kept(self, storage):
+        _add(storage, age_days=10)
+        tip = _add(storage, age_days=10)
+
+        _prune(storage, RetentionPolicy(max_age=timedelta(days=1)))
+
+        assert _ids(storage) == [tip]
+        assert storage.get_cursor() == str(tip)
+
+    def test_unread_events_protected_by_active_cursor(self, storage):
+        ids = [_add(storage, age_days=10) for _ in range(5)]
+        _session(storage, "behind", cursor=ids[1])
+
+        _prune(storage, RetentionPolicy(max_age=timedelta(days=1)))
+
+        assert _ids(storage) == ids[2:]
+
+    def test_deleted_sessions_do_not_pin_history(self, storage):
+        ids = [_add(storage, age_days=10) for _ in range(5)]
+        _session(storage, "gone", cursor=ids[0])
+        storage.delete_session("gone")
+
+        _prune(storage, RetentionPolicy(max_age=timedelta(days=1)))
+
+        assert _ids(storage) == ids[-1:]
+
+    def test_force_prunes_past_unread_events(self, storage):
+        ids = [_add(storage, age_days=10) for _ in range(5)]
+        _session(storage, "stuck", cursor=ids[0])
+
+        _prune(storage, RetentionPolicy(max_age=timedelta(days=1), force=True))
+
+        assert _ids(storage) == ids[-1:]
+
+    def test_cursor_below_retained_floor_keeps_working(self):
+        sid = server._register_session_impl(name="r", client_id="retention-reader")["session_id"]
+        stale_cursor = server.storage.get_cursor()
+        for _ in range(3):
+            server._publish_event_impl(event_type="old", payload="x")
+        kept = server._publish_event_impl(event_type="new", payload="y")["event_id"]
+        server.storage.update_session_cursor(sid, str(kept - 1))
+
+        _prune(server.storage, RetentionPolicy(max_events=1))
+
+        result = server._get_events_impl(cursor=stale_cursor, order="asc")
+        assert [e["id"] for e in result["events"]] == [kept]
+
+    def test_disabled_policy_deletes_nothing(self, storage):
+        _add(storage, age_days=1000)
+        _add(storage)
+        assert _prune(storage, RetentionPolicy()).deleted == 0
+        assert len(_ids(storage)) == 2
+
+
+@pytest.mark.sqlite_only
+class TestIncrementalVacuum:
+    def test_fresh_database_uses_incremental_auto_vacuum(self, storage):
+        with storage._connect() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    def test_prune_returns_pages(self, storage):
+        for _ in range(300):
+            _add(storage, age_days=10, payload="x" * 2000)
+        _add(storage)
+
+        result = _prune(storage, RetentionPolicy(max_age=timedelta(days=1)))
+
+        assert result.pages_freed > 0
+        with storage._connect() as conn:
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+class TestPeriodicTask:
+    def test_runs_until_stopped(self):
+        ran = threading.Event()
+        task = PeriodicTask("test-task", 0.01, ran.set)
+        task.start()
+        try:
+            assert ran.wait(2)
+        finally:
+            task.stop()
+
+    def test_failing_run_is_logged_not_fatal(self, caplog):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+
+        task = PeriodicTask("flaky-task", 0.01, flaky)
+        task.start()
+        try:
+            for _ in range(200):
+                if len(calls) >= 2:
+                    break
+                threading.Event().wait(0.01)
+        finally:
+            task.stop()
+        assert len(calls) >= 2
+        assert "flaky-task: run failed" in caplog.text
+
+
+class TestDeadlineTask:
+    def test_runs_when_due(self):
+        ran = threading.Event()
+        due = time.time() + 0.05
+        task = DeadlineTask("deadline-task", 5.0, ran.set, lambda: due, min_wait=0.01)
+        task.start()
+        try:
+            assert ran.wait(2)
+            assert time.time() >= due
+        finally:
+            task.stop()
+
+    def test_nothing_due_never_runs(self):
+        calls = []
+        task = DeadlineTask("idle-task", 0.01, lambda: calls.append(1), lambda: None, min_wait=0.01)
+        task.start()
+        threading.Event().wait(0.1)
+        task.stop()
+        assert calls == []
@@ -0,0 +1,249 @@
+"""Tests for full-text search: the events_fts index, search_events, and the CLI."""
+
+import sys
+from argparse import Namespace
+from unittest.mock import patch
+
+import pytest
+
+from agent_event_bus import cli, server
+from agent_event_bus.storage import SQLiteStorage, _snippet
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
+LOG = "Traceback (most recent call last):\n" + "  frame in handler\n" * 200
+
+
+def _ids(hits) -> list[int]:
+    return [hit.event.id for hit in hits]
+
+
+def _indexed(storage, word: str) -> int:
+    """Rows events_fts holds for `word`, whether or not their event still exists."""
+    with storage._connect() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM events_fts WHERE events_fts MATCH ?", (word,)
+        ).fetchone()[0]
+
+
+class TestStorageSearch:
+    def test_finds_words_in_payloads(self, storage):
+        hit = storage.add_event(
+            event_type="ci_failed", payload="migration step crashed", session_id="s"
+        )
+        storage.add_event(event_type="note", payload="all quiet", session_id="s")
+        assert _ids(storage.search_events("crashed")) == [hit.id]
+
+    def test_stemming_matches_word_forms(self, storage):
+        event = storage.add_event(event_type="note", payload="ran the migrations", session_id="s")
+        assert _ids(storage.search_events("migration")) == [event.id]
+
+    def test_title_matches_rank_first(self, storage):
+        body = storage.add_event(
+            event_type="note", payload="long notes that mention deploy once", session_id="s"
+        )
+        titled = storage.add_event(
+            event_type="note", payload="see title", session_id="s", meta={"title": "deploy"}
+        )
+        hits = storage.search_events("deploy")
+        assert _ids(hits) == [titled.id, body.id]
+        assert hits[0].score > hits[1].score
+
+    def test_filters(self, storage):
+        wanted = storage.add_event(
+            event_type="ci_failed",
+            payload="flaky test",
+            session_id="s",
+            channel="repo:a",
+            correlation_id="t-1",
+            meta={"tags": ["ci"]},
+        )
+        storage.add_event(event_type="ci_failed", payload="flaky test", session_id="s")
+        storage.add_event(event_type="note", payload="flaky test", session_id="s", channel="repo:a")
+        assert _ids(
+            storage.search_events("flaky", channels=["repo:a"], event_types=["ci_failed"])
+        ) == [wanted.id]
+        assert _ids(storage.search_events("flaky", correlation_id="t-1")) == [wanted.id]
+        assert _ids(storage.search_events("flaky", tags=["ci"])) == [wanted.id]
+        assert _ids(storage.search_events("flaky", any_tags=["ci", "x"])) == [wanted.id]
+
+    def test_compressed_payloads_are_searchable(self, storage):
+        event = storage.add_event(event_type="ci_failed", payload=LOG, session_id="s")
+        (hit,) = storage.search_events("traceback")
+        assert hit.event.id == event.id
+        assert "**Traceback**" in hit.snippet
+
+    def test_fts_syntax_and_plain_text_both_work(self, storage):
+        event = storage.add_event(event_type="note", payload="ci-failure in schema", session_id="s")
+        assert _ids(storage.search_events("ci-failure")) == [event.id]
+        assert _ids(storage.search_events('"in schema"')) == [event.id]
+        assert _ids(storage.search_events("schem*")) == [event.id]
+        assert _ids(storage.search_events('schema"')) == [event.id]  # stray quote
+        assert storage.search_events("   ") == []
+
+    def test_limit(self, storage):
+        for _ in range(5):
+            storage.add_event(event_type="note", payload="repeat", session_id="s")
+        assert len(storage.search_events("repeat", limit=3)) == 3
+
+    @pytest.mark.sqlite_only
+    def test_deleted_events_are_unindexed(self, storage):
+        plain = storage.add_event(event_type="note", payload="doomed", session_id="s")
+        large = storage.add_event(event_type="note", payload=LOG + "doomed", session_id="s")
+        kept = storage.add_event(event_type="note", payload="doomed", session_id="s")
+        storage.delete_events([plain.id])
+        assert storage.delete_oldest_events(1, kept.id) == 1  # the compressed one
+        assert _ids(storage.search_events("doomed")) == [kept.id]
+        assert _indexed(storage, "doomed") == 1
+        assert _indexed(storage, "traceback") == 0
+        assert large.id not in _ids(storage.search_events("traceback"))
+
+    @pytest.mark.sqlite_only
+    def test_rolled_back_event_is_not_indexed(self, storage):
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.add_event(event_type="note", payload="phantom", session_id="s")
+                raise RuntimeError("abort")
+        assert _indexed(storage, "phantom") == 0
+
+    def test_migration_indexes_existing_history(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db)
+        plain = storage.add_event(event_type="note", payload="legacy words", session_id="s")
+        large = storage.add_event(
+            event_type="note", payload=LOG, session_id="s", meta={"title": "legacy crash"}
+        )
+        with storage._connect() as conn:
+            conn.execute("DROP TABLE events_fts")
+            conn.execute("UPDATE schema_version SET version = 8")
+        storage.close()
+
+        migrated = SQLiteStorage(db_path=temp_db)
+        assert sorted(_ids(migrated.search_events("legacy"))) == [plain.id, large.id]
+
+
+class TestSnippet:
+    def test_highlights_matches_in_context(self):
+        text = "x " * 100 + "the migration failed" + " y" * 100
+        snippet = _snippet(text, "migration")
+        assert "**migration**" in snippet
+        assert snippet.startswith("…") and snippet.endswith("…")
+        assert len(snippet) < len(text)
+
+    def test_matches_other_word_forms(self):
+        assert "**migrations**" in _snippet("ran migrations", "migration")
+
+    def test_collapses_whitespace(self):
+        assert _snippet("line one\n\n  line two", "two") == "line one line **two**"
+
+    def test_falls_back_to_the_start(self):
+        assert _snippet("nothing relevant here", "absent") == "nothing relevant here"
+
+    def test_operators_are_not_highlighted(self):
+        assert _snippet("cats AND dogs", "cats AND dogs") == "**cats** AND **dogs**"
+
+
+class TestServerSearch:
+    def test_results_carry_event_score_and_snippet(self):
+        # bm25 scores a term found in every document as ~0; give it others to beat
+        for payload in ("unrelated", "also unrelated"):
+            server._publish_event_impl(event_type="note", payload=payload)
+        published = server._publish_event_impl(
+            event_type="ci_failed",
+            payload="xyzzy-unique migration blew up",
+            title="CI red",
+            tags=["ci"],
+        )
+        result = server._search_events_impl(query="xyzzy", tags=["ci"])
+        (hit,) = result["results"]
+        assert hit["id"] == published["event_id"]
+        assert hit["title"] == "CI red"
+        assert hit["score"] > 0
+        assert "**xyzzy**" in hit["snippet"]
+
+    def test_empty_query_is_an_error(self):
+        assert server._search_events_impl(query=" ") == {"error": "Empty search query"}
+
+
+def _search_args(**overrides) -> Namespace:
+    defaults = dict(
+        query="q",
+        limit=None,
+        channel=None,
+        include=None,
+        correlation_id=None,
+        tags=None,
+        any_tags=None,
+        json=False,
+        url=None,
+    )
+    defaults.update(overrides)
+    return Namespace(**defaults)
+
+
+class TestCmdSearch:
+    @patch("agent_event_bus.cli.call_tool")
+    def test_passes_filters(self, mock_call):
+        mock_call.return_value = {"results": []}
+        cli.cmd_search(
+            _search_args(
+                query="migration",
+                limit=5,
+                channel="repo:a",
+                include="ci_failed, ci_passed",
+                correlation_id="t-1",
+                tags="ci",
+                any_tags="a,b",
+            )
+        )
+        assert mock_call.call_args[0][0] == "search_events"
+        assert mock_call.call_args[0][1] == {
+            "query": "migration",
+            "limit": 5,
+            "channel": "repo:a",
+            "event_types": ["ci_failed", "ci_passed"],
+            "correlation_id": "t-1",
+            "tags": ["ci"],
+            "any_tags": ["a", "b"],
+        }
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_prints_snippets(self, mock_call, capsys):
+        mock_call.return_value = {
+            "results": [
+                {
+                    "id": 7,
+                    "event_type": "ci_failed",
+                    "channel": "all",
+                    "session_id": "s",
+                    "timestamp": "2026-01-01T00:00:00",
+                    "score": 1.5,
+                    "snippet": "the **migration** failed",
+                }
+            ]
+        }
+        cli.cmd_search(_search_args())
+        out = capsys.readouterr().out
+        assert "[7] ci_failed (all) score 1.5" in out
+        assert "the **migration** failed" in out
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_no_matches(self, mock_call, capsys):
+        mock_call.return_value = {"results": []}
+        cli.cmd_search(_search_args())
+        assert "No matches" in capsys.readouterr().out
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_error_exits_nonzero(self, mock_call):
+        mock_call.return_value = {"error": "Empty search query"}
+        with pytest.raises(SystemExit):
+            cli.cmd_search(_search_args())
+
+    def test_flags_parse(self):
+        argv = ["cli", "search", "migration failure", "--limit", "3", "--include", "ci_failed"]
+        with patch.object(sys, "argv", argv):
+            with patch("agent_event_bus.cli.cmd_search") as mock_cmd:
+                cli.main()
+        args = mock_cmd.call_args[0][0]
+        assert args.query == "migration failure"
+        assert args.limit == 3
+        assert args.include == "ci_failed"
@@ -1,17 +1,21 @@
 """Tests for MCP server tools."""
 
+import dataclasses
 import logging
 import os
 import socket
 import subprocess
 import sys
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
 import pytest
 
 from agent_event_bus import server
-from agent_event_bus.storage import Session, SQLiteStorage
+from agent_event_bus.storage import SESSION_TIMEOUT, Session, SQLiteStorage
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
 
 # Access the underlying functions from FunctionTool wrappers
 register_session = server._register_session_impl
@@ -224,6 +228,31 @@ class TestListSessions:
         # Session should be deleted
         assert server.storage.get_session("dead-session") is None
 
+    def test_dead_local_clients_deleted_in_one_write(self):
+        """Several dead clients found by one list cost one write, not one each."""
+        hostname = socket.gethostname()
+        now = datetime.now()
+        for i in range(3):
+            server.storage.add_session(
+                Session(
+                    id=f"dead-{i}",
+                    display_id=f"dead-display-{i}",
+                    name="dead",
+                    machine=hostname,
+                    cwd="/test",
+                    repo="test",
+                    registered_at=now,
+                    last_heartbeat=now,
+                    client_id=str(999999990 + i),
+                )
+            )
+
+        with patch.object(
+            server.storage, "delete_session", side_effect=AssertionError("one at a time")
+        ):
+            assert list_sessions() == []
+        assert server.storage.session_count() == 0
+
     def test_list_sessions_ordered_by_most_recent_activity(self):
         """Test that sessions are returned most recently active first."""
         import time
@@ -2412,3 +2441,115 @@ class TestAckRejectionShape:
         assert len(warned) == 2, f"one line per tool, deduped within each: {warned}"
         assert any(m.startswith("get_events:") for m in warned)
         assert any(m.startswith("ack_events:") for m in warned)
+
+
+class TestUnitOfWork:
+    """Tool bodies run as one storage transaction (SQLiteStorage.transaction)."""
+
+    def _count_acquires(self, monkeypatch):
+        calls = []
+        real = server.storage._acquire
+        caller = threading.current_thread()
+
+        def counting(readonly=False):
+            # This thread only: publish_event's background webhook dispatch
+            # reads storage from its own thread. Both lanes count.
+            if threading.current_thread() is caller:
+                calls.append(1)
+            return real(readonly)
+
+        monkeypatch.setattr(server.storage, "_acquire", counting)
+        return calls
+
+    @pytest.mark.sqlite_only
+    def test_get_events_from_memory_uses_no_connection(self, monkeypatch):
+        sid = register_session(name="uow", client_id="uow-get")["session_id"]
+        get_events(session_id=sid, resume=True)  # initialize the saved cursor
+        publish_event(event_type="t", payload="p")
+        calls = self._count_acquires(monkeypatch)
+
+        # Session cache, recent-events window, buffered heartbeat and cursor:
+        # the lazy unit of work never begins
+        result = get_events(session_id=sid, resume=True, order="asc")
+
+        assert result["events"]
+        assert calls == []
+
+    @pytest.mark.sqlite_only
+    def test_get_events_uses_one_connection(self, monkeypatch):
+        monkeypatch.setattr(server.storage, "_recent", None)
+        sid = register_session(name="uow", client_id="uow-get-sql")["session_id"]
+        get_events(session_id=sid, resume=True)
+        publish_event(event_type="t", payload="p")
+        calls = self._count_acquires(monkeypatch)
+
+        result = get_events(session_id=sid, resume=True, order="asc")
+
+        assert result["events"]
+        assert len(calls) == 1
+
+    @pytest.mark.sqlite_only
+    def test_register_and_ack_use_one_connection(self, monkeypatch):
+        calls = self._count_acquires(monkeypatch)
+        sid = register_session(name="uow", client_id="uow-reg")["session_id"]
+        assert len(calls) == 1
+
+        ack_events(session_id=sid, cursor=server.storage.get_cursor())
+        assert len(calls) == 3  # get_cursor above, then the ack
+
+    def test_registration_event_announced_only_after_commit(self, monkeypatch):
+        announced = []
+        monkeypatch.setattr(
+            server.notifier, "publish", lambda e: announced.append(server.storage.get_cursor())
+        )
+        with server.storage.transaction():
+            register_session(name="uow", client_id="uow-announce")
+            assert announced == []
+        # Announced with the row already committed and visible
+        assert announced == [server.storage.get_cursor()]
+
+    def test_failed_unit_leaves_no_partial_writes(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        before = server.storage.get_cursor()
+        monkeypatch.setattr(server.storage, "session_count", fail)
+        with pytest.raises(RuntimeError):
+            register_session(name="uow", client_id="uow-fail")
+
+        # add_session and the registration event rolled back with it
+        monkeypatch.undo()
+        assert server.storage.get_session("uow-fail") is None
+        assert server.storage.get_cursor() == before
+
+
+class TestSessionExpiry:
+    """Timed-out sessions are deleted by the expiry task, not by tool calls."""
+
+    def _age(self, sid: str) -> None:
+        stale = datetime.now() - timedelta(seconds=SESSION_TIMEOUT + 60)
+        session = server.storage.get_session(sid)
+        server.storage.add_session(dataclasses.replace(session, last_heartbeat=stale))
+
+    def test_tool_calls_do_not_sweep(self):
+        stale = register_session(name="expiring", client_id="exp-stale")["session_id"]
+        self._age(stale)
+
+        register_session(name="other", client_id="exp-other")
+        get_events()
+        list_sessions()
+
+        assert server.storage.get_session(stale) is not None
+
+    def test_expiry_announces_each_session(self):
+        sid = register_session(name="expiring", client_id="exp-announce")["session_id"]
+        self._age(sid)
+
+        assert server._expire_sessions() == 1
+
+        assert server.storage.get_session(sid) is None
+        events = get_events(limit=5)["events"]
+        ended = [e for e in events if e["session_id"] == sid]
+        assert ended[0]["event_type"] == "session_unregistered"
+        assert "expired" in ended[0]["payload"]
+        assert server._expire_sessions() == 0
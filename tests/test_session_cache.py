@@ -0,0 +1,365 @@
+"""Tests for the write-through session cache (session_cache.py) in SQLiteStorage."""
+
+import sqlite3
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from agent_event_bus.session_cache import SessionCache
+from agent_event_bus.storage import SESSION_TIMEOUT, Session, SQLiteStorage
+
+# The cache and the heartbeat/cursor buffers are SQLiteStorage's machinery.
+pytestmark = pytest.mark.sqlite_only
+
+
+def _session(session_id: str, client_id: str = "c", age: timedelta = timedelta(0)) -> Session:
+    at = datetime.now() - age
+    return Session(
+        id=session_id,
+        display_id=f"d-{session_id}",
+        name=session_id,
+        machine="m",
+        cwd="/c",
+        repo="r",
+        registered_at=at,
+        last_heartbeat=at,
+        client_id=client_id,
+    )
+
+
+def _no_sqlite(storage):
+    return patch.object(storage, "_connect", side_effect=AssertionError("hit SQLite"))
+
+
+def _snapshot(storage) -> tuple:
+    return (
+        [(s.id, s.last_heartbeat, s.last_cursor) for s in storage.list_sessions()],
+        storage.session_count(),
+        [storage.get_session(i, include_deleted=True) for i in ("a", "b", "c", "nope")],
+        storage.find_session_by_client("m", "c", include_deleted=True),
+        storage.find_session_by_client("m", "c"),
+    )
+
+
+class TestSessionCache:
+    def test_reads_skip_sqlite(self, storage):
+        storage.add_session(_session("a"))
+        with _no_sqlite(storage):
+            assert storage.get_session("a").name == "a"
+            assert storage.get_session("missing") is None
+            assert storage.find_session_by_client("m", "c").id == "a"
+            assert [s.id for s in storage.list_sessions()] == ["a"]
+            assert storage.session_count() == 1
+            assert storage.cleanup_stale_sessions() == 0
+
+    def test_matches_sqlite_through_every_write(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db, heartbeat_flush_seconds=0)
+        uncached = SQLiteStorage(db_path=temp_db, session_cache=False)
+        storage.add_session(_session("a", age=timedelta(hours=2)))
+        storage.add_session(_session("b", client_id="other"))
+        storage.add_session(_session("c", age=timedelta(days=2)))
+        assert _snapshot(storage) == _snapshot(uncached)
+
+        storage.update_heartbeat("a", datetime.now())
+        storage.update_session_cursor("b", "42")
+        assert _snapshot(storage) == _snapshot(uncached)
+
+        assert storage.cleanup_stale_sessions() == 1  # "c"
+        storage.delete_session("a")
+        assert _snapshot(storage) == _snapshot(uncached)
+
+        # Writes to deleted sessions change nothing, in either copy
+        assert not storage.update_heartbeat("a", datetime.now())
+        assert not storage.update_session_cursor("c", "7")
+        assert _snapshot(storage) == _snapshot(uncached)
+
+    def test_loaded_at_startup(self, storage, temp_db):
+        storage.add_session(_session("a"))
+        reopened = SQLiteStorage(db_path=temp_db)
+        with _no_sqlite(reopened):
+            assert reopened.get_session("a").display_id == "d-a"
+
+    def test_returned_sessions_are_copies(self, storage):
+        storage.add_session(_session("a"))
+        storage.get_session("a").name = "mutated"
+        assert storage.get_session("a").name == "a"
+
+    def test_rolled_back_writes_never_reach_the_cache(self, storage):
+        storage.add_session(_session("a"))
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.update_session_cursor("a", "99")
+                storage.delete_session("a")
+                raise RuntimeError("boom")
+        session = storage.get_session("a")
+        assert session is not None
+        assert session.last_cursor is None
+
+    def test_transaction_reads_its_own_writes(self, storage):
+        storage.add_session(_session("a"))
+        with storage.transaction():
+            storage.update_session_cursor("a", "5")
+            assert storage.get_session("a").last_cursor == "5"
+            assert storage._sessions.get("a").last_cursor is None  # not committed yet
+        assert storage.get_session("a").last_cursor == "5"
+
+    def test_invalidate_picks_up_outside_writes(self, storage, temp_db):
+        storage.add_session(_session("a"))
+        conn = sqlite3.connect(temp_db)
+        conn.execute("UPDATE sessions SET name = 'renamed' WHERE id = 'a'")
+        conn.commit()
+        conn.close()
+        assert storage.get_session("a").name == "a"  # stale until told
+
+        storage.invalidate_sessions("a")
+        assert storage.get_session("a").name == "renamed"
+
+    def test_stale_finds_only_expired_sessions(self):
+        cache = SessionCache()
+        cache.load([_session("old", age=timedelta(hours=3)), _session("new")])
+        cache.put(_session("older", age=timedelta(hours=5)))
+        cutoff = datetime.now() - timedelta(hours=1)
+
+        assert [s.id for s in cache.stale(cutoff)] == ["older", "old"]
+        assert [s.id for s in cache.stale(cutoff)] == ["older", "old"]  # still due
+
+        cache.update("older", deleted_at=datetime.now())
+        cache.update("old", last_heartbeat=datetime.now())
+        assert cache.stale(cutoff) == []
+
+    def test_oldest_heartbeat_tracks_the_heap(self):
+        cache = SessionCache()
+        assert cache.oldest_heartbeat() is None
+        old = _session("a", age=timedelta(hours=3))
+        cache.put(old)
+        cache.put(_session("b"))
+        assert cache.oldest_heartbeat() == old.last_heartbeat
+
+        cache.update("a", last_heartbeat=datetime.now())
+        cache.stale(datetime.now() - timedelta(hours=1))  # re-arms "a"
+        assert cache.oldest_heartbeat() > old.last_heartbeat
+
+    def test_disabled_from_env(self, temp_db, monkeypatch):
+        monkeypatch.setenv("AGENT_EVENT_BUS_SESSION_CACHE", "0")
+        storage = SQLiteStorage(db_path=temp_db)
+        assert storage._sessions is None
+        storage.add_session(_session("a"))
+        storage.update_heartbeat("a", datetime.now())
+        assert storage.get_session("a").id == "a"
+
+
+def _stored_heartbeat(temp_db, session_id: str) -> str:
+    conn = sqlite3.connect(temp_db)
+    try:
+        return conn.execute(
+            "SELECT last_heartbeat FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestBufferedHeartbeats:
+    def test_heartbeat_is_memory_only_until_flushed(self, storage, temp_db):
+        storage.add_session(_session("a", age=timedelta(hours=1)))
+        before = _stored_heartbeat(temp_db, "a")
+        now = datetime.now()
+
+        with _no_sqlite(storage):
+            assert storage.update_heartbeat("a", now)
+            assert storage.get_session("a").last_heartbeat == now
+            assert storage.list_sessions()[0].last_heartbeat == now
+        assert _stored_heartbeat(temp_db, "a") == before
+
+        assert storage.flush_heartbeats() == 1
+        assert _stored_heartbeat(temp_db, "a") == now.isoformat()
+        assert storage.flush_heartbeats() == 0
+
+    def test_unknown_or_deleted_session(self, storage):
+        storage.add_session(_session("a"))
+        storage.delete_session("a")
+        assert not storage.update_heartbeat("a", datetime.now())
+        assert not storage.update_heartbeat("never", datetime.now())
+
+    def test_flush_never_moves_backwards_or_revives(self, storage, temp_db):
+        storage.add_session(_session("a"))
+        storage.add_session(_session("b"))
+        old = datetime.now() - timedelta(minutes=5)
+        storage.update_heartbeat("a", old)
+        storage.update_heartbeat("b", datetime.now())
+        storage.add_session(_session("a"))  # re-registered with a fresh heartbeat
+        fresh = _stored_heartbeat(temp_db, "a")
+        storage.delete_session("b")
+
+        storage.flush_heartbeats()
+
+        assert _stored_heartbeat(temp_db, "a") == fresh
+        assert storage.get_session("b") is None
+
+    def test_stale_sweep_sees_buffered_heartbeats(self, storage):
+        storage.add_session(_session("a", age=timedelta(days=2)))
+        storage.add_session(_session("b", age=timedelta(days=2)))
+        storage.update_heartbeat("a", datetime.now())
+
+        assert storage.cleanup_stale_sessions() == 1
+        assert storage.get_session("a") is not None
+        assert storage.get_session("b") is None
+
+    def test_rolled_back_flush_keeps_heartbeats(self, storage, temp_db):
+        storage.add_session(_session("a", age=timedelta(hours=1)))
+        before = _stored_heartbeat(temp_db, "a")
+        storage.update_heartbeat("a", datetime.now())
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.flush_heartbeats()
+                raise RuntimeError("boom")
+        assert _stored_heartbeat(temp_db, "a") == before
+        assert storage.flush_heartbeats() == 1
+
+    def test_close_flushes(self, storage, temp_db):
+        storage.add_session(_session("a", age=timedelta(hours=1)))
+        now = datetime.now()
+        storage.update_heartbeat("a", now)
+        storage.close()
+        assert _stored_heartbeat(temp_db, "a") == now.isoformat()
+
+    def test_write_through_when_disabled(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db, heartbeat_flush_seconds=0)
+        storage.add_session(_session("a", age=timedelta(hours=1)))
+        now = datetime.now()
+        storage.update_heartbeat("a", now)
+        assert _stored_heartbeat(temp_db, "a") == now.isoformat()
+
+
+def _stored_cursor(temp_db, session_id: str) -> str | None:
+    conn = sqlite3.connect(temp_db)
+    try:
+        return conn.execute(
+            "SELECT last_cursor FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestBufferedCursors:
+    def test_advance_is_memory_only_until_flushed(self, storage, temp_db):
+        storage.add_session(_session("a"))
+        with _no_sqlite(storage):
+            assert storage.advance_session_cursor("a", "10")
+            assert storage.get_session("a").last_cursor == "10"
+        assert _stored_cursor(temp_db, "a") is None
+
+        assert storage.flush_cursors() == 1
+        assert _stored_cursor(temp_db, "a") == "10"
+        assert storage.flush_cursors() == 0
+
+    def test_only_moves_forward(self, storage, temp_db):
+        storage.add_session(_session("a"))
+        storage.advance_session_cursor("a", "10")
+        assert storage.advance_session_cursor("a", "9")
+        assert storage.get_session("a").last_cursor == "10"
+
+        storage.update_session_cursor("a", "20")  # written through
+        storage.advance_session_cursor("a", "15")
+        assert storage.flush_cursors() == 0
+        assert _stored_cursor(temp_db, "a") == "20"
+
+    def test_ack_replaces_pending_advance(self, storage, temp_db):
+        storage.add_session(_session("a"))
+        storage.advance_session_cursor("a", "10")
+        storage.update_session_cursor("a", "3")  # a deliberate rewind
+
+        assert storage.flush_cursors() == 0
+        assert _stored_cursor(temp_db, "a") == "3"
+        assert storage.get_session("a").last_cursor == "3"
+
+    def test_unknown_or_deleted_session(self, storage, temp_db):
+        storage.add_session(_session("a"))
+        storage.advance_session_cursor("a", "5")
+        storage.delete_session("a")
+        assert not storage.advance_session_cursor("a", "6")
+        assert not storage.advance_session_cursor("never", "6")
+
+        storage.flush_cursors()
+        assert _stored_cursor(temp_db, "a") is None
+
+    def test_rolled_back_flush_keeps_advances(self, storage, temp_db):
+        storage.add_session(_session("a"))
+        storage.advance_session_cursor("a", "10")
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.flush_cursors()
+                raise RuntimeError("boom")
+        assert _stored_cursor(temp_db, "a") is None
+        assert storage.flush_cursors() == 1
+        assert _stored_cursor(temp_db, "a") == "10"
+
+    def test_close_flushes(self, storage, temp_db):
+        storage.add_session(_session("a"))
+        storage.advance_session_cursor("a", "10")
+        storage.close()
+        assert _stored_cursor(temp_db, "a") == "10"
+
+    def test_write_through_when_disabled(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db, cursor_flush_seconds=0)
+        storage.add_session(_session("a"))
+        assert storage.advance_session_cursor("a", "10")
+        assert storage.advance_session_cursor("a", "4")
+        assert _stored_cursor(temp_db, "a") == "10"
+        assert storage.get_session("a").last_cursor == "10"
+        assert not storage.advance_session_cursor("never", "1")
+
+
+class TestLazyTransaction:
+    def test_no_connection_until_first_statement(self, storage):
+        storage.add_session(_session("a"))
+        with (
+            _no_sqlite(storage),
+            patch.object(storage, "_acquire", side_effect=AssertionError("began")),
+        ):
+            with storage.transaction(lazy=True):
+                assert storage.get_session("a") is not None
+                storage.update_heartbeat("a", datetime.now())
+                storage.advance_session_cursor("a", "1")
+
+    def test_begins_on_first_write_and_commits(self, storage):
+        storage.add_session(_session("a"))
+        with storage.transaction(lazy=True):
+            storage.update_session_cursor("a", "7")
+            assert storage.get_session("a").last_cursor == "7"
+        assert storage.get_session("a").last_cursor == "7"
+
+    def test_rolls_back(self, storage):
+        storage.add_session(_session("a"))
+        with pytest.raises(RuntimeError):
+            with storage.transaction(lazy=True):
+                storage.update_session_cursor("a", "7")
+                raise RuntimeError("boom")
+        assert storage.get_session("a").last_cursor is None
+
+
+class TestSessionExpiry:
+    def test_expire_returns_the_deleted_sessions(self, storage):
+        storage.add_session(_session("a", age=timedelta(days=2)))
+        storage.add_session(_session("b"))
+
+        expired = storage.expire_sessions()
+
+        assert [s.id for s in expired] == ["a"]
+        assert expired[0].deleted_at is not None
+        assert storage.get_session("a") is None
+        assert storage.expire_sessions() == []
+
+    @pytest.mark.parametrize("cached", [True, False])
+    def test_next_expiry(self, temp_db, cached):
+        storage = SQLiteStorage(db_path=temp_db, session_cache=cached)
+        assert storage.next_session_expiry() is None
+        old = _session("a", age=timedelta(hours=3))
+        storage.add_session(old)
+        storage.add_session(_session("b"))
+
+        due = storage.next_session_expiry()
+        if cached:
+            assert due == old.last_heartbeat + timedelta(seconds=SESSION_TIMEOUT)
+        else:
+            assert due <= datetime.now()  # unknown: sweep now
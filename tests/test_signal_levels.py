@@ -3,10 +3,14 @@
 from datetime import datetime
 from unittest.mock import patch
 
+import pytest
+
 from agent_event_bus import cli, server
 from agent_event_bus.storage import Event
 from conftest import make_events_args
 
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
 publish_event = server._publish_event_impl
 get_events = server._get_events_impl
 register_session = server._register_session_impl
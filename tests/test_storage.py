@@ -1,11 +1,21 @@
 """Tests for SQLite storage backend."""
 
+import itertools
 import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import pytest
 
-from agent_event_bus.storage import SCHEMA_VERSION, SESSION_TIMEOUT, Session, SQLiteStorage
+from agent_event_bus.payload_codec import CODECS, CompressedPayload
+from agent_event_bus.storage import (
+    SCHEMA_VERSION,
+    SESSION_TIMEOUT,
+    Session,
+    SQLiteStorage,
+    _build_events_query,
+)
 
 
 class TestSessionOperations:
@@ -85,6 +95,28 @@ class TestSessionOperations:
         """Test deleting a session that doesn't exist."""
         assert storage.delete_session("nonexistent") is False
 
+    def test_delete_sessions_in_one_batch(self, storage):
+        """Test soft-deleting several sessions at once."""
+        now = datetime.now()
+        for session_id in ("a", "b", "c"):
+            storage.add_session(
+                Session(
+                    id=session_id,
+                    display_id=f"d-{session_id}",
+                    name=session_id,
+                    machine="localhost",
+                    cwd="/home/user/project",
+                    repo="project",
+                    registered_at=now,
+                    last_heartbeat=now,
+                )
+            )
+        storage.delete_session("b")
+
+        assert storage.delete_sessions(["a", "b", "missing"]) == 1
+        assert [s.id for s in storage.list_sessions()] == ["c"]
+        assert storage.delete_sessions([]) == 0
+
     def test_list_sessions(self, storage):
         """Test listing all sessions."""
         now = datetime.now()
@@ -961,6 +993,7 @@ class TestSchemaParity:
 class TestSoftDelete:
     """Tests for soft-delete behavior."""
 
+    @pytest.mark.sqlite_only
     def test_soft_delete_sets_deleted_at_and_preserves_row(self, storage, temp_db):
         """Verify soft-delete sets deleted_at without removing the row."""
         import sqlite3
@@ -1259,3 +1292,392 @@ class TestBacklogPaging:
         events, cursor, has_more = storage.get_events(limit=0)
         assert events == []
         assert has_more is False
+
+
+class TestTransaction:
+    """storage.transaction(): one connection, one commit, for a unit of work."""
+
+    @pytest.mark.sqlite_only
+    def test_calls_inside_share_one_connection(self, storage):
+        with storage.transaction():
+            with storage._connect() as a, storage._connect() as b:
+                assert a is b
+
+    @pytest.mark.sqlite_only
+    def test_commits_once_at_the_end(self, storage):
+        with storage.transaction():
+            event = storage.add_event(event_type="t", payload="p", session_id="s1")
+            # Not yet visible to another connection
+            other = sqlite3.connect(storage.db_path)
+            assert other.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 0
+            other.close()
+        assert storage.get_cursor() == str(event.id)
+
+    def test_exception_rolls_back_every_write(self, storage):
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.add_event(event_type="t", payload="p", session_id="s1")
+                storage.add_event(event_type="t", payload="p", session_id="s1")
+                raise RuntimeError("boom")
+        assert storage.get_cursor() is None
+
+    def test_nested_transaction_joins_the_outer_one(self, storage):
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                with storage.transaction():
+                    storage.add_event(event_type="t", payload="p", session_id="s1")
+                raise RuntimeError("outer fails after inner finished")
+        assert storage.get_cursor() is None
+
+    def test_after_commit_waits_for_commit(self, storage):
+        seen = []
+        with storage.transaction():
+            storage.after_commit(lambda: seen.append(storage.get_cursor()))
+            event = storage.add_event(event_type="t", payload="p", session_id="s1")
+            assert seen == []
+        assert seen == [str(event.id)]
+
+    def test_after_commit_dropped_on_rollback(self, storage):
+        seen = []
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.after_commit(lambda: seen.append(True))
+                raise RuntimeError("boom")
+        assert seen == []
+
+    def test_after_commit_runs_immediately_outside_a_transaction(self, storage):
+        seen = []
+        storage.after_commit(lambda: seen.append(True))
+        assert seen == [True]
+
+    @pytest.mark.sqlite_only
+    def test_storage_usable_after_transaction(self, storage):
+        with storage.transaction():
+            storage.add_event(event_type="t", payload="p", session_id="s1")
+        with storage._connect() as conn:
+            assert not conn.in_transaction
+        storage.add_event(event_type="t", payload="p", session_id="s1")
+        assert storage.get_cursor() == "2"
+
+
+@pytest.mark.sqlite_only
+class TestGroupCommit:
+    """add_event batches concurrent publishers into shared transactions."""
+
+    def _publish_concurrently(self, storage, n):
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            return list(
+                pool.map(
+                    lambda i: storage.add_event(event_type="t", payload=str(i), session_id="s"),
+                    range(n),
+                )
+            )
+
+    def _slow_batches(self, storage, monkeypatch):
+        """Record batch sizes, holding each commit long enough for a queue to form."""
+        sizes = []
+        real = storage._commit_batch
+
+        def slow(batch):
+            sizes.append(len(batch))
+            time.sleep(0.02)
+            real(batch)
+
+        monkeypatch.setattr(storage, "_commit_batch", slow)
+        return sizes
+
+    def test_every_caller_gets_its_own_committed_id(self, storage):
+        events = self._publish_concurrently(storage, 32)
+
+        assert len({e.id for e in events}) == 32
+        stored, _, _ = storage.get_events(limit=100, order="asc")
+        by_id = {e.id: e.payload for e in stored}
+        assert all(by_id[e.id] == e.payload for e in events)
+
+    def test_concurrent_publishes_share_commits(self, storage, monkeypatch):
+        sizes = self._slow_batches(storage, monkeypatch)
+        self._publish_concurrently(storage, 16)
+
+        assert sum(sizes) == 16
+        assert len(sizes) < 16
+        assert max(sizes) > 1
+
+    def test_batch_size_capped(self, temp_db, monkeypatch):
+        storage = SQLiteStorage(db_path=temp_db, group_commit_max=3)
+        sizes = self._slow_batches(storage, monkeypatch)
+        self._publish_concurrently(storage, 12)
+
+        assert sum(sizes) == 12
+        assert max(sizes) <= 3
+
+    def test_failed_commit_raises_in_every_caller_of_the_batch(self, storage, monkeypatch):
+        def broken(conn, row):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(storage, "_insert_event", broken)
+        with pytest.raises(sqlite3.OperationalError):
+            storage.add_event(event_type="t", payload="p", session_id="s")
+        assert storage._pending == []
+
+    def test_disabled_writes_each_event_directly(self, temp_db, monkeypatch):
+        storage = SQLiteStorage(db_path=temp_db, group_commit_max=0)
+        monkeypatch.setattr(storage, "_group_commit", lambda pending: pytest.fail("grouped"))
+        assert storage.add_event(event_type="t", payload="p", session_id="s").id == 1
+
+    def test_inside_a_transaction_writes_inline(self, storage, monkeypatch):
+        monkeypatch.setattr(storage, "_group_commit", lambda pending: pytest.fail("grouped"))
+        with storage.transaction():
+            event = storage.add_event(event_type="t", payload="p", session_id="s")
+        assert storage.get_cursor() == str(event.id)
+
+    def test_returned_event_keeps_meta(self, storage):
+        event = storage.add_event(event_type="t", payload="p", session_id="s", meta={"tags": ["a"]})
+        assert event.meta == {"tags": ["a"]}
+
+
+@pytest.mark.sqlite_only
+class TestDurability:
+    def _synchronous(self, storage):
+        with storage._connect() as conn:
+            return conn.execute("PRAGMA synchronous").fetchone()[0]
+
+    def test_full_by_default(self, storage):
+        assert self._synchronous(storage) == 2  # FULL
+
+    def test_normal_relaxes_synchronous(self, temp_db):
+        assert self._synchronous(SQLiteStorage(db_path=temp_db, durability="normal")) == 1
+
+    def test_env_var_selects_mode(self, temp_db, monkeypatch):
+        monkeypatch.setenv("AGENT_EVENT_BUS_DURABILITY", "normal")
+        assert SQLiteStorage(db_path=temp_db).durability == "normal"
+
+    def test_unknown_mode_rejected(self, temp_db):
+        with pytest.raises(ValueError, match="durability"):
+            SQLiteStorage(db_path=temp_db, durability="yolo")
+
+
+@pytest.mark.sqlite_only
+class TestEventQueryPlans:
+    """Every filter shape get_events builds must seek an index, never scan.
+
+    Runs EXPLAIN QUERY PLAN over the exact SQL _build_events_query produces,
+    so an index dropped or a WHERE clause reshaped fails here rather than as
+    a poll that slows down with the size of the table.
+    """
+
+    FILTERS = {
+        "channels": [None, ["repo:a"], ["repo:a", "session:b"]],
+        "event_types": [None, ["ci_failed"], ["ci_failed", "help_needed"]],
+        "correlation_id": [None, "thread-1"],
+        "tags": [None, ["ci"], ["ci", "flaky"]],
+        "any_tags": [None, ["ci", "flaky"]],
+    }
+
+    def _plan(self, storage, **kwargs) -> list[str]:
+        query, params = _build_events_query(**kwargs)
+        with storage._connect() as conn:
+            return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+    def _shapes(self):
+        for (
+            channels,
+            event_types,
+            correlation_id,
+            tags,
+            any_tags,
+            cursor,
+            order,
+        ) in itertools.product(*self.FILTERS.values(), [None, "42"], ["asc", "desc"]):
+            # Unfiltered and cursor-less is "the newest N": a LIMITed walk of
+            # the primary key from one end, which is already optimal
+            if not (channels or event_types or correlation_id or tags or any_tags or cursor):
+                continue
+            yield dict(
+                cursor=cursor,
+                limit=50,
+                channels=channels,
+                order=order,
+                event_types=event_types,
+                correlation_id=correlation_id,
+                tags=tags,
+                any_tags=any_tags,
+            )
+
+    def test_every_filter_shape_seeks(self, storage):
+        for shape in self._shapes():
+            plan = self._plan(storage, **shape)
+            assert plan[0].startswith("SEARCH events USING"), (shape, plan)
+            assert not any(step.startswith("SCAN") for step in plan), (shape, plan)
+
+    def test_channel_poll_seeks_channel_and_cursor_together(self, storage):
+        plan = self._plan(storage, cursor="42", limit=50, channels=["repo:a"], order="asc")
+        assert plan == ["SEARCH events USING INDEX idx_events_channel_id (channel=? AND id>?)"]
+
+    def test_event_type_poll_seeks_type_and_cursor_together(self, storage):
+        plan = self._plan(storage, cursor="42", limit=50, event_types=["ci_failed"], order="asc")
+        assert plan == ["SEARCH events USING INDEX idx_events_type_id (event_type=? AND id>?)"]
+
+    def test_tag_poll_seeks_tag_and_cursor_together(self, storage):
+        plan = self._plan(storage, cursor="42", limit=50, tags=["ci"], order="asc")
+        assert (
+            "SEARCH event_tags USING COVERING INDEX idx_event_tags_tag (tag=? AND event_id>?)"
+            in (plan)
+        )
+
+    def test_redundant_id_index_dropped(self, storage):
+        with storage._connect() as conn:
+            indexes = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='events'"
+                )
+            }
+        assert "idx_events_id" not in indexes
+        assert {"idx_events_channel_id", "idx_events_type_id"} <= indexes
+
+
+@pytest.mark.sqlite_only
+class TestRowDecoding:
+    """Rows are decoded by position, timestamps without a sqlite3 converter."""
+
+    def _reopened(self, storage) -> SQLiteStorage:
+        return SQLiteStorage(db_path=str(storage.db_path), recent_events=0, session_cache=False)
+
+    def test_event_round_trip(self, storage):
+        event = storage.add_event(
+            event_type="t",
+            payload="p",
+            session_id="s",
+            channel="repo:x",
+            correlation_id="c",
+            meta={"title": "hello"},
+        )
+        events, _, _ = self._reopened(storage).get_events()
+        assert events[0] == event
+        assert events[0].timestamp_iso == event.timestamp.isoformat()
+
+    def test_session_round_trip(self, storage):
+        stamp = datetime(2026, 3, 1, 12, 0, 0)  # whole second: the short ISO form
+        session = Session(
+            id="s",
+            display_id="d",
+            name="n",
+            machine="m",
+            cwd="/c",
+            repo="r",
+            registered_at=stamp,
+            last_heartbeat=stamp + timedelta(microseconds=5),
+            client_id="42",
+            last_cursor="7",
+        )
+        storage.add_session(session)
+        storage.delete_session("s")
+
+        stored = self._reopened(storage).get_session("s", include_deleted=True)
+        assert stored.deleted_at is not None
+        stored.deleted_at = None
+        assert stored == session
+
+    def test_wire_form_of_text_not_written_by_isoformat(self, storage):
+        """A row written some other way renders as isoformat() always did."""
+        with storage._connect() as conn:
+            conn.execute(
+                "INSERT INTO events (event_type, payload, session_id, timestamp) "
+                "VALUES ('t', 'p', 's', '2026-03-01 12:00:00')"
+            )
+        events, _, _ = self._reopened(storage).get_events()
+        assert events[0].timestamp_iso == "2026-03-01T12:00:00"
+
+
+LOG_PAYLOAD = "".join(f'  File "/srv/app/module_{i}.py", line {i}, in handler\n' for i in range(60))
+
+
+@pytest.mark.sqlite_only
+class TestPayloadCompression:
+    """Large payloads are stored compressed and read back as the same text."""
+
+    def _stored(self, storage, event_id) -> tuple:
+        with storage._connect() as conn:
+            return conn.execute(
+                "SELECT typeof(payload), payload_codec FROM events WHERE id = ?", (event_id,)
+            ).fetchone()
+
+    def _reopened(self, storage, **kwargs) -> SQLiteStorage:
+        return SQLiteStorage(
+            db_path=str(storage.db_path), recent_events=0, session_cache=False, **kwargs
+        )
+
+    def test_large_payload_stored_compressed(self, storage):
+        event = storage.add_event(event_type="t", payload=LOG_PAYLOAD, session_id="s")
+        assert tuple(self._stored(storage, event.id)) == ("blob", "zlib")
+        events, _, _ = self._reopened(storage).get_events()
+        assert events[0].payload == LOG_PAYLOAD
+        assert events[0] == event
+
+    def test_small_payload_stored_as_text(self, storage):
+        event = storage.add_event(event_type="t", payload="short", session_id="s")
+        assert tuple(self._stored(storage, event.id)) == ("text", None)
+
+    def test_payload_that_does_not_shrink_stored_as_text(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db, compress_min_bytes=1)
+        event = storage.add_event(event_type="t", payload="ab", session_id="s")
+        assert tuple(self._stored(storage, event.id)) == ("text", None)
+
+    def test_zero_threshold_disables(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db, compress_min_bytes=0)
+        event = storage.add_event(event_type="t", payload=LOG_PAYLOAD, session_id="s")
+        assert tuple(self._stored(storage, event.id)) == ("text", None)
+        # Rows compressed earlier stay readable with compression off
+        storage.compress_min_bytes = 1024
+        compressed = storage.add_event(event_type="t", payload=LOG_PAYLOAD, session_id="s")
+        events, _, _ = self._reopened(storage, compress_min_bytes=0).get_events(order="asc")
+        assert [e.payload for e in events] == [LOG_PAYLOAD, LOG_PAYLOAD]
+        assert events[1].id == compressed.id
+
+    def test_decompressed_only_when_read(self, storage):
+        storage.add_event(event_type="t", payload=LOG_PAYLOAD, session_id="s")
+        (event,) = self._reopened(storage).scan_events(0, 10)
+        held = event.__dict__["_payload"]
+        assert isinstance(held, CompressedPayload)
+        assert event.payload_size == len(held.data) < len(LOG_PAYLOAD)
+        assert event.payload == LOG_PAYLOAD
+        assert event.__dict__["_payload"] == LOG_PAYLOAD  # decoded once, then kept
+
+    def test_recent_window_serves_decompressed_text(self, storage):
+        storage.add_event(event_type="t", payload=LOG_PAYLOAD, session_id="s")
+        warmed = SQLiteStorage(db_path=str(storage.db_path))
+        events, _, _ = warmed.get_events(cursor="0")
+        assert events[0].payload == LOG_PAYLOAD
+        assert warmed.recent_events_stats()["hits"] >= 1
+
+    def test_compress_payloads_backfills_history(self, temp_db):
+        plain = SQLiteStorage(db_path=temp_db, compress_min_bytes=0)
+        ids = [
+            plain.add_event(event_type="t", payload=payload, session_id="s").id
+            for payload in (LOG_PAYLOAD, "short", LOG_PAYLOAD)
+        ]
+        stats = self._reopened(plain).compress_payloads(batch_size=2)
+        assert stats["scanned"] == 3
+        assert stats["compressed"] == 2
+        assert stats["bytes_before"] == 2 * len(LOG_PAYLOAD)
+        assert 0 < stats["bytes_after"] < stats["bytes_before"]
+        assert [tuple(self._stored(plain, i))[1] for i in ids] == ["zlib", None, "zlib"]
+        events, _, _ = self._reopened(plain).get_events(order="asc")
+        assert [e.payload for e in events] == [LOG_PAYLOAD, "short", LOG_PAYLOAD]
+        # A second pass finds nothing left to do
+        assert self._reopened(plain).compress_payloads()["compressed"] == 0
+
+    def test_unknown_codec_rejected(self, temp_db):
+        with pytest.raises(ValueError, match="payload codec"):
+            SQLiteStorage(db_path=temp_db, payload_codec="lz4")
+
+    def test_threshold_from_environment(self, temp_db, monkeypatch):
+        monkeypatch.setenv("AGENT_EVENT_BUS_COMPRESS_MIN_BYTES", "0")
+        assert SQLiteStorage(db_path=temp_db).compress_min_bytes == 0
+
+    @pytest.mark.skipif("zstd" not in CODECS, reason="no zstd binding installed")
+    def test_zstd_round_trip(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db, payload_codec="zstd")
+        event = storage.add_event(event_type="t", payload=LOG_PAYLOAD, session_id="s")
+        assert tuple(self._stored(storage, event.id)) == ("blob", "zstd")
+        assert self._reopened(storage).get_events()[0][0].payload == LOG_PAYLOAD
@@ -0,0 +1,167 @@
+"""Tests for the storage interface, the backend selector, and the memory backend.
+
+The shared behavior of both backends is covered by running the rest of the
+suite once per backend (see conftest.py). This file holds what only the
+memory backend needs pinned down: that its transactions roll back what
+SQLite would have rolled back, and that they exclude other writers.
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from agent_event_bus.memory_storage import MemoryStorage
+from agent_event_bus.storage import Session, SQLiteStorage
+from agent_event_bus.storage_backend import STORAGE_BACKENDS, Storage, create_storage
+
+
+def _session(session_id: str) -> Session:
+    now = datetime.now()
+    return Session(
+        id=session_id,
+        display_id=f"d-{session_id}",
+        name=session_id,
+        machine="m",
+        cwd="/c",
+        repo="r",
+        registered_at=now,
+        last_heartbeat=now,
+        client_id=session_id,
+    )
+
+
+class TestCreateStorage:
+    def test_defaults_to_sqlite(self, monkeypatch, temp_db):
+        monkeypatch.delenv("AGENT_EVENT_BUS_STORAGE", raising=False)
+        monkeypatch.setenv("AGENT_EVENT_BUS_DB", temp_db)
+        assert isinstance(create_storage(), SQLiteStorage)
+
+    def test_env_selects_backend(self, monkeypatch):
+        monkeypatch.setenv("AGENT_EVENT_BUS_STORAGE", "memory")
+        assert isinstance(create_storage(), MemoryStorage)
+
+    def test_argument_wins_over_env(self, monkeypatch):
+        monkeypatch.setenv("AGENT_EVENT_BUS_STORAGE", "sqlite")
+        assert isinstance(create_storage("memory"), MemoryStorage)
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError, match="Unknown storage backend 'redis'"):
+            create_storage("redis")
+
+    def test_every_backend_provides_the_interface(self, storage):
+        assert isinstance(storage, Storage)
+        assert sorted(STORAGE_BACKENDS) == ["memory", "sqlite"]
+
+
+class TestMemoryTransactions:
+    def test_rollback_undoes_every_kind_of_write(self):
+        storage = MemoryStorage()
+        storage.add_session(_session("kept"))
+        kept_event = storage.add_event(event_type="note", payload="kept", session_id="kept")
+        webhook = storage.add_webhook(url="https://example.test/hook")
+
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.add_session(_session("new"))
+                storage.update_session_cursor("kept", "99")
+                storage.delete_session("kept")
+                storage.add_event(
+                    event_type="note", payload="new", session_id="new", meta={"tags": ["t"]}
+                )
+                storage.delete_events([kept_event.id])
+                storage.set_webhook_active(webhook.id, False)
+                storage.add_webhook(url="https://example.test/other")
+                raise RuntimeError("abort")
+
+        assert storage.get_session("new") is None
+        kept = storage.get_session("kept")
+        assert kept is not None and kept.last_cursor is None
+        assert [e.id for e in storage.get_events(order="asc")[0]] == [kept_event.id]
+        assert storage.get_events(tags=["t"])[0] == []
+        assert [w.id for w in storage.list_webhooks()] == [webhook.id]
+        assert storage.get_matching_webhooks(kept_event)[0].id == webhook.id
+
+    def test_after_commit_runs_on_commit_only(self):
+        storage = MemoryStorage()
+        ran = []
+        with storage.transaction():
+            storage.after_commit(lambda: ran.append("committed"))
+            assert ran == []
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.after_commit(lambda: ran.append("rolled back"))
+                raise RuntimeError("abort")
+        assert ran == ["committed"]
+
+    def test_nested_blocks_join_the_outer_one(self):
+        storage = MemoryStorage()
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                with storage.transaction(lazy=True):
+                    storage.add_event(event_type="note", payload="inner", session_id="s")
+                raise RuntimeError("abort")
+        assert storage.event_count() == 0
+
+    def test_excludes_other_writers_until_done(self):
+        storage = MemoryStorage()
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with storage.transaction():
+                storage.add_event(event_type="note", payload="first", session_id="s")
+                entered.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        entered.wait(5)
+        writer = threading.Thread(
+            target=storage.add_event,
+            kwargs=dict(event_type="note", payload="second", session_id="s"),
+        )
+        writer.start()
+        writer.join(0.1)
+        assert writer.is_alive()  # blocked behind the open transaction
+        release.set()
+        holder.join(5)
+        writer.join(5)
+        assert [e.payload for e in storage.get_events(order="asc")[0]] == ["first", "second"]
+
+
+class TestMemoryEventIndexes:
+    def test_deleted_ids_leave_every_index(self):
+        storage = MemoryStorage()
+        doomed = storage.add_event(
+            event_type="ci",
+            payload="x",
+            session_id="s",
+            channel="repo:a",
+            correlation_id="t",
+            meta={"tags": ["flaky", "flaky"]},
+        )
+        kept = storage.add_event(event_type="ci", payload="y", session_id="s", channel="repo:a")
+        assert storage.delete_oldest_events(5, doomed.id) == 1
+        assert [e.id for e in storage.get_events(channels=["repo:a"])[0]] == [kept.id]
+        assert storage.get_events(correlation_id="t")[0] == []
+        assert storage.get_events(any_tags=["flaky"])[0] == []
+        assert storage.get_cursor() == str(kept.id)
+
+    def test_ids_are_never_reused(self):
+        storage = MemoryStorage()
+        first = storage.add_event(event_type="note", payload="x", session_id="s")
+        storage.delete_events([first.id])
+        assert storage.get_cursor() is None
+        assert storage.add_event(event_type="note", payload="y", session_id="s").id > first.id
+
+    def test_search_understands_or_and_not(self):
+        storage = MemoryStorage()
+        deploy = storage.add_event(event_type="note", payload="deploy to prod", session_id="s")
+        staging = storage.add_event(event_type="note", payload="deploy to staging", session_id="s")
+        rollback = storage.add_event(event_type="note", payload="rollback", session_id="s")
+        assert [h.event.id for h in storage.search_events("deploy NOT staging")] == [deploy.id]
+        assert {h.event.id for h in storage.search_events("staging OR rollback")} == {
+            staging.id,
+            rollback.id,
+        }
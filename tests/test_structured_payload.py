@@ -6,9 +6,13 @@ import sqlite3
 from datetime import datetime
 from unittest.mock import patch
 
+import pytest
+
 from agent_event_bus import cli, server
 from conftest import make_publish_args
 
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
 publish_event = server._publish_event_impl
 get_events = server._get_events_impl
 
@@ -71,7 +75,11 @@ class TestStorageStructuredFields:
         )
         assert [e.payload for e in events] == ["b"]
 
-    def test_corrupt_payload_meta_is_dropped_not_fatal(self, storage):
+    def test_corrupt_payload_meta_is_dropped_not_fatal(self, temp_db):
+        from agent_event_bus.storage import SQLiteStorage
+
+        # Without the recent-events window, so the read decodes the bad row
+        storage = SQLiteStorage(db_path=temp_db, recent_events=0)
         storage.add_event(event_type="note", payload="hi", session_id="s1")
         with storage._connect() as conn:
             conn.execute("UPDATE events SET payload_meta = 'not-json{'")
@@ -80,6 +88,7 @@ class TestStorageStructuredFields:
         assert events[0].meta is None
 
 
+@pytest.mark.sqlite_only
 class TestMigrationV4:
     def test_migrates_v3_database(self, temp_db):
         """A pre-v4 database gains the new columns and keeps its events."""
@@ -112,6 +121,17 @@ class TestMigrationV4:
                 channel TEXT NOT NULL DEFAULT 'all'
             )
         """)
+        conn.execute("""
+            CREATE TABLE webhooks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                channel_filter TEXT,
+                event_types TEXT,
+                created_at TIMESTAMP NOT NULL,
+                active INTEGER NOT NULL DEFAULT 1,
+                secret TEXT
+            )
+        """)
         conn.execute(
             "INSERT INTO events (event_type, payload, session_id, timestamp) VALUES (?, ?, ?, ?)",
             ("legacy", "old event", "old-session", datetime.now().isoformat()),
@@ -271,3 +291,179 @@ class TestCLIStructuredFlags:
                 assert args.tags == "a,b"
                 assert args.correlation_id == "t-9"
                 assert args.signal_level == "actionable"
+
+
+def _tagged(storage, *tag_lists) -> list[int]:
+    """Publish one event per tag list (None = untagged) and return their ids."""
+    return [
+        storage.add_event(
+            event_type="note",
+            payload=f"p{i}",
+            session_id="s1",
+            meta={"tags": tags} if tags is not None else None,
+        ).id
+        for i, tags in enumerate(tag_lists)
+    ]
+
+
+class TestStorageTagFilters:
+    """tags / any_tags on get_events, answered from event_tags."""
+
+    def _ids(self, storage, **filters) -> list[int]:
+        events, _, _ = storage.get_events(order="asc", **filters)
+        return [e.id for e in events]
+
+    @pytest.mark.sqlite_only
+    def test_add_event_indexes_tags(self, storage):
+        (event_id,) = _tagged(storage, ["ci", "flaky", "ci"])
+        with storage._connect() as conn:
+            rows = conn.execute(
+                "SELECT tag FROM event_tags WHERE event_id = ? ORDER BY tag", (event_id,)
+            ).fetchall()
+        assert [row[0] for row in rows] == ["ci", "flaky"]
+
+    def test_tags_require_every_tag(self, storage):
+        ids = _tagged(storage, ["ci"], ["ci", "flaky"], ["flaky"], None)
+        assert self._ids(storage, tags=["ci"]) == ids[:2]
+        assert self._ids(storage, tags=["ci", "flaky"]) == [ids[1]]
+
+    def test_any_tags_require_one_tag(self, storage):
+        ids = _tagged(storage, ["ci"], ["ci", "flaky"], ["flaky"], ["other"], None)
+        assert self._ids(storage, any_tags=["ci", "flaky"]) == ids[:3]
+
+    def test_tag_filters_compose_with_cursor_and_other_filters(self, storage):
+        ids = _tagged(storage, ["ci"], ["ci", "flaky"], ["ci"])
+        assert self._ids(storage, cursor=str(ids[0]), tags=["ci"]) == ids[1:]
+        assert self._ids(storage, tags=["ci"], any_tags=["flaky"]) == [ids[1]]
+        assert self._ids(storage, tags=["ci"], event_types=["other"]) == []
+
+    def test_window_and_sql_agree(self, temp_db):
+        from agent_event_bus.storage import SQLiteStorage
+
+        cached = SQLiteStorage(db_path=temp_db)
+        _tagged(cached, ["ci"], ["ci", "flaky"], ["flaky"], None, ["a", 1])
+        uncached = SQLiteStorage(db_path=temp_db, recent_events=0)
+        for filters in (
+            {"tags": ["ci"]},
+            {"tags": ["ci", "flaky"]},
+            {"any_tags": ["flaky", "a"]},
+            {"tags": ["ci"], "any_tags": ["flaky"]},
+        ):
+            assert self._ids(cached, **filters) == self._ids(uncached, **filters), filters
+        assert cached.recent_events_stats()["hits"] >= 4
+
+    @pytest.mark.sqlite_only
+    def test_deleted_events_leave_no_tags(self, storage):
+        ids = _tagged(storage, ["ci"], ["ci"], ["ci"])
+        storage.delete_events([ids[0]])
+        storage.delete_oldest_events(1, ids[-1])
+        with storage._connect() as conn:
+            rows = conn.execute("SELECT event_id FROM event_tags").fetchall()
+        assert [row[0] for row in rows] == [ids[2]]
+
+    @pytest.mark.sqlite_only
+    def test_rolled_back_event_leaves_no_tags(self, storage):
+        try:
+            with storage.transaction():
+                _tagged(storage, ["ci"])
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        with storage._connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM event_tags").fetchone()[0] == 0
+
+
+class TestMigrationV8:
+    def test_backfills_tags_from_payload_meta(self, temp_db):
+        """Events written before event_tags existed become filterable by tag."""
+        from agent_event_bus.storage import SQLiteStorage
+
+        storage = SQLiteStorage(db_path=temp_db, recent_events=0)
+        ids = _tagged(storage, ["ci"], ["ci", "flaky"], None)
+        with storage._connect() as conn:
+            conn.execute(
+                "INSERT INTO events (event_type, payload, session_id, timestamp, payload_meta) "
+                "VALUES ('note', 'corrupt', 's1', ?, '{\"tags\": [not json')",
+                (datetime.now().isoformat(),),
+            )
+            conn.execute("DROP TABLE event_tags")
+            conn.execute("DROP TRIGGER events_delete_tags")
+            conn.execute("UPDATE schema_version SET version = 7")
+        storage.close()
+
+        migrated = SQLiteStorage(db_path=temp_db, recent_events=0)
+        events, _, _ = migrated.get_events(order="asc", tags=["ci"])
+        assert [e.id for e in events] == ids[:2]
+        events, _, _ = migrated.get_events(order="asc", any_tags=["flaky"])
+        assert [e.id for e in events] == [ids[1]]
+
+
+class TestServerTagFilters:
+    def test_get_events_tag_filters(self):
+        start = server.storage.get_cursor()
+        first = publish_event(event_type="note", payload="a", tags=["ci"])
+        publish_event(event_type="note", payload="b", tags=["docs"])
+        third = publish_event(event_type="note", payload="c", tags=["ci", "flaky"])
+
+        result = get_events(cursor=start, order="asc", tags=["ci"])
+        assert [e["id"] for e in result["events"]] == [first["event_id"], third["event_id"]]
+        result = get_events(cursor=start, order="asc", any_tags=["flaky", "nope"])
+        assert [e["id"] for e in result["events"]] == [third["event_id"]]
+
+    def test_tag_filtered_poll_does_not_consume(self):
+        session_id = server._register_session_impl(
+            name="tags", machine="m", cwd="/tmp", client_id="tag-filter-test"
+        )["session_id"]
+        get_events(session_id=session_id, resume=True)  # initializes the cursor at the tip
+        publish_event(event_type="note", payload="untagged")
+        publish_event(event_type="note", payload="tagged", tags=["ci"])
+
+        narrowed = get_events(session_id=session_id, resume=True, order="asc", tags=["ci"])
+        assert [e["payload"] for e in narrowed["events"]] == ["tagged"]
+        full = get_events(session_id=session_id, resume=True, order="asc")
+        assert [e["payload"] for e in full["events"]] == ["untagged", "tagged"]
+
+    def test_long_poll_predicate_honors_tags(self):
+        event = server.storage.add_event(
+            event_type="note", payload="p", session_id="s1", meta={"tags": ["ci"]}
+        )
+        assert server._event_matches(event, tags=["ci"])
+        assert not server._event_matches(event, tags=["ci", "flaky"])
+        assert server._event_matches(event, any_tags=["flaky", "ci"])
+        assert not server._event_matches(event, any_tags=["docs"])
+
+
+class TestCLITagFilters:
+    @patch("agent_event_bus.cli.call_tool")
+    def test_events_tag_filters_passthrough(self, mock_call):
+        from conftest import make_events_args
+
+        mock_call.return_value = {"events": [], "next_cursor": None}
+
+        cli.cmd_events(make_events_args(tags="ci, flaky", any_tags="backend"))
+
+        call_args = mock_call.call_args[0][1]
+        assert call_args["tags"] == ["ci", "flaky"]
+        assert call_args["any_tags"] == ["backend"]
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_events_without_tag_filters_omits_them(self, mock_call):
+        from conftest import make_events_args
+
+        mock_call.return_value = {"events": [], "next_cursor": None}
+
+        cli.cmd_events(make_events_args())
+
+        call_args = mock_call.call_args[0][1]
+        assert "tags" not in call_args and "any_tags" not in call_args
+
+    def test_events_tag_flags_parse(self):
+        import sys as _sys
+
+        argv = ["cli", "events", "--tags", "ci", "--any-tags", "a,b"]
+        with patch.object(_sys, "argv", argv):
+            with patch("agent_event_bus.cli.cmd_events") as mock_cmd:
+                cli.main()
+        args = mock_cmd.call_args[0][0]
+        assert args.tags == "ci"
+        assert args.any_tags == "a,b"
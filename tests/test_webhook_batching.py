@@ -0,0 +1,248 @@
+"""Tests for batched webhooks: deliveries grouped into signed JSON arrays."""
+
+import asyncio
+import json
+import sys
+from argparse import Namespace
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from agent_event_bus import cli, server
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
+
+def _publish(storage, count: int = 1):
+    return [
+        storage.add_event(event_type="note", payload=str(i), session_id="s") for i in range(count)
+    ]
+
+
+def _run_pass(monkeypatch, outcome=None):
+    """One _dispatch_webhooks pass; returns each POST's event ids, a list per request."""
+    posts = []
+
+    async def fake_deliver(webhook, event, bodies=None):
+        posts.append([event.id])
+        return outcome
+
+    async def fake_deliver_batch(webhook, events, bodies=None):
+        posts.append([event.id for event in events])
+        return outcome
+
+    monkeypatch.setattr(server, "_deliver_webhook", fake_deliver)
+    monkeypatch.setattr(server, "_deliver_webhook_batch", fake_deliver_batch)
+    asyncio.run(server._dispatch_webhooks())
+    return posts
+
+
+class TestBatchSettingsStorage:
+    def test_round_trip(self, storage):
+        webhook = storage.add_webhook(url="https://batch.test", batch_size=10, batch_linger=2.5)
+        assert (webhook.batch_size, webhook.batch_linger) == (10, 2.5)
+        (listed,) = storage.list_webhooks()
+        assert (listed.batch_size, listed.batch_linger) == (10, 2.5)
+        storage.add_event(event_type="note", payload="p", session_id="s")
+        (claimed,) = storage.claim_webhook_deliveries(10, 60)
+        assert claimed.webhook.batch_size == 10
+
+    def test_off_by_default(self, storage):
+        webhook = storage.add_webhook(url="https://single.test")
+        assert (webhook.batch_size, webhook.batch_linger) == (None, None)
+
+
+class TestRegisterBatched:
+    def test_linger_defaults_when_batching(self):
+        result = server._register_webhook_impl(url="https://batch.test", batch_size=20)
+        assert (result["batch_size"], result["batch_linger"]) == (
+            20,
+            server.WEBHOOK_BATCH_LINGER_SECONDS,
+        )
+        (listed,) = server._list_webhooks_impl()
+        assert (listed["batch_size"], listed["batch_linger"]) == (20, 1.0)
+
+    def test_unbatched_reports_none(self):
+        result = server._register_webhook_impl(url="https://single.test")
+        assert (result["batch_size"], result["batch_linger"]) == (None, None)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"batch_size": 0},
+            {"batch_size": server.WEBHOOK_DISPATCH_BATCH + 1},
+            {"batch_linger": 1.0},
+            {"batch_size": 5, "batch_linger": -1},
+            {"batch_size": 5, "batch_linger": server.WEBHOOK_MAX_BATCH_LINGER_SECONDS + 1},
+        ],
+    )
+    def test_invalid_settings_rejected(self, kwargs):
+        assert "error" in server._register_webhook_impl(url="https://batch.test", **kwargs)
+        assert server.storage.list_webhooks() == []
+
+
+class TestBatchedDispatch:
+    def test_full_batch_goes_out_at_once(self, monkeypatch):
+        server.storage.add_webhook(url="https://batch.test", batch_size=3, batch_linger=60)
+        events = _publish(server.storage, 3)
+        assert _run_pass(monkeypatch) == [[e.id for e in events]]
+        assert server.storage.list_webhook_deliveries() == []
+
+    def test_partial_batch_waits_and_later_events_join_it(self, monkeypatch):
+        webhook = server.storage.add_webhook(
+            url="https://batch.test", batch_size=10, batch_linger=60
+        )
+        _publish(server.storage, 2)
+        assert _run_pass(monkeypatch) == []
+        deadline = server._filling_batches[webhook.id].deadline
+        assert deadline > datetime.now()
+
+        _publish(server.storage)
+        assert _run_pass(monkeypatch) == []
+        rows = server.storage.list_webhook_deliveries()
+        # Deferred without spending attempts, all to the first event's deadline
+        assert [(r.attempts, r.next_attempt_at) for r in rows] == [(0, deadline)] * 3
+
+    def test_batch_filled_over_several_rounds_goes_out_when_full(self, monkeypatch):
+        webhook = server.storage.add_webhook(
+            url="https://batch.test", batch_size=3, batch_linger=30
+        )
+        events = []
+        for _ in range(2):
+            events += _publish(server.storage)
+            assert _run_pass(monkeypatch) == []
+        assert len(server._filling_batches[webhook.id].held) == 2
+
+        events += _publish(server.storage)
+        # The third event fills the batch: the two held back come due with it
+        assert _run_pass(monkeypatch) == [[e.id for e in events]]
+        assert server.storage.list_webhook_deliveries() == []
+        assert webhook.id not in server._filling_batches
+
+    def test_next_batch_starts_fresh_after_a_full_one(self, monkeypatch):
+        webhook = server.storage.add_webhook(
+            url="https://batch.test", batch_size=2, batch_linger=30
+        )
+        for _ in range(2):
+            _publish(server.storage)
+            _run_pass(monkeypatch)
+        _publish(server.storage)
+        assert _run_pass(monkeypatch) == []
+        assert len(server._filling_batches[webhook.id].held) == 1
+
+    def test_expired_linger_sends_a_partial_batch(self, monkeypatch):
+        webhook = server.storage.add_webhook(
+            url="https://batch.test", batch_size=10, batch_linger=0
+        )
+        events = _publish(server.storage, 2)
+        assert _run_pass(monkeypatch) == [[e.id for e in events]]
+        assert webhook.id not in server._filling_batches
+
+    def test_overflow_sends_full_batches_and_holds_the_rest(self, monkeypatch):
+        server.storage.add_webhook(url="https://batch.test", batch_size=2, batch_linger=60)
+        events = _publish(server.storage, 5)
+        ids = [e.id for e in events]
+        assert _run_pass(monkeypatch) == [ids[0:2], ids[2:4]]
+        (waiting,) = server.storage.list_webhook_deliveries()
+        assert waiting.event_id == ids[4]
+
+    def test_failed_batch_is_retried_as_one_without_lingering(self, monkeypatch):
+        server.storage.add_webhook(url="https://batch.test", batch_size=3, batch_linger=60)
+        events = _publish(server.storage, 3)
+        _run_pass(monkeypatch, "returned 503")
+        rows = server.storage.list_webhook_deliveries()
+        assert {r.attempts for r in rows} == {1}
+        assert len({r.next_attempt_at for r in rows}) == 1  # one shared backoff
+
+        for row in rows:  # come due now
+            server.storage.fail_webhook_delivery(row.id, "returned 503", datetime.now())
+        server.storage.add_event(event_type="note", payload="late", session_id="s")
+        # The retries go straight out; the new event starts a batch of its own
+        assert _run_pass(monkeypatch) == [[e.id for e in events]]
+        (fresh,) = server.storage.list_webhook_deliveries()
+        assert fresh.attempts == 0
+
+    def test_unbatched_webhooks_still_get_one_post_per_event(self, monkeypatch):
+        server.storage.add_webhook(url="https://single.test")
+        server.storage.add_webhook(url="https://batch.test", batch_size=5, batch_linger=0)
+        events = _publish(server.storage, 2)
+        ids = [e.id for e in events]
+        assert sorted(_run_pass(monkeypatch)) == sorted([[ids[0]], [ids[1]], ids])
+
+    def test_open_breaker_holds_the_whole_batch(self, monkeypatch):
+        webhook = server.storage.add_webhook(
+            url="https://batch.test", batch_size=2, batch_linger=60
+        )
+        for _ in range(server.WEBHOOK_BREAKER_THRESHOLD):
+            server.webhook_breakers.record(webhook.id, ok=False)
+        _publish(server.storage, 2)
+        assert _run_pass(monkeypatch) == []
+        rows = server.storage.list_webhook_deliveries()
+        assert [r.attempts for r in rows] == [0, 0]
+        assert all(r.next_attempt_at > datetime.now() for r in rows)
+
+
+class TestBatchWireFormat:
+    def test_array_of_payloads_signed_as_a_whole(self):
+        webhook = server.storage.add_webhook(
+            url="https://batch.test", secret="s3cret", batch_size=5, batch_linger=1
+        )
+        events = _publish(server.storage, 2)
+        captured = {}
+
+        class FakeResponse:
+            status_code = 200
+
+        class FakeClient:
+            async def post(self, url, content=None, headers=None):
+                captured.update(content=content, headers=headers)
+                return FakeResponse()
+
+        with patch.object(server, "_get_webhook_client", FakeClient):
+            assert asyncio.run(server._deliver_webhook_batch(webhook, events)) is None
+        assert json.loads(captured["content"]) == [server._webhook_payload(e) for e in events]
+        signature = server._compute_signature(captured["content"], "s3cret")
+        assert captured["headers"][server.SIGNATURE_HEADER] == f"sha256={signature}"
+
+
+class TestWebhookBatchCli:
+    def test_register_parses_batch_settings(self):
+        argv = ["cli", "webhook", "register", "--url", "https://batch.test", "--batch-size", "25"]
+        with patch.object(sys, "argv", [*argv, "--batch-linger", "2.5"]):
+            with patch("agent_event_bus.cli.cmd_webhook_register") as mock_cmd:
+                cli.main()
+        args = mock_cmd.call_args[0][0]
+        assert (args.batch_size, args.batch_linger) == (25, 2.5)
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_register_passes_batch_settings(self, mock_call, capsys):
+        mock_call.return_value = {"webhook_id": 1}
+        args = Namespace(
+            webhook_url="https://batch.test",
+            channel=None,
+            event_types=None,
+            secret=None,
+            batch_size=25,
+            batch_linger=None,
+            url=None,
+        )
+        cli.cmd_webhook_register(args)
+        arguments = mock_call.call_args.args[1]
+        assert arguments["batch_size"] == 25
+        assert "batch_linger" not in arguments  # the server's default applies
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_list_shows_batch_settings(self, mock_call, capsys):
+        mock_call.return_value = [
+            {
+                "webhook_id": 1,
+                "url": "https://batch.test",
+                "active": True,
+                "created_at": "2026-01-01T00:00:00",
+                "batch_size": 25,
+                "batch_linger": 2.5,
+            }
+        ]
+        cli.cmd_webhook_list(Namespace(all=False, url=None))
+        assert "Batches: up to 25 events, 2.5s linger" in capsys.readouterr().out
@@ -0,0 +1,233 @@
+"""Tests for per-webhook circuit breakers and delivery concurrency caps."""
+
+import asyncio
+from argparse import Namespace
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from agent_event_bus import cli, server
+from agent_event_bus.webhook_breaker import WebhookBreakers
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breakers(clock) -> WebhookBreakers:
+    return WebhookBreakers(threshold=3, cooldown=10, max_cooldown=25, probe_wait=5, clock=clock)
+
+
+class TestWebhookBreakers:
+    def test_closed_until_threshold_consecutive_failures(self):
+        breakers = _breakers(_Clock())
+        for _ in range(2):
+            breakers.record(1, ok=False)
+        assert breakers.admit(1) is None
+        breakers.record(1, ok=True)  # a success resets the count
+        for _ in range(2):
+            breakers.record(1, ok=False)
+        assert breakers.admit(1) is None
+        breakers.record(1, ok=False)
+        assert breakers.admit(1) == 1010.0
+        assert breakers.admit(2) is None  # per webhook
+
+    def test_half_open_lets_one_probe_through(self):
+        clock = _Clock()
+        breakers = _breakers(clock)
+        for _ in range(3):
+            breakers.record(1, ok=False)
+        clock.now = 1010.0
+        assert breakers.admit(1) is None  # the probe
+        assert breakers.admit(1) == 1015.0  # the rest wait for its outcome
+        assert breakers.snapshot(1)["state"] == "half_open"
+
+    def test_successful_probe_closes(self):
+        clock = _Clock()
+        breakers = _breakers(clock)
+        for _ in range(3):
+            breakers.record(1, ok=False)
+        clock.now = 1010.0
+        breakers.admit(1)
+        breakers.record(1, ok=True)
+        assert breakers.admit(1) is None
+        assert breakers.snapshot(1) == {
+            "state": "closed",
+            "consecutive_failures": 0,
+            "retry_at": None,
+        }
+
+    def test_failed_probe_doubles_the_cooldown_up_to_the_cap(self):
+        clock = _Clock()
+        breakers = _breakers(clock)
+        for _ in range(3):
+            breakers.record(1, ok=False)
+        for expected_cooldown in (20, 25, 25):
+            clock.now = breakers.admit(1) or clock.now
+            assert breakers.admit(1) is None
+            breakers.record(1, ok=False)
+            assert breakers.admit(1) == clock.now + expected_cooldown
+
+    def test_late_failures_while_open_do_not_extend_it(self):
+        breakers = _breakers(_Clock())
+        for _ in range(3):
+            breakers.record(1, ok=False)
+        breakers.record(1, ok=False)
+        assert breakers.admit(1) == 1010.0
+        assert breakers.snapshot(1)["consecutive_failures"] == 3
+
+    def test_snapshot_reports_when_it_next_probes(self):
+        breakers = _breakers(_Clock())
+        for _ in range(3):
+            breakers.record(1, ok=False)
+        snapshot = breakers.snapshot(1)
+        assert snapshot["state"] == "open"
+        assert snapshot["retry_at"] == datetime.fromtimestamp(1010.0).isoformat()
+
+    def test_forget(self):
+        breakers = _breakers(_Clock())
+        for _ in range(3):
+            breakers.record(1, ok=False)
+        breakers.forget(1)
+        assert breakers.admit(1) is None
+
+
+class TestDispatchWithBreakers:
+    def _fail_every_post(self, monkeypatch):
+        posts = []
+
+        async def fake_deliver(webhook, event, bodies=None):
+            posts.append(event.id)
+            return "returned 503"
+
+        monkeypatch.setattr(server, "_deliver_webhook", fake_deliver)
+        return posts
+
+    def test_open_breaker_defers_without_spending_attempts(self, monkeypatch):
+        webhook = server.storage.add_webhook(url="https://down.test")
+        for _ in range(server.WEBHOOK_BREAKER_THRESHOLD):
+            server.webhook_breakers.record(webhook.id, ok=False)
+        server.storage.add_event(event_type="note", payload="p", session_id="s")
+        posts = self._fail_every_post(monkeypatch)
+
+        asyncio.run(server._dispatch_webhooks())
+
+        assert posts == []
+        (row,) = server.storage.list_webhook_deliveries()
+        assert row.attempts == 0
+        assert row.next_attempt_at > datetime.now()
+
+    def test_breaker_opens_mid_round(self, monkeypatch):
+        """Deliveries queued behind the failures that open the breaker are
+        held back rather than sent."""
+        monkeypatch.setattr(server, "WEBHOOK_MAX_CONCURRENCY", 1)
+        server.storage.add_webhook(url="https://down.test")
+        count = server.WEBHOOK_BREAKER_THRESHOLD + 3
+        for i in range(count):
+            server.storage.add_event(event_type="note", payload=str(i), session_id="s")
+        posts = self._fail_every_post(monkeypatch)
+
+        asyncio.run(server._dispatch_webhooks())
+
+        assert len(posts) == server.WEBHOOK_BREAKER_THRESHOLD
+        rows = server.storage.list_webhook_deliveries()
+        assert sorted(r.attempts for r in rows) == [0] * 3 + [1] * len(posts)
+
+    def test_concurrency_is_capped_per_webhook(self, monkeypatch):
+        monkeypatch.setattr(server, "WEBHOOK_MAX_CONCURRENCY", 2)
+        slow = server.storage.add_webhook(url="https://slow.test")
+        other = server.storage.add_webhook(url="https://other.test")
+        for i in range(6):
+            server.storage.add_event(event_type="note", payload=str(i), session_id="s")
+        in_flight = {slow.id: 0, other.id: 0}
+        peak = {slow.id: 0, other.id: 0}
+
+        async def fake_deliver(webhook, event, bodies=None):
+            in_flight[webhook.id] += 1
+            peak[webhook.id] = max(peak[webhook.id], in_flight[webhook.id])
+            await asyncio.sleep(0.01)
+            in_flight[webhook.id] -= 1
+
+        monkeypatch.setattr(server, "_deliver_webhook", fake_deliver)
+        asyncio.run(server._dispatch_webhooks())
+
+        assert peak == {slow.id: 2, other.id: 2}
+        assert server.storage.list_webhook_deliveries() == []
+
+    def test_cancelled_delivery_still_reports_to_the_breaker(self, monkeypatch):
+        webhook = server.storage.add_webhook(url="https://hung.test")
+        server.storage.add_event(event_type="note", payload="p", session_id="s")
+
+        async def hang(webhook, event, bodies=None):
+            await asyncio.sleep(60)
+
+        monkeypatch.setattr(server, "_deliver_webhook", hang)
+
+        async def main():
+            (delivery,) = server.storage.claim_webhook_deliveries(10, 60)
+            task = asyncio.ensure_future(server._attempt_delivery([delivery]))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(main())
+        assert server.webhook_breakers.snapshot(webhook.id)["consecutive_failures"] == 1
+
+    def test_client_pool_limits_are_explicit(self, monkeypatch):
+        # Restored afterwards, so the mock client never outlives this test
+        monkeypatch.setattr(server, "_webhook_client", None)
+        with patch("agent_event_bus.server.httpx.AsyncClient") as mock_client:
+            asyncio.run(self._get_client())
+        limits = mock_client.call_args.kwargs["limits"]
+        assert limits.max_connections == server.WEBHOOK_MAX_CONNECTIONS
+        assert limits.max_keepalive_connections == server.WEBHOOK_MAX_KEEPALIVE_CONNECTIONS
+
+    @staticmethod
+    async def _get_client():
+        return server._get_webhook_client()
+
+
+class TestBreakerVisibility:
+    def test_list_webhooks_reports_breaker_state(self):
+        webhook = server.storage.add_webhook(url="https://down.test")
+        assert server._list_webhooks_impl()[0]["breaker"]["state"] == "closed"
+        for _ in range(server.WEBHOOK_BREAKER_THRESHOLD):
+            server.webhook_breakers.record(webhook.id, ok=False)
+        breaker = server._list_webhooks_impl()[0]["breaker"]
+        assert breaker["state"] == "open"
+        assert breaker["consecutive_failures"] == server.WEBHOOK_BREAKER_THRESHOLD
+        assert breaker["retry_at"] is not None
+
+    def test_unregister_forgets_the_breaker(self):
+        webhook = server.storage.add_webhook(url="https://down.test")
+        for _ in range(server.WEBHOOK_BREAKER_THRESHOLD):
+            server.webhook_breakers.record(webhook.id, ok=False)
+        server._unregister_webhook_impl(webhook.id)
+        assert server.webhook_breakers.admit(webhook.id) is None
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_cli_list_shows_open_circuits(self, mock_call, capsys):
+        mock_call.return_value = [
+            {
+                "webhook_id": 1,
+                "url": "https://down.test",
+                "active": True,
+                "created_at": "2026-01-01T00:00:00",
+                "breaker": {
+                    "state": "open",
+                    "consecutive_failures": 5,
+                    "retry_at": "2026-01-01T00:00:30",
+                },
+            }
+        ]
+        cli.cmd_webhook_list(Namespace(all=False, url=None))
+        assert "Circuit: open after 5 failures, next probe 2026-01-01T00:00:30" in (
+            capsys.readouterr().out
+        )
@@ -0,0 +1,117 @@
+"""Tests for webhook fan-out: each event rendered and signed once per dispatch round."""
+
+import asyncio
+import json
+import sys
+import types
+
+import pytest
+
+from agent_event_bus import server
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
+
+class _FakeResponse:
+    status_code = 200
+
+
+def _run_pass(monkeypatch):
+    """One _dispatch_webhooks pass against a client that accepts everything;
+    returns each POST as (url, content, headers)."""
+    posts = []
+
+    class FakeClient:
+        async def post(self, url, content=None, headers=None):
+            posts.append((url, content, headers))
+            return _FakeResponse()
+
+    monkeypatch.setattr(server, "_get_webhook_client", FakeClient)
+    asyncio.run(server._dispatch_webhooks())
+    return posts
+
+
+def _count_calls(monkeypatch, name: str) -> list:
+    calls = []
+    original = getattr(server, name)
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(server, name, counting)
+    return calls
+
+
+class TestSerializeOnce:
+    def test_each_event_is_rendered_once_and_shared(self, monkeypatch):
+        for i in range(10):
+            server.storage.add_webhook(url=f"https://hook{i}.test")
+        events = [
+            server.storage.add_event(event_type="note", payload=str(i), session_id="s")
+            for i in range(2)
+        ]
+        rendered = _count_calls(monkeypatch, "_webhook_payload")
+
+        posts = _run_pass(monkeypatch)
+
+        assert len(posts) == 20
+        assert len(rendered) == 2
+        for event in events:
+            bodies = {
+                id(content)
+                for _, content, _ in posts
+                if json.loads(content)["event_id"] == event.id
+            }
+            assert len(bodies) == 1  # the very same bytes object, ten times
+
+    def test_each_body_is_signed_once_per_distinct_secret(self, monkeypatch):
+        secrets = ["shared", "shared", "shared", "other", None]
+        for i, secret in enumerate(secrets):
+            server.storage.add_webhook(url=f"https://hook{i}.test", secret=secret)
+        server.storage.add_event(event_type="note", payload="p", session_id="s")
+        signed = _count_calls(monkeypatch, "_compute_signature")
+
+        posts = _run_pass(monkeypatch)
+
+        assert sorted(secret for _, secret in signed) == ["other", "shared"]
+        for (_, content, headers), secret in zip(sorted(posts), secrets):
+            if secret is None:
+                assert server.SIGNATURE_HEADER not in headers
+            else:
+                expected = server._compute_signature(content, secret)
+                assert headers[server.SIGNATURE_HEADER] == f"sha256={expected}"
+
+    def test_batch_is_spliced_from_the_rendered_events(self, monkeypatch):
+        server.storage.add_webhook(url="https://single.test")
+        server.storage.add_webhook(url="https://batch.test", batch_size=3, batch_linger=0)
+        events = [
+            server.storage.add_event(event_type="note", payload=str(i), session_id="s")
+            for i in range(3)
+        ]
+        rendered = _count_calls(monkeypatch, "_webhook_payload")
+
+        posts = _run_pass(monkeypatch)
+
+        assert len(rendered) == 3
+        (batch,) = [content for url, content, _ in posts if url == "https://batch.test"]
+        assert json.loads(batch) == [server._webhook_payload(e) for e in events]
+
+
+class TestJsonEncoder:
+    def test_uses_orjson_when_installed(self, monkeypatch):
+        fake = types.SimpleNamespace(dumps=lambda obj: b"fast")
+        monkeypatch.setitem(sys.modules, "orjson", fake)
+        assert server._load_json_encoder()({"a": 1}) == b"fast"
+
+    def test_falls_back_to_json_for_what_orjson_refuses(self, monkeypatch):
+        def refuse(obj):
+            raise TypeError("Integer exceeds 64-bit range")
+
+        monkeypatch.setitem(sys.modules, "orjson", types.SimpleNamespace(dumps=refuse))
+        big = {"n": 2**70}
+        assert server._load_json_encoder()(big) == json.dumps(big).encode()
+
+    def test_json_without_orjson(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "orjson", None)  # import raises ImportError
+        assert server._load_json_encoder() is server._json_bytes
@@ -0,0 +1,304 @@
+"""Tests for the webhook outbox: durable deliveries, retries, and dead letters."""
+
+import asyncio
+import sys
+from argparse import Namespace
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from agent_event_bus import cli, server
+from agent_event_bus.storage import SQLiteStorage
+
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
+
+def _publish(storage, event_type: str = "note", channel: str = "all"):
+    return storage.add_event(event_type=event_type, payload="p", session_id="s", channel=channel)
+
+
+class TestOutboxStorage:
+    def test_event_enqueues_one_delivery_per_matching_webhook(self, storage):
+        every = storage.add_webhook(url="https://every.test")
+        storage.add_webhook(url="https://ci.test", event_types=["ci"])
+        event = _publish(storage)
+        (delivery,) = storage.list_webhook_deliveries()
+        assert (delivery.webhook_id, delivery.event_id) == (every.id, event.id)
+        assert (delivery.status, delivery.attempts) == ("pending", 0)
+
+    def test_no_webhooks_no_deliveries(self, storage):
+        _publish(storage)
+        storage.add_events([{"event_type": "a", "payload": "1", "session_id": "s"}])
+        assert storage.list_webhook_deliveries() == []
+
+    def test_batch_enqueues_for_every_event(self, storage):
+        storage.add_webhook(url="https://every.test")
+        events = storage.add_events(
+            [{"event_type": t, "payload": "p", "session_id": "s"} for t in ("a", "b")]
+        )
+        assert [d.event_id for d in storage.list_webhook_deliveries()] == [e.id for e in events]
+
+    def test_rolled_back_event_leaves_no_delivery(self, storage):
+        storage.add_webhook(url="https://every.test")
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                _publish(storage)
+                raise RuntimeError("abort")
+        assert storage.list_webhook_deliveries() == []
+
+    def test_claim_leases_what_it_returns(self, storage):
+        webhook = storage.add_webhook(url="https://every.test")
+        event = _publish(storage)
+        (claimed,) = storage.claim_webhook_deliveries(10, 60)
+        assert claimed.webhook.url == webhook.url
+        assert claimed.event.id == event.id
+        assert claimed.attempts == 0
+        # Leased: no other pass sees it, and nothing is due until the lease runs out
+        assert storage.claim_webhook_deliveries(10, 60) == []
+        assert storage.next_webhook_delivery() > datetime.now()
+
+    def test_expired_lease_is_claimed_again(self, storage):
+        storage.add_webhook(url="https://every.test")
+        _publish(storage)
+        (first,) = storage.claim_webhook_deliveries(10, 0)
+        (again,) = storage.claim_webhook_deliveries(10, 60)
+        assert again.id == first.id
+
+    def test_claim_limit_takes_oldest_first(self, storage):
+        storage.add_webhook(url="https://every.test")
+        events = [_publish(storage) for _ in range(3)]
+        claimed = storage.claim_webhook_deliveries(2, 60)
+        assert [d.event_id for d in claimed] == [e.id for e in events[:2]]
+
+    def test_inactive_webhook_is_not_claimed(self, storage):
+        webhook = storage.add_webhook(url="https://every.test")
+        _publish(storage)
+        storage.set_webhook_active(webhook.id, False)
+        assert storage.claim_webhook_deliveries(10, 60) == []
+        assert storage.next_webhook_delivery() is None
+        storage.set_webhook_active(webhook.id, True)
+        assert len(storage.claim_webhook_deliveries(10, 60)) == 1
+
+    def test_complete_removes_the_delivery(self, storage):
+        storage.add_webhook(url="https://every.test")
+        _publish(storage)
+        (claimed,) = storage.claim_webhook_deliveries(10, 60)
+        assert storage.complete_webhook_delivery(claimed.id) is True
+        assert storage.list_webhook_deliveries() == []
+        assert storage.complete_webhook_delivery(claimed.id) is False
+
+    def test_fail_reschedules_and_records_the_error(self, storage):
+        storage.add_webhook(url="https://every.test")
+        _publish(storage)
+        (claimed,) = storage.claim_webhook_deliveries(10, 60)
+        retry_at = datetime.now() + timedelta(seconds=30)
+        assert storage.fail_webhook_delivery(claimed.id, "returned 503", retry_at) is True
+        (row,) = storage.list_webhook_deliveries()
+        assert (row.status, row.attempts, row.last_error) == ("pending", 1, "returned 503")
+        assert row.next_attempt_at == retry_at
+        assert storage.next_webhook_delivery() == retry_at
+
+    def test_dead_letters_wait_for_replay(self, storage):
+        webhook = storage.add_webhook(url="https://every.test")
+        other = storage.add_webhook(url="https://other.test")
+        _publish(storage)
+        for claimed in storage.claim_webhook_deliveries(10, 60):
+            storage.fail_webhook_delivery(claimed.id, "timed out", None)
+        dead = storage.list_webhook_deliveries(status="dead")
+        assert len(dead) == 2
+        assert storage.next_webhook_delivery() is None
+        assert storage.claim_webhook_deliveries(10, 0) == []
+
+        assert storage.replay_webhook_deliveries(webhook_id=other.id) == 1
+        (replayed,) = storage.list_webhook_deliveries(status="pending")
+        assert (replayed.webhook_id, replayed.attempts) == (other.id, 0)
+        assert storage.replay_webhook_deliveries(delivery_ids=[replayed.id]) == 0
+        (still_dead,) = storage.list_webhook_deliveries(status="dead")
+        assert still_dead.webhook_id == webhook.id
+        assert storage.replay_webhook_deliveries() == 1
+
+    def test_deleting_the_event_or_webhook_drops_its_deliveries(self, storage):
+        doomed = storage.add_webhook(url="https://doomed.test")
+        kept = storage.add_webhook(url="https://kept.test")
+        first = _publish(storage)
+        second = _publish(storage)
+        storage.delete_events([first.id])
+        storage.delete_webhook(doomed.id)
+        (left,) = storage.list_webhook_deliveries()
+        assert (left.webhook_id, left.event_id) == (kept.id, second.id)
+
+    @pytest.mark.sqlite_only
+    def test_deliveries_survive_a_restart(self, temp_db):
+        storage = SQLiteStorage(db_path=temp_db)
+        storage.add_webhook(url="https://every.test")
+        event = _publish(storage)
+        storage.claim_webhook_deliveries(10, 0)  # a pass that died mid-delivery
+        storage.close()
+
+        reopened = SQLiteStorage(db_path=temp_db)
+        (claimed,) = reopened.claim_webhook_deliveries(10, 60)
+        assert claimed.event.id == event.id
+        reopened.close()
+
+
+def _run_pass(monkeypatch, outcome):
+    """One _dispatch_webhooks pass with every POST answered by `outcome`."""
+    delivered = []
+
+    async def fake_deliver(webhook, event, bodies=None):
+        delivered.append(event.id)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(server, "_deliver_webhook", fake_deliver)
+    asyncio.run(server._dispatch_webhooks())
+    return delivered
+
+
+class TestDispatchPass:
+    def test_delivered_rows_leave_the_outbox(self, monkeypatch):
+        server.storage.add_webhook(url="https://every.test")
+        event = _publish(server.storage)
+        assert _run_pass(monkeypatch, None) == [event.id]
+        assert server.storage.list_webhook_deliveries() == []
+
+    def test_failure_is_retried_later_with_backoff(self, monkeypatch):
+        server.storage.add_webhook(url="https://every.test")
+        _publish(server.storage)
+        before = datetime.now()
+        _run_pass(monkeypatch, "returned 502")
+        (row,) = server.storage.list_webhook_deliveries()
+        assert (row.status, row.attempts, row.last_error) == ("pending", 1, "returned 502")
+        assert row.next_attempt_at > before
+        # Not due yet, so the next pass leaves it alone
+        assert _run_pass(monkeypatch, None) == []
+
+    def test_exception_counts_as_a_failed_attempt(self, monkeypatch):
+        server.storage.add_webhook(url="https://every.test")
+        _publish(server.storage)
+        _run_pass(monkeypatch, ValueError("boom"))
+        (row,) = server.storage.list_webhook_deliveries()
+        assert row.attempts == 1
+        assert row.last_error == "raised ValueError: boom"
+
+    def test_last_attempt_makes_a_dead_letter(self, monkeypatch):
+        monkeypatch.setattr(server, "WEBHOOK_MAX_ATTEMPTS", 2)
+        monkeypatch.setattr(server, "_webhook_retry_delay", lambda attempts: 0)
+        server.storage.add_webhook(url="https://every.test")
+        _publish(server.storage)
+        _run_pass(monkeypatch, "timed out")
+        _run_pass(monkeypatch, "timed out")
+        (row,) = server.storage.list_webhook_deliveries()
+        assert (row.status, row.attempts) == ("dead", 2)
+        assert _run_pass(monkeypatch, None) == []
+
+    def test_full_round_goes_again(self, monkeypatch):
+        monkeypatch.setattr(server, "WEBHOOK_DISPATCH_BATCH", 2)
+        server.storage.add_webhook(url="https://every.test")
+        events = [_publish(server.storage) for _ in range(5)]
+        assert _run_pass(monkeypatch, None) == [e.id for e in events]
+
+    @pytest.mark.parametrize("attempts", [1, 3, 10, 40])
+    def test_retry_delay_is_jittered_exponential_and_capped(self, attempts):
+        ceiling = min(
+            server.WEBHOOK_RETRY_MAX_SECONDS,
+            server.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        )
+        for _ in range(20):
+            assert ceiling / 2 <= server._webhook_retry_delay(attempts) <= ceiling
+
+    def test_schedule_skips_events_no_webhook_wants(self):
+        event = _publish(server.storage)
+        with patch("agent_event_bus.server.threading.Thread") as mock_thread:
+            server._schedule_webhook_dispatch(event)
+        mock_thread.assert_not_called()
+
+    def test_retry_task_drives_a_pass(self, monkeypatch):
+        server.storage.add_webhook(url="https://every.test")
+        event = _publish(server.storage)
+        assert server._next_webhook_delivery() <= datetime.now().timestamp()
+        monkeypatch.setattr(server, "_server_loop", None)
+        delivered = []
+
+        async def fake_deliver(webhook, event, bodies=None):
+            delivered.append(event.id)
+
+        monkeypatch.setattr(server, "_deliver_webhook", fake_deliver)
+        server._retry_webhook_deliveries()
+        assert delivered == [event.id]
+        assert server._next_webhook_delivery() is None
+
+
+class TestDeadLetterTools:
+    def _kill(self, monkeypatch):
+        monkeypatch.setattr(server, "WEBHOOK_MAX_ATTEMPTS", 1)
+        webhook = server.storage.add_webhook(url="https://every.test")
+        event = _publish(server.storage)
+        _run_pass(monkeypatch, "returned 500")
+        return webhook, event
+
+    def test_list_dead_letters(self, monkeypatch):
+        webhook, event = self._kill(monkeypatch)
+        result = server._list_dead_letters_impl()
+        assert result["count"] == 1
+        (dead,) = result["dead_letters"]
+        assert (dead["webhook_id"], dead["event_id"]) == (webhook.id, event.id)
+        assert (dead["status"], dead["attempts"]) == ("dead", 1)
+        assert dead["last_error"] == "returned 500"
+        assert server._list_dead_letters_impl(webhook_id=webhook.id + 1)["count"] == 0
+
+    def test_replay_requeues_and_kicks_a_pass(self, monkeypatch):
+        self._kill(monkeypatch)
+        with patch("agent_event_bus.server._schedule_webhook_dispatch") as mock_dispatch:
+            assert server._replay_dead_letters_impl() == {"replayed": 1}
+        mock_dispatch.assert_called_once_with()
+        assert server._list_dead_letters_impl()["count"] == 0
+        (row,) = server.storage.list_webhook_deliveries(status="pending")
+        assert row.attempts == 0
+
+    def test_replay_with_nothing_dead(self):
+        with patch("agent_event_bus.server._schedule_webhook_dispatch") as mock_dispatch:
+            assert server._replay_dead_letters_impl(delivery_ids=[42]) == {"replayed": 0}
+        mock_dispatch.assert_not_called()
+
+
+class TestWebhookDeadLetterCli:
+    @patch("agent_event_bus.cli.call_tool")
+    def test_dead_letters_lists(self, mock_call, capsys):
+        mock_call.return_value = {
+            "dead_letters": [
+                {
+                    "delivery_id": 3,
+                    "webhook_id": 1,
+                    "event_id": 9,
+                    "attempts": 15,
+                    "last_error": "returned 502",
+                }
+            ],
+            "count": 1,
+        }
+        cli.cmd_webhook_dead_letters(Namespace(webhook_id=1, limit=5, json=False, url=None))
+        mock_call.assert_called_once_with(
+            "list_dead_letters", {"limit": 5, "webhook_id": 1}, url=None
+        )
+        out = capsys.readouterr().out
+        assert "#3  webhook #1  event 9" in out
+        assert "returned 502" in out
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_replay_passes_ids(self, mock_call, capsys):
+        mock_call.return_value = {"replayed": 2}
+        cli.cmd_webhook_replay(Namespace(delivery_ids=[3, 4], webhook_id=None, url=None))
+        mock_call.assert_called_once_with("replay_dead_letters", {"delivery_ids": [3, 4]}, url=None)
+        assert "Requeued 2" in capsys.readouterr().out
+
+    def test_replay_parses(self):
+        argv = ["cli", "webhook", "replay", "3", "4", "--webhook-id", "1"]
+        with patch.object(sys, "argv", argv):
+            with patch("agent_event_bus.cli.cmd_webhook_replay") as mock_cmd:
+                cli.main()
+        args = mock_cmd.call_args[0][0]
+        assert args.delivery_ids == [3, 4]
+        assert args.webhook_id == 1
@@ -1,5 +1,6 @@
 """Tests for webhook functionality."""
 
+import threading
 from datetime import datetime
 from unittest.mock import AsyncMock, patch
 
@@ -7,6 +8,8 @@ import pytest
 
 from agent_event_bus.storage import Event, SQLiteStorage, Webhook
 
+pytestmark = pytest.mark.usefixtures("storage_backend")
+
 
 class TestWebhookStorage:
     """Tests for webhook storage operations."""
@@ -191,6 +194,65 @@ class TestWebhookMatching:
         event = self._make_event()
         assert len(storage.get_matching_webhooks(event)) == 0
 
+    def test_nested_prefixes_all_match(self, storage):
+        """Every filter that prefixes the channel matches, and nothing else."""
+        ids = [
+            storage.add_webhook(url=f"https://{f}.com", channel_filter=f).id
+            for f in ("", "repo", "repo:a", "repo:ab", "repo:b")
+        ]
+        storage.add_webhook(url="https://types.com", event_types=["other"])
+
+        matching = storage.get_matching_webhooks(self._make_event(channel="repo:ab"))
+        assert sorted(wh.id for wh in matching) == ids[:4]
+
+    def test_index_is_reused_until_a_webhook_write(self, storage):
+        storage.add_webhook(url="https://a.com")
+        event = self._make_event()
+        assert len(storage.get_matching_webhooks(event)) == 1
+
+        with patch.object(storage, "list_webhooks", side_effect=AssertionError("reloaded")):
+            assert len(storage.get_matching_webhooks(event)) == 1
+
+        wh = storage.add_webhook(url="https://b.com")
+        assert len(storage.get_matching_webhooks(event)) == 2
+        storage.set_webhook_active(wh.id, False)
+        assert len(storage.get_matching_webhooks(event)) == 1
+        storage.set_webhook_active(wh.id, True)
+        storage.delete_webhook(wh.id)
+        assert [w.url for w in storage.get_matching_webhooks(event)] == ["https://a.com"]
+
+    def test_build_racing_a_write_is_not_kept(self, storage):
+        """An index built from rows read before a write never outlives it."""
+        storage.add_webhook(url="https://a.com")
+        real_list = storage.list_webhooks
+
+        def list_then_write(active_only=True):
+            rows = real_list(active_only=active_only)
+            storage.add_webhook(url="https://b.com")  # lands mid-build
+            return rows
+
+        event = self._make_event()
+        with patch.object(storage, "list_webhooks", side_effect=list_then_write):
+            assert len(storage.get_matching_webhooks(event)) == 1
+        assert len(storage.get_matching_webhooks(event)) == 2
+
+    def test_rebuild_on_another_thread_sees_the_new_webhook(self, storage):
+        """The index is invalidated only once add_webhook's INSERT has
+        committed: a rebuild another thread starts right then reads the new
+        row, rather than rebuilding from the table as it was and keeping it."""
+        event = self._make_event()
+        real_invalidate = storage._invalidate_webhooks
+
+        def invalidate_then_rebuild_elsewhere():
+            real_invalidate()
+            rebuild = threading.Thread(target=storage.get_matching_webhooks, args=(event,))
+            rebuild.start()
+            rebuild.join()
+
+        with patch.object(storage, "_invalidate_webhooks", invalidate_then_rebuild_elsewhere):
+            storage.add_webhook(url="https://a.com")
+        assert [w.url for w in storage.get_matching_webhooks(event)] == ["https://a.com"]
+
 
 class TestWebhookDispatch:
     """Tests for webhook HTTP dispatch."""
@@ -490,8 +552,9 @@ class TestWebhookIntegration:
             assert dispatched_event.event_type == "test_event"
 
     @pytest.mark.asyncio
-    async def test_dispatch_webhook_retry_on_failure(self):
-        """Test webhook retries on HTTP errors."""
+    async def test_dispatch_webhook_does_not_retry_inline(self):
+        """A failed POST is not retried in place: the outbox retries it later
+        (see test_webhook_outbox.py)."""
         from agent_event_bus.server import _dispatch_webhook
 
         webhook = Webhook(
@@ -513,9 +576,8 @@ class TestWebhookIntegration:
         )
 
         with patch("agent_event_bus.server._get_webhook_client") as mock_get_client:
-            # Mock 500, 500, then 200 (succeeds on retry)
+            # Mock 500, then 200 (which an inline retry would reach)
             mock_responses = [
-                AsyncMock(status_code=500),
                 AsyncMock(status_code=500),
                 AsyncMock(status_code=200),
             ]
@@ -525,13 +587,13 @@ class TestWebhookIntegration:
 
             result = await _dispatch_webhook(webhook, event)
 
-            assert result is True
-            assert mock_client.post.call_count == 3  # Retried twice, succeeded on 3rd
+            assert result is False
+            assert mock_client.post.call_count == 1
 
     @pytest.mark.asyncio
-    async def test_dispatch_webhook_exhausts_retries(self):
-        """Test webhook returns False after exhausting retries."""
-        from agent_event_bus.server import _dispatch_webhook
+    async def test_deliver_webhook_reports_the_failure(self):
+        """_deliver_webhook says why a delivery failed, for the outbox's last_error."""
+        from agent_event_bus.server import _deliver_webhook
 
         webhook = Webhook(
             id=1,
@@ -552,17 +614,15 @@ class TestWebhookIntegration:
         )
 
         with patch("agent_event_bus.server._get_webhook_client") as mock_get_client:
-            # All attempts fail
-            mock_response = AsyncMock(status_code=500)
+            mock_response = AsyncMock(status_code=503)
             mock_client = AsyncMock()
             mock_client.post = AsyncMock(return_value=mock_response)
             mock_get_client.return_value = mock_client
 
-            result = await _dispatch_webhook(webhook, event)
+            assert await _deliver_webhook(webhook, event) == "returned 503"
 
-            assert result is False
-            # 1 initial + 2 retries = 3 calls
-            assert mock_client.post.call_count == 3
+            mock_response.status_code = 204
+            assert await _deliver_webhook(webhook, event) is None
 
     @pytest.mark.asyncio
     async def test_dispatch_webhook_handles_timeout(self):